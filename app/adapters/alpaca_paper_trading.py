@@ -6,7 +6,7 @@
 import logging
 import os
 from datetime import datetime
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 
 from alpaca.trading.client import TradingClient
@@ -270,6 +270,24 @@ class AlpacaPaperTrading:
             logger.error(f"가격 조회 실패 {ticker}: {e}")
             return None
     
+    def get_latest_prices(self, tickers: List[str]) -> Dict[str, float]:
+        """다종목 현재가 일괄 조회 (최신 호가 1회 요청, bid/ask 중간값)"""
+        if not tickers:
+            return {}
+        try:
+            request = StockLatestQuoteRequest(symbol_or_symbols=list(tickers))
+            latest_quotes = self.data_client.get_stock_latest_quote(request)
+            prices = {}
+            for ticker, quote in latest_quotes.items():
+                bid, ask = float(quote.bid_price or 0), float(quote.ask_price or 0)
+                mid = (bid + ask) / 2 if bid > 0 and ask > 0 else max(bid, ask)
+                if mid > 0:
+                    prices[ticker] = mid
+            return prices
+        except Exception as e:
+            logger.error(f"가격 일괄 조회 실패 ({len(tickers)}종목): {e}")
+            return {}
+    
     def submit_bracket_order(self, ticker: str, side: str, quantity: int,
                            stop_loss_price: float, take_profit_price: float,
                            signal_id: str = None) -> Tuple[AlpacaTrade, str, str]:
@@ -0,0 +1,725 @@
+"""
+로컬 거래소 시뮬레이터 (TradingProtocol 구현)
+- 녹화 봉(JSONL) 또는 시드 고정 합성 봉(GBM)으로 종목별 가격 경로 재생 → 같은 입력이면 같은 체결
+- 가상 시계: 주문 지연은 가상 시간 기준 → 실제 대기 없이 수십~수백 배속 실행
+  BROKER=sim 기본은 벽시계 1배속 자동 진행(SIM_SPEED), 수동 진행(speed 0)은 리플레이/테스트에서 step()으로 구동
+- 레이트리밋: 자동 진행 시 실제 API처럼 벽시계로 보충, 수동 진행 시 가상 시계로 보충
+- 공유 상태(REDIS_URL): 가상 시계 기준점·계좌·대기 주문을 Redis에 두고 단일 락으로 갱신
+  → API/워커/비트 프로세스가 같은 가격 경로와 같은 계좌를 봄
+- 체결: 스프레드 + 참여율 비례 충격 슬리피지, 봉 거래량 참여율 상한 → 부분 체결(잔량은 다음 봉에서 이어서 체결)
+- 브래킷: 스톱/목표가 자식 주문을 TriggerBook OCO 그룹으로 관리, 봉마다 불리한 극값부터 평가(보수적)
+- 거부: 레이트리밋 / 매수여력 부족 / 공매도 불가 / 시세 없음 + 시드 고정 랜덤 거부율
+"""
+from __future__ import annotations
+
+import gzip
+import json
+import logging
+import math
+import os
+import random
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.adapters.trading_adapter import UnifiedPosition, UnifiedTrade
+from app.adapters.trigger_book import STOP, TARGET, Trigger, TriggerBook
+
+logger = logging.getLogger(__name__)
+
+SIM_LOCK_WAIT_SEC = 5.0
+SIM_LOCK_TTL_SEC = 10
+SIM_STATE_TTL_SEC = 7 * 86400
+
+
+class OrderRejected(ValueError):
+    """시뮬레이터 주문 거부 (reason: rate_limited / insufficient_buying_power / ...)"""
+
+    def __init__(self, reason: str, message: str = ""):
+        self.reason = reason
+        super().__init__(f"주문 거부({reason}){': ' + message if message else ''}")
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+@dataclass
+class SimConfig:
+    """시뮬레이터 설정 (환경변수 SIM_* 로 오버라이드)"""
+    seed: int = 42
+    initial_cash: float = 100000.0
+    bar_sec: int = 60
+    start: datetime = datetime(2025, 1, 2, 14, 30, tzinfo=timezone.utc)
+    latency_ms: float = 150.0          # 주문 → 체결 평균 지연 (가상 시간)
+    latency_jitter_ms: float = 50.0
+    half_spread_bps: float = 2.0
+    impact_bps: float = 50.0           # 봉 거래량 100% 참여 시 추가 충격
+    participation: float = 0.1         # 봉당 체결 가능 거래량 비율 (부분 체결 상한)
+    reject_rate: float = 0.0           # 랜덤 거부 확률
+    rate_limit_per_min: float = 200.0  # 알파카 기본 200req/min
+    rate_burst: int = 20
+    allow_short: bool = True
+    speed: float = 0.0                 # >0: 벽시계 × speed 로 봉 자동 진행, 0: step() 수동 (리플레이/테스트)
+    synthetic_vol: float = 0.002       # 합성 봉 1봉 수익률 표준편차
+    synthetic_volume: int = 50000
+
+    @classmethod
+    def from_env(cls) -> "SimConfig":
+        cfg = cls()
+        cfg.seed = int(_env_float("SIM_SEED", cfg.seed))
+        cfg.initial_cash = _env_float("SIM_INITIAL_CASH", cfg.initial_cash)
+        cfg.bar_sec = int(_env_float("SIM_BAR_SEC", cfg.bar_sec))
+        start = os.getenv("SIM_START")
+        if start:
+            cfg.start = datetime.fromisoformat(start.replace("Z", "+00:00"))
+        cfg.latency_ms = _env_float("SIM_LATENCY_MS", cfg.latency_ms)
+        cfg.latency_jitter_ms = _env_float("SIM_LATENCY_JITTER_MS", cfg.latency_jitter_ms)
+        cfg.half_spread_bps = _env_float("SIM_HALF_SPREAD_BPS", cfg.half_spread_bps)
+        cfg.impact_bps = _env_float("SIM_IMPACT_BPS", cfg.impact_bps)
+        cfg.participation = _env_float("SIM_PARTICIPATION", cfg.participation)
+        cfg.reject_rate = _env_float("SIM_REJECT_RATE", cfg.reject_rate)
+        cfg.rate_limit_per_min = _env_float("SIM_RATE_LIMIT_PER_MIN", cfg.rate_limit_per_min)
+        cfg.rate_burst = int(_env_float("SIM_RATE_BURST", cfg.rate_burst))
+        cfg.allow_short = os.getenv("SIM_ALLOW_SHORT", "1").lower() in ("1", "true", "yes", "on")
+        cfg.speed = _env_float("SIM_SPEED", 1.0)  # BROKER=sim: step() 호출자가 없으므로 벽시계 진행이 기본
+        cfg.synthetic_vol = _env_float("SIM_SYNTHETIC_VOL", cfg.synthetic_vol)
+        cfg.synthetic_volume = int(_env_float("SIM_SYNTHETIC_VOLUME", cfg.synthetic_volume))
+        return cfg
+
+
+@dataclass
+class SimBar:
+    """시뮬레이터 봉 (기존 Candle 호환: o/h/l/c/v, ts)"""
+    o: float
+    h: float
+    l: float
+    c: float
+    v: int
+    ts: datetime
+
+
+# ----------------------------------------------------------------------
+# 봉 소스
+# ----------------------------------------------------------------------
+def synthetic_bars(ticker: str, seed: int = 42, start: Optional[datetime] = None,
+                   bar_sec: int = 60, vol: float = 0.002, volume: int = 50000,
+                   start_price: Optional[float] = None) -> Iterator[SimBar]:
+    """종목별 시드 고정 GBM 봉 (무한 생성)"""
+    rng = random.Random(f"{seed}:{ticker}")
+    price = start_price or round(20 + rng.random() * 280, 2)
+    ts = start or SimConfig.start
+    while True:
+        o = price * (1 + rng.gauss(0, vol * 0.2))
+        c = o * math.exp(rng.gauss(0, vol))
+        h = max(o, c) * (1 + abs(rng.gauss(0, vol * 0.5)))
+        l = min(o, c) * (1 - abs(rng.gauss(0, vol * 0.5)))
+        v = max(1, int(volume * rng.lognormvariate(0, 0.5)))
+        yield SimBar(o=round(o, 4), h=round(h, 4), l=round(l, 4), c=round(c, 4), v=v, ts=ts)
+        price = c
+        ts = ts + timedelta(seconds=bar_sec)
+
+
+def load_bars_jsonl(path: str) -> Dict[str, List[SimBar]]:
+    """녹화 봉 로드: 줄당 {"ticker","ts","o","h","l","c","v"} → 종목별 시간순 리스트 (.gz 지원)"""
+    out: Dict[str, List[SimBar]] = {}
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                d = json.loads(line)
+                ts = d["ts"]
+                ts = datetime.fromisoformat(ts.replace("Z", "+00:00")) if isinstance(ts, str) \
+                    else datetime.fromtimestamp(float(ts), tz=timezone.utc)
+                bar = SimBar(o=float(d["o"]), h=float(d["h"]), l=float(d["l"]),
+                             c=float(d["c"]), v=int(d.get("v", 0)), ts=ts)
+            except Exception as e:
+                logger.warning(f"녹화 봉 스킵: {e}")
+                continue
+            out.setdefault(str(d["ticker"]).upper(), []).append(bar)
+    for bars in out.values():
+        bars.sort(key=lambda b: b.ts)
+    return out
+
+
+@dataclass
+class _Working:
+    """부분 체결 잔량 (다음 봉에서 이어서 체결)"""
+    order_id: str
+    ticker: str
+    side: str
+    remaining: int
+    signal_id: str = None
+    meta: dict = None
+
+
+@dataclass
+class _Book:
+    """종목 시세 상태: 현재 봉 + 다음 봉 미리보기 + 봉 내 소진 거래량"""
+    source: Iterator[SimBar]
+    bar: Optional[SimBar] = None
+    nxt: Optional[SimBar] = None
+    used_volume: int = 0
+    idx: int = 0                       # 지금까지 진행한 봉 수 (공유 상태 따라잡기 기준)
+
+
+@dataclass
+class SimStats:
+    orders: int = 0
+    fills: int = 0
+    partials: int = 0
+    bracket_exits: int = 0
+    bars: int = 0
+    latency_ms_total: float = 0.0
+    rejects: Counter = field(default_factory=Counter)
+
+
+class SimStateStore:
+    """프로세스 간 공유 시뮬레이터 상태 (Redis): 벽시계 기준점 + 계좌/대기 주문 스냅샷 + 단일 락"""
+
+    def __init__(self, redis_client, namespace: str = "sim"):
+        self.r = redis_client
+        self.epoch_key = f"{namespace}:epoch"
+        self.state_key = f"{namespace}:state"
+        self.lock_key = f"{namespace}:lock"
+
+    def epoch(self, default: float) -> float:
+        """가상 시계 기준 벽시계 시각 (최초 프로세스가 정함)"""
+        try:
+            self.r.set(self.epoch_key, default, nx=True, ex=SIM_STATE_TTL_SEC)
+            raw = self.r.get(self.epoch_key)
+            return float(raw.decode() if isinstance(raw, bytes) else raw)
+        except Exception as e:
+            logger.warning(f"시뮬레이터 기준 시각 조회 실패 (프로세스 로컬): {e}")
+            return default
+
+    def acquire(self, wait_sec: float = SIM_LOCK_WAIT_SEC) -> str:
+        token = f"{os.getpid()}:{threading.get_ident()}:{time.time()}"
+        deadline = time.time() + wait_sec
+        while not self.r.set(self.lock_key, token, nx=True, ex=SIM_LOCK_TTL_SEC):
+            if time.time() >= deadline:
+                raise RuntimeError("시뮬레이터 상태 락 획득 실패")
+            time.sleep(0.005)
+        return token
+
+    def release(self, token: str) -> None:
+        raw = self.r.get(self.lock_key)
+        if (raw.decode() if isinstance(raw, bytes) else raw) == token:
+            self.r.delete(self.lock_key)
+
+    def load(self) -> Optional[dict]:
+        raw = self.r.get(self.state_key)
+        return json.loads(raw) if raw else None
+
+    def save(self, state: dict) -> None:
+        self.r.set(self.state_key, json.dumps(state), ex=SIM_STATE_TTL_SEC)
+
+
+class MarketSimulator:
+    """결정적 로컬 거래소 (TradingProtocol + submit_bracket_order/submit_eod_exit)"""
+
+    def __init__(self, config: Optional[SimConfig] = None,
+                 bars: Optional[Dict[str, Iterable[SimBar]]] = None,
+                 on_fill: Optional[Callable[[UnifiedTrade], None]] = None,
+                 store: Optional[SimStateStore] = None):
+        self.config = config or SimConfig()
+        self.store = store
+        self._recorded = bars is not None
+        self._books: Dict[str, _Book] = {}
+        for t, src in (bars or {}).items():
+            self._books[t.upper()] = self._open_book(iter(src))
+        self.cash = float(self.config.initial_cash)
+        self.positions: Dict[str, Tuple[int, float]] = {}   # ticker → (부호 수량, 평단)
+        self.realized_pnl = 0.0
+        self.now = self.config.start
+        self.fills: List[UnifiedTrade] = []
+        self.stats = SimStats()
+        self.on_fill = on_fill
+        self._rng = random.Random(self.config.seed)
+        self._triggers = TriggerBook(persist=False)
+        self._exits: Dict[str, str] = {}           # 자식 주문 ID → 청산 방향(buy/sell)
+        self._working: List[_Working] = []
+        self._seq = 0
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._wall_start = store.epoch(time.time()) if store is not None else time.time()
+        self._sim_start = self.now
+        self._tokens = float(self.config.rate_burst)
+        self._tokens_at = self._rate_now()
+
+    # ------------------------------------------------------------------
+    # 시세 / 가상 시계
+    # ------------------------------------------------------------------
+    def _open_book(self, source: Iterator[SimBar]) -> _Book:
+        book = _Book(source=source)
+        book.bar = next(source, None)
+        book.nxt = next(source, None)
+        return book
+
+    def _book(self, ticker: str) -> Optional[_Book]:
+        book = self._books.get(ticker)
+        if book is None and not self._recorded:
+            # 시작 시각부터 생성해 현재 봉까지 따라잡음 → 처음 조회한 시점과 무관하게 프로세스 간 같은 경로
+            cfg = self.config
+            book = self._open_book(synthetic_bars(ticker, cfg.seed, self._sim_start, cfg.bar_sec,
+                                                  cfg.synthetic_vol, cfg.synthetic_volume))
+            self._catch_up(book)
+            self._books[ticker] = book
+        return book
+
+    def _advance(self, book: _Book) -> bool:
+        book.idx += 1
+        if book.nxt is None:
+            return False  # 녹화 종료 → 마지막 봉 유지
+        book.bar, book.nxt = book.nxt, next(book.source, None)
+        book.used_volume = 0
+        return True
+
+    def _catch_up(self, book: _Book) -> None:
+        """체결 평가 없이 현재 봉 위치까지 전진 (다른 프로세스가 이미 평가한 구간)"""
+        while book.idx < self.stats.bars:
+            self._advance(book)
+
+    def step(self, n: int = 1) -> List[UnifiedTrade]:
+        """가상 시계를 n봉 전진 → 잔량 체결 + 브래킷 트리거 평가, 발생 체결 반환"""
+        out: List[UnifiedTrade] = []
+        with self._session():
+            for _ in range(max(0, n)):
+                self.now += timedelta(seconds=self.config.bar_sec)
+                self.stats.bars += 1
+                for ticker, book in self._books.items():
+                    if not self._advance(book):
+                        continue
+                    out += self._fill_working(ticker, book)
+                    out += self._eval_triggers(ticker, book.bar)
+        return out
+
+    def _pump(self) -> None:
+        # speed > 0: 벽시계 경과 × speed 만큼 가상 시계를 따라잡음 (파이프라인 배속 실행)
+        speed = self.config.speed
+        if speed <= 0:
+            return
+        with self._session():
+            target = self._sim_start + timedelta(seconds=(time.time() - self._wall_start) * speed)
+            behind = int((target - self.now).total_seconds() // self.config.bar_sec)
+            if behind > 0:
+                self.step(behind)
+
+    # ------------------------------------------------------------------
+    # 공유 상태
+    # ------------------------------------------------------------------
+    @contextmanager
+    def _session(self):
+        """상태 접근 구간: 로컬 락 + (공유 모드) Redis 락 안에서 최신 상태 적재 → 작업 → 저장 (중첩 시 바깥 구간만)"""
+        with self._lock:
+            outer = self.store is not None and self._depth == 0
+            token = self.store.acquire() if outer else None
+            self._depth += 1
+            try:
+                if outer:
+                    state = self.store.load()
+                    if state:
+                        self._restore(state)
+                yield
+            finally:
+                self._depth -= 1
+                if outer:
+                    try:
+                        self.store.save(self._dump())
+                    finally:
+                        self.store.release(token)
+
+    def _dump(self) -> dict:
+        return {
+            "now": self.now.isoformat(), "bars": self.stats.bars, "cash": self.cash,
+            "realized_pnl": self.realized_pnl, "seq": self._seq,
+            "tokens": self._tokens, "tokens_at": self._tokens_at,
+            "positions": {t: [q, avg] for t, (q, avg) in self.positions.items()},
+            "working": [asdict(w) for w in self._working],
+            "triggers": [asdict(t) for t in self._triggers.orders()],
+            "exits": dict(self._exits),
+            "used": {t: b.used_volume for t, b in self._books.items() if b.used_volume},
+        }
+
+    def _restore(self, state: dict) -> None:
+        if int(state.get("bars", 0)) < self.stats.bars:
+            return  # 만료/초기화된 상태 → 로컬이 최신, 저장 시 덮어씀
+        self.now = datetime.fromisoformat(state["now"])
+        self.stats.bars = int(state["bars"])
+        self.cash = float(state["cash"])
+        self.realized_pnl = float(state["realized_pnl"])
+        self._seq = int(state["seq"])
+        self._tokens, self._tokens_at = float(state["tokens"]), float(state["tokens_at"])
+        self.positions = {t: (int(q), float(avg)) for t, (q, avg) in state["positions"].items()}
+        self._working = [_Working(**w) for w in state["working"]]
+        self._triggers = TriggerBook(persist=False)
+        for t in state["triggers"]:
+            self._triggers.add(Trigger(**t))
+        self._exits = dict(state["exits"])
+        used = state.get("used") or {}
+        for t in set(self._books) | set(used):
+            book = self._book(t)
+            if book is not None:
+                self._catch_up(book)
+                book.used_volume = int(used.get(t, 0))
+
+    def get_current_price(self, ticker: str) -> Optional[float]:
+        """현재가 (현재 봉 종가)"""
+        with self._session():
+            self._pump()
+            book = self._book(ticker.upper())
+            return book.bar.c if book and book.bar else None
+
+    def get_latest_prices(self, tickers: List[str]) -> Dict[str, float]:
+        """다종목 현재가 (현재 봉 종가, 봉 없는 종목 제외)"""
+        out = {}
+        with self._session():
+            for t in tickers:
+                price = self.get_current_price(t)
+                if price:
+                    out[t] = price
+        return out
+
+    def get_latest_candles(self, ticker: str, n: int = 1) -> List[SimBar]:
+        """인제스터 호환: 현재 봉 (히스토리는 보관하지 않음)"""
+        with self._session():
+            book = self._book(ticker.upper())
+            return [book.bar] if book and book.bar and n > 0 else []
+
+    # ------------------------------------------------------------------
+    # 주문
+    # ------------------------------------------------------------------
+    def _next_id(self, prefix: str) -> str:
+        self._seq += 1
+        return f"{prefix}_{self.now.strftime('%Y%m%d%H%M%S')}_{self._seq:06d}"
+
+    def _reject(self, reason: str, message: str = "") -> None:
+        self.stats.rejects[reason] += 1
+        raise OrderRejected(reason, message)
+
+    def _rate_now(self) -> float:
+        # 자동 진행(BROKER=sim)은 실제 API처럼 벽시계, 수동 진행(리플레이/테스트)은 가상 시계 기준 보충
+        return time.time() if self.config.speed > 0 else self.now.timestamp()
+
+    def _take_token(self) -> bool:
+        cfg = self.config
+        if cfg.rate_limit_per_min <= 0:
+            return True
+        now = self._rate_now()
+        elapsed = max(0.0, now - self._tokens_at)
+        self._tokens = min(float(cfg.rate_burst), self._tokens + elapsed * cfg.rate_limit_per_min / 60.0)
+        self._tokens_at = now
+        if self._tokens < 1.0:
+            return False
+        self._tokens -= 1.0
+        return True
+
+    def _latency_sec(self) -> float:
+        cfg = self.config
+        ms = max(0.0, self._rng.gauss(cfg.latency_ms, cfg.latency_jitter_ms)) if cfg.latency_jitter_ms > 0 \
+            else max(0.0, cfg.latency_ms)
+        self.stats.latency_ms_total += ms
+        return ms / 1000.0
+
+    def _fill_price(self, book: _Book, side: str, qty: int, ref: float) -> float:
+        cfg = self.config
+        part = qty / book.bar.v if book.bar.v > 0 else 1.0
+        bps = cfg.half_spread_bps + cfg.impact_bps * min(1.0, part)
+        return round(ref * (1 + bps / 10000.0) if side == "buy" else ref * (1 - bps / 10000.0), 4)
+
+    def _capacity(self, book: _Book) -> int:
+        cap = int(book.bar.v * self.config.participation) if book.bar.v > 0 else 0
+        return max(0, max(1, cap) - book.used_volume) if book.bar.v > 0 else 0
+
+    def _validate(self, ticker: str, side: str, quantity: int, price: float) -> None:
+        pos_qty = self.positions.get(ticker, (0, 0.0))[0]
+        if side == "buy":
+            opening = quantity - max(0, -pos_qty)
+            if opening > 0 and opening * price > self.cash + 1e-9:
+                self._reject("insufficient_buying_power",
+                             f"{ticker} 필요 ${opening * price:,.2f} > 현금 ${self.cash:,.2f}")
+        elif not self.config.allow_short and quantity > max(0, pos_qty):
+            self._reject("short_not_allowed", f"{ticker} 보유 {pos_qty}주 < 매도 {quantity}주")
+
+    def submit_market_order(self, ticker: str, side: str, quantity: int,
+                            signal_id: str = None, meta: dict = None) -> UnifiedTrade:
+        """시장가 주문: 지연 반영 가격으로 참여율 한도까지 즉시 체결, 잔량은 다음 봉에서 체결"""
+        ticker, side = ticker.upper(), side.lower()
+        quantity = int(quantity or 0)
+        with self._session():
+            self._pump()
+            self.stats.orders += 1
+            if quantity <= 0 or side not in ("buy", "sell"):
+                self._reject("invalid_order", f"{ticker} {side} {quantity}")
+            if not self._take_token():
+                self._reject("rate_limited")
+            book = self._book(ticker)
+            if book is None or book.bar is None:
+                self._reject("no_quote", ticker)
+            if self.config.reject_rate > 0 and self._rng.random() < self.config.reject_rate:
+                self._reject("random_reject")
+            self._validate(ticker, side, quantity, book.bar.c)
+
+            # 지연 동안의 가격 이동: 현재 종가 → 다음 봉 시가 선형 보간
+            latency = self._latency_sec()
+            ref = book.bar.c
+            if book.nxt is not None:
+                ref += (book.nxt.o - book.bar.c) * min(1.0, latency / self.config.bar_sec)
+            order_id = self._next_id("SIM")
+            filled = min(quantity, self._capacity(book))
+            price = self._fill_price(book, side, filled or quantity, ref)
+            remaining = quantity - filled
+            trade_meta = dict(meta or {})
+            trade_meta.update({"simulated": True, "order_id": order_id, "requested_qty": quantity,
+                               "latency_ms": round(latency * 1000, 1)})
+            if remaining > 0:
+                self.stats.partials += 1
+                trade_meta.update({"partial": True, "remaining": remaining})
+                self._working.append(_Working(order_id, ticker, side, remaining, signal_id, meta))
+            trade = UnifiedTrade(trade_id=order_id, ticker=ticker, side=side, quantity=filled,
+                                 price=price, timestamp=self.now + timedelta(seconds=latency),
+                                 signal_id=signal_id, meta=trade_meta)
+            if filled > 0:
+                book.used_volume += filled
+                self._apply(trade)
+            return trade
+
+    def submit_bracket_order(self, ticker: str, side: str, quantity: int,
+                             stop_loss_price: float, take_profit_price: float,
+                             signal_id: str = None) -> Tuple[UnifiedTrade, str, str]:
+        """브래킷 주문: 진입 시장가 + 스톱/목표가 OCO 자식 (요청 수량 기준)"""
+        ticker, side = ticker.upper(), side.lower()
+        long = side == "buy"
+        with self._session():
+            if (long and not stop_loss_price < take_profit_price) or \
+                    (not long and not take_profit_price < stop_loss_price):
+                self.stats.orders += 1
+                self._reject("invalid_bracket", f"SL={stop_loss_price} TP={take_profit_price}")
+            trade = self.submit_market_order(ticker, side, quantity, signal_id, {"bracket": True})
+            exit_side = "sell" if long else "buy"
+            stop_id, profit_id = f"{trade.trade_id}-SL", f"{trade.trade_id}-TP"
+            # TriggerBook 발동 규칙: STOP=가격≤레벨, TARGET=가격≥레벨 → 숏은 역할을 뒤집어 등록
+            self._triggers.add(Trigger(stop_id, ticker, STOP if long else TARGET, float(stop_loss_price),
+                                       int(quantity), group=trade.trade_id, signal_id=signal_id or ""))
+            self._triggers.add(Trigger(profit_id, ticker, TARGET if long else STOP, float(take_profit_price),
+                                       int(quantity), group=trade.trade_id, signal_id=signal_id or ""))
+            self._exits[stop_id] = self._exits[profit_id] = exit_side
+        return trade, stop_id, profit_id
+
+    def submit_eod_exit(self, ticker: str, quantity: float | int, side: str) -> UnifiedTrade:
+        """EOD 청산: 청산 수량에 연결된 브래킷 취소 후 시장가"""
+        with self._session():
+            self._cancel_brackets(ticker.upper(), int(quantity))
+            return self.submit_market_order(ticker, side, int(quantity), signal_id=f"eod_{ticker}",
+                                            meta={"eod_exit": True})
+
+    def _cancel_brackets(self, ticker: str, quantity: Optional[int] = None) -> List[Trigger]:
+        """청산된 보유분에 연결된 브래킷만 취소 (호출 측 락 보유)
+
+        잔량 체결 대기 중인 진입의 브래킷은 남기고, 나머지를 오래된 진입부터 quantity 만큼 (None이면 전부)
+        """
+        working = {w.order_id for w in self._working if w.ticker == ticker}
+        groups: Dict[str, int] = {}
+        for trig in self._triggers.orders():
+            if trig.ticker == ticker and trig.group not in working:
+                groups.setdefault(trig.group, trig.quantity)
+        removed = []
+        left = quantity
+        for group, qty in groups.items():
+            if left is not None and left <= 0:
+                break
+            for oid in (f"{group}-SL", f"{group}-TP"):
+                trig = self._triggers.cancel(oid)
+                if trig is not None:
+                    self._exits.pop(oid, None)
+                    removed.append(trig)
+            if left is not None:
+                left -= qty
+        return removed
+
+    # ------------------------------------------------------------------
+    # 봉 진행 시 처리
+    # ------------------------------------------------------------------
+    def _fill_working(self, ticker: str, book: _Book) -> List[UnifiedTrade]:
+        out = []
+        keep = []
+        for w in self._working:
+            if w.ticker != ticker:
+                keep.append(w)
+                continue
+            qty = min(w.remaining, self._capacity(book))
+            if qty > 0:
+                vwap = (book.bar.o + book.bar.h + book.bar.l + book.bar.c) / 4
+                trade = UnifiedTrade(trade_id=f"{w.order_id}-F{self.stats.bars}", ticker=ticker, side=w.side,
+                                     quantity=qty, price=self._fill_price(book, w.side, qty, vwap),
+                                     timestamp=self.now, signal_id=w.signal_id,
+                                     meta={**(w.meta or {}), "simulated": True, "parent_order_id": w.order_id,
+                                           "remaining": w.remaining - qty})
+                book.used_volume += qty
+                w.remaining -= qty
+                self._apply(trade)
+                out.append(trade)
+            if w.remaining > 0:
+                keep.append(w)
+        self._working = keep
+        return out
+
+    def _eval_triggers(self, ticker: str, bar: SimBar) -> List[UnifiedTrade]:
+        if ticker not in self._triggers.tickers():
+            return []
+        pos_qty = self.positions.get(ticker, (0, 0.0))[0]
+        # 롱은 저가 먼저, 숏은 고가 먼저 (같은 봉에서 SL/TP 동시 교차 시 손절 우선)
+        path = (bar.l, bar.h) if pos_qty >= 0 else (bar.h, bar.l)
+        fired = self._triggers.on_price(ticker, path[0]) + self._triggers.on_price(ticker, path[1])
+        out = []
+        for trig in fired:
+            exit_side = self._exits.pop(trig.order_id, None)
+            for sib in (f"{trig.group}-SL", f"{trig.group}-TP"):
+                self._exits.pop(sib, None)
+            held = self.positions.get(ticker, (0, 0.0))[0]
+            qty = min(trig.quantity, held if exit_side == "sell" else -held)
+            if not exit_side or qty <= 0:
+                continue
+            # 갭 관통 시 시가 체결, 아니면 트리거 레벨 체결
+            gapped = bar.o < trig.level if trig.kind == STOP else bar.o > trig.level
+            ref = bar.o if gapped else trig.level
+            price = round(ref * (1 - self.config.half_spread_bps / 10000.0) if exit_side == "sell"
+                          else ref * (1 + self.config.half_spread_bps / 10000.0), 4)
+            trade = UnifiedTrade(trade_id=trig.order_id, ticker=ticker, side=exit_side, quantity=qty,
+                                 price=price, timestamp=self.now, signal_id=trig.signal_id,
+                                 meta={"simulated": True, "bracket_exit": True, "parent_order_id": trig.group})
+            self.stats.bracket_exits += 1
+            self._apply(trade)
+            out.append(trade)
+        return out
+
+    # ------------------------------------------------------------------
+    # 계좌
+    # ------------------------------------------------------------------
+    def _apply(self, trade: UnifiedTrade) -> None:
+        signed = trade.quantity if trade.side == "buy" else -trade.quantity
+        qty, avg = self.positions.get(trade.ticker, (0, 0.0))
+        new_qty = qty + signed
+        if qty == 0 or (qty > 0) == (signed > 0):
+            avg = (abs(qty) * avg + trade.quantity * trade.price) / abs(new_qty)
+        else:
+            closed = min(abs(qty), trade.quantity)
+            self.realized_pnl += (trade.price - avg) * closed * (1 if qty > 0 else -1)
+            if abs(signed) > abs(qty):
+                avg = trade.price  # 반대 방향 전환분은 체결가가 새 평단
+        self.cash -= signed * trade.price
+        if new_qty == 0:
+            self.positions.pop(trade.ticker, None)
+            self._cancel_brackets(trade.ticker)
+        else:
+            self.positions[trade.ticker] = (new_qty, avg)
+        self.stats.fills += 1
+        self.fills.append(trade)
+        if self.on_fill is not None:
+            try:
+                self.on_fill(trade)
+            except Exception as e:
+                logger.warning(f"시뮬레이터 체결 콜백 실패 {trade.trade_id}: {e}")
+
+    def get_positions(self) -> List[UnifiedPosition]:
+        """현재 포지션 조회"""
+        with self._session():
+            self._pump()
+            out = []
+            for ticker, (qty, avg) in self.positions.items():
+                book = self._books.get(ticker)
+                px = book.bar.c if book and book.bar else avg
+                pnl = (px - avg) * qty
+                out.append(UnifiedPosition(
+                    ticker=ticker, quantity=qty, avg_price=avg, current_price=px,
+                    market_value=qty * px, unrealized_pnl=pnl,
+                    unrealized_pnl_pct=(pnl / (abs(qty) * avg)) * 100 if avg > 0 else 0,
+                ))
+            return out
+
+    def get_portfolio_summary(self) -> dict:
+        """포트폴리오 요약 (AlpacaPaperTrading.get_portfolio_summary 와 동일 키)"""
+        with self._session():
+            positions = self.get_positions()
+            cash, realized = self.cash, self.realized_pnl
+        market_value = sum(p.market_value for p in positions)
+        equity = cash + market_value
+        return {
+            'cash': cash,
+            'portfolio_value': equity,
+            'equity': equity,
+            'buying_power': max(0.0, cash),
+            'positions_count': len(positions),
+            'total_unrealized_pnl': sum(p.unrealized_pnl for p in positions),
+            'total_market_value': market_value,
+            'realized_pnl': realized,
+            'positions': [
+                {
+                    'ticker': p.ticker,
+                    'quantity': p.quantity,
+                    'avg_price': p.avg_price,
+                    'current_price': p.current_price,
+                    'market_value': p.market_value,
+                    'unrealized_pnl': p.unrealized_pnl,
+                    'unrealized_pnl_pct': p.unrealized_pnl_pct
+                }
+                for p in positions
+            ]
+        }
+
+    def get_stats(self) -> dict:
+        """처리량/체결 품질 지표 (가상 시간 대비 벽시계 배속 포함)"""
+        sim_sec = (self.now - self._sim_start).total_seconds()
+        wall_sec = max(1e-9, time.time() - self._wall_start)
+        s = self.stats
+        return {
+            "sim_time": self.now.isoformat(),
+            "bars": s.bars,
+            "orders": s.orders,
+            "fills": s.fills,
+            "partials": s.partials,
+            "bracket_exits": s.bracket_exits,
+            "rejects": dict(s.rejects),
+            "avg_latency_ms": round(s.latency_ms_total / s.orders, 1) if s.orders else 0.0,
+            "pending_triggers": len(self._triggers),
+            "working_orders": len(self._working),
+            "speedup": round(sim_sec / wall_sec, 1),
+        }
+
+
+_market_simulator: Optional[MarketSimulator] = None
+
+
+def get_market_simulator() -> MarketSimulator:
+    """글로벌 시뮬레이터 (SIM_BARS_PATH 있으면 녹화 봉 재생, 없으면 합성 봉)"""
+    global _market_simulator
+    if _market_simulator is None:
+        cfg = SimConfig.from_env()
+        path = os.getenv("SIM_BARS_PATH")
+        bars = load_bars_jsonl(path) if path else None
+        if bars:
+            cfg.start = min(b[0].ts for b in bars.values() if b)
+        store = None
+        if os.getenv("REDIS_URL"):
+            try:
+                import redis
+                # 설정이 바뀌면 다른 네임스페이스 → 이전 실행의 계좌/시계를 이어받지 않음
+                namespace = f"sim:{cfg.seed}:{int(cfg.start.timestamp())}:{cfg.bar_sec}:{os.path.basename(path or '')}"
+                store = SimStateStore(redis.from_url(os.getenv("REDIS_URL")), namespace)
+            except Exception as e:
+                logger.warning(f"시뮬레이터 공유 상태 준비 실패 (프로세스 로컬): {e}")
+        _market_simulator = MarketSimulator(cfg, bars, store=store)
+        logger.info(f"🧪 로컬 거래소 시뮬레이터: {'녹화 ' + str(len(bars)) + '종목' if bars else '합성 봉'}, "
+                    f"지연 {cfg.latency_ms:.0f}ms, 참여율 {cfg.participation:.0%}, 배속 {cfg.speed or '수동'}, "
+                    f"{'공유' if store else '로컬'} 상태")
+    return _market_simulator
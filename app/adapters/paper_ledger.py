@@ -1,14 +1,36 @@
 """
 가상 체결 기록 관리
 실제 거래 없이 가상으로 체결을 시뮬레이션하고 기록
+- 체결/리셋은 append-only 이벤트 로그(JSONL)에 먼저 기록 → 포지션·현금·손익은 이벤트 단위 O(1) 증분 반영
+- N 이벤트마다 상태 스냅샷(원자적 교체) → 재시작 시 스냅샷 이후 이벤트만 재생
+- 로그는 세그먼트(events-<gen>.jsonl) 단위, 일정 크기마다 새 세그먼트로 압축 → 오래된 세그먼트는 보존 개수만 유지
+- 메모리에는 최근 체결만 보관(deque), 전체 내역은 세그먼트에서 스트리밍
+- PAPER_LEDGER_DIR(또는 store_dir) 미지정 시 메모리 전용
+- 같은 이름의 레저를 여러 프로세스가 열면 파일 락 + 꼬리 따라잡기로 동일 상태 유지
 """
-from dataclasses import dataclass
-from typing import List, Dict
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
 from datetime import datetime
+import json
 import logging
+import os
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - 비 POSIX
+    fcntl = None
 
 logger = logging.getLogger(__name__)
 
+PAPER_LEDGER_DIR = os.getenv("PAPER_LEDGER_DIR", "")  # 비어 있으면 영속화 안 함
+PAPER_LEDGER_SNAPSHOT_EVERY = int(os.getenv("PAPER_LEDGER_SNAPSHOT_EVERY", "500"))
+PAPER_LEDGER_COMPACT_BYTES = int(os.getenv("PAPER_LEDGER_COMPACT_BYTES", str(8 * 1024 * 1024)))
+PAPER_LEDGER_KEEP_SEGMENTS = int(os.getenv("PAPER_LEDGER_KEEP_SEGMENTS", "10"))
+PAPER_LEDGER_RECENT_TRADES = int(os.getenv("PAPER_LEDGER_RECENT_TRADES", "1000"))
+
 @dataclass
 class PaperTrade:
     """가상 거래 기록"""
@@ -21,6 +43,31 @@ class PaperTrade:
     order_id: str
     meta: dict = None
 
+    def to_dict(self) -> dict:
+        return {
+            "trade_id": self.trade_id,
+            "ticker": self.ticker,
+            "side": self.side,
+            "quantity": self.quantity,
+            "price": self.price,
+            "timestamp": self.timestamp.isoformat(),
+            "order_id": self.order_id,
+            "meta": self.meta
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "PaperTrade":
+        return cls(
+            trade_id=d["trade_id"],
+            ticker=d["ticker"],
+            side=d["side"],
+            quantity=d["quantity"],
+            price=float(d["price"]),
+            timestamp=datetime.fromisoformat(d["timestamp"]),
+            order_id=d.get("order_id", ""),
+            meta=d.get("meta") or {}
+        )
+
 @dataclass
 class PaperPosition:
     """가상 포지션"""
@@ -31,22 +78,272 @@ class PaperPosition:
     last_price: float
     timestamp: datetime
 
+class LedgerEventLog:
+    """레저 이벤트 로그(JSONL 세그먼트) + 스냅샷 파일"""
+
+    def __init__(self, directory: str, name: str):
+        self.dir = Path(directory) / name
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.snapshot_path = self.dir / "snapshot.json"
+        self.lock_path = self.dir / ".lock"
+        with self.locked():
+            if not self.segments():
+                legacy = self.dir / "events.jsonl"  # 단일 로그 시절 파일 → 세그먼트 0
+                if legacy.exists():
+                    os.replace(legacy, self.segment_path(0))
+                else:
+                    self.segment_path(0).touch()
+
+    def segment_path(self, gen: int) -> Path:
+        return self.dir / f"events-{gen:06d}.jsonl"
+
+    def segments(self) -> List[Tuple[int, Path]]:
+        """보존 중인 세그먼트 (세대 순)"""
+        out = []
+        for path in self.dir.glob("events-*.jsonl"):
+            try:
+                out.append((int(path.stem.split("-", 1)[1]), path))
+            except ValueError:
+                continue
+        return sorted(out)
+
+    def start_segment(self, gen: int) -> None:
+        """새 세그먼트 생성 (파일 생성 자체가 다른 프로세스에 대한 전환 신호)"""
+        self.segment_path(gen).touch(exist_ok=True)
+
+    def prune(self, below_gen: int) -> int:
+        """below_gen 미만 세그먼트 삭제 → 삭제 개수"""
+        n = 0
+        for gen, path in self.segments():
+            if gen < below_gen:
+                path.unlink(missing_ok=True)
+                n += 1
+        return n
+
+    @contextmanager
+    def locked(self):
+        """프로세스 간 배타 락 (fcntl 없으면 무락)"""
+        with open(self.lock_path, "a") as lf:
+            if fcntl:
+                fcntl.flock(lf, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lf, fcntl.LOCK_UN)
+
+    def append(self, gen: int, event: dict) -> int:
+        """이벤트 1건 추가 → 새 파일 오프셋"""
+        line = (json.dumps(event, ensure_ascii=False, separators=(",", ":")) + "\n").encode()
+        with open(self.segment_path(gen), "ab") as f:
+            f.write(line)
+            f.flush()
+            return f.tell()
+
+    def read_from(self, gen: int, offset: int) -> Iterator[Tuple[dict, int]]:
+        """세그먼트 offset 이후 완전한 줄만 (이벤트, 끝 오프셋)으로 순회"""
+        with open(self.segment_path(gen), "rb") as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # 기록 중인 꼬리
+                offset += len(line)
+                try:
+                    yield json.loads(line), offset
+                except ValueError:
+                    logger.warning(f"레저 이벤트 파싱 실패 (offset={offset})")
+
+    def load_snapshot(self) -> Optional[dict]:
+        try:
+            with open(self.snapshot_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"레저 스냅샷 로드 실패 (전체 재생): {e}")
+            return None
+
+    def write_snapshot(self, state: dict) -> None:
+        tmp = self.snapshot_path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(state, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.snapshot_path)
+
 class PaperLedger:
-    """가상 체결 레저"""
+    """가상 체결 레저 (이벤트 소싱)"""
     
-    def __init__(self, initial_cash: float = 1000000):
+    def __init__(self, initial_cash: float = 1000000, name: str = "default",
+                 store_dir: Optional[str] = None, persist: Optional[bool] = None):
         """
         Args:
             initial_cash: 초기 현금 (원화)
+            name: 레저 이름 (이벤트 로그 디렉터리)
+            store_dir: 로그/스냅샷 루트 (기본 PAPER_LEDGER_DIR)
+            persist: None이면 루트가 설정된 경우에만 영속화, False면 메모리 전용
         """
+        self.initial_cash = initial_cash
         self.cash_krw = initial_cash
         self.cash_usd = 0.0
         self.positions: Dict[str, PaperPosition] = {}
-        self.trades: List[PaperTrade] = []
+        self.trades: deque = deque(maxlen=PAPER_LEDGER_RECENT_TRADES)  # 최근 체결만
+        self.total_trades = 0
         self.daily_pnl = 0.0
         self.daily_trades = 0
+        self.seq = 0
+        self._gen = 0
+        self._offset = 0
+        self._since_snapshot = 0
         
-        logger.info(f"페이퍼 레저 초기화: 현금 ${initial_cash:,}")
+        self._log: Optional[LedgerEventLog] = None
+        root = store_dir or PAPER_LEDGER_DIR
+        if persist is None:
+            persist = bool(root)
+        elif persist and not root:
+            logger.warning(f"페이퍼 레저 영속화 비활성 ({name}): PAPER_LEDGER_DIR 미설정")
+            persist = False
+        if persist:
+            try:
+                self._log = LedgerEventLog(root, name)
+                self._recover()
+            except Exception as e:
+                logger.warning(f"페이퍼 레저 영속화 비활성 ({name}): {e}")
+                self._log = None
+
+        logger.info(f"페이퍼 레저 초기화: 현금 ${initial_cash:,} (seq={self.seq}, 포지션 {len(self.positions)}개)")
+
+    # ------------------------------------------------------------------
+    # 이벤트 소싱
+    # ------------------------------------------------------------------
+    def _recover(self):
+        """스냅샷 복원 후 이후 이벤트만 재생"""
+        snap = self._log.load_snapshot()
+        if snap:
+            self._restore(snap)
+        replayed = self._catch_up()
+        if snap or replayed:
+            logger.info(f"페이퍼 레저 복구: 스냅샷 seq={snap.get('seq', 0) if snap else 0}, 재생 {replayed}건")
+
+    def _catch_up(self) -> int:
+        """현재 세그먼트 꼬리 → 다른 프로세스가 연 다음 세그먼트 순으로 재생"""
+        n = 0
+        while True:
+            try:
+                for event, end in self._log.read_from(self._gen, self._offset):
+                    self._apply(event)
+                    self._offset = end
+                    n += 1
+            except FileNotFoundError:
+                # 보존 개수를 넘겨 지워진 세그먼트 → 더 최신 스냅샷에서 재시작
+                snap = self._log.load_snapshot()
+                if not snap or int(snap.get("gen", 0)) <= self._gen:
+                    raise
+                self._restore(snap)
+                continue
+            if not self._log.segment_path(self._gen + 1).exists():
+                return n
+            self._gen += 1
+            self._offset = 0
+
+    def _commit(self, event: dict, snapshot: bool = False) -> None:
+        """이벤트 기록 후 반영 (다른 프로세스 기록분 먼저 따라잡기)"""
+        if self._log is None:
+            event["seq"] = self.seq + 1
+            self._apply(event)
+            return
+        with self._log.locked():
+            self._catch_up()
+            event["seq"] = self.seq + 1
+            self._offset = self._log.append(self._gen, event)
+            self._apply(event)
+            self._since_snapshot += 1
+            if self._offset >= PAPER_LEDGER_COMPACT_BYTES:
+                self._compact()
+            elif snapshot or self._since_snapshot >= PAPER_LEDGER_SNAPSHOT_EVERY:
+                self.snapshot()
+
+    def _compact(self) -> None:
+        """새 세그먼트로 넘기고 스냅샷이 그 시작을 가리키게 한 뒤 오래된 세그먼트 정리 (락 안에서 호출)
+
+        세그먼트 생성 → 스냅샷 순서라 중간에 죽어도 이전 스냅샷 + 두 세그먼트 재생으로 복구됨
+        """
+        self._log.start_segment(self._gen + 1)
+        self._gen += 1
+        self._offset = 0
+        self.snapshot()
+        removed = self._log.prune(self._gen - PAPER_LEDGER_KEEP_SEGMENTS + 1)
+        logger.info(f"페이퍼 레저 압축: 세그먼트 {self._gen} 시작, 정리 {removed}개")
+
+    def _apply(self, event: dict) -> None:
+        self.seq = int(event.get("seq", self.seq + 1))
+        etype = event.get("type")
+        if etype == "fill":
+            trade = PaperTrade.from_dict(event["trade"])
+            self._update_position(trade)
+            trade_value = trade.price * trade.quantity
+            if trade.side == "buy":
+                self.cash_usd -= trade_value
+            else:
+                self.cash_usd += trade_value
+            self.trades.append(trade)
+            self.total_trades += 1
+            self.daily_trades += 1
+        elif etype == "reset_daily":
+            self.daily_pnl = 0.0
+            self.daily_trades = 0
+
+    def _state(self) -> dict:
+        return {
+            "seq": self.seq,
+            "gen": self._gen,
+            "offset": self._offset,
+            "cash_krw": self.cash_krw,
+            "cash_usd": self.cash_usd,
+            "daily_pnl": self.daily_pnl,
+            "daily_trades": self.daily_trades,
+            "total_trades": self.total_trades,
+            "positions": [
+                {**asdict(p), "timestamp": p.timestamp.isoformat()} for p in self.positions.values()
+            ],
+            "recent_trades": [t.to_dict() for t in self.trades],
+            "saved_at": datetime.now().isoformat()
+        }
+
+    def _restore(self, snap: dict) -> None:
+        self.seq = int(snap.get("seq", 0))
+        self._gen = int(snap.get("gen", 0))
+        self._offset = int(snap.get("offset", 0))
+        self.cash_krw = float(snap.get("cash_krw", self.cash_krw))
+        self.cash_usd = float(snap.get("cash_usd", 0.0))
+        self.daily_pnl = float(snap.get("daily_pnl", 0.0))
+        self.daily_trades = int(snap.get("daily_trades", 0))
+        self.total_trades = int(snap.get("total_trades", 0))
+        self.positions = {}
+        for p in snap.get("positions", []):
+            p = dict(p)
+            p["timestamp"] = datetime.fromisoformat(p["timestamp"])
+            self.positions[p["ticker"]] = PaperPosition(**p)
+        self.trades.clear()
+        self.trades.extend(PaperTrade.from_dict(t) for t in snap.get("recent_trades", []))
+
+    def snapshot(self) -> None:
+        """현재 상태 스냅샷 저장 (이벤트 로그 오프셋 포함)"""
+        if self._log is None:
+            return
+        try:
+            self._log.write_snapshot(self._state())
+            self._since_snapshot = 0
+            logger.debug(f"페이퍼 레저 스냅샷 저장: seq={self.seq}")
+        except Exception as e:
+            logger.warning(f"페이퍼 레저 스냅샷 저장 실패: {e}")
+
+    def refresh(self) -> int:
+        """다른 프로세스가 기록한 이벤트 반영"""
+        if self._log is None:
+            return 0
+        with self._log.locked():
+            return self._catch_up()
     
     def simulate_fill(self, order_id: str, ticker: str, side: str, 
                      quantity: int, price: float, meta: dict = None) -> PaperTrade:
@@ -80,19 +377,8 @@ class PaperLedger:
             meta=meta or {}
         )
         
-        # 포지션 업데이트
-        self._update_position(trade)
-        
-        # 현금 업데이트
-        trade_value = fill_price * quantity
-        if side == "buy":
-            self.cash_usd -= trade_value
-        else:
-            self.cash_usd += trade_value
-        
-        # 거래 기록 저장
-        self.trades.append(trade)
-        self.daily_trades += 1
+        # 이벤트 기록 → 포지션/현금/카운터 증분 반영
+        self._commit({"type": "fill", "trade": trade.to_dict()})
         
         logger.info(f"가상 체결: {ticker} {side} {quantity}주 @ ${fill_price:.2f}")
         
@@ -162,22 +448,25 @@ class PaperLedger:
     
     def reset_daily(self):
         """일일 통계 리셋"""
-        self.daily_pnl = 0.0
-        self.daily_trades = 0
+        self._commit({"type": "reset_daily", "ts": datetime.now().isoformat()}, snapshot=True)
         logger.info("일일 통계 리셋")
     
-    def export_trades(self) -> List[dict]:
-        """거래 기록 내보내기"""
-        return [
-            {
-                "trade_id": trade.trade_id,
-                "ticker": trade.ticker,
-                "side": trade.side,
-                "quantity": trade.quantity,
-                "price": trade.price,
-                "timestamp": trade.timestamp.isoformat(),
-                "order_id": trade.order_id,
-                "meta": trade.meta
-            }
-            for trade in self.trades
-        ]
+    def export_trades(self, since: Optional[datetime] = None) -> List[dict]:
+        """거래 기록 내보내기 (영속화 시 보존 중인 세그먼트, 아니면 최근분)
+
+        Args:
+            since: 이 시각 이후 체결만 (마지막 기록이 그 전인 세그먼트는 열지 않음)
+        """
+        if self._log is None:
+            return [trade.to_dict() for trade in self.trades if since is None or trade.timestamp >= since]
+        cutoff = since.timestamp() if since else None
+        out = []
+        for gen, path in self._log.segments():
+            if cutoff is not None and path.stat().st_mtime < cutoff:
+                continue
+            for event, _ in self._log.read_from(gen, 0):
+                if event.get("type") != "fill":
+                    continue
+                if since is None or datetime.fromisoformat(event["trade"]["timestamp"]) >= since:
+                    out.append(event["trade"])
+        return out
@@ -1,12 +1,12 @@
 """
 트레이딩 어댑터 팩토리
-BROKER 설정에 따라 알파카 또는 기존 PaperLedger 선택
+BROKER 설정에 따라 알파카 / 기존 PaperLedger / 로컬 시뮬레이터(sim) 선택
 GPT-5 권장 리스크 관리 시스템 통합
 """
 
 import os
 import logging
-from typing import Protocol, List, Optional, Tuple, Any
+from typing import Protocol, Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass
 from datetime import datetime
 
@@ -75,6 +75,11 @@ class TradingAdapterFactory:
             logger.info("기존 PaperLedger 어댑터 사용")
             return PaperLedgerAdapter(PaperLedger())
         
+        elif broker == 'sim':
+            from app.adapters.market_simulator import get_market_simulator
+            logger.info("로컬 거래소 시뮬레이터 어댑터 사용")
+            return get_market_simulator()
+        
         else:
             raise ValueError(f"지원하지 않는 브로커: {broker}")
 
@@ -214,6 +219,10 @@ class AlpacaAdapter:
         """현재 가격 조회"""
         return self.client.get_current_price(ticker)
     
+    def get_latest_prices(self, tickers: List[str]) -> Dict[str, float]:
+        """다종목 현재가 일괄 조회 (스냅샷 1회)"""
+        return self.client.get_latest_prices(tickers)
+    
     def submit_bracket_order(self, ticker: str, side: str, quantity: int,
                            stop_loss_price: float, take_profit_price: float,
                            signal_id: str = None) -> Tuple[UnifiedTrade, str, str]:
@@ -0,0 +1,278 @@
+"""
+페이퍼 트리거 북 (스톱로스/익절 대기 주문 인덱스)
+- 종목별로 스톱(가격 ≤ 레벨 시 발동)·목표가(가격 ≥ 레벨 시 발동) 레벨을 정렬 보관
+- 가격 갱신 시 bisect로 교차된 레벨 구간만 잘라내 발동 → 종목당 O(log n + 발동 수)
+- 같은 포지션의 SL/TP는 group으로 묶어 한쪽 발동 시 반대쪽 취소 (OCO)
+- 대기 트리거는 Redis 해시(paper:triggers)에 영속화 → 재시작 시 복원
+- 여러 프로세스(워커 폴링, 시세 수집 경로)가 같은 북을 평가 → 발동은 HDEL 선점으로 한 번만 실행,
+  다른 프로세스의 등록/발동은 sync()로 주기적으로 따라잡음
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import redis
+
+logger = logging.getLogger(__name__)
+
+TRIGGER_BOOK_KEY = "paper:triggers"
+TRIGGER_BOOK_SYNC_SEC = float(os.getenv("TRIGGER_BOOK_SYNC_SEC", "2"))
+
+STOP = "stop_loss"
+TARGET = "take_profit"
+
+
+@dataclass
+class Trigger:
+    """대기 트리거 (청산 주문)"""
+    order_id: str
+    ticker: str
+    kind: str            # stop_loss | take_profit
+    level: float
+    quantity: int
+    group: str = ""      # OCO 그룹 (원 진입 주문 ID)
+    signal_id: str = ""
+    created_at: str = field(default_factory=lambda: datetime.now().isoformat())
+
+    def crossed(self, price: float) -> bool:
+        return price <= self.level if self.kind == STOP else price >= self.level
+
+
+class _TickerLevels:
+    """종목 단위 정렬 레벨 (level, order_id) 리스트"""
+    __slots__ = ("stops", "targets")
+
+    def __init__(self):
+        self.stops: List[Tuple[float, str]] = []
+        self.targets: List[Tuple[float, str]] = []
+
+    def side(self, kind: str) -> List[Tuple[float, str]]:
+        return self.stops if kind == STOP else self.targets
+
+    def __len__(self) -> int:
+        return len(self.stops) + len(self.targets)
+
+
+class TriggerBook:
+    """종목별 가격 정렬 트리거 인덱스 + Redis 영속화"""
+
+    def __init__(self, redis_url: Optional[str] = None, persist: bool = True):
+        self.redis_url = redis_url if redis_url is not None else os.getenv("REDIS_URL")
+        self.persist = persist and bool(self.redis_url)
+        self._r = None
+        self._lock = threading.RLock()
+        self._orders: Dict[str, Trigger] = {}
+        self._groups: Dict[str, set] = {}
+        self._levels: Dict[str, _TickerLevels] = {}
+        self._synced_at = 0.0
+
+    @property
+    def r(self):
+        if self._r is None and self.persist:
+            self._r = redis.from_url(self.redis_url)
+        return self._r
+
+    # ------------------------------------------------------------------
+    # 등록 / 취소
+    # ------------------------------------------------------------------
+    def add(self, trig: Trigger, _persist: bool = True) -> Trigger:
+        with self._lock:
+            if trig.order_id in self._orders:
+                self._remove(trig.order_id)
+            self._orders[trig.order_id] = trig
+            if trig.group:
+                self._groups.setdefault(trig.group, set()).add(trig.order_id)
+            book = self._levels.setdefault(trig.ticker, _TickerLevels())
+            insort(book.side(trig.kind), (trig.level, trig.order_id))
+            if _persist:
+                self._save(trig)  # 락 안에서 저장 → sync()가 저장 전 트리거를 지우지 않음
+        return trig
+
+    def cancel(self, order_id: str) -> Optional[Trigger]:
+        with self._lock:
+            trig = self._remove(order_id)
+        if trig is not None:
+            self._delete([order_id])
+        return trig
+
+    def cancel_ticker(self, ticker: str) -> List[Trigger]:
+        """종목 전체 대기 트리거 취소 (수동 청산 등)"""
+        with self._lock:
+            book = self._levels.get(ticker)
+            ids = [oid for _, oid in (book.stops + book.targets)] if book else []
+            removed = [t for t in (self._remove(oid) for oid in ids) if t is not None]
+        self._delete([t.order_id for t in removed])
+        return removed
+
+    def _remove(self, order_id: str) -> Optional[Trigger]:
+        trig = self._orders.pop(order_id, None)
+        if trig is None:
+            return None
+        book = self._levels.get(trig.ticker)
+        if book is not None:
+            levels = book.side(trig.kind)
+            i = bisect_left(levels, (trig.level, order_id))
+            if i < len(levels) and levels[i][1] == order_id:
+                levels.pop(i)
+            if not book:
+                del self._levels[trig.ticker]
+        if trig.group:
+            members = self._groups.get(trig.group)
+            if members is not None:
+                members.discard(order_id)
+                if not members:
+                    del self._groups[trig.group]
+        return trig
+
+    # ------------------------------------------------------------------
+    # 가격 이벤트
+    # ------------------------------------------------------------------
+    def on_price(self, ticker: str, price: float) -> List[Trigger]:
+        """가격 갱신 → 교차된 트리거만 발동 (발동분 + OCO 형제는 북에서 제거)"""
+        if not price or price <= 0:
+            return []
+        with self._lock:
+            book = self._levels.get(ticker)
+            if book is None:
+                return []
+            # 스톱: level ≥ price 구간(정렬 꼬리), 목표가: level ≤ price 구간(정렬 머리)
+            i = bisect_left(book.stops, (price, ""))
+            hit = book.stops[i:]
+            del book.stops[i:]
+            j = bisect_right(book.targets, (price, "\uffff"))
+            hit += book.targets[:j]
+            del book.targets[:j]
+            if not hit:
+                return []
+            fired: List[Trigger] = []
+            dropped: List[str] = []
+            for _, oid in hit:
+                trig = self._orders.get(oid)
+                if trig is None:
+                    continue  # 같은 틱에서 먼저 발동된 OCO 형제로 이미 취소됨
+                self._remove_indexed(trig)
+                fired.append(trig)
+                dropped.append(oid)
+                for sib in list(self._groups.get(trig.group, ())) if trig.group else ():
+                    if self._remove(sib) is not None:
+                        dropped.append(sib)
+            if not self._levels.get(ticker):
+                self._levels.pop(ticker, None)
+        claimed = self._claim(dropped)
+        if claimed is not None:
+            fired = [t for t in fired if t.order_id in claimed]  # 다른 프로세스가 먼저 발동한 건 제외
+        return fired
+
+    def _remove_indexed(self, trig: Trigger) -> None:
+        # 레벨 리스트에서는 이미 잘라냈으므로 주문/그룹 인덱스만 정리
+        self._orders.pop(trig.order_id, None)
+        if trig.group:
+            members = self._groups.get(trig.group)
+            if members is not None:
+                members.discard(trig.order_id)
+                if not members:
+                    del self._groups[trig.group]
+
+    # ------------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------------
+    def tickers(self) -> List[str]:
+        with self._lock:
+            return list(self._levels)
+
+    def orders(self, kind: Optional[str] = None) -> List[Trigger]:
+        with self._lock:
+            return [t for t in self._orders.values() if kind is None or t.kind == kind]
+
+    def get(self, order_id: str) -> Optional[Trigger]:
+        return self._orders.get(order_id)
+
+    def __len__(self) -> int:
+        return len(self._orders)
+
+    # ------------------------------------------------------------------
+    # 영속화
+    # ------------------------------------------------------------------
+    def _save(self, trig: Trigger) -> None:
+        if not self.persist:
+            return
+        try:
+            self.r.hset(TRIGGER_BOOK_KEY, trig.order_id, json.dumps(asdict(trig)))
+        except Exception as e:
+            logger.warning(f"트리거 저장 실패 {trig.order_id}: {e}")
+
+    def _delete(self, order_ids: List[str]) -> None:
+        if not self.persist or not order_ids:
+            return
+        try:
+            self.r.hdel(TRIGGER_BOOK_KEY, *order_ids)
+        except Exception as e:
+            logger.warning(f"트리거 삭제 실패 ({len(order_ids)}건): {e}")
+
+    def _claim(self, order_ids: List[str]) -> Optional[set]:
+        """Redis에서 삭제에 성공한 ID만 이 프로세스 몫 (영속화 없음/장애 시 None → 로컬 판단 유지)"""
+        if not self.persist or not order_ids:
+            return None
+        try:
+            pipe = self.r.pipeline(transaction=False)
+            for oid in order_ids:
+                pipe.hdel(TRIGGER_BOOK_KEY, oid)
+            return {oid for oid, n in zip(order_ids, pipe.execute()) if n}
+        except Exception as e:
+            logger.warning(f"트리거 선점 실패 ({len(order_ids)}건): {e}")
+            return None
+
+    def sync(self, max_age: float = TRIGGER_BOOK_SYNC_SEC) -> int:
+        """다른 프로세스의 등록/발동/취소를 Redis 기준으로 반영 (max_age 안에서는 생략) → 변경 건수"""
+        if not self.persist or time.time() - self._synced_at < max_age:
+            return 0
+        changed = 0
+        with self._lock:
+            try:
+                raw = self.r.hgetall(TRIGGER_BOOK_KEY) or {}
+            except Exception as e:
+                logger.warning(f"트리거 북 동기화 실패: {e}")
+                return 0
+            self._synced_at = time.time()
+            remote = {(k.decode() if isinstance(k, bytes) else str(k)): v for k, v in raw.items()}
+            for oid in [o for o in self._orders if o not in remote]:
+                self._remove(oid)
+                changed += 1
+            for oid, v in remote.items():
+                if oid in self._orders:
+                    continue
+                try:
+                    self.add(Trigger(**json.loads(v)), _persist=False)
+                    changed += 1
+                except Exception as e:
+                    logger.warning(f"트리거 동기화 스킵 {oid}: {e}")
+        return changed
+
+    def load(self) -> int:
+        """Redis에 영속화된 대기 트리거 복원"""
+        if not self.persist:
+            return 0
+        try:
+            raw = self.r.hgetall(TRIGGER_BOOK_KEY) or {}
+        except Exception as e:
+            logger.warning(f"트리거 북 복원 실패: {e}")
+            return 0
+        self._synced_at = time.time()
+        n = 0
+        for v in raw.values():
+            try:
+                self.add(Trigger(**json.loads(v)), _persist=False)
+                n += 1
+            except Exception as e:
+                logger.warning(f"트리거 복원 스킵: {e}")
+        if n:
+            logger.info(f"📚 트리거 북 복원: {n}건 ({len(self._levels)}종목)")
+        return n
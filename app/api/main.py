@@ -2,17 +2,22 @@
 FastAPI 메인 모듈
 /health, /signal, /report 등 엔드포인트
 """
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, List, Optional, Any
+import asyncio
 import logging
 import json
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, timedelta, timezone
 import os
 import time
 import hmac
 import hashlib
+import uuid
 from urllib.parse import parse_qs
 from fastapi import Request
 
@@ -26,8 +31,9 @@ except Exception:
 
  
 
-import redis
+import redis.asyncio as aioredis
 import psycopg2
+import psycopg2.pool
 import httpx
 
 # 로깅 설정
@@ -56,6 +62,11 @@ app.add_middleware(
 from app.api.portfolio import router as portfolio_router
 app.include_router(portfolio_router)
 
+from app.config import publish_config_change  # noqa: E402
+from app.utils.universe import get_universe_service  # noqa: E402
+from app.io.recent_signals import get_recent_signal_store  # noqa: E402
+from app.engine.score_series import get_score_series  # noqa: E402
+
 # Pydantic 모델들
 class HealthResponse(BaseModel):
     status: str
@@ -136,6 +147,7 @@ class SystemStatusResponse(BaseModel):
     llm_status: str
     signal_latency_ms: int
     execution_latency_ms: int
+    persist_flush_lag_sec: Optional[float] = None
     timestamp: str
 
 # Universe API 모델
@@ -149,6 +161,7 @@ trading_bot = None
 slack_bot = None
 redis_streams = None
 redis_client = None
+async_redis = None  # 이벤트 루프용 비동기 Redis 클라이언트
 db_connection = None
 llm_engine = None
 
@@ -166,28 +179,6 @@ error_counters = {
 # 헬스체크 헬퍼 함수들
 CONNECT_TIMEOUT = 1.5  # 초
 
-def check_redis(url: str):
-    t0 = time.perf_counter()
-    try:
-        r = redis.from_url(url, socket_timeout=CONNECT_TIMEOUT, socket_connect_timeout=CONNECT_TIMEOUT)
-        r.ping()
-        return True, None, int((time.perf_counter() - t0) * 1000)
-    except Exception as e:
-        return False, str(e), int((time.perf_counter() - t0) * 1000)
-
-def check_db(dsn: str):
-    t0 = time.perf_counter()
-    try:
-        conn = psycopg2.connect(dsn, connect_timeout=int(CONNECT_TIMEOUT))
-        cur = conn.cursor()
-        cur.execute("SELECT 1;")
-        cur.fetchone()
-        cur.close()
-        conn.close()
-        return True, None, int((time.perf_counter() - t0) * 1000)
-    except Exception as e:
-        return False, str(e), int((time.perf_counter() - t0) * 1000)
-
 def check_slack(token: str, channel_id: str):
     t0 = time.perf_counter()
     if not token or not channel_id:
@@ -210,10 +201,196 @@ def check_llm():
     # 헬스 관점에선 "켜져 있고 키가 있다"면 OK로 간주 (외부 호출은 비용/지연 유발)
     return enabled and has_key, {"enabled": enabled, "has_key": has_key}
 
+# =============================================================================
+# 블로킹 작업 오프로딩 / DB 풀 / 헬스 프로브 캐시 / 리포트 잡
+# =============================================================================
+# 이벤트 루프에서는 비동기 Redis만 사용하고, 동기 Redis·Postgres·외부 HTTP·시뮬레이션은
+# 상한이 있는 스레드 풀에서 실행. 리포트 잡은 별도 풀을 써서 동시 리포트가 몰려도
+# 가벼운 엔드포인트·헬스 프로브용 스레드는 항상 남음
+
+API_EXECUTOR_WORKERS = int(os.getenv("API_EXECUTOR_WORKERS", "4"))
+REPORT_EXECUTOR_WORKERS = int(os.getenv("REPORT_EXECUTOR_WORKERS", "2"))
+API_DB_POOL_MAX = int(os.getenv("API_DB_POOL_MAX", str(API_EXECUTOR_WORKERS + REPORT_EXECUTOR_WORKERS)))
+HEALTH_PROBE_INTERVAL_SEC = float(os.getenv("HEALTH_PROBE_INTERVAL_SEC", "30"))
+REPORT_JOB_CACHE_SEC = float(os.getenv("REPORT_JOB_CACHE_SEC", "60"))
+REPORT_JOB_MAX = 50
+
+_executor = ThreadPoolExecutor(max_workers=API_EXECUTOR_WORKERS, thread_name_prefix="api-blocking")
+_report_executor = ThreadPoolExecutor(max_workers=REPORT_EXECUTOR_WORKERS, thread_name_prefix="api-report")
+_db_pool: Optional[psycopg2.pool.ThreadedConnectionPool] = None
+_health_cache: Dict[str, Any] = {}
+_health_task: Optional[asyncio.Task] = None
+_report_jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_report_job_tasks: Dict[str, asyncio.Task] = {}
+
+async def run_blocking(fn: Callable, *args, **kwargs):
+    """블로킹 함수를 상한 스레드 풀에서 실행"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, lambda: fn(*args, **kwargs))
+
+async def run_report(fn: Callable, **params):
+    """리포트 빌더를 리포트 전용 풀에서 실행 (공용 풀을 점유하지 않음)"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_report_executor, lambda: fn(**params))
+
+def _get_db_pool() -> Optional[psycopg2.pool.ThreadedConnectionPool]:
+    global _db_pool
+    if _db_pool is None:
+        dsn = os.getenv("POSTGRES_URL") or os.getenv("DATABASE_URL")
+        if not dsn:
+            return None
+        _db_pool = psycopg2.pool.ThreadedConnectionPool(1, API_DB_POOL_MAX, dsn, connect_timeout=int(CONNECT_TIMEOUT) or 1)
+    return _db_pool
+
+@contextmanager
+def _db_conn():
+    """풀에서 커넥션 대여 (오류 시 커넥션 폐기)"""
+    pool = _get_db_pool()
+    if pool is None:
+        raise RuntimeError("missing_db_dsn")
+    conn = pool.getconn()
+    broken = False
+    try:
+        yield conn
+    except Exception:
+        broken = True
+        try:
+            conn.rollback()
+        except Exception:
+            pass
+        raise
+    finally:
+        pool.putconn(conn, close=broken or bool(conn.closed))
+
+def check_db():
+    t0 = time.perf_counter()
+    try:
+        with _db_conn() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1;")
+                cur.fetchone()
+        return True, None, int((time.perf_counter() - t0) * 1000)
+    except Exception as e:
+        return False, str(e), int((time.perf_counter() - t0) * 1000)
+
+async def _probe_redis_async():
+    t0 = time.perf_counter()
+    try:
+        if async_redis is None:
+            raise RuntimeError("redis unavailable")
+        await asyncio.wait_for(async_redis.ping(), timeout=CONNECT_TIMEOUT)
+        return True, None, int((time.perf_counter() - t0) * 1000)
+    except Exception as e:
+        return False, str(e) or type(e).__name__, int((time.perf_counter() - t0) * 1000)
+
+async def refresh_health_probes() -> Dict[str, Any]:
+    """Redis/DB/Slack 프로브를 병렬 실행하고 캐시 갱신"""
+    db_dsn = os.getenv("POSTGRES_URL") or os.getenv("DATABASE_URL", "")
+    slack_token = os.getenv("SLACK_BOT_TOKEN", "")
+    slack_channel = os.getenv("SLACK_CHANNEL_ID") or ""
+
+    async def _db():
+        if not db_dsn:
+            return False, "missing_db_dsn", 0
+        return await run_blocking(check_db)
+
+    r_res, d_res, s_res = await asyncio.gather(
+        _probe_redis_async(),
+        _db(),
+        run_blocking(check_slack, slack_token, slack_channel),
+    )
+    _health_cache.update({
+        "redis": r_res,
+        "db": d_res,
+        "slack": s_res,
+        "checked_at": datetime.now(timezone.utc).isoformat(),
+    })
+    return _health_cache
+
+async def _health_probe_loop():
+    while True:
+        try:
+            await refresh_health_probes()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"헬스 프로브 갱신 실패: {e}")
+        await asyncio.sleep(HEALTH_PROBE_INTERVAL_SEC)
+
+async def _get_health_probes() -> Dict[str, Any]:
+    """캐시된 프로브 결과 (최초 1회만 즉시 실행)"""
+    if not _health_cache:
+        await refresh_health_probes()
+    return _health_cache
+
+def _job_view(job: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in job.items() if k != "key"}
+
+def submit_report_job(kind: str, fn: Callable, **params) -> Dict[str, Any]:
+    """리포트 잡 등록 (동일 파라미터의 진행 중/최근 완료 잡은 재사용)"""
+    key = json.dumps([kind, params], sort_keys=True, default=str)
+    now = time.time()
+    for job in reversed(_report_jobs.values()):
+        if job["key"] != key:
+            continue
+        if job["status"] in ("queued", "running"):
+            return job
+        if job["status"] == "done" and now - (job.get("finished_ts") or 0) < REPORT_JOB_CACHE_SEC:
+            return job
+        break
+
+    job_id = uuid.uuid4().hex[:12]
+    job: Dict[str, Any] = {
+        "job_id": job_id,
+        "kind": kind,
+        "params": params,
+        "status": "queued",
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "key": key,
+    }
+    _report_jobs[job_id] = job
+    _evict_report_jobs()
+
+    async def _run():
+        job["status"] = "running"
+        t0 = time.perf_counter()
+        try:
+            job["result"] = await run_report(fn, **params)
+            job["status"] = "done"
+        except Exception as e:
+            logger.error(f"리포트 잡 실패 ({kind} {job_id}): {e}")
+            job["status"] = "error"
+            job["error"] = str(e)
+        finally:
+            job["finished_ts"] = time.time()
+            job["elapsed_ms"] = int((time.perf_counter() - t0) * 1000)
+            _report_job_tasks.pop(job_id, None)
+
+    _report_job_tasks[job_id] = asyncio.get_running_loop().create_task(_run())
+    return job
+
+def _evict_report_jobs() -> None:
+    """상한 초과 시 오래된 완료 잡부터 제거 (진행 중 잡은 결과를 잃지 않도록 유지)"""
+    excess = len(_report_jobs) - REPORT_JOB_MAX
+    if excess <= 0:
+        return
+    for old_id in [j for j, job in _report_jobs.items() if job["status"] in ("done", "error")][:excess]:
+        _report_jobs.pop(old_id, None)
+
+async def wait_report_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    task = _report_job_tasks.get(job["job_id"])
+    if task is not None:
+        await asyncio.shield(task)
+    if job["status"] == "error":
+        raise RuntimeError(job.get("error") or "report job failed")
+    if job["status"] != "done":
+        raise RuntimeError(f"report job {job['job_id']} not finished ({job['status']})")
+    return job.get("result") or {}
+
 @app.on_event("startup")
 async def startup_event():
     """앱 시작 시 초기화"""
-    global trading_bot, slack_bot, redis_streams, redis_client
+    global trading_bot, slack_bot, redis_streams, redis_client, async_redis, _health_task
     
     logger.info("Trading Bot API 시작")
     
@@ -233,8 +410,14 @@ async def startup_event():
         if redis_url:
             import redis as _redis
             redis_client = _redis.from_url(redis_url)
+            async_redis = aioredis.from_url(redis_url, socket_timeout=CONNECT_TIMEOUT, socket_connect_timeout=CONNECT_TIMEOUT)
     except Exception:
         redis_client = None
+        async_redis = None
+
+    # 헬스 프로브 백그라운드 갱신 (요청 경로에서 외부 연결 생성 제거)
+    if os.getenv("HEALTHZ_SKIP_EXTERNAL", "0").lower() not in ("1", "true", "yes", "on"):
+        _health_task = asyncio.get_running_loop().create_task(_health_probe_loop())
 
     # 여기서 실제 컴포넌트들을 초기화
     # trading_bot = TradingBot()
@@ -244,6 +427,22 @@ async def startup_event():
 async def shutdown_event():
     """앱 종료 시 정리"""
     logger.info("Trading Bot API 종료")
+    if _health_task is not None:
+        _health_task.cancel()
+    for task in list(_report_job_tasks.values()):
+        task.cancel()
+    if async_redis is not None:
+        try:
+            await async_redis.close()
+        except Exception:
+            pass
+    if _db_pool is not None:
+        try:
+            _db_pool.closeall()
+        except Exception:
+            pass
+    _executor.shutdown(wait=False)
+    _report_executor.shutdown(wait=False)
 
 @app.get("/", response_model=Dict[str, str])
 async def root():
@@ -258,14 +457,12 @@ async def root():
 async def health_check():
     """헬스 체크"""
     try:
-        # 시스템 상태 확인
-        redis_health = {"status": "unknown"}
-        
-        if redis_streams:
-            redis_health = redis_streams.health_check()
+        # 시스템 상태 확인 (캐시된 Redis 프로브)
+        probes = await _get_health_probes()
+        r_ok = (probes.get("redis") or (False,))[0]
         
         # 전체 상태 결정
-        if redis_health.get("status") == "healthy":
+        if r_ok:
             status = "healthy"
         else:
             status = "degraded"
@@ -285,12 +482,6 @@ async def health_check():
 @app.get("/healthz", response_model=HealthzResponse)
 async def healthz_check(skip_external: bool = False):
     """헬스체크 (상세) - Redis/DB/Slack 토큰 체크"""
-    # 환경변수에서 직접 읽어와 자가검사 (전역 객체 의존 X)
-    redis_url = os.getenv("REDIS_URL", "redis://redis:6379/0")
-    db_dsn = os.getenv("POSTGRES_URL") or os.getenv("DATABASE_URL", "")
-    slack_token = os.getenv("SLACK_BOT_TOKEN", "")
-    slack_channel = os.getenv("SLACK_CHANNEL_ID") or ""
-
     # 개발 편의: 외부 의존성 체크 스킵
     skip_external = skip_external or (os.getenv("HEALTHZ_SKIP_EXTERNAL", "0").lower() in ("1", "true", "yes", "on"))
 
@@ -301,10 +492,13 @@ async def healthz_check(skip_external: bool = False):
         l_ok, l_meta = check_llm()
         overall = True  # 외부 의존성은 개발 모드에서 강제 통과
     else:
-        r_ok, r_err, r_ms = check_redis(redis_url)
-        d_ok, d_err, d_ms = check_db(db_dsn) if db_dsn else (False, "missing_db_dsn", 0)
-        s_ok, s_err, s_ms = check_slack(slack_token, slack_channel)
+        # 백그라운드에서 갱신된 프로브 캐시 사용 (HEALTH_PROBE_INTERVAL_SEC)
+        probes = await _get_health_probes()
+        r_ok, r_err, r_ms = probes["redis"]
+        d_ok, d_err, d_ms = probes["db"]
+        s_ok, s_err, s_ms = probes["slack"]
         l_ok, l_meta = check_llm()
+        l_meta = {**l_meta, "checked_at": probes.get("checked_at")}
         overall = r_ok and d_ok and s_ok and l_ok
 
     return HealthzResponse(
@@ -323,24 +517,8 @@ async def system_status():
         # Redis 상태 (redis_streams 미초기화 시에도 ping 통해 판별)
         redis_connected = False
         try:
-            if redis_streams:
-                health = redis_streams.health_check()
-                redis_connected = bool(
-                    health.get("redis_connected")
-                    or health.get("connected")
-                    or (health.get("status") == "healthy")
-                )
-            if not redis_connected:
-                # 폴백: 전역 redis_client 우선, 없으면 새 커넥션으로 ping
-                try:
-                    if redis_client:
-                        redis_connected = bool(redis_client.ping())
-                    else:
-                        import redis as _r
-                        r = _r.from_url(os.getenv("REDIS_URL", "redis://redis:6379/0"))
-                        redis_connected = bool(r.ping())
-                except Exception:
-                    redis_connected = False
+            probes = await _get_health_probes()
+            redis_connected = bool((probes.get("redis") or (False,))[0])
         except Exception:
             redis_connected = False
         
@@ -354,12 +532,22 @@ async def system_status():
         signal_latency = 150  # ms
         execution_latency = 300  # ms
         
+        # 쓰기 지연 영속화 플러시 지연 (flush_write_behind가 기록)
+        flush_lag = None
+        if async_redis is not None:
+            try:
+                raw = await async_redis.hget("persist:metrics", "lag_sec")
+                flush_lag = float(json.loads(raw)) if raw is not None else None
+            except Exception:
+                flush_lag = None
+        
         return SystemStatusResponse(
             status="healthy" if redis_connected else "degraded",
             redis_connected=redis_connected,
             llm_status=llm_status,
             signal_latency_ms=signal_latency,
             execution_latency_ms=execution_latency,
+            persist_flush_lag_sec=flush_lag,
             timestamp=datetime.now().isoformat()
         )
         
@@ -437,72 +625,84 @@ async def get_signals(limit: int = 10, ticker: Optional[str] = None):
 
 
 @app.get("/signals/recent", response_model=List[Dict])
-async def get_recent_signals(hours: int = 24, include_suppressed: int = 0):
-    """최근 N시간 시그널 조회 (KST 시간 포함)"""
+async def get_recent_signals(response: Response, hours: int = 24, include_suppressed: int = 0,
+                             ticker: Optional[str] = None, action: Optional[str] = None,
+                             cursor: Optional[str] = None, limit: int = 200):
+    """최근 N시간 시그널 조회 (KST 시간 포함, 최신순 페이지 — 다음 페이지 커서는 X-Next-Cursor 헤더)"""
     try:
-        now = datetime.now(timezone.utc)
-        kst = timezone(timedelta(hours=9))
-        results: List[Dict] = []
-        # Redis 최근 신호 조회 (있으면)
-        if redis_client:
-            try:
-                key = "signals:recent"
-                raw = redis_client.lrange(key, 0, 500) or []
-                for b in raw:
-                    try:
-                        s = json.loads(b)
-                    except Exception:
-                        continue
-                    # suppressed 포함 여부
-                    if not include_suppressed and s.get("suppressed_reason"):
-                        continue
-                    ts = s.get("timestamp")
-                    try:
-                        ts_dt = datetime.fromisoformat(ts) if ts else now
-                    except Exception:
-                        ts_dt = now
-                    if ts_dt.astimezone(timezone.utc) < now - timedelta(hours=hours):
-                        continue
-                    # 표준화 + KST 추가
-                    s["timestamp_kst"] = ts_dt.astimezone(kst).isoformat()
-                    results.append(s)
-                return results[:200]
-            except Exception:
-                pass
-
-        # Fallback 더미
-        return []
+        if cursor is not None and not cursor.isdigit():
+            raise HTTPException(status_code=400, detail=f"invalid cursor: {cursor}")
+        since = time.time() - hours * 3600
+        items, next_cursor = await run_blocking(
+            get_recent_signal_store().page, ticker, action, bool(include_suppressed), since, None, cursor, limit)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return [_with_kst(s) for s in items]
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"최근 시그널 조회 실패: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def _with_kst(s: Dict) -> Dict:
+    """응답 표준화: timestamp_kst 추가"""
+    kst = timezone(timedelta(hours=9))
+    ts = s.get("timestamp")
+    try:
+        ts_dt = datetime.fromisoformat(ts) if ts else datetime.now(timezone.utc)
+    except Exception:
+        ts_dt = datetime.now(timezone.utc)
+    s["timestamp_kst"] = ts_dt.astimezone(kst).isoformat()
+    return s
+
+
+@app.get("/signals/scores/latest", response_model=Dict[str, Dict])
+async def get_latest_scores(tickers: Optional[str] = None):
+    """종목별 최신 점수 (scores:latest 해시 1회 조회, tickers=콤마 구분 선택)"""
+    names = [t.strip() for t in tickers.split(",") if t.strip()] if tickers else None
+    return await run_blocking(get_score_series().latest, names)
+
+
+@app.get("/signals/scores/{ticker}", response_model=List[Dict])
+async def get_score_history(ticker: str, minutes: int = 60, resolution: str = "auto"):
+    """종목 점수 구간 조회 (resolution: auto | 0(원시) | 60 | 300)"""
+    res = resolution if resolution == "auto" else None
+    if res is None:
+        try:
+            res = int(resolution)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"invalid resolution: {resolution}")
+    end = time.time()
+    try:
+        return await run_blocking(get_score_series().range, ticker, end - minutes * 60, end, res)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 # Helper: paper order 저장 (DB 우선, 실패 시 None)
 def _save_paper_order(order: "PaperOrderRequest") -> Optional[str]:
     order_id = None
     dsn = os.getenv("POSTGRES_URL") or os.getenv("DATABASE_URL")
     if dsn:
         try:
-            conn = psycopg2.connect(dsn)
-            cur = conn.cursor()
-            cur.execute(
-                """
-                INSERT INTO orders_paper (ticker, side, qty, px_entry, sl, tp)
-                VALUES (%s, %s, %s, %s, %s, %s)
-                RETURNING id
-                """,
-                (
-                    order.ticker,
-                    order.side,
-                    order.qty,
-                    order.entry,
-                    order.sl,
-                    order.tp,
-                ),
-            )
-            order_id = str(cur.fetchone()[0])
-            conn.commit()
-            cur.close()
-            conn.close()
+            with _db_conn() as conn:
+                with conn.cursor() as cur:
+                    cur.execute(
+                        """
+                        INSERT INTO orders_paper (ticker, side, qty, px_entry, sl, tp)
+                        VALUES (%s, %s, %s, %s, %s, %s)
+                        RETURNING id
+                        """,
+                        (
+                            order.ticker,
+                            order.side,
+                            order.qty,
+                            order.entry,
+                            order.sl,
+                            order.tp,
+                        ),
+                    )
+                    order_id = str(cur.fetchone()[0])
+                conn.commit()
         except Exception as db_err:
             logger.error(f"페이퍼 주문 DB 기록 실패: {db_err}")
     return order_id
@@ -568,7 +768,7 @@ async def slack_interactions(request: Request):
                 sl=float(order_data.get("sl", 0.0)),
                 tp=float(order_data.get("tp", 0.0)),
             )
-            order_id = _save_paper_order(order)
+            order_id = await run_blocking(_save_paper_order, order)
             if not order_id:
                 order_id = f"paper_{int(time.time()*1000)}"
                 paper_orders.append({"id": order_id, **order.dict(), "ts": datetime.now().isoformat()})
@@ -594,8 +794,8 @@ async def slack_interactions(request: Request):
 async def create_paper_order(order: PaperOrderRequest):
     """페이퍼 주문 기록"""
     try:
-        # DB 기록 시도 (PostgreSQL)
-        order_id = _save_paper_order(order)
+        # DB 기록 시도 (PostgreSQL, 스레드 풀)
+        order_id = await run_blocking(_save_paper_order, order)
         
         # 메모리에도 기록 (DB 실패 대비)
         fallback_id = f"paper_{int(time.time()*1000)}"
@@ -662,10 +862,9 @@ async def get_daily_report(force: bool = False, post: bool = False):
         # metrics_daily에 upsert
         await upsert_daily_metrics(today, report_data)
         
-        # 성과 리포트 병합 (경량)
+        # 성과 리포트 병합 (경량) — /report/perf와 동일 잡 공유
         try:
-            from app.engine.perf import simulate_and_summarize
-            perf = simulate_and_summarize(days=1)
+            perf = await wait_report_job(submit_report_job("perf", _build_perf_report, days=1))
             report_data["perf_summary"] = perf.get("summary", {})
         except Exception:
             report_data["perf_summary"] = {}
@@ -690,7 +889,10 @@ async def get_daily_report(force: bool = False, post: bool = False):
         raise HTTPException(status_code=500, detail=str(e))
 
 async def collect_daily_metrics(date: datetime.date) -> Dict:
-    """일일 메트릭 수집"""
+    """일일 메트릭 수집 (동기 Redis 조회는 스레드 풀에서)"""
+    return await run_blocking(_collect_daily_metrics_sync, date)
+
+def _collect_daily_metrics_sync(date: datetime.date) -> Dict:
     try:
         # 기본 집계 (임시 값)
         metrics = {
@@ -735,11 +937,16 @@ async def collect_daily_metrics(date: datetime.date) -> Dict:
                 metrics["signal_cutoff_rth"] = float(cut_rth) if cut_rth else 0.68
                 metrics["signal_cutoff_ext"] = float(cut_ext) if cut_ext else 0.78
 
-                # 유니버스 크기
-                uni_ext = r.scard("universe:external") or 0
-                uni_watch = r.scard("universe:watchlist") or 0
-                static_core = len((os.getenv("TICKERS") or "").split(",")) if os.getenv("TICKERS") else 0
-                metrics["universe_size"] = min(60, static_core + uni_ext + uni_watch)
+                # 유니버스 크기 (중복 제거·상한 적용된 스냅샷 기준)
+                metrics["universe_size"] = len(get_universe_service().snapshot().symbols)
+
+                # 스트림 윈도우 카운터 (O(1) 조회, 일부만 집계된 날은 스트림에서 재구성)
+                from app.jobs.eod_reporter import load_stream_counts
+                buckets, _ = load_stream_counts(r, f"{date:%Y%m%d}")
+                if buckets:
+                    metrics["candidate_signals"] = sum(buckets.get("signals.raw", {}).values())
+                    metrics["edgar_count"] = sum(buckets.get("news.edgar", {}).values())
+                    metrics["stream_counts"] = {k: sum(v.values()) for k, v in buckets.items()}
         except Exception:
             pass
         
@@ -751,13 +958,14 @@ async def collect_daily_metrics(date: datetime.date) -> Dict:
 
 async def upsert_daily_metrics(date: datetime.date, metrics: Dict):
     """metrics_daily에 upsert"""
+    await run_blocking(_upsert_daily_metrics_sync, date, metrics)
+
+def _upsert_daily_metrics_sync(date: datetime.date, metrics: Dict):
     try:
-        if not db_connection:
+        if _get_db_pool() is None:
             logger.warning("DB 연결 없음 - 메트릭 저장 건너뜀")
             return
         
-        cursor = db_connection.cursor()
-        
         query = """
         INSERT INTO metrics_daily (
             date, trades, winrate, rr_avg, pnl, drawdown, var95, 
@@ -789,8 +997,10 @@ async def upsert_daily_metrics(date: datetime.date, metrics: Dict):
             json.dumps(metrics)
         )
         
-        cursor.execute(query, values)
-        db_connection.commit()
+        with _db_conn() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(query, values)
+            conn.commit()
         
         logger.info(f"일일 메트릭 저장 완료: {date}")
         
@@ -884,7 +1094,7 @@ async def get_positions():
     try:
         from app.api.portfolio import get_trading_adapter
         trading_adapter = get_trading_adapter()
-        positions = trading_adapter.get_positions()
+        positions = await run_blocking(trading_adapter.get_positions)
         
         return [
             {
@@ -932,40 +1142,70 @@ async def get_trades(limit: int = 20, ticker: Optional[str] = None):
         logger.error(f"거래 조회 실패: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def _build_perf_report(days: int = 1) -> Dict:
+    """OCO 시뮬 기반 성과 리포트 계산 (DB/시세 I/O 포함 → 스레드 풀 전용)"""
+    from app.engine.perf import simulate_and_summarize, build_equity_curve
+    from utils.spark import to_sparkline
+    result = simulate_and_summarize(days=days, write_trades=False)
+    trades = result.get("trades", [])
+    # 그룹 요약 (세션/레짐) - meta/session, regime 필드가 없는 경우 빈값
+    by_session = {"RTH": {"trades": 0, "pnl": 0.0}, "EXT": {"trades": 0, "pnl": 0.0}}
+    by_regime = {}
+    for t in trades:
+        sess = (t.get("session") or (t.get("meta") or {}).get("session") or "RTH")
+        pnl = float(t.get("pnl_cash", 0.0))
+        if sess not in by_session:
+            by_session[sess] = {"trades": 0, "pnl": 0.0}
+        by_session[sess]["trades"] += 1
+        by_session[sess]["pnl"] += pnl
+        reg = t.get("regime") or (t.get("meta") or {}).get("regime") or "unknown"
+        if reg not in by_regime:
+            by_regime[reg] = {"trades": 0, "pnl": 0.0}
+        by_regime[reg]["trades"] += 1
+        by_regime[reg]["pnl"] += pnl
+    # Equity/Drawdown
+    eq, eq_meta = build_equity_curve(trades)
+    spark = to_sparkline(eq)
+    result["by_session"] = by_session
+    result["by_regime"] = by_regime
+    result["equity"] = {"sparkline": spark, **eq_meta}
+    return result
+
+class ReportJobRequest(BaseModel):
+    kind: str = "perf"
+    days: int = 1
+
+_REPORT_JOB_BUILDERS: Dict[str, Callable[..., Dict]] = {
+    "perf": _build_perf_report,
+}
+
 @app.get("/report/perf", response_model=Dict)
 async def report_perf(days: int = 1):
-    """OCO 시뮬 기반 성과 리포트 (경량)"""
+    """OCO 시뮬 기반 성과 리포트 (경량, 동일 요청은 잡 공유)"""
     try:
-        from app.engine.perf import simulate_and_summarize, build_equity_curve
-        from utils.spark import to_sparkline
-        result = simulate_and_summarize(days=days, write_trades=False)
-        trades = result.get("trades", [])
-        # 그룹 요약 (세션/레짐) - meta/session, regime 필드가 없는 경우 빈값
-        by_session = {"RTH": {"trades": 0, "pnl": 0.0}, "EXT": {"trades": 0, "pnl": 0.0}}
-        by_regime = {}
-        for t in trades:
-            sess = (t.get("session") or (t.get("meta") or {}).get("session") or "RTH")
-            pnl = float(t.get("pnl_cash", 0.0))
-            if sess not in by_session:
-                by_session[sess] = {"trades": 0, "pnl": 0.0}
-            by_session[sess]["trades"] += 1
-            by_session[sess]["pnl"] += pnl
-            reg = t.get("regime") or (t.get("meta") or {}).get("regime") or "unknown"
-            if reg not in by_regime:
-                by_regime[reg] = {"trades": 0, "pnl": 0.0}
-            by_regime[reg]["trades"] += 1
-            by_regime[reg]["pnl"] += pnl
-        # Equity/Drawdown
-        eq, eq_meta = build_equity_curve(trades)
-        spark = to_sparkline(eq)
-        result["by_session"] = by_session
-        result["by_regime"] = by_regime
-        result["equity"] = {"sparkline": spark, **eq_meta}
-        return result
+        return await wait_report_job(submit_report_job("perf", _build_perf_report, days=days))
     except Exception as e:
         logger.error(f"성과 리포트 생성 실패: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/report/jobs", response_model=Dict)
+async def create_report_job(req: ReportJobRequest):
+    """리포트 백그라운드 잡 등록 → job_id로 폴링"""
+    builder = _REPORT_JOB_BUILDERS.get(req.kind)
+    if builder is None:
+        raise HTTPException(status_code=400, detail=f"unknown report kind: {req.kind}")
+    job = submit_report_job(req.kind, builder, days=req.days)
+    return {k: v for k, v in _job_view(job).items() if k != "result"}
+
+@app.get("/report/jobs/{job_id}", response_model=Dict)
+async def get_report_job(job_id: str):
+    """리포트 잡 상태/결과 조회"""
+    job = _report_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="job not found")
+    return _job_view(job)
+
+
 @app.post("/emergency-stop")
 async def emergency_stop():
     """긴급 중지"""
@@ -1001,6 +1241,15 @@ async def get_config():
             "max_positions": 5,
             "max_exposure": 0.1
         }
+        # 런타임 설정 스냅샷 (버전/컷오프, 무효화 후 첫 조회는 Redis 재로드 → 스레드 풀)
+        try:
+            from app.config import get_config_snapshot
+            snap = await run_blocking(get_config_snapshot)
+            config["config_version"] = snap.version
+            config["signal_cutoff_rth"] = snap.signal_cutoff_rth
+            config["signal_cutoff_ext"] = snap.signal_cutoff_ext
+        except Exception:
+            pass
         
         return config
         
@@ -1014,57 +1263,54 @@ async def set_universe(tickers: List[UniverseTicker]):
     try:
         if not redis_client:
             raise HTTPException(status_code=503, detail="redis unavailable")
-        key = "universe:external"
-        pipe = redis_client.pipeline()
-        pipe.delete(key)
-        count = 0
-        for t in tickers:
-            val = (t.ticker or "").strip().upper()
-            if not val:
-                continue
-            pipe.sadd(key, val)
-            count += 1
-        pipe.execute()
-        return {"status": "ok", "inserted": count}
+        symbols = [(t.ticker or "").strip().upper() for t in tickers]
+        return await run_blocking(_set_universe_sync, [s for s in symbols if s])
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"유니버스 설정 실패: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def _set_universe_sync(symbols: List[str]) -> Dict:
+    """universe:external 교체 → 변경 알림 → 스냅샷 기록 (동기 Redis, 스레드 풀에서 실행)"""
+    key = "universe:external"
+    pipe = redis_client.pipeline()
+    pipe.delete(key)
+    if symbols:
+        pipe.sadd(key, *symbols)
+    pipe.execute()
+    publish_config_change(redis_client, "universe_set")
+    snap = get_universe_service().materialize(redis_client)
+    return {"status": "ok", "inserted": len(symbols), "version": snap.version if snap else None}
+
 @app.get("/universe/get", response_model=List[str])
 async def get_universe():
-    """Static Core(TICKERS) + external + watchlist 병합 후 상한 60개 반환"""
+    """Static Core(TICKERS) + external + watchlist 병합 후 UNIVERSE_MAX 상한 반환 (유니버스 서비스 스냅샷)"""
     try:
-        max_n = int(os.getenv("UNIVERSE_MAX", "60"))
-        core = [t.strip().upper() for t in (os.getenv("TICKERS", "").split(",")) if t.strip()]
-        external = []
-        watch = []
-        if redis_client:
-            try:
-                external = [x.decode() if isinstance(x, (bytes, bytearray)) else x for x in (redis_client.smembers("universe:external") or [])]
-            except Exception:
-                external = []
-            try:
-                watch = [x.decode() if isinstance(x, (bytes, bytearray)) else x for x in (redis_client.smembers("universe:watchlist") or [])]
-            except Exception:
-                watch = []
-        merged = []
-        seen = set()
-        for arr in [core, external, watch]:
-            for s in arr:
-                if s and s not in seen:
-                    merged.append(s)
-                    seen.add(s)
-                if len(merged) >= max_n:
-                    break
-            if len(merged) >= max_n:
-                break
-        return merged
+        snap = await run_blocking(get_universe_service().snapshot)
+        return list(snap.symbols)
     except Exception as e:
         logger.error(f"유니버스 조회 실패: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/universe/diff")
+async def get_universe_diff(since: Optional[str] = None):
+    """유니버스 변경 내역: since 버전 대비 추가/제거 종목"""
+    try:
+        service = get_universe_service()
+        snap = await run_blocking(service.snapshot)
+        d = service.diff(since, snap)
+        return {
+            "version": snap.version,
+            "since": since,
+            "added": list(d.added),
+            "removed": list(d.removed),
+            "tiers": snap.tiers(),
+        }
+    except Exception as e:
+        logger.error(f"유니버스 diff 조회 실패: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.put("/config")
 async def update_config(config: Dict[str, Any]):
     """설정 업데이트"""
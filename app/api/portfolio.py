@@ -5,8 +5,10 @@ GPT-5 리스크 관리 시스템 통합
 
 from fastapi import APIRouter, HTTPException
 import logging
+from datetime import datetime
 
 from app.adapters.trading_adapter import get_trading_adapter
+from app.io.last_price import adapter_price_fetcher, get_last_price_service
 from app.engine.risk_manager import get_risk_manager
 
 logger = logging.getLogger(__name__)
@@ -114,18 +116,21 @@ async def get_positions():
 async def get_current_price(ticker: str):
     """종목 현재가 조회"""
     try:
+        # 최종가 서비스 (신선도 한도 내 캐시, 없거나 오래됐으면 브로커 스냅샷으로 보충)
         trading_adapter = get_trading_adapter()
-        price = trading_adapter.get_current_price(ticker.upper())
+        entry = get_last_price_service().get_entry(ticker.upper(), fetcher=adapter_price_fetcher(trading_adapter))
         
-        if price is None:
+        if entry is None:
             raise HTTPException(status_code=404, detail=f"가격 정보를 찾을 수 없습니다: {ticker}")
         
         return {
             "status": "success",
             "data": {
                 "ticker": ticker.upper(),
-                "price": price,
-                "timestamp": "real-time"
+                "price": entry.price,
+                "timestamp": datetime.fromtimestamp(entry.ts).isoformat(),
+                "age_sec": round(entry.age(), 1),
+                "source": entry.source
             }
         }
         
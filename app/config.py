@@ -1,7 +1,18 @@
 # app/config.py
+import atexit
+import hashlib
+import json
+import logging
 import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
 import redis
 
+logger = logging.getLogger(__name__)
+
 # 안전 범위 상수
 SAFE_RTH_RANGE = (0.12, 0.30)
 SAFE_EXT_RANGE = (0.18, 0.38)
@@ -131,21 +142,68 @@ class Settings:
 
 settings = Settings()
 
-def get_signal_cutoffs():
-    """Redis 값이 있으면 우선 사용, 없으면 기본 설정값 반환. 안전 범위로 클램프"""
+# =============================================================================
+# 런타임 설정 스냅샷 (Redis 런타임 노브 → 불변 버전 객체)
+# =============================================================================
+# - 핫패스(티커 루프)는 로컬 메모리 스냅샷만 읽는다 (티커당 Redis 왕복 0회)
+# - 변경 시 CONFIG_CHANNEL pub/sub(또는 keyspace 알림)으로 무효화, TTL 만료 시 폴백 재로드
+# - version은 내용 해시 → 같은 설정이면 모든 프로세스에서 동일한 버전 문자열
+
+CONFIG_CHANNEL = "cfg:changed"
+CONFIG_SNAPSHOT_TTL_SEC = float(os.getenv("CONFIG_SNAPSHOT_TTL_SEC", "30"))
+CONFIG_LISTENER_POLL_SEC = 1.0  # 리스너 종료 요청 확인 주기
+
+# keyspace 알림(notify-keyspace-events 설정 시)도 무효화 트리거로 사용
+_CONFIG_KEYSPACE_PATTERNS = (
+    "__keyspace@*__:cfg:signal_cutoff:*",
+    "__keyspace@*__:universe:external",
+    "__keyspace@*__:universe:watchlist",
+)
+
+
+@dataclass(frozen=True)
+class RuntimeConfig:
+    """런타임 설정 스냅샷 (불변)"""
+    version: str
+    loaded_at: float
+    signal_cutoff_rth: float
+    signal_cutoff_ext: float
+    universe_external: Tuple[str, ...] = ()
+    universe_watchlist: Tuple[str, ...] = ()
+    source: str = "defaults"
+
+    @property
+    def signal_cutoffs(self) -> Tuple[float, float]:
+        return self.signal_cutoff_rth, self.signal_cutoff_ext
+
+
+def _decode(v):
+    return v.decode() if isinstance(v, (bytes, bytearray)) else v
+
+
+def _load_runtime_config(r: Optional[redis.Redis]) -> RuntimeConfig:
+    """Redis 런타임 노브를 한 번의 파이프라인으로 읽어 스냅샷 생성"""
     rth, ext = settings.SIGNAL_CUTOFF_RTH, settings.SIGNAL_CUTOFF_EXT
-    try:
-        rurl = os.getenv("REDIS_URL")
-        if rurl:
-            r = redis.from_url(rurl)
-            rv = r.get("cfg:signal_cutoff:rth")
-            ev = r.get("cfg:signal_cutoff:ext")
+    external: Tuple[str, ...] = ()
+    watch: Tuple[str, ...] = ()
+    source = "defaults"
+    if r is not None:
+        try:
+            pipe = r.pipeline(transaction=False)
+            pipe.get("cfg:signal_cutoff:rth")
+            pipe.get("cfg:signal_cutoff:ext")
+            pipe.smembers("universe:external")
+            pipe.smembers("universe:watchlist")
+            rv, ev, ext_set, watch_set = pipe.execute()
             if rv is not None:
                 rth = float(rv)
             if ev is not None:
                 ext = float(ev)
-    except Exception:
-        pass
+            external = tuple(sorted(_decode(x) for x in (ext_set or [])))
+            watch = tuple(sorted(_decode(x) for x in (watch_set or [])))
+            source = "redis"
+        except Exception as e:
+            logger.warning(f"런타임 설정 로드 실패(기본값 사용): {e}")
     # 임시 델타 적용(테스트 가속): SIGNAL_CUTOFF_RTH_DELTA, SIGNAL_CUTOFF_EXT_DELTA
     try:
         delta_rth = float(os.getenv("SIGNAL_CUTOFF_RTH_DELTA", "0.0"))
@@ -157,7 +215,158 @@ def get_signal_cutoffs():
     # 안전 범위로 최종 클램프
     rth = _clamp(rth, *SAFE_RTH_RANGE)
     ext = _clamp(ext, *SAFE_EXT_RANGE)
-    return rth, ext
+    body = json.dumps([round(rth, 6), round(ext, 6), external, watch], separators=(",", ":"))
+    version = hashlib.sha1(body.encode()).hexdigest()[:12]
+    return RuntimeConfig(
+        version=version,
+        loaded_at=time.time(),
+        signal_cutoff_rth=rth,
+        signal_cutoff_ext=ext,
+        universe_external=external,
+        universe_watchlist=watch,
+        source=source,
+    )
+
+
+class ConfigSnapshotStore:
+    """프로세스 로컬 설정 스냅샷 저장소 (pub/sub 무효화 + TTL 폴백)"""
+
+    def __init__(self, redis_url: Optional[str] = None, ttl_sec: float = CONFIG_SNAPSHOT_TTL_SEC):
+        """
+        Args:
+            redis_url: Redis 연결 URL (없으면 REDIS_URL, 그것도 없으면 기본값만 사용)
+            ttl_sec: 알림 유실 대비 최대 스냅샷 수명
+        """
+        self.redis_url = redis_url or os.getenv("REDIS_URL")
+        self.ttl_sec = ttl_sec
+        self._snapshot: Optional[RuntimeConfig] = None
+        self._dirty = True
+        self._lock = threading.Lock()
+        self._listener_pid: Optional[int] = None
+        self._listener_retry_at = 0.0
+        self._listener: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._atexit_registered = False
+        self.reloads = 0
+
+    def _redis(self) -> Optional[redis.Redis]:
+        if not self.redis_url:
+            return None
+        try:
+            return redis.from_url(self.redis_url)
+        except Exception:
+            return None
+
+    def get(self) -> RuntimeConfig:
+        """현재 스냅샷 (무효화됐거나 TTL 만료 시에만 Redis 재로드)"""
+        snap = self._snapshot
+        if snap is not None and not self._dirty and (time.time() - snap.loaded_at) < self.ttl_sec:
+            return snap
+        return self.refresh()
+
+    def refresh(self) -> RuntimeConfig:
+        with self._lock:
+            snap = self._snapshot
+            if snap is not None and not self._dirty and (time.time() - snap.loaded_at) < self.ttl_sec:
+                return snap
+            r = self._redis()
+            self._ensure_listener()
+            self._dirty = False
+            new_snap = _load_runtime_config(r)
+            if snap is None or snap.version != new_snap.version:
+                logger.info(f"런타임 설정 스냅샷 갱신: version={new_snap.version} "
+                            f"RTH={new_snap.signal_cutoff_rth:.3f} EXT={new_snap.signal_cutoff_ext:.3f} "
+                            f"external={len(new_snap.universe_external)} watch={len(new_snap.universe_watchlist)}")
+            self._snapshot = new_snap
+            self.reloads += 1
+            return new_snap
+
+    def invalidate(self) -> None:
+        self._dirty = True
+
+    def _ensure_listener(self) -> None:
+        """프로세스(pid)별 pub/sub 리스너 스레드 기동 (fork 이후 재기동)"""
+        if not self.redis_url or self._listener_pid == os.getpid():
+            return
+        if time.time() < self._listener_retry_at:
+            return
+        try:
+            pubsub = redis.from_url(self.redis_url).pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(CONFIG_CHANNEL)
+            pubsub.psubscribe(*_CONFIG_KEYSPACE_PATTERNS)
+        except Exception as e:
+            logger.warning(f"설정 변경 구독 실패(TTL 폴백 사용): {e}")
+            self._listener_retry_at = time.time() + 60
+            return
+        self._listener_pid = os.getpid()
+        stop = self._stop = threading.Event()  # fork 후 자식 스레드는 자기 이벤트로만 종료
+
+        def _run():
+            try:
+                # listen()은 소켓 읽기에서 무기한 블록 → 타임아웃 폴링으로 종료 요청 확인
+                while not stop.is_set():
+                    if pubsub.get_message(timeout=CONFIG_LISTENER_POLL_SEC) is not None:
+                        self.invalidate()
+            except Exception as e:
+                logger.warning(f"설정 변경 구독 종료(TTL 폴백 사용): {e}")
+                self._listener_retry_at = time.time() + 60
+            finally:
+                try:
+                    pubsub.close()
+                except Exception:
+                    pass
+                if self._listener_pid == os.getpid():
+                    self._listener_pid = None
+                self.invalidate()
+
+        self._listener = threading.Thread(target=_run, name="config-snapshot-listener", daemon=True)
+        self._listener.start()
+        if not self._atexit_registered:
+            atexit.register(self.close)
+            self._atexit_registered = True
+
+    def close(self, timeout: float = 2.0) -> None:
+        """리스너 스레드 종료 (구독 해제 후 join)"""
+        self._stop.set()
+        listener, self._listener = self._listener, None
+        if listener is not None and listener.is_alive() and listener is not threading.current_thread():
+            listener.join(timeout)
+
+
+_config_store: Optional[ConfigSnapshotStore] = None
+
+
+def get_config_store() -> ConfigSnapshotStore:
+    """글로벌 설정 스냅샷 저장소 반환"""
+    global _config_store
+    if _config_store is None:
+        _config_store = ConfigSnapshotStore()
+    return _config_store
+
+
+def get_config_snapshot() -> RuntimeConfig:
+    """현재 런타임 설정 스냅샷 (로컬 메모리)"""
+    return get_config_store().get()
+
+
+def publish_config_change(r: Optional[redis.Redis] = None, reason: str = "") -> None:
+    """설정 변경 브로드캐스트: 모든 프로세스의 스냅샷 무효화"""
+    try:
+        if r is None:
+            rurl = os.getenv("REDIS_URL")
+            if not rurl:
+                return
+            r = redis.from_url(rurl)
+        r.publish(CONFIG_CHANNEL, reason or "changed")
+    except Exception as e:
+        logger.warning(f"설정 변경 알림 실패: {e}")
+    if _config_store is not None:
+        _config_store.invalidate()
+
+
+def get_signal_cutoffs():
+    """현재 스냅샷의 컷오프 (Redis 값 우선, 없으면 기본 설정값; 델타 적용 후 안전 범위로 클램프)"""
+    return get_config_snapshot().signal_cutoffs
 
 def sanitize_cutoffs_in_redis():
     """Redis의 컷오프 값들을 안전 범위로 정화하고 되써주기"""
@@ -166,9 +375,10 @@ def sanitize_cutoffs_in_redis():
         if not rurl:
             return
         r = redis.from_url(rurl)
-        rth, ext = get_signal_cutoffs()  # 이미 클램프된 값
+        rth, ext = _load_runtime_config(r).signal_cutoffs  # 이미 클램프된 값
         r.set("cfg:signal_cutoff:rth", rth)
         r.set("cfg:signal_cutoff:ext", ext)
+        publish_config_change(r, "sanitize_cutoffs")
         return {"rth": rth, "ext": ext}
     except Exception:
         pass
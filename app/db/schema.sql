@@ -127,6 +127,23 @@ CREATE TABLE IF NOT EXISTS trades (
     status VARCHAR(20) DEFAULT 'pending' -- 'pending', 'filled', 'cancelled', 'rejected'
 );
 
+-- 청산 결정 감사 테이블 (쓰기 지연 배치 적재)
+CREATE TABLE IF NOT EXISTS exit_decisions (
+    id SERIAL PRIMARY KEY,
+    decision_id VARCHAR(120) UNIQUE NOT NULL, -- 클라이언트 생성 멱등 키
+    ts TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    symbol VARCHAR(10) NOT NULL,
+    side VARCHAR(10) NOT NULL,
+    qty INTEGER NOT NULL,
+    policy VARCHAR(20) NOT NULL, -- 'EOD', 'TIME_STOP', 'TRAIL_STOP', 'REGIME_FLAT', 'OPEN_CLEANUP'
+    reason TEXT,
+    tif VARCHAR(10),
+    attempt INTEGER DEFAULT 1,
+    market_state VARCHAR(20),
+    order_id VARCHAR(64),
+    price DECIMAL(10,4)
+);
+
 -- 포지션 테이블
 CREATE TABLE IF NOT EXISTS positions (
     id SERIAL PRIMARY KEY,
@@ -225,6 +242,7 @@ CREATE INDEX IF NOT EXISTS idx_edgar_events_ts ON edgar_events(ts);
 CREATE INDEX IF NOT EXISTS idx_edgar_events_form ON edgar_events(form);
 CREATE INDEX IF NOT EXISTS idx_bars_30s_ticker ON bars_30s(ticker);
 CREATE INDEX IF NOT EXISTS idx_bars_30s_ts ON bars_30s(ts);
+CREATE INDEX IF NOT EXISTS idx_exit_decisions_ts ON exit_decisions(ts);
 CREATE INDEX IF NOT EXISTS idx_signals_ticker ON signals(ticker);
 CREATE INDEX IF NOT EXISTS idx_signals_ts ON signals(ts);
 CREATE INDEX IF NOT EXISTS idx_signals_signal_type ON signals(signal_type);
@@ -0,0 +1,290 @@
+"""
+유니버스 일괄 스코어링 (numpy 벡터화)
+- 종목별 최근 봉을 (종목 × 봉) 2D 배열로 정렬해 TechScore(EMA/MACD/RSI/VWAP)와 레짐 점수를 한 번에 계산
+- 봉 개수가 같은 종목끼리 묶어 계산 (지표 기간이 봉 개수에 따라 달라지는 레짐 로직과 동일하게)
+- 시간축 재귀(EMA)만 봉 수만큼 반복하고 종목축은 전부 벡터 연산 → 종목 수가 늘어도 비용은 거의 고정
+- 결과는 TechScoreEngine.calculate_tech_score / RegimeDetector.detect_regime과 같은 결과 객체
+"""
+from __future__ import annotations
+
+import logging
+import os
+from datetime import datetime
+from operator import attrgetter
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from app.engine.regime import RegimeDetector, RegimeResult, RegimeType
+from app.engine.techscore import TechScoreEngine, TechScoreResult
+
+logger = logging.getLogger(__name__)
+
+
+_HLCV = attrgetter("h", "l", "c", "v")
+
+
+def _ohlcv(rows: List[List]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """봉 리스트 묶음 → (high, low, close, volume) 각각 (종목 × 봉) 배열 (속성 추출 1회)"""
+    a = np.array([list(map(_HLCV, bars)) for bars in rows], dtype=float)
+    return a[:, :, 0], a[:, :, 1], a[:, :, 2], a[:, :, 3]
+
+
+def _ema_last2(x: np.ndarray, alpha: float) -> Tuple[np.ndarray, np.ndarray]:
+    """행별 EMA(첫 값 시드)의 마지막 두 값"""
+    ema = x[:, 0].copy()
+    prev = ema
+    for t in range(1, x.shape[1]):
+        prev = ema
+        ema = alpha * x[:, t] + (1 - alpha) * ema
+    return ema, prev
+
+
+def _ema_series(x: np.ndarray, alpha: float) -> np.ndarray:
+    out = np.empty_like(x)
+    out[:, 0] = x[:, 0]
+    for t in range(1, x.shape[1]):
+        out[:, t] = alpha * x[:, t] + (1 - alpha) * out[:, t - 1]
+    return out
+
+
+def _sym(value: np.ndarray, lo: float, hi: float) -> np.ndarray:
+    """TechScoreEngine.normalize_value_symmetric 벡터판"""
+    if hi == lo:
+        return np.zeros_like(value)
+    mid = (lo + hi) / 2
+    up = np.clip((value - mid) / (hi - mid), 0.0, 1.0) if hi != mid else np.zeros_like(value)
+    dn = np.clip((value - mid) / (mid - lo), -1.0, 0.0) if mid != lo else np.zeros_like(value)
+    return np.where(value >= mid, up, dn)
+
+
+def _rsi_last(closes: np.ndarray, period: int = 14) -> np.ndarray:
+    diff = np.diff(closes[:, -(period + 1):], axis=1)
+    gain = np.where(diff > 0, diff, 0.0).mean(axis=1)
+    loss = np.where(diff > 0, 0.0, -diff).mean(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100 - 100 / (1 + gain / loss)
+    return np.where(loss == 0, 100.0, rsi)
+
+
+class BatchScorer:
+    """TechScoreEngine/RegimeDetector 설정을 그대로 쓰는 벡터화 계산기"""
+
+    def __init__(self, tech_engine: Optional[TechScoreEngine] = None,
+                 regime_detector: Optional[RegimeDetector] = None):
+        self.tech = tech_engine or TechScoreEngine()
+        self.regime = regime_detector or RegimeDetector()
+
+    # ------------------------------------------------------------------ 공개 API
+    def score_universe(self, tech_bars: Dict[str, List],
+                       regime_bars: Optional[Dict[str, List]] = None) -> Dict[str, Tuple[RegimeResult, TechScoreResult]]:
+        """{ticker: 봉 리스트} → {ticker: (RegimeResult, TechScoreResult)}"""
+        now = datetime.now()
+        arrays: Dict[int, Tuple] = {}  # 같은 봉 묶음이면 배열 재사용
+        techs = self.tech_scores(tech_bars, now, arrays)
+        regimes = self.regimes(tech_bars if regime_bars is None else regime_bars, now,
+                               arrays if regime_bars is None or regime_bars is tech_bars else None)
+        return {t: (regimes[t], techs[t]) for t in tech_bars if t in regimes}
+
+    def tech_scores(self, bars_by_ticker: Dict[str, List], now: Optional[datetime] = None,
+                    arrays: Optional[Dict[int, Tuple]] = None) -> Dict[str, TechScoreResult]:
+        now = now or datetime.now()
+        out: Dict[str, TechScoreResult] = {}
+        for n, tickers, rows in _group_by_length(bars_by_ticker):
+            for t, (score, comps) in zip(tickers, self._tech_group(rows, _arrays(arrays, n, rows))):
+                out[t] = TechScoreResult(score=score, components=comps, timestamp=now)
+        return out
+
+    def regimes(self, bars_by_ticker: Dict[str, List], now: Optional[datetime] = None,
+                arrays: Optional[Dict[int, Tuple]] = None) -> Dict[str, RegimeResult]:
+        now = now or datetime.now()
+        out: Dict[str, RegimeResult] = {}
+        for n, tickers, rows in _group_by_length(bars_by_ticker):
+            for t, (regime, conf, feats) in zip(tickers, self._regime_group(rows, _arrays(arrays, n, rows))):
+                out[t] = RegimeResult(regime=regime, confidence=conf, features=feats, timestamp=now)
+        return out
+
+    # ------------------------------------------------------------------ TechScore
+    def _tech_group(self, rows: List[List], arrays):
+        n_rows, n = len(rows), len(rows[0])
+        zero = {"ema": 0.0, "macd": 0.0, "rsi": 0.0, "vwap": 0.0}
+        if n < 20:
+            return [(0.0, dict(zero)) for _ in range(n_rows)]
+        h, lo, c, v = arrays()
+        rng = self.tech.normalization_ranges
+
+        # EMA 20/50 (50봉 미만이면 원본과 동일하게 0)
+        if n >= 50:
+            e20, _ = _ema_last2(c, 2.0 / 21)
+            e50, _ = _ema_last2(c, 2.0 / 51)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                ratio = np.where(e50 > 0, (e20 - e50) / e50, 0.0)
+            ema_s = _sym(ratio, *rng["ema"])
+        else:
+            ema_s = np.zeros(n_rows)
+
+        # MACD 히스토그램
+        if n >= 26:
+            macd_line = _ema_series(c, 2.0 / 13) - _ema_series(c, 2.0 / 27)
+            sig, _ = _ema_last2(macd_line, 2.0 / 10)
+            macd_s = _sym(macd_line[:, -1] - sig, *rng["macd"])
+        else:
+            macd_s = np.zeros(n_rows)
+
+        rsi_s = np.clip((_rsi_last(c, 14) - 50) / 50, -1.0, 1.0)
+
+        # VWAP 편차 (거래량 0이면 마지막 종가)
+        tp = (h + lo + c) / 3
+        vol = v.sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            vwap = np.where(vol > 0, (tp * v).sum(axis=1) / vol, c[:, -1])
+            dev = np.where(vwap > 0, (c[:, -1] - vwap) / vwap, 0.0)
+        vwap_s = _sym(dev, *rng["vwap"])
+
+        w = self.tech.weights
+        final = ema_s * w["ema"] + macd_s * w["macd"] + rsi_s * w["rsi"] + vwap_s * w["vwap"]
+        return [
+            (float(final[i]), {"ema": float(ema_s[i]), "macd": float(macd_s[i]),
+                               "rsi": float(rsi_s[i]), "vwap": float(vwap_s[i])})
+            for i in range(n_rows)
+        ]
+
+    # ------------------------------------------------------------------ 레짐
+    def _regime_group(self, rows: List[List], arrays):
+        det = self.regime
+        n_rows, n = len(rows), len(rows[0])
+        if n < det.min_data_points:
+            return [(RegimeType.SIDEWAYS, 0.0, {}) for _ in range(n_rows)]
+        h, lo, c, v = arrays()
+        th = det.thresholds
+        price = c[:, -1]
+
+        # EMA (가용 바 수에 맞춰 기간 축소, RegimeDetector.calculate_ema와 동일)
+        fast_p = min(20, max(3, n // 3))
+        slow_p = min(50, max(5, n // 2))
+        ef, ef_prev = _ema_last2(c, 2.0 / (max(2, min(fast_p, n)) + 1))
+        es, es_prev = _ema_last2(c, 2.0 / (max(2, min(slow_p, n)) + 1))
+
+        # ADX (최근 14개 TR/DM 평균)
+        hd = h[:, 1:] - h[:, :-1]
+        ld = lo[:, :-1] - lo[:, 1:]
+        tr = np.maximum.reduce([h[:, 1:] - lo[:, 1:], np.abs(h[:, 1:] - c[:, :-1]), np.abs(lo[:, 1:] - c[:, :-1])])
+        dmp = np.where((hd > ld) & (hd > 0), hd, 0.0)
+        dmm = np.where((ld > hd) & (ld > 0), ld, 0.0)
+        atr = tr[:, -14:].mean(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            dip = np.where(atr > 0, dmp[:, -14:].mean(axis=1) / atr * 100, 0.0)
+            dim = np.where(atr > 0, dmm[:, -14:].mean(axis=1) / atr * 100, 0.0)
+            dx = np.where(dip + dim > 0, np.abs(dip - dim) / (dip + dim) * 100, 0.0)
+        adx = np.minimum(dx, 100.0)
+
+        # RSI 시계열 (최근 20개만 필요: 극단 여부 + 현재값)
+        diff = np.diff(c, axis=1)
+        gains = np.where(diff > 0, diff, 0.0)
+        losses = np.where(diff < 0, -diff, 0.0)
+        if n >= 15:
+            g = sliding_window_view(gains, 14, axis=1).mean(axis=-1)  # 인덱스 i=14.. 에 대응
+            lsum = sliding_window_view(losses, 14, axis=1).mean(axis=-1)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                r = np.where(lsum == 0, 100.0, 100 - 100 / (1 + g / lsum))
+            rsi_hist = np.concatenate([np.full((n_rows, 14), 50.0), r], axis=1)
+        else:
+            rsi_hist = np.full((n_rows, n), 50.0)
+        rsi_now = rsi_hist[:, -1]
+
+        # 볼린저 (20)
+        bb_win = c[:, -min(20, n):]
+        mid = bb_win.mean(axis=1)
+        sd = bb_win.std(axis=1)
+        upper, lower = mid + 2 * sd, mid - 2 * sd
+        width = upper - lower
+        with np.errstate(divide="ignore", invalid="ignore"):
+            bb_pos = np.where(width > 0, (price - lower) / width, 0.5)
+
+        # --- Trend
+        ratio_min = th["trend"]["ema_ratio_min"]
+        slope_f = (ef - ef_prev) / np.maximum(ef_prev, 1e-9)
+        slope_s = (es - es_prev) / np.maximum(es_prev, 1e-9)
+        trend = (0.30 * (ef > es * (1 + ratio_min)) + 0.20 * (price > ef)
+                 + 0.25 * (slope_f > ratio_min) + 0.15 * (slope_s > ratio_min * 0.5)
+                 + np.where(adx >= 10, 0.10 * np.minimum((adx - 10) / 40.0, 1.0), 0.0))
+        if n >= 10:
+            mom = (price - c[:, -10]) / np.maximum(c[:, -10], 1e-9)
+            trend = trend + 0.10 * (mom > th["trend"]["price_momentum_min"])
+        trend = np.minimum(trend, 1.0)
+
+        # --- Vol-Spike (2분 = 4봉 블록)
+        bar_rng = (h - lo) / np.maximum(lo, 1e-9)
+        recent_vol = bar_rng[:, -4:].mean(axis=1)
+        last_abs_ret = np.abs((c[:, -1] - c[:, -2]) / np.maximum(c[:, -2], 1e-9))
+        blocks = sliding_window_view(bar_rng[:, :-1], 4, axis=1).mean(axis=-1)
+        hist_thr = np.percentile(blocks, th["vol_spike"].get("volatility_percentile", 90), axis=1)
+        recent_volm = v[:, -4:].sum(axis=1)
+        avg_volm = sliding_window_view(v[:, :-1], 4, axis=1).sum(axis=-1).mean(axis=1)
+        volume_ratio = recent_volm / np.maximum(avg_volm, 1e-9)
+        vol_spike = np.minimum(0.6 * (recent_vol > hist_thr)
+                               + 0.4 * (volume_ratio > th["vol_spike"]["volume_ratio_min"]), 1.0)
+        vol_spike = np.where(last_abs_ret >= float(os.getenv("MIN_BAR_RET_ABS", "0.006")), 1.0, vol_spike)
+
+        # --- Mean-Revert
+        mr_thr = th["mean_revert"]["rsi_extreme_min"]
+        bb_min = th["mean_revert"]["bb_position_min"]
+        tail = rsi_hist[:, -20:]
+        recent_extreme = ((tail <= mr_thr) | (tail >= 100 - mr_thr)).any(axis=1) & (n >= 20)
+        back_to_mid = (rsi_now >= 30) & (rsi_now <= 70)
+        bb_extreme = (bb_pos >= bb_min) | (bb_pos <= 1 - bb_min)
+        mr = 0.5 + 0.2 * bb_extreme - 0.2 * ((adx >= 20) | (ef > es * (1 + 0.001)))
+        mean_revert = np.where(recent_extreme & back_to_mid, np.clip(mr, 0.0, 1.0), 0.0)
+
+        out = []
+        for i in range(n_rows):
+            t, vs, m = float(trend[i]), float(vol_spike[i]), float(mean_revert[i])
+            scores = {RegimeType.TREND: t, RegimeType.VOL_SPIKE: vs, RegimeType.MEAN_REVERT: m}
+            best = max(scores, key=scores.get)
+            conf = scores[best]
+            # 타이브레이커: RegimeDetector.detect_regime과 동일
+            if vs >= t - 0.05:
+                best, conf = RegimeType.VOL_SPIKE, vs
+            if (m >= max(t, vs) - 0.05) and (30 <= rsi_now[i] <= 70):
+                best, conf = RegimeType.MEAN_REVERT, m
+            feats = {
+                "trend_score": t, "vol_spike_score": vs, "mean_revert_score": m,
+                "adx": float(adx[i]), "rsi": float(rsi_now[i]),
+                "ema_20": float(ef[i]), "ema_50": float(es[i]), "bb_position": float(bb_pos[i]),
+            }
+            out.append((best, conf, feats))
+        return out
+
+
+def _group_by_length(bars_by_ticker: Dict[str, List]):
+    groups: Dict[int, Tuple[List[str], List[List]]] = {}
+    for t, bars in bars_by_ticker.items():
+        bars = bars or []
+        tickers, rows = groups.setdefault(len(bars), ([], []))
+        tickers.append(t)
+        rows.append(bars)
+    return [(n, tickers, rows) for n, (tickers, rows) in groups.items()]
+
+
+def _arrays(cache: Optional[Dict[int, Tuple]], n: int, rows: List[List]):
+    """봉 길이 그룹별 배열 지연 생성 (캐시가 있으면 tech/레짐이 공유)"""
+    def get():
+        if cache is None:
+            return _ohlcv(rows)
+        if n not in cache:
+            cache[n] = _ohlcv(rows)
+        return cache[n]
+    return get
+
+
+_batch_scorer: Optional[BatchScorer] = None
+
+
+def get_batch_scorer(tech_engine: Optional[TechScoreEngine] = None,
+                     regime_detector: Optional[RegimeDetector] = None) -> BatchScorer:
+    """글로벌 일괄 스코어러 (최초 호출 시 넘긴 엔진 설정 사용)"""
+    global _batch_scorer
+    if _batch_scorer is None:
+        _batch_scorer = BatchScorer(tech_engine, regime_detector)
+    return _batch_scorer
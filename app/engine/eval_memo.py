@@ -0,0 +1,110 @@
+"""
+변경 인지 평가 메모 (새 봉이 없는 종목은 재평가 생략)
+- generate_signals는 30초마다 돌지만 지연 시세(야후)·Tier B 종목은 그 사이 새 봉이 없는 경우가 많음
+- 종목별로 (마지막 봉 서명, 설정 버전, 세션, 최신 EDGAR/뉴스 ID) 키와 직전 평가 결과(레짐/기술점수/믹스 신호)를 보관
+- 키가 같으면 같은 입력 → 같은 결과(이미 발행/억제 처리됨)이므로 토큰 소비·봉 조회·스코어링·믹싱 전체를 건너뜀
+- 결과가 확정된 평가만 저장 (쿨다운/일일상한/리스크 차단처럼 시간이 지나면 풀리는 억제는 호출 측에서 제외)
+- 봉 서명은 ts + OHLCV (진행 중 봉 갱신도 변경으로 인지), 최대 보관 시간 초과 시 강제 재평가
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+EVAL_MEMO_ENABLED = os.getenv("EVAL_MEMO_ENABLED", "1") in ("1", "true", "True")
+EVAL_MEMO_MAX_AGE_SEC = float(os.getenv("EVAL_MEMO_MAX_AGE_SEC", "300"))
+
+MemoKey = Tuple[Any, ...]
+
+
+def bar_signature(bar) -> Optional[Tuple]:
+    """마지막 봉 서명 (ts + OHLCV)"""
+    if bar is None:
+        return None
+    return (getattr(bar, "ts", None), bar.o, bar.h, bar.l, bar.c, bar.v)
+
+
+def memo_key(bar, config_version: str, session: str, news_id: Optional[str] = None) -> Optional[MemoKey]:
+    """news_id: 종목의 최신 EDGAR 공시/LLM 인사이트 스트림 ID (새 이벤트 → 키 변경 → 재평가)"""
+    sig = bar_signature(bar)
+    return None if sig is None else (sig, config_version, session, news_id)
+
+
+@dataclass
+class EvalMemoEntry:
+    key: MemoKey
+    regime_result: Any = None
+    tech_score: Any = None
+    signal: Any = None           # 믹싱 결과 (None = 신호 없음)
+    stored_at: float = 0.0
+
+
+class EvalMemo:
+    """종목별 직전 평가 결과 캐시 (프로세스 로컬)"""
+
+    def __init__(self, enabled: bool = EVAL_MEMO_ENABLED, max_age_sec: float = EVAL_MEMO_MAX_AGE_SEC,
+                 clock=time.time):
+        self.enabled = enabled
+        self.max_age_sec = max_age_sec
+        self._clock = clock
+        self._entries: Dict[str, EvalMemoEntry] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, ticker: str, key: Optional[MemoKey]) -> Optional[EvalMemoEntry]:
+        """키가 같고 만료 전이면 직전 결과 (히트), 아니면 None (미스)"""
+        if not self.enabled or key is None:
+            return None
+        with self._lock:
+            entry = self._entries.get(ticker)
+            fresh = (entry is not None and entry.key == key
+                     and (self.max_age_sec <= 0 or self._clock() - entry.stored_at < self.max_age_sec))
+            if fresh:
+                self.hits += 1
+                return entry
+            self.misses += 1
+            return None
+
+    def store(self, ticker: str, key: Optional[MemoKey], regime_result=None, tech_score=None, signal=None) -> None:
+        if not self.enabled or key is None:
+            return
+        with self._lock:
+            self._entries[ticker] = EvalMemoEntry(key, regime_result, tech_score, signal, self._clock())
+
+    def get(self, ticker: str) -> Optional[EvalMemoEntry]:
+        """직전 평가 결과 (키 검사 없음)"""
+        return self._entries.get(ticker)
+
+    def invalidate(self, ticker: Optional[str] = None) -> None:
+        with self._lock:
+            if ticker is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(ticker, None)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> Dict[str, float]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses,
+                "hit_rate": round(self.hit_rate, 4)}
+
+
+_eval_memo: Optional[EvalMemo] = None
+
+
+def get_eval_memo() -> EvalMemo:
+    """글로벌 평가 메모 인스턴스 반환"""
+    global _eval_memo
+    if _eval_memo is None:
+        _eval_memo = EvalMemo()
+    return _eval_memo
@@ -14,6 +14,7 @@ import logging
 import hashlib
 import json
 import os
+import threading
 from typing import Dict, Optional
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone, time as dtime
@@ -80,9 +81,14 @@ class LLMInsightEngine:
         self.monthly_cost_krw = 0.0
         self.current_month = datetime.now().month
         
-        # 속도 제한
-        self.rate_limit_calls_per_minute = 1
+        # 속도 제한 (토큰 버킷: 분당 N콜 평균, 사이클 디스패치용 버스트 허용)
+        self.rate_limit_calls_per_minute = float(os.getenv("LLM_RATE_PER_MIN", "10"))
+        self.rate_burst = max(1, int(os.getenv("LLM_RATE_BURST", "3")))
+        self._rate_tokens = float(self.rate_burst)
+        self._rate_at = time.time()
+        self._rate_lock = threading.Lock()
         self.last_call_time = 0
+        self.est_cost_per_call_krw = float(os.getenv("LLM_EST_COST_KRW", "5"))
         
         # LLM 활성화 상태
         self.llm_enabled = True
@@ -209,17 +215,7 @@ class LLMInsightEngine:
                 
                 # 비용 업데이트
                 self._update_cost(result.cost_krw)
-
-                # 메트릭 기록 (Redis HINCRBY/HINCRBYFLOAT)
-                try:
-                    if self.redis:
-                        key = f"metrics:llm:{datetime.utcnow():%Y%m%d}"
-                        trigger = "edgar" if edgar_event else (regime or "unknown")
-                        self.redis.hincrby(key, "total", 1)
-                        self.redis.hincrbyfloat(key, "cost_krw", float(result.cost_krw or 0.0))
-                        self.redis.hincrby(key, f"by_trigger:{trigger}", 1)
-                except Exception:
-                    pass
+                self._record_metrics("edgar" if edgar_event else (regime or "unknown"), result.cost_krw)
                 
                 logger.info(f"LLM 분석 완료: {source} (비용: {result.cost_krw:.0f}원)")
                 return result
@@ -229,6 +225,50 @@ class LLMInsightEngine:
         
         return None
     
+    def complete(self, prompt: str, system: str, max_tokens: int = 150, temperature: float = 0.2,
+                 model: str = "gpt-3.5-turbo", timeout: float = None, trigger: str = "completion") -> Optional[str]:
+        """자유 형식 프롬프트 1회 (analyze_text와 같은 활성 상태/속도 제한/월 비용 한도 적용)
+
+        Returns:
+            str: 응답 본문 (None if 비활성, 한도 초과 또는 실패)
+        """
+        if not self.client or not self.llm_enabled:
+            return None
+        if not self._check_limits():
+            logger.warning(f"속도 제한 또는 비용 한도 초과 ({trigger})")
+            return None
+        try:
+            response = self.client.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": system},
+                    {"role": "user", "content": prompt}
+                ],
+                max_tokens=max_tokens,
+                temperature=temperature,
+                timeout=timeout
+            )
+            content = response.choices[0].message.content or ""
+        except Exception as e:
+            logger.error(f"LLM API 호출 실패 ({trigger}): {e}")
+            return None
+        # 비용 계산 (_call_llm과 같은 추정식)
+        cost_krw = ((len(prompt.split()) * 1.3) * 0.0000015 + len(content.split()) * 0.000002) * self.usd_to_krw
+        self._update_cost(cost_krw)
+        self._record_metrics(trigger, cost_krw)
+        return content
+
+    def _record_metrics(self, trigger: str, cost_krw: float) -> None:
+        """메트릭 기록 (Redis HINCRBY/HINCRBYFLOAT)"""
+        try:
+            if self.redis:
+                key = f"metrics:llm:{datetime.utcnow():%Y%m%d}"
+                self.redis.hincrby(key, "total", 1)
+                self.redis.hincrbyfloat(key, "cost_krw", float(cost_krw or 0.0))
+                self.redis.hincrby(key, f"by_trigger:{trigger}", 1)
+        except Exception:
+            pass
+
     def _call_llm(self, text: str) -> Optional[LLMInsight]:
         """LLM API 호출"""
         if not self.client:
@@ -360,23 +400,40 @@ class LLMInsightEngine:
         }
     
     def _check_limits(self) -> bool:
-        """제한 확인"""
-        current_time = time.time()
-        
+        """제한 확인 (월 비용 + 토큰 버킷 속도 제한)"""
         # 월 비용 확인
         if self.monthly_cost_krw >= self.monthly_cap_krw:
             if self.llm_enabled:
                 self._disable_llm()
             return False
         
-        # 속도 제한 확인 (분당 10콜로 완화)
-        if current_time - self.last_call_time < 6:
-            logger.warning("속도 제한: 분당 10콜 초과")
-            return False
-        
-        self.last_call_time = current_time
+        with self._rate_lock:
+            self._refill_rate_tokens()
+            if self._rate_tokens < 1.0:
+                logger.warning(f"속도 제한: 분당 {self.rate_limit_calls_per_minute:.0f}콜 초과")
+                return False
+            self._rate_tokens -= 1.0
+            self.last_call_time = time.time()
         return True
     
+    def _refill_rate_tokens(self) -> None:
+        now = time.time()
+        self._rate_tokens = min(float(self.rate_burst),
+                                self._rate_tokens + (now - self._rate_at) * self.rate_limit_calls_per_minute / 60.0)
+        self._rate_at = now
+    
+    def available_calls(self) -> int:
+        """지금 즉시 호출 가능한 수 (속도 토큰 ∧ 월 비용 여유)"""
+        if not self.llm_enabled or not self.client:
+            return 0
+        with self._rate_lock:
+            self._refill_rate_tokens()
+            tokens = int(self._rate_tokens)
+        headroom = self.monthly_cap_krw - self.monthly_cost_krw
+        if headroom <= 0:
+            return 0
+        return min(tokens, int(headroom // max(self.est_cost_per_call_krw, 1e-9)))
+    
     def _update_cost(self, cost_krw: float):
         """비용 업데이트"""
         # 월 변경 확인
@@ -430,6 +487,9 @@ class LLMInsightEngine:
     def reset_limits(self):
         """제한 리셋 (테스트용)"""
         self.last_call_time = 0
+        with self._rate_lock:
+            self._rate_tokens = float(self.rate_burst)
+            self._rate_at = time.time()
         logger.info("제한 리셋됨")
     
     def analyze_edgar_filing(self, filing: Dict) -> Optional[LLMInsight]:
@@ -0,0 +1,180 @@
+"""
+LLM 작업 스케줄러 (사이클 단위 가치 순위 디스패치)
+- generate_signals 한 사이클의 게이팅 후보(EDGAR/vol_spike)를 모아 기대 의사결정 영향도로 순위화
+  · 점수가 컷오프에 가까울수록(LLM 감성으로 결정이 뒤집힐 여지) ↑, 레짐 가중, EDGAR 보너스, 이월 대기 보너스
+- 속도 토큰/일일 한도/월 비용 여유 안에서 상위 K개만 동시 실행 (사이클 마감 시간 내)
+- 나머지: 최소 가치 이상은 다음 사이클로 이월(Redis ZSET llm:deferred), 미만은 드롭
+"""
+from __future__ import annotations
+
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFERRED_KEY = "llm:deferred"
+
+LLM_CYCLE_TOP_K = int(os.getenv("LLM_CYCLE_TOP_K", "3"))
+LLM_CYCLE_DEADLINE_SEC = float(os.getenv("LLM_CYCLE_DEADLINE_SEC", "8"))
+LLM_MIN_VALUE = float(os.getenv("LLM_MIN_VALUE", "0.2"))
+LLM_VALUE_BAND = float(os.getenv("LLM_VALUE_BAND", "0.25"))      # 컷오프 ±band 안에서 근접도 가중
+LLM_DEFER_BONUS = float(os.getenv("LLM_DEFER_BONUS", "0.1"))     # 이월 1회당 가산 (기아 방지)
+LLM_DEFER_TTL_SEC = int(os.getenv("LLM_DEFER_TTL_SEC", "900"))
+
+EVENT_WEIGHT = {"edgar": 1.0, "vol_spike": 0.6}
+REGIME_WEIGHT = {"vol_spike": 1.0, "trend": 0.7, "mean_revert": 0.5, "sideways": 0.3}
+
+
+@dataclass
+class LLMWorkItem:
+    """게이팅 후보 1건"""
+    ticker: str
+    event_type: str                 # edgar | vol_spike
+    score: float                    # 기술 점수 (-1~1, 최종 점수 대용)
+    regime: str
+    edgar_filing: Optional[Dict] = None
+    value: float = 0.0
+    deferrals: int = 0
+
+    @property
+    def key(self) -> str:
+        return f"{self.ticker}:{self.event_type}"
+
+
+@dataclass
+class DispatchPlan:
+    run: List[LLMWorkItem] = field(default_factory=list)
+    deferred: List[LLMWorkItem] = field(default_factory=list)
+    dropped: List[LLMWorkItem] = field(default_factory=list)
+
+
+def estimate_value(item: LLMWorkItem, cutoff: float, band: float = LLM_VALUE_BAND) -> float:
+    """기대 의사결정 영향도 (0~약 1.5)"""
+    proximity = max(0.0, 1.0 - abs(abs(item.score) - cutoff) / max(band, 1e-9))
+    base = EVENT_WEIGHT.get(item.event_type, 0.3)
+    regime_w = REGIME_WEIGHT.get(item.regime, 0.5)
+    value = base * (0.4 + 0.6 * proximity) * (0.5 + 0.5 * regime_w)
+    if item.edgar_filing:
+        value += 0.2
+    return round(value + LLM_DEFER_BONUS * item.deferrals, 4)
+
+
+class LLMWorkScheduler:
+    """가치 순위 + 예산 제한 LLM 디스패처"""
+
+    def __init__(self, top_k: int = LLM_CYCLE_TOP_K, deadline_sec: float = LLM_CYCLE_DEADLINE_SEC,
+                 min_value: float = LLM_MIN_VALUE, redis_client=None, max_workers: int = 4):
+        self.top_k = top_k
+        self.deadline_sec = deadline_sec
+        self.min_value = min_value
+        self.redis = redis_client
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm-dispatch")
+
+    def _load_deferrals(self, items: List[LLMWorkItem]) -> None:
+        if self.redis is None or not items:
+            return
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.zremrangebyscore(DEFERRED_KEY, "-inf", time.time() - LLM_DEFER_TTL_SEC)
+            pipe.hmget(f"{DEFERRED_KEY}:count", [it.key for it in items])
+            _, counts = pipe.execute()
+            for it, c in zip(items, counts):
+                it.deferrals = int(c or 0)
+        except Exception as e:
+            logger.debug(f"LLM 이월 상태 조회 실패: {e}")
+
+    def _save_deferrals(self, plan: DispatchPlan) -> None:
+        if self.redis is None:
+            return
+        try:
+            now = time.time()
+            pipe = self.redis.pipeline(transaction=False)
+            for it in plan.deferred:
+                pipe.zadd(DEFERRED_KEY, {it.key: now})
+                pipe.hincrby(f"{DEFERRED_KEY}:count", it.key, 1)
+            done = [it.key for it in plan.run + plan.dropped]
+            if done:
+                pipe.zrem(DEFERRED_KEY, *done)
+                pipe.hdel(f"{DEFERRED_KEY}:count", *done)
+            pipe.expire(f"{DEFERRED_KEY}:count", LLM_DEFER_TTL_SEC)
+            pipe.execute()
+        except Exception as e:
+            logger.debug(f"LLM 이월 상태 저장 실패: {e}")
+
+    def plan(self, items: List[LLMWorkItem], cutoff: float, budget: int) -> DispatchPlan:
+        """가치 순 정렬 → 예산 내 상위 K 실행 / 최소 가치 이상 이월 / 나머지 드롭"""
+        # 같은 종목 후보는 가치가 가장 높은 이벤트 하나만 (종목당 인사이트 1개 사용)
+        self._load_deferrals(items)
+        best: Dict[str, LLMWorkItem] = {}
+        for it in items:
+            it.value = estimate_value(it, cutoff)
+            cur = best.get(it.ticker)
+            if cur is None or it.value > cur.value:
+                best[it.ticker] = it
+        ranked = sorted(best.values(), key=lambda it: (-it.value, it.ticker))
+        k = max(0, min(self.top_k, budget))
+        plan = DispatchPlan()
+        for it in ranked:
+            if it.value < self.min_value:
+                plan.dropped.append(it)
+            elif len(plan.run) < k:
+                plan.run.append(it)
+            else:
+                plan.deferred.append(it)
+        self._save_deferrals(plan)
+        return plan
+
+    def dispatch(self, plan: DispatchPlan, run: Callable[[LLMWorkItem], object],
+                 deadline_sec: Optional[float] = None) -> Dict[str, object]:
+        """실행 대상 동시 호출 → {ticker: 결과} (마감 초과분은 결과 없음, deadline_sec로 사이클별 상한 지정)"""
+        if not plan.run:
+            return {}
+        futures = {self._pool.submit(run, it): it for it in plan.run}
+        timeout = self.deadline_sec if deadline_sec is None else max(0.0, deadline_sec)
+        done, not_done = wait(futures, timeout=timeout)
+        out: Dict[str, object] = {}
+        for fut in done:
+            it = futures[fut]
+            try:
+                res = fut.result()
+                if res is not None:
+                    out[it.ticker] = res
+            except Exception as e:
+                logger.warning(f"LLM 작업 실패 {it.key}: {e}")
+        if not_done:
+            logger.warning(f"LLM 사이클 마감 초과: {[futures[f].key for f in not_done]}")
+        return out
+
+    def run_cycle(self, items: List[LLMWorkItem], cutoff: float, budget: int,
+                  run: Callable[[LLMWorkItem], object],
+                  deadline_sec: Optional[float] = None) -> Tuple[Dict[str, object], DispatchPlan]:
+        plan = self.plan(items, cutoff, budget)
+        if plan.run or plan.deferred or plan.dropped:
+            logger.info(
+                f"🤖 LLM 스케줄: 실행 {[f'{i.key}({i.value:.2f})' for i in plan.run]} "
+                f"이월 {len(plan.deferred)} 드롭 {len(plan.dropped)} (예산 {budget})"
+            )
+        return self.dispatch(plan, run, deadline_sec), plan
+
+
+_llm_scheduler: Optional[LLMWorkScheduler] = None
+
+
+def get_llm_scheduler() -> LLMWorkScheduler:
+    """글로벌 LLM 작업 스케줄러 인스턴스 반환"""
+    global _llm_scheduler
+    if _llm_scheduler is None:
+        redis_client = None
+        try:
+            redis_url = os.getenv("REDIS_URL")
+            if redis_url:
+                import redis
+                redis_client = redis.from_url(redis_url)
+        except Exception:
+            redis_client = None
+        _llm_scheduler = LLMWorkScheduler(redis_client=redis_client)
+    return _llm_scheduler
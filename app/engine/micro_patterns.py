@@ -0,0 +1,155 @@
+"""
+스트리밍 마이크로 패턴 감지기 (틱 스파이크 / 3분봉 3연속 양봉)
+- 봉이 도착할 때마다 종목별 고정 크기 상태만 갱신 (캔들 리스트 재스캔 없음)
+- 같은 ts 봉이 다시 오면(진행 중 봉 갱신) 마지막 슬롯을 교체 후 재평가, 이벤트는 (패턴, 봉 ts)당 1회
+- 감지 결과는 MicroPatternEvent로 반환 → scheduler가 스캘프 게이팅 경로(컷/리스크/발행)로 처리
+"""
+from __future__ import annotations
+
+import logging
+import os
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+TICK_SPIKE = "tick_spike"
+THREE_MIN_THREE_UP = "3min_3up"
+
+
+def _env_on(name: str) -> bool:
+    return os.getenv(name, "false").lower() in ("1", "true", "yes", "on")
+
+
+@dataclass
+class MicroPatternEvent:
+    """감지 이벤트 1건"""
+    ticker: str
+    pattern: str                    # tick_spike | 3min_3up
+    direction: float                # +1 롱 / -1 숏
+    price: float
+    bar_ts: object
+    reason: str = ""
+    features: Dict[str, float] = field(default_factory=dict)
+
+
+@dataclass
+class _TickerState:
+    bars: Deque[Tuple[object, float, float, float, float]]   # (ts, o, h, l, c)
+    emitted: Dict[str, object] = field(default_factory=dict)  # 패턴 → 마지막 발행 봉 ts
+
+
+class MicroPatternDetector:
+    """종목별 O(1) 상태 스트리밍 감지기"""
+
+    def __init__(self, bar_sec: Optional[int] = None, spike_ret: Optional[float] = None,
+                 spike_range: Optional[float] = None, tick_spike: Optional[bool] = None,
+                 three_up: Optional[bool] = None):
+        # 봉 집계기의 실제 1분봉 기준 (3분 창 = 3봉)
+        self.bar_sec = max(1, int(bar_sec or int(os.getenv("MICRO_PATTERN_BAR_SEC", "60") or 60)))
+        self.spike_ret = spike_ret if spike_ret is not None else float(os.getenv("SCALP_MIN_RET", "0.003"))
+        self.spike_range = spike_range if spike_range is not None else float(os.getenv("SCALP_MIN_RANGE", "0.003"))
+        self.tick_spike = _env_on("SCALP_TICK_SPIKE") if tick_spike is None else tick_spike
+        self.three_up = _env_on("SCALP_3MIN3UP") if three_up is None else three_up
+        # 30s/15s 분할 시 마지막 두 바가 같은 1분에 속함 → 분당 간격으로 비교
+        self.bars_per_min = max(1, 60 // self.bar_sec)
+        self.window = max(1, int(180 / self.bar_sec))  # 3분 창의 바 개수
+        self._maxlen = max(self.bars_per_min + 1, self.window * 3)
+        self._state: Dict[str, _TickerState] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.tick_spike or self.three_up
+
+    def last_ts(self, ticker: str):
+        st = self._state.get(ticker)
+        return st.bars[-1][0] if st and st.bars else None
+
+    def _append(self, ticker: str, ts, o: float, h: float, l: float, c: float) -> Optional[_TickerState]:
+        st = self._state.get(ticker)
+        if st is None:
+            st = self._state[ticker] = _TickerState(bars=deque(maxlen=self._maxlen))
+        bars = st.bars
+        if bars and ts is not None and bars[-1][0] is not None:
+            if ts < bars[-1][0]:
+                return None  # 지연 도착한 과거 봉 무시
+            if ts == bars[-1][0]:
+                bars.pop()  # 진행 중 봉 갱신
+        bars.append((ts, float(o), float(h), float(l), float(c)))
+        return st
+
+    def on_bar(self, ticker: str, ts, o: float, h: float, l: float, c: float) -> List[MicroPatternEvent]:
+        """봉 1개 반영 → 새로 감지된 이벤트 목록"""
+        st = self._append(ticker, ts, o, h, l, c)
+        if st is None:
+            return []
+        events: List[MicroPatternEvent] = []
+        for ev in (self._check_tick_spike(ticker, st.bars) if self.tick_spike else None,
+                   self._check_three_up(ticker, st.bars) if self.three_up else None):
+            if ev is not None and st.emitted.get(ev.pattern) != ts:
+                st.emitted[ev.pattern] = ts
+                events.append(ev)
+        return events
+
+    def on_candles(self, ticker: str, candles: List) -> List[MicroPatternEvent]:
+        """캔들 목록 중 마지막으로 본 봉 이후(동일 ts 포함)만 반영. 첫 호출은 과거 봉으로 상태만 채움"""
+        if not candles:
+            return []
+        last = self.last_ts(ticker)
+        if last is None:
+            for c in candles[-self._maxlen:-1]:
+                self._append(ticker, getattr(c, "ts", None), c.o, c.h, c.l, c.c)
+            candles = candles[-1:]
+        events: List[MicroPatternEvent] = []
+        for c in candles:
+            ts = getattr(c, "ts", None)
+            if last is not None and ts is not None and ts < last:
+                continue
+            events.extend(self.on_bar(ticker, ts, c.o, c.h, c.l, c.c))
+        return events
+
+    def _check_tick_spike(self, ticker: str, bars) -> Optional[MicroPatternEvent]:
+        if len(bars) < 2:
+            return None
+        _, _, h, l, c = bars[-1]
+        prev_c = bars[-1 - self.bars_per_min][4] if len(bars) > self.bars_per_min else bars[-2][4]
+        abs_ret = abs((c - prev_c) / max(prev_c, 1e-9))
+        # 야후 1분봉 분할 시 마지막 두 바가 동일 값인 경우가 많아 고저폭 기준도 허용
+        rng = (h - l) / max(c, 1e-9)
+        if abs_ret >= self.spike_ret:
+            reason = f"ret>={self.spike_ret:.3%}"
+        elif rng >= self.spike_range:
+            reason = f"range>={self.spike_range:.3%}"
+        else:
+            return None
+        return MicroPatternEvent(
+            ticker=ticker, pattern=TICK_SPIKE, direction=1.0 if c >= prev_c else -1.0, price=c,
+            bar_ts=bars[-1][0], reason=reason, features={"last_abs_ret": abs_ret, "last_range": rng},
+        )
+
+    def _check_three_up(self, ticker: str, bars) -> Optional[MicroPatternEvent]:
+        w = self.window
+        if len(bars) < 3 * w:
+            return None
+        # 마지막 봉으로 끝나는 3분 창 3개: 창 종가 > 창 시가
+        for k in range(3):
+            end = -1 - k * w
+            start = -(k + 1) * w
+            if not bars[end][4] > bars[start][1]:
+                return None
+        return MicroPatternEvent(
+            ticker=ticker, pattern=THREE_MIN_THREE_UP, direction=1.0, price=bars[-1][4],
+            bar_ts=bars[-1][0], reason="3min green x3", features={"3min3up": True},
+        )
+
+
+_detector: Optional[MicroPatternDetector] = None
+
+
+def get_micro_pattern_detector() -> MicroPatternDetector:
+    """글로벌 마이크로 패턴 감지기 인스턴스 반환"""
+    global _detector
+    if _detector is None:
+        _detector = MicroPatternDetector()
+    return _detector
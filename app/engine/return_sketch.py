@@ -0,0 +1,332 @@
+"""
+수익률 분위수 스케치 (종목 × 레짐)
+- DDSketch 방식의 로그 버킷 히스토그램: 상대오차 alpha 이내 분위수, 버킷 카운트 합산으로 병합 가능
+- Redis 해시 risk:sketch:{ticker}:{regime} 에 관측당 파이프라인 1회(버킷/카운트/모멘트) → O(1) 갱신
+- 누적합/제곱합(HINCRBYFLOAT)으로 평균·표준편차 러닝 모멘트 동시 유지
+- VaR95/CVaR95 요약은 risk:var95:{ticker}:{regime} 문자열 키로 주기적 물질화 → 사이징은 GET 한 번
+- 봉 수익률은 닫힌 봉만, (종목, 봉 시각)당 1회: risk:sketch:seen:{ticker}:{bar_ts} SET NX로 프로세스 간 중복 제거
+"""
+from __future__ import annotations
+
+import json
+import logging
+import math
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Optional, Tuple
+
+import redis
+
+logger = logging.getLogger(__name__)
+
+SKETCH_KEY_PREFIX = "risk:sketch"
+SEEN_KEY_PREFIX = "risk:sketch:seen"
+VAR_KEY_PREFIX = "risk:var95"
+ALL_REGIMES = "all"
+
+SKETCH_ALPHA = float(os.getenv("RISK_SKETCH_ALPHA", "0.02"))       # 상대오차 2%
+SKETCH_MIN_ABS = float(os.getenv("RISK_SKETCH_MIN_ABS", "1e-5"))    # 이하 |r|은 0 버킷
+SKETCH_TTL_SEC = int(os.getenv("RISK_SKETCH_TTL_SEC", str(30 * 86400)))
+VAR_MIN_SAMPLES = int(os.getenv("RISK_VAR_MIN_SAMPLES", "30"))      # 미만이면 VaR 미공개
+VAR_REFRESH_EVERY = int(os.getenv("RISK_VAR_REFRESH_EVERY", "20"))  # N 관측마다 요약 재계산
+SEEN_TTL_SEC = int(os.getenv("RISK_SKETCH_SEEN_TTL_SEC", "3600"))   # 봉 중복 제거 마커 수명
+
+_COUNT_FIELD = "count"
+_ZERO_FIELD = "z"
+_SUM_FIELD = "sum"
+_SUMSQ_FIELD = "sumsq"
+
+
+def sketch_key(ticker: str, regime: str) -> str:
+    return f"{SKETCH_KEY_PREFIX}:{ticker.upper()}:{regime or ALL_REGIMES}"
+
+
+def var_key(ticker: str, regime: str) -> str:
+    return f"{VAR_KEY_PREFIX}:{ticker.upper()}:{regime or ALL_REGIMES}"
+
+
+def seen_key(ticker: str, bar_epoch: int) -> str:
+    return f"{SEEN_KEY_PREFIX}:{ticker.upper()}:{bar_epoch}"
+
+
+def _epoch(ts) -> Optional[float]:
+    """봉 시각 → epoch 초 (naive datetime은 UTC로 간주)"""
+    if ts is None:
+        return None
+    if isinstance(ts, datetime):
+        return (ts.replace(tzinfo=timezone.utc) if ts.tzinfo is None else ts).timestamp()
+    return float(ts)
+
+
+class ReturnSketch:
+    """로그 버킷 분위수 스케치 (병합 가능, 메모리 O(버킷 수))"""
+
+    def __init__(self, alpha: float = SKETCH_ALPHA, min_abs: float = SKETCH_MIN_ABS):
+        self.alpha = alpha
+        self.min_abs = min_abs
+        self.gamma = (1 + alpha) / (1 - alpha)
+        self._log_gamma = math.log(self.gamma)
+        self.pos: Dict[int, int] = {}
+        self.neg: Dict[int, int] = {}
+        self.zero = 0
+        self.count = 0
+        self.sum = 0.0
+        self.sumsq = 0.0
+
+    # ------------------------------------------------------------------
+    # 버킷 매핑
+    # ------------------------------------------------------------------
+    def bucket_field(self, x: float) -> str:
+        """관측값 → 해시 필드명 (p{i} / n{i} / z)"""
+        ax = abs(x)
+        if ax <= self.min_abs:
+            return _ZERO_FIELD
+        idx = int(math.ceil(math.log(ax) / self._log_gamma))
+        return f"{'p' if x > 0 else 'n'}{idx}"
+
+    def _bucket_value(self, idx: int) -> float:
+        # 버킷 (gamma^(i-1), gamma^i] 대표값 → 상대오차 alpha 이내
+        return 2 * self.gamma ** idx / (self.gamma + 1)
+
+    # ------------------------------------------------------------------
+    # 갱신 / 병합
+    # ------------------------------------------------------------------
+    def add(self, x: float, n: int = 1) -> None:
+        self._add_field(self.bucket_field(x), n)
+        self.sum += x * n
+        self.sumsq += x * x * n
+
+    def _add_field(self, field: str, n: int) -> None:
+        if field == _ZERO_FIELD:
+            self.zero += n
+        elif field[0] == "p":
+            i = int(field[1:])
+            self.pos[i] = self.pos.get(i, 0) + n
+        elif field[0] == "n":
+            i = int(field[1:])
+            self.neg[i] = self.neg.get(i, 0) + n
+        else:
+            return
+        self.count += n
+
+    def merge(self, other: "ReturnSketch") -> "ReturnSketch":
+        for i, c in other.pos.items():
+            self.pos[i] = self.pos.get(i, 0) + c
+        for i, c in other.neg.items():
+            self.neg[i] = self.neg.get(i, 0) + c
+        self.zero += other.zero
+        self.count += other.count
+        self.sum += other.sum
+        self.sumsq += other.sumsq
+        return self
+
+    # ------------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------------
+    def _ascending(self) -> Iterable[Tuple[float, int]]:
+        """(대표값, 카운트) 오름차순: 큰 손실 → 0 → 큰 이익"""
+        for i in sorted(self.neg, reverse=True):
+            yield -self._bucket_value(i), self.neg[i]
+        if self.zero:
+            yield 0.0, self.zero
+        for i in sorted(self.pos):
+            yield self._bucket_value(i), self.pos[i]
+
+    def moments(self) -> Tuple[float, float]:
+        """(평균, 표본 표준편차)"""
+        if self.count <= 0:
+            return 0.0, 0.0
+        mean = self.sum / self.count
+        if self.count < 2:
+            return mean, 0.0
+        var = max(0.0, (self.sumsq - self.count * mean * mean) / (self.count - 1))
+        return mean, math.sqrt(var)
+
+    def summary(self, confidence: float = 0.95) -> Dict:
+        var95, cvar95 = self.var_cvar(confidence)
+        mean, std = self.moments()
+        return {"var95": round(var95, 6), "cvar95": round(cvar95, 6),
+                "mean": round(mean, 8), "std": round(std, 8), "n": self.count}
+
+    def quantile(self, q: float) -> float:
+        if self.count <= 0:
+            return 0.0
+        rank = q * (self.count - 1)
+        seen = 0
+        last = 0.0
+        for v, c in self._ascending():
+            seen += c
+            last = v
+            if seen > rank:
+                return v
+        return last
+
+    def var_cvar(self, confidence: float = 0.95) -> Tuple[float, float]:
+        """(VaR, CVaR) — 손실 임계값(양수). 좌측 꼬리가 이익이면 0"""
+        if self.count <= 0:
+            return 0.0, 0.0
+        q = self.quantile(1 - confidence)
+        var = abs(min(q, 0.0))
+        tail_n = max(1, int(math.ceil((1 - confidence) * self.count)))
+        acc = 0.0
+        taken = 0
+        for v, c in self._ascending():
+            k = min(c, tail_n - taken)
+            acc += v * k
+            taken += k
+            if taken >= tail_n:
+                break
+        cvar = abs(min(acc / taken, 0.0)) if taken else 0.0
+        return var, max(cvar, var)
+
+    # ------------------------------------------------------------------
+    # 직렬화
+    # ------------------------------------------------------------------
+    @classmethod
+    def from_hash(cls, h: Dict, **kwargs) -> "ReturnSketch":
+        sk = cls(**kwargs)
+        for k, v in (h or {}).items():
+            field = k.decode() if isinstance(k, bytes) else str(k)
+            if field == _SUM_FIELD:
+                sk.sum = float(v)
+                continue
+            if field == _SUMSQ_FIELD:
+                sk.sumsq = float(v)
+                continue
+            if field == _COUNT_FIELD:
+                continue
+            try:
+                sk._add_field(field, int(v))
+            except (TypeError, ValueError):
+                continue
+        return sk
+
+
+class ReturnRecorder:
+    """실현 수익률(봉/거래) → Redis 스케치 기록 + VaR 요약 물질화"""
+
+    def __init__(self, redis_url: Optional[str] = None, sketch: Optional[ReturnSketch] = None):
+        self.redis_url = redis_url or os.getenv("REDIS_URL")
+        self._r = None
+        self._mapper = sketch or ReturnSketch()
+        self._lock = threading.Lock()
+        self._last_bar: Dict[str, int] = {}  # 로컬 빠른 경로 (같은 봉 재호출 시 Redis 왕복 생략)
+
+    @property
+    def r(self):
+        if self._r is None and self.redis_url:
+            self._r = redis.from_url(self.redis_url)
+        return self._r
+
+    def record(self, ticker: str, regime: str, ret: float,
+               refresh_every: int = VAR_REFRESH_EVERY, min_samples: int = VAR_MIN_SAMPLES,
+               rollup: bool = True) -> None:
+        """수익률 1건 기록 (레짐별 + 전체 스케치, rollup=False면 해당 키만)"""
+        r = self.r
+        if r is None or ret is None or not math.isfinite(ret):
+            return
+        ret = float(ret)
+        field = self._mapper.bucket_field(ret)
+        keys = [sketch_key(ticker, regime)]
+        if rollup and regime and regime != ALL_REGIMES:
+            keys.append(sketch_key(ticker, ALL_REGIMES))
+        try:
+            pipe = r.pipeline(transaction=False)
+            for k in keys:
+                pipe.hincrby(k, field, 1)
+                pipe.hincrby(k, _COUNT_FIELD, 1)
+                pipe.hincrbyfloat(k, _SUM_FIELD, ret)
+                pipe.hincrbyfloat(k, _SUMSQ_FIELD, ret * ret)
+                pipe.expire(k, SKETCH_TTL_SEC)
+            res = pipe.execute()
+        except Exception as e:
+            logger.warning(f"수익률 스케치 기록 실패 {ticker}: {e}")
+            return
+        for i, k in enumerate(keys):
+            n = int(res[i * 5 + 1] or 0)
+            if n >= min_samples and (n == min_samples or n % max(1, refresh_every) == 0):
+                self.refresh_summary(ticker, k.rsplit(":", 1)[1], min_samples=min_samples)
+
+    def record_bar(self, ticker: str, regime: str, candles, bar_sec: Optional[int] = None,
+                   now: Optional[float] = None) -> bool:
+        """최신 닫힌 봉 수익률 기록 (종목·봉 시각당 1회, 프로세스 간 공유)
+
+        bar_sec를 알면 마지막 봉이 닫혔는지 시각으로 판단하고, 모르면 마지막 봉은 진행 중일 수 있으므로
+        그 직전 봉을 쓴다.
+        """
+        if not candles:
+            return False
+        idx = len(candles) - 1
+        last_ts = _epoch(getattr(candles[-1], "ts", None))
+        if bar_sec is None or last_ts is None or last_ts + bar_sec > (time.time() if now is None else now):
+            idx -= 1  # 진행 중(부분) 봉 제외
+        if idx < 1:
+            return False
+        bar, prev = candles[idx], candles[idx - 1]
+        bar_ts = _epoch(getattr(bar, "ts", None))
+        if bar_ts is None or not prev.c or prev.c <= 0:
+            return False
+        bar_ts = int(bar_ts)
+        with self._lock:
+            if self._last_bar.get(ticker) == bar_ts:
+                return False
+            self._last_bar[ticker] = bar_ts
+        r = self.r
+        if r is None:
+            return False
+        try:
+            # 워커 재활용/다중 프로세스에서도 같은 봉은 한 번만 (공유 스케치)
+            if not r.set(seen_key(ticker, bar_ts), 1, nx=True, ex=SEEN_TTL_SEC):
+                return False
+        except Exception as e:
+            logger.warning(f"수익률 스케치 중복 확인 실패 {ticker}: {e}")
+            return False
+        self.record(ticker, regime, bar.c / prev.c - 1.0)
+        return True
+
+    def load(self, ticker: str, regime: str) -> ReturnSketch:
+        h = self.r.hgetall(sketch_key(ticker, regime)) if self.r is not None else {}
+        return ReturnSketch.from_hash(h, alpha=self._mapper.alpha, min_abs=self._mapper.min_abs)
+
+    def refresh_summary(self, ticker: str, regime: str, min_samples: int = VAR_MIN_SAMPLES) -> Optional[Dict]:
+        """스케치 → VaR95/CVaR95/모멘트 요약 키 갱신"""
+        try:
+            sk = self.load(ticker, regime)
+            if sk.count < min_samples:
+                return None
+            summary = {**sk.summary(0.95), "ts": int(time.time())}
+            self.r.set(var_key(ticker, regime), json.dumps(summary), ex=SKETCH_TTL_SEC)
+            return summary
+        except Exception as e:
+            logger.warning(f"VaR 요약 갱신 실패 {ticker}/{regime}: {e}")
+            return None
+
+
+def get_return_var95(ticker: str, regime: Optional[str] = None, r=None) -> float:
+    """사이징용 VaR95 조회 (레짐 → 전체 폴백, MGET 한 번). 없으면 0.0"""
+    try:
+        r = r or get_return_recorder().r
+        if r is None:
+            return 0.0
+        keys = [var_key(ticker, ALL_REGIMES)]
+        if regime and regime != ALL_REGIMES:
+            keys.insert(0, var_key(ticker, regime))
+        for raw in r.mget(keys):
+            if raw:
+                return float(json.loads(raw).get("var95", 0.0))
+    except Exception as e:
+        logger.debug(f"VaR95 조회 실패 {ticker}: {e}")
+    return 0.0
+
+
+_return_recorder: Optional[ReturnRecorder] = None
+
+
+def get_return_recorder() -> ReturnRecorder:
+    """글로벌 수익률 기록기 인스턴스 반환"""
+    global _return_recorder
+    if _return_recorder is None:
+        _return_recorder = ReturnRecorder()
+    return _return_recorder
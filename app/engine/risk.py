@@ -13,10 +13,17 @@ def rolling_var95(ret_samples: list[float]) -> float:
     q = np.percentile(arr, 5)
     return float(abs(min(q, 0.0)))
 
-def suggest_position_qty(default_qty: int, var95: float, max_risk_r: float = 1.0) -> int:
+def suggest_position_qty(default_qty: int, var95: float | None = None, max_risk_r: float = 1.0,
+                         ticker: str | None = None, regime: str | None = None, r=None) -> int:
     """Propose position qty so that expected loss in R does not exceed max_risk_r.
     Here we scale linearly on VaR proxy; for demo keep within 1..3x default.
+    If var95 is None, it is read from the ticker/regime return sketch summary (single MGET).
     """
+    if var95 is None:
+        if not ticker:
+            return default_qty
+        from app.engine.return_sketch import get_return_var95
+        var95 = get_return_var95(ticker, regime, r=r)
     if var95 <= 0:
         return default_qty
     scale = max(0.5, min(1.5, max_risk_r / var95))
@@ -26,6 +33,8 @@ def suggest_position_qty(default_qty: int, var95: float, max_risk_r: float = 1.0
 """
 리스크 관리 엔진
 PnL, VaR95, 셧다운 로직
+- REDIS_URL이 있으면 공유 리스크 상태(orders.fills 기반) 스냅샷으로 상수 시간 조회
+- 없거나 장애 시 로컬 스트리밍 스케치(정렬 없음)로 폴백
 """
 import logging
 from typing import Dict, List, Optional, Tuple
@@ -33,6 +42,8 @@ from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
 
+from app.engine.return_sketch import ReturnSketch
+
 logger = logging.getLogger(__name__)
 
 class RiskStatus(Enum):
@@ -62,7 +73,8 @@ class RiskEngine:
                  daily_loss_limit: float = 0.03,  # 3%
                  var_confidence: float = 0.95,
                  max_positions: int = 5,
-                 max_exposure: float = 0.1):  # 10%
+                 max_exposure: float = 0.1,  # 10%
+                 shared=None):
         """
         Args:
             initial_capital: 초기 자본
@@ -70,6 +82,7 @@ class RiskEngine:
             var_confidence: VaR 신뢰수준
             max_positions: 최대 포지션 수
             max_exposure: 최대 노출 비율
+            shared: 공유 리스크 상태 (기본: REDIS_URL 있으면 전역 SharedRiskState)
         """
         self.initial_capital = initial_capital
         self.daily_loss_limit = daily_loss_limit
@@ -85,9 +98,18 @@ class RiskEngine:
         # 포지션 추적
         self.positions: Dict[str, Dict] = {}
         
-        # 수익률 히스토리 (VaR 계산용)
-        self.returns_history: List[float] = []
-        self.max_history_size = 1000
+        # 수익률 스케치 (VaR 계산용, 로컬 폴백)
+        self.returns_sketch = ReturnSketch()
+        self.min_var_samples = 10
+
+        # 공유 리스크 상태 (프로세스 간 공통 뷰)
+        if shared is None:
+            try:
+                from app.engine.risk_state import get_shared_risk_state
+                shared = get_shared_risk_state()
+            except Exception as e:
+                logger.warning(f"공유 리스크 상태 준비 실패 (로컬 모드): {e}")
+        self.shared = shared
         
         # 리스크 상태
         self.status = RiskStatus.NORMAL
@@ -108,6 +130,7 @@ class RiskEngine:
             }
         
         pos = self.positions[ticker]
+        realized_pnl = 0.0
         
         if side == "buy":
             # 매수: 평균단가 재계산
@@ -129,24 +152,32 @@ class RiskEngine:
         pos["last_price"] = price
         pos["timestamp"] = timestamp
         
-        # 수익률 히스토리 업데이트
+        # 수익률 스케치 업데이트
         self._update_returns_history(realized_pnl if side == "sell" else 0.0)
     
     def update_market_prices(self, prices: Dict[str, float]):
         """시장 가격 업데이트 (미실현 손익 계산)"""
-        total_unrealized = 0.0
+        if self.shared is not None:
+            try:
+                self.shared.mark_prices(prices)
+            except Exception as e:
+                logger.warning(f"공유 리스크 상태 가격 반영 실패: {e}")
         
         for ticker, pos in self.positions.items():
             if ticker in prices:
                 current_price = prices[ticker]
                 pos["last_price"] = current_price
                 pos["unrealized_pnl"] = (current_price - pos["avg_price"]) * pos["quantity"]
-                total_unrealized += pos["unrealized_pnl"]
         
+        positions, realized_pnl, _, _ = self._view()
+        self._check_daily_loss(positions, realized_pnl)
+    
+    def _check_daily_loss(self, positions: Dict[str, Dict], realized_pnl: float) -> None:
+        """일일 손실 한도 확인 (실현 + 미실현, 공유 스냅샷이면 전 프로세스 공통 기준)"""
+        if self.status == RiskStatus.SHUTDOWN:
+            return
         # 총 손익 = 실현손익 + 미실현손익
-        total_pnl = self.daily_pnl + total_unrealized
-        
-        # 일일 손실 한도 확인
+        total_pnl = realized_pnl + sum(pos.get("unrealized_pnl", 0.0) for pos in positions.values())
         daily_pnl_pct = total_pnl / self.initial_capital
         
         if daily_pnl_pct <= -self.daily_loss_limit:
@@ -154,33 +185,44 @@ class RiskEngine:
             self.shutdown_reason = f"일일 손실 한도 초과: {daily_pnl_pct*100:.2f}%"
             logger.warning(f"리스크 셧다운: {self.shutdown_reason}")
     
+    def _shared_snapshot(self):
+        """공유 스냅샷 (없거나 장애 시 None → 로컬 상태 사용)"""
+        if self.shared is None:
+            return None
+        try:
+            return self.shared.snapshot()
+        except Exception as e:
+            logger.warning(f"공유 리스크 스냅샷 조회 실패 (로컬 폴백): {e}")
+            return None
+
+    def _view(self) -> Tuple[Dict[str, Dict], float, float, float]:
+        """(포지션, 실현손익, VaR, CVaR) — 공유 스냅샷 우선"""
+        snap = self._shared_snapshot()
+        if snap is not None:
+            return snap.positions, snap.realized_pnl, snap.var95, snap.cvar95
+        var_95, cvar_95 = self._local_var_cvar()
+        return self.positions, self.daily_pnl, var_95, cvar_95
+
+    def _local_var_cvar(self) -> Tuple[float, float]:
+        if self.returns_sketch.count < self.min_var_samples:
+            return 0.0, 0.0
+        return self.returns_sketch.var_cvar(self.var_confidence)
+
     def calculate_var(self, lookback_days: int = 30) -> float:
-        """VaR 계산"""
-        if len(self.returns_history) < 10:
-            return 0.0
-        
-        # 최근 N일 수익률 사용
-        recent_returns = self.returns_history[-min(len(self.returns_history), lookback_days*10):]
-        
-        if len(recent_returns) < 5:
-            return 0.0
-        
-        # VaR 계산 (히스토리컬 시뮬레이션)
-        sorted_returns = sorted(recent_returns)
-        var_index = int((1 - self.var_confidence) * len(sorted_returns))
-        var_95 = sorted_returns[var_index] if var_index < len(sorted_returns) else sorted_returns[0]
-        
-        return abs(var_95)  # 절댓값 반환
+        """VaR 계산 (스트리밍 분위수 스케치, 상수 시간)"""
+        return self._view()[2]
     
-    def check_position_limits(self, new_ticker: str = None) -> Tuple[bool, str]:
+    def check_position_limits(self, new_ticker: str = None, positions: Optional[Dict[str, Dict]] = None) -> Tuple[bool, str]:
         """포지션 한도 확인"""
+        if positions is None:
+            positions = self._view()[0]
         # 최대 포지션 수 확인
-        if len(self.positions) >= self.max_positions:
-            if new_ticker and new_ticker not in self.positions:
+        if len(positions) >= self.max_positions:
+            if new_ticker and new_ticker not in positions:
                 return False, f"최대 포지션 수 초과: {self.max_positions}개"
         
         # 최대 노출 확인
-        total_exposure = sum(abs(pos["quantity"] * pos["last_price"]) for pos in self.positions.values())
+        total_exposure = sum(abs(pos["quantity"] * pos["last_price"]) for pos in positions.values())
         exposure_ratio = total_exposure / self.initial_capital
         
         if exposure_ratio > self.max_exposure:
@@ -190,19 +232,17 @@ class RiskEngine:
     
     def calculate_risk_metrics(self) -> RiskMetrics:
         """리스크 지표 계산"""
+        positions, realized_pnl, var_95, _ = self._view()
         # 총 미실현 손익
-        total_unrealized = sum(pos["unrealized_pnl"] for pos in self.positions.values())
-        total_pnl = self.daily_pnl + total_unrealized
+        total_unrealized = sum(pos.get("unrealized_pnl", 0.0) for pos in positions.values())
+        total_pnl = realized_pnl + total_unrealized
         daily_pnl_pct = total_pnl / self.initial_capital
         
-        # VaR 계산
-        var_95 = self.calculate_var()
-        
         # 최대 드로다운 (간단한 계산)
         max_drawdown = min(0, daily_pnl_pct)  # 음수일 때만
         
         # 총 노출
-        total_exposure = sum(abs(pos["quantity"] * pos["last_price"]) for pos in self.positions.values())
+        total_exposure = sum(abs(pos["quantity"] * pos["last_price"]) for pos in positions.values())
         
         # 리스크 상태 결정
         status = self._determine_risk_status(daily_pnl_pct, var_95)
@@ -212,7 +252,7 @@ class RiskEngine:
             daily_pnl_pct=daily_pnl_pct,
             var_95=var_95,
             max_drawdown=max_drawdown,
-            position_count=len(self.positions),
+            position_count=len(positions),
             total_exposure=total_exposure,
             status=status,
             timestamp=datetime.now()
@@ -239,15 +279,11 @@ class RiskEngine:
         return RiskStatus.NORMAL
     
     def _update_returns_history(self, realized_pnl: float):
-        """수익률 히스토리 업데이트"""
+        """수익률 스케치 업데이트 (O(1), 로컬 폴백용)"""
         if realized_pnl != 0:
             # 수익률 계산 (실현손익 / 초기자본)
             return_pct = realized_pnl / self.initial_capital
-            self.returns_history.append(return_pct)
-            
-            # 히스토리 크기 제한
-            if len(self.returns_history) > self.max_history_size:
-                self.returns_history = self.returns_history[-self.max_history_size:]
+            self.returns_sketch.add(return_pct)
     
     def reset_daily(self):
         """일일 통계 리셋"""
@@ -256,6 +292,8 @@ class RiskEngine:
         self.daily_start = datetime.now().date()
         self.status = RiskStatus.NORMAL
         self.shutdown_reason = ""
+        if self.shared is not None:
+            self.shared.reset_daily()
         logger.info("일일 리스크 통계 리셋")
     
     def can_trade(self, ticker: str, side: str, quantity: int, price: float) -> Tuple[bool, str]:
@@ -264,8 +302,14 @@ class RiskEngine:
         if self.status == RiskStatus.SHUTDOWN:
             return False, f"리스크 셧다운: {self.shutdown_reason}"
         
+        positions, realized_pnl, var_95, _ = self._view()
+        # 다른 프로세스가 반영한 가격 하락도 여기서 셧다운으로 이어지도록 매 판단마다 확인
+        self._check_daily_loss(positions, realized_pnl)
+        if self.status == RiskStatus.SHUTDOWN:
+            return False, f"리스크 셧다운: {self.shutdown_reason}"
+
         # 포지션 한도 확인
-        can_position, position_msg = self.check_position_limits(ticker)
+        can_position, position_msg = self.check_position_limits(ticker, positions)
         if not can_position:
             return False, position_msg
         
@@ -275,7 +319,6 @@ class RiskEngine:
             return False, f"거래 규모 초과: {trade_value/self.initial_capital*100:.1f}%"
         
         # VaR 기반 추가 검증
-        var_95 = self.calculate_var()
         if var_95 > self.daily_loss_limit * 0.3:  # VaR가 일일 한도의 30% 초과
             return False, f"VaR 한도 초과: {var_95*100:.2f}%"
         
@@ -286,13 +329,13 @@ class RiskEngine:
         if self.status != RiskStatus.WARNING:
             return None
         
-        self.calculate_risk_metrics()
+        positions = self._view()[0]
         
         # 가장 큰 포지션 찾기
         largest_position = None
         max_exposure = 0.0
         
-        for ticker, pos in self.positions.items():
+        for ticker, pos in positions.items():
             exposure = abs(pos["quantity"] * pos["last_price"])
             if exposure > max_exposure:
                 max_exposure = exposure
@@ -315,7 +358,7 @@ class RiskEngine:
         
         if self.status == RiskStatus.CRITICAL:
             # 모든 포지션 청산 권장
-            for ticker, pos in self.positions.items():
+            for ticker, pos in self._view()[0].items():
                 actions.append({
                     "action": "close_position",
                     "ticker": ticker,
@@ -335,12 +378,14 @@ class RiskEngine:
     def get_risk_report(self) -> Dict:
         """리스크 리포트"""
         metrics = self.calculate_risk_metrics()
+        positions, _, _, cvar_95 = self._view()
         
-        return {
+        report = {
             "status": metrics.status.value,
             "daily_pnl": metrics.daily_pnl,
             "daily_pnl_pct": metrics.daily_pnl_pct * 100,
             "var_95": metrics.var_95 * 100,
+            "cvar_95": cvar_95 * 100,
             "max_drawdown": metrics.max_drawdown * 100,
             "position_count": metrics.position_count,
             "total_exposure": metrics.total_exposure,
@@ -349,3 +394,11 @@ class RiskEngine:
             "can_trade": self.status != RiskStatus.SHUTDOWN,
             "timestamp": metrics.timestamp.isoformat()
         }
+        snap = self._shared_snapshot()
+        if snap is not None:
+            report["return_moments"] = {"mean": snap.mean, "std": snap.std, "n": snap.n}
+            try:
+                report["symbol_var"] = self.shared.symbol_var(sorted(positions))
+            except Exception as e:
+                logger.warning(f"종목별 VaR 조회 실패: {e}")
+        return report
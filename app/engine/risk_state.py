@@ -0,0 +1,343 @@
+"""
+공유 리스크 상태 (프로세스 간 공통 뷰)
+- orders.fills 스트림을 커서 기반으로 소비해 포지션/일일 실현손익을 Redis에 반영
+- 체결 실현수익률은 스트리밍 분위수 스케치(return_sketch)에 O(1) 기록 → 포트폴리오/종목별 VaR·CVaR·모멘트
+- 조회는 파이프라인 1회 스냅샷 + 짧은 로컬 캐시 → 히스토리 길이와 무관한 상수 시간
+- 체결 반영과 커서 전진은 한 MULTI → 중간 장애 시 이중 반영/유실 없음
+- 브로커 측 브래킷(SL/TP) 청산은 orders.fills를 거치지 않으므로 주기적으로 브로커 포지션과 대사(reconcile)
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import redis
+
+from app.engine.return_sketch import ReturnRecorder, get_return_recorder, var_key
+from app.io.codec import decode_stream_fields
+from app.utils.market_clock import get_market_clock
+
+logger = logging.getLogger(__name__)
+
+POSITIONS_KEY = "risk:state:positions"
+DAY_KEY_PREFIX = "risk:state:day"
+FILLS_STREAM = "orders.fills"
+FILLS_CURSOR_KEY = "risk:state:fills_cursor"
+FILLS_LOCK_KEY = "risk:state:fills_lock"
+RECONCILE_MARK_KEY = "risk:state:reconciled_at"
+RECONCILE_MISSING_KEY = "risk:state:missing"  # 브로커에서 사라진 종목 (연속 2회 확인 후 정리)
+PORTFOLIO = "_PORTFOLIO"
+TRADE_REGIME = "trade"
+
+RISK_STATE_CACHE_SEC = float(os.getenv("RISK_STATE_CACHE_SEC", "2"))
+RISK_MIN_TRADES = int(os.getenv("RISK_MIN_TRADES", "10"))   # 미만이면 VaR 0 (기존 calculate_var 기준)
+DAY_KEY_TTL_SEC = 7 * 86400
+RISK_RECONCILE_SEC = int(os.getenv("RISK_RECONCILE_SEC", "60"))           # 브로커 대사 주기
+RISK_RECONCILE_GRACE_SEC = float(os.getenv("RISK_RECONCILE_GRACE_SEC", "30"))  # 최근 체결 종목은 대사 유예
+
+
+def day_key(ymd: Optional[str] = None) -> str:
+    return f"{DAY_KEY_PREFIX}:{ymd or get_market_clock().et_ymd()}"
+
+
+def _s(v) -> str:
+    return v.decode() if isinstance(v, bytes) else str(v)
+
+
+@dataclass(frozen=True)
+class RiskSnapshot:
+    """공유 리스크 상태 스냅샷 (불변)"""
+    positions: Dict[str, Dict] = field(default_factory=dict)
+    realized_pnl: float = 0.0
+    trades: int = 0
+    var95: float = 0.0
+    cvar95: float = 0.0
+    mean: float = 0.0
+    std: float = 0.0
+    n: int = 0
+    loaded_at: float = field(default_factory=time.time)
+
+    @property
+    def unrealized_pnl(self) -> float:
+        return sum(float(p.get("unrealized_pnl", 0.0)) for p in self.positions.values())
+
+    @property
+    def total_exposure(self) -> float:
+        return sum(abs(float(p.get("quantity", 0)) * float(p.get("last_price", 0.0))) for p in self.positions.values())
+
+
+class SharedRiskState:
+    """Redis 기반 포지션/실현손익/수익률 스케치 공유 저장소"""
+
+    def __init__(self, redis_url: Optional[str] = None, initial_capital: Optional[float] = None,
+                 recorder: Optional[ReturnRecorder] = None):
+        self.redis_url = redis_url or os.getenv("REDIS_URL")
+        self.initial_capital = float(initial_capital or os.getenv("INITIAL_CAPITAL", "1000000") or 1000000)
+        self._r = None
+        self._recorder = recorder
+        self._lock = threading.Lock()
+        self._cached: Optional[RiskSnapshot] = None
+
+    @property
+    def r(self):
+        if self._r is None and self.redis_url:
+            self._r = redis.from_url(self.redis_url)
+        return self._r
+
+    @property
+    def recorder(self) -> ReturnRecorder:
+        if self._recorder is None:
+            self._recorder = get_return_recorder()
+        return self._recorder
+
+    # ------------------------------------------------------------------
+    # 쓰기 (체결 소비자 단일 경로)
+    # ------------------------------------------------------------------
+    def apply_fill(self, fill: Dict, cursor: Optional[str] = None) -> float:
+        """체결 1건 반영 → 실현손익 반환 (RiskEngine.update_position과 동일 규칙)
+
+        cursor(스트림 메시지 ID)를 주면 상태 갱신과 같은 MULTI에서 소비 커서를 전진시킨다.
+        """
+        ticker = _s(fill.get("ticker") or fill.get("symbol") or "").upper()
+        side = _s(fill.get("side") or "").lower()
+        try:
+            quantity = float(fill.get("quantity") or fill.get("qty") or 0)
+            price = float(fill.get("price") or 0)
+        except (TypeError, ValueError):
+            quantity = price = 0.0
+        if not ticker or quantity <= 0 or price <= 0 or side not in ("buy", "sell"):
+            if cursor is not None:
+                self.r.set(FILLS_CURSOR_KEY, cursor)
+            return 0.0
+
+        raw = self.r.hget(POSITIONS_KEY, ticker)
+        pos = json.loads(raw) if raw else {"quantity": 0.0, "avg_price": 0.0}
+        realized = 0.0
+        trade_ret = None
+        if side == "buy":
+            total_cost = pos["quantity"] * pos["avg_price"] + quantity * price
+            pos["quantity"] += quantity
+            pos["avg_price"] = total_cost / pos["quantity"] if pos["quantity"] > 0 else 0.0
+        elif pos["quantity"] >= quantity and pos["avg_price"] > 0:
+            realized = (price - pos["avg_price"]) * quantity
+            trade_ret = price / pos["avg_price"] - 1.0
+            pos["quantity"] -= quantity
+        pos["last_price"] = price
+        pos["unrealized_pnl"] = (price - pos["avg_price"]) * pos["quantity"]
+        pos["updated_at"] = time.time()
+
+        dk = day_key()
+        pipe = self.r.pipeline(transaction=True)
+        if pos["quantity"] > 0:
+            pipe.hset(POSITIONS_KEY, ticker, json.dumps(pos))
+        else:
+            pipe.hdel(POSITIONS_KEY, ticker)
+        pipe.hincrby(dk, "trades", 1)
+        if realized:
+            pipe.hincrbyfloat(dk, "realized_pnl", realized)
+        pipe.expire(dk, DAY_KEY_TTL_SEC)
+        if cursor is not None:
+            pipe.set(FILLS_CURSOR_KEY, cursor)
+        pipe.execute()
+
+        if trade_ret is not None:
+            self.recorder.record(PORTFOLIO, TRADE_REGIME, realized / self.initial_capital,
+                                 refresh_every=1, min_samples=RISK_MIN_TRADES, rollup=False)
+            self.recorder.record(ticker, TRADE_REGIME, trade_ret,
+                                 refresh_every=1, min_samples=RISK_MIN_TRADES, rollup=False)
+        self._cached = None
+        return realized
+
+    def _acquire(self) -> Optional[str]:
+        """단일 소비자 락 (체결 소비/대사 공용) → 토큰 또는 None"""
+        token = f"{os.getpid()}:{time.time()}"
+        return token if self.r.set(FILLS_LOCK_KEY, token, nx=True, ex=30) else None
+
+    def _release(self, token: str) -> None:
+        if _s(self.r.get(FILLS_LOCK_KEY) or "") == token:
+            self.r.delete(FILLS_LOCK_KEY)
+
+    def consume_fills(self, max_batch: int = 500) -> int:
+        """orders.fills 신규 메시지 반영 (단일 소비자 락 + 커서)"""
+        r = self.r
+        if r is None:
+            return 0
+        token = self._acquire()
+        if token is None:
+            return 0
+        applied = 0
+        try:
+            cursor = _s(r.get(FILLS_CURSOR_KEY) or "0-0")
+            entries = r.xrange(FILLS_STREAM, min=f"({cursor}", max="+", count=max_batch) or []
+            for msg_id, data in entries:
+                try:
+                    self.apply_fill(decode_stream_fields(data), cursor=_s(msg_id))
+                    applied += 1
+                except Exception as e:
+                    logger.warning(f"체결 반영 실패 {_s(msg_id)}: {e}")
+                    # 실패 건도 커서 전진 (독성 메시지로 정체 방지)
+                    r.set(FILLS_CURSOR_KEY, _s(msg_id))
+        finally:
+            self._release(token)
+        if applied:
+            logger.info(f"리스크 상태 체결 반영: {applied}건")
+        return applied
+
+    def reconcile(self, broker_positions: Dict[str, Dict], now: Optional[float] = None) -> Dict[str, float]:
+        """브로커 포지션 기준 대사: 브로커에 없거나 줄어든 공유 포지션 정리 → {종목: 추정 실현손익}
+
+        브로커 측 브래킷 SL/TP 청산은 체결 스트림에 오지 않아 공유 상태에 유령 포지션이 남는다.
+        청산가를 알 수 없으므로 마지막 마크 가격으로 실현손익을 추정해 일일 손익에 반영한다.
+        최근 RISK_RECONCILE_GRACE_SEC 안에 체결이 반영된 종목은 브로커 반영 지연일 수 있어 건너뛴다.
+        브로커 조회 실패가 빈 목록으로 돌아오는 어댑터가 있어, 완전히 사라진 종목은 연속 2회 확인 후 정리한다.
+        신규 진입은 체결 스트림이 유일한 경로이므로 브로커에만 있는 포지션은 추가하지 않는다.
+        """
+        r = self.r
+        if r is None:
+            return {}
+        token = self._acquire()
+        if token is None:
+            return {}
+        now = time.time() if now is None else now
+        broker = {t.upper(): p for t, p in (broker_positions or {}).items()}
+        closed: Dict[str, float] = {}
+        try:
+            missing = {_s(k) for k in (r.hkeys(RECONCILE_MISSING_KEY) or [])}
+            held_state = {_s(k): v for k, v in (r.hgetall(POSITIONS_KEY) or {}).items()}
+            pipe = r.pipeline(transaction=True)
+            stale = missing - set(held_state)  # 체결 스트림으로 이미 청산된 종목
+            if stale:
+                pipe.hdel(RECONCILE_MISSING_KEY, *stale)
+            for ticker, v in held_state.items():
+                pos = json.loads(v)
+                if now - float(pos.get("updated_at", 0.0)) < RISK_RECONCILE_GRACE_SEC:
+                    continue
+                held = float((broker.get(ticker) or {}).get("quantity", 0) or 0)
+                if held >= pos["quantity"]:
+                    if ticker in missing:
+                        pipe.hdel(RECONCILE_MISSING_KEY, ticker)
+                    continue
+                if held <= 0 and ticker not in missing:
+                    pipe.hset(RECONCILE_MISSING_KEY, ticker, int(now))  # 다음 대사에서 재확인
+                    continue
+                price = float((broker.get(ticker) or {}).get("current_price") or pos.get("last_price") or pos["avg_price"])
+                gone = pos["quantity"] - max(held, 0.0)
+                closed[ticker] = (price - pos["avg_price"]) * gone
+                if held > 0:
+                    pos.update(quantity=held, last_price=price, updated_at=now,
+                               unrealized_pnl=(price - pos["avg_price"]) * held)
+                    pipe.hset(POSITIONS_KEY, ticker, json.dumps(pos))
+                else:
+                    pipe.hdel(POSITIONS_KEY, ticker)
+                    pipe.hdel(RECONCILE_MISSING_KEY, ticker)
+            if closed:
+                dk = day_key()
+                pipe.hincrby(dk, "reconciled_exits", len(closed))
+                pipe.hincrbyfloat(dk, "realized_pnl", sum(closed.values()))
+                pipe.expire(dk, DAY_KEY_TTL_SEC)
+                self._cached = None
+            pipe.execute()
+            if closed:
+                logger.info(f"리스크 상태 브로커 대사: 정리 {sorted(closed)} 추정 실현손익 {sum(closed.values()):.2f}")
+        finally:
+            self._release(token)
+        return closed
+
+    def reconcile_due(self, interval_sec: int = RISK_RECONCILE_SEC) -> bool:
+        """대사 주기 도래 여부 (프로세스 간 SET NX, 주기당 1회)"""
+        try:
+            return bool(self.r.set(RECONCILE_MARK_KEY, int(time.time()), nx=True, ex=max(1, interval_sec)))
+        except Exception:
+            return False
+
+    def mark_prices(self, prices: Dict[str, float]) -> int:
+        """보유 종목 현재가 반영 (미실현손익 갱신) → 반영 종목 수
+
+        체결 반영과 같은 단일 소비자 락 안에서 읽고 써서 동시 체결의 수량 갱신을 덮어쓰지 않는다.
+        락이 잡혀 있으면 이번 주기는 건너뛴다 (다음 주기에 반영).
+        """
+        if not prices or self.r is None:
+            return 0
+        token = self._acquire()
+        if token is None:
+            return 0
+        try:
+            raw = self.r.hgetall(POSITIONS_KEY) or {}
+            updates = {}
+            for k, v in raw.items():
+                t = _s(k)
+                px = float(prices.get(t) or 0)
+                if px > 0:
+                    pos = json.loads(v)
+                    pos["last_price"] = px
+                    pos["unrealized_pnl"] = (px - pos["avg_price"]) * pos["quantity"]
+                    updates[t] = json.dumps(pos)
+            if updates:
+                self.r.hset(POSITIONS_KEY, mapping=updates)
+                self._cached = None
+        finally:
+            self._release(token)
+        return len(updates)
+
+    # ------------------------------------------------------------------
+    # 읽기 (모든 프로세스)
+    # ------------------------------------------------------------------
+    def snapshot(self, max_age: float = RISK_STATE_CACHE_SEC) -> RiskSnapshot:
+        """포지션/일일손익/포트폴리오 VaR 요약 (파이프라인 1회, 로컬 캐시)"""
+        snap = self._cached
+        if snap is not None and time.time() - snap.loaded_at < max_age:
+            return snap
+        with self._lock:
+            snap = self._cached
+            if snap is not None and time.time() - snap.loaded_at < max_age:
+                return snap
+            pipe = self.r.pipeline(transaction=False)
+            pipe.hgetall(POSITIONS_KEY)
+            pipe.hgetall(day_key())
+            pipe.get(var_key(PORTFOLIO, TRADE_REGIME))
+            positions_raw, day_raw, var_raw = pipe.execute()
+            positions = {_s(k): json.loads(v) for k, v in (positions_raw or {}).items()}
+            day = {_s(k): _s(v) for k, v in (day_raw or {}).items()}
+            summary = json.loads(var_raw) if var_raw else {}
+            snap = RiskSnapshot(
+                positions=positions,
+                realized_pnl=float(day.get("realized_pnl", 0.0)),
+                trades=int(day.get("trades", 0)),
+                var95=float(summary.get("var95", 0.0)),
+                cvar95=float(summary.get("cvar95", 0.0)),
+                mean=float(summary.get("mean", 0.0)),
+                std=float(summary.get("std", 0.0)),
+                n=int(summary.get("n", 0)),
+            )
+            self._cached = snap
+            return snap
+
+    def symbol_var(self, tickers: List[str]) -> Dict[str, Dict]:
+        """종목별 체결 수익률 VaR/CVaR 요약 (MGET 1회)"""
+        if not tickers:
+            return {}
+        out = {}
+        for t, raw in zip(tickers, self.r.mget([var_key(t, TRADE_REGIME) for t in tickers])):
+            if raw:
+                out[t] = json.loads(raw)
+        return out
+
+    def reset_daily(self) -> None:
+        """일일 실현손익은 ET 날짜 키로 자연 롤오버 — 캐시만 무효화"""
+        self._cached = None
+
+
+_shared_risk_state: Optional[SharedRiskState] = None
+
+
+def get_shared_risk_state() -> Optional[SharedRiskState]:
+    """글로벌 공유 리스크 상태 (REDIS_URL 없으면 None)"""
+    global _shared_risk_state
+    if _shared_risk_state is None and os.getenv("REDIS_URL"):
+        _shared_risk_state = SharedRiskState()
+    return _shared_risk_state
@@ -0,0 +1,280 @@
+"""
+신호 점수 시계열 (종목별 원시 + 고정 해상도 롤업, 메모리 상한)
+- 최신값: 해시 scores:latest (필드=종목) → 유니버스 최신 점수는 HGETALL 한 번
+- 원시: 종목별 ZSET scores:raw:{ticker} (score=ts), SCORE_RAW_RETENTION_SEC 지난 점은 기록 시 잘라냄
+- 롤업: 1m / 5m 버킷 집계(count/sum/min/max/last)를 일자별 해시 scores:{1m|5m}:{YYYYMMDD} 필드 {ticker}:{bucket}
+  · 진행 중 버킷은 프로세스 로컬에서 누적 후 덮어쓰기, 재시작 후 처음 보는 버킷만 기존 값과 병합
+- 기록은 사이클 단위 버퍼 → flush() 파이프라인 1회 (기존 종목별 SETEX + LPUSH/LTRIM/EXPIRE 대체)
+- 메모리 상한: 종목 수 × (원시 보존 점 + 1m 1440 + 5m 288×2일) 버킷
+- 조회: range(ticker, start, end, resolution="auto") → 구간 길이에 맞는 해상도 선택
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import redis
+
+from app.io.codec import decode as decode_payload, get_codec
+
+logger = logging.getLogger(__name__)
+
+SCORE_LATEST_KEY = "scores:latest"
+SCORE_RAW_PREFIX = "scores:raw"
+SCORE_ROLLUP_PREFIX = "scores"
+
+SCORE_RAW_RETENTION_SEC = int(os.getenv("SCORE_RAW_RETENTION_SEC", "900"))   # 원시 15분
+SCORE_AUTO_1M_MAX_SEC = int(os.getenv("SCORE_AUTO_1M_MAX_SEC", str(6 * 3600)))  # auto: 6시간까지 1m
+# 해상도(초) → (키 라벨, 일자 해시 TTL)
+ROLLUPS: Dict[int, Tuple[str, int]] = {
+    60: ("1m", 26 * 3600),
+    300: ("5m", 2 * 86400),
+}
+
+
+def raw_key(ticker: str) -> str:
+    return f"{SCORE_RAW_PREFIX}:{ticker.upper()}"
+
+
+def rollup_key(resolution: int, ymd: str) -> str:
+    return f"{SCORE_ROLLUP_PREFIX}:{ROLLUPS[resolution][0]}:{ymd}"
+
+
+def _ymd(epoch: float) -> str:
+    return datetime.fromtimestamp(epoch, tz=timezone.utc).strftime("%Y%m%d")
+
+
+@dataclass
+class ScoreBucket:
+    """고정 해상도 버킷 집계"""
+    ts: int             # 버킷 시작 (epoch 초)
+    count: int = 0
+    sum: float = 0.0
+    min: float = 0.0
+    max: float = 0.0
+    last: float = 0.0
+
+    def add(self, score: float) -> None:
+        self.min = score if self.count == 0 else min(self.min, score)
+        self.max = score if self.count == 0 else max(self.max, score)
+        self.count += 1
+        self.sum += score
+        self.last = score
+
+    def merge(self, other: "ScoreBucket") -> None:
+        """재시작 전 기록분(other)이 앞선 관측 → last는 현재 값 유지"""
+        if other.count <= 0:
+            return
+        if self.count == 0:
+            self.last = other.last
+        self.min = other.min if self.count == 0 else min(self.min, other.min)
+        self.max = other.max if self.count == 0 else max(self.max, other.max)
+        self.count += other.count
+        self.sum += other.sum
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def to_list(self) -> list:
+        return [self.count, self.sum, self.min, self.max, self.last]
+
+    @classmethod
+    def from_list(cls, ts: int, data) -> "ScoreBucket":
+        count, total, lo, hi, last = data
+        return cls(ts, int(count), float(total), float(lo), float(hi), float(last))
+
+    def to_dict(self, resolution: int) -> Dict:
+        return {"ts": self.ts, "resolution": resolution, "count": self.count, "mean": round(self.mean, 6),
+                "min": self.min, "max": self.max, "last": self.last}
+
+
+class ScoreSeries:
+    """점수 시계열 기록/조회"""
+
+    def __init__(self, redis_client=None, raw_retention_sec: int = SCORE_RAW_RETENTION_SEC,
+                 rollups: Iterable[int] = tuple(ROLLUPS), codec=None, clock=time.time):
+        self.redis = redis_client
+        self.raw_retention_sec = raw_retention_sec
+        self.rollups = tuple(sorted(rollups))
+        self.codec = codec or get_codec()
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Dict] = {}                       # 종목 → 최신 점 (latest 해시)
+        self._raw: List[Tuple[str, float, bytes]] = []             # (종목, ts, 멤버)
+        self._buckets: Dict[Tuple[int, str], ScoreBucket] = {}     # 진행 중 버킷
+        self._dirty: set = set()
+        self._closed: List[Tuple[int, str, ScoreBucket]] = []      # flush 전에 닫힌 버킷 (사이클이 경계를 넘음)
+        self._loaded: set = set()                                  # 기존 값 병합 완료 (해상도, 종목, 버킷)
+        self._started = clock()  # 이 시각 이후 시작한 버킷은 이전 프로세스 기록이 있을 수 없음
+
+    # ------------------------------------------------------------------ 기록
+    def record(self, ticker: str, score: float, ts: Optional[float] = None, signal_type: str = "") -> None:
+        """평가 1건 버퍼링 (flush 전까지 Redis 미기록)"""
+        ticker = ticker.upper()
+        ts = self._clock() if ts is None else float(ts)
+        score = float(score)
+        point = {"score": score, "ts": ts, "signal_type": signal_type}
+        with self._lock:
+            self._pending[ticker] = point
+            self._raw.append((ticker, ts, self.codec.encode([round(ts, 3), score, signal_type])))
+            for res in self.rollups:
+                start = int(ts // res * res)
+                cur = self._buckets.get((res, ticker))
+                if cur is None or cur.ts != start:
+                    if cur is not None and cur.ts > start:
+                        continue  # 지난 버킷으로 역행한 점은 원시에만 남김
+                    if cur is not None and (res, ticker) in self._dirty:
+                        self._closed.append((res, ticker, cur))
+                    cur = self._buckets[(res, ticker)] = ScoreBucket(start)
+                cur.add(score)
+                self._dirty.add((res, ticker))
+
+    def flush(self) -> int:
+        """버퍼 → 파이프라인 1회 기록 → 기록한 종목 수"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            raw, self._raw = self._raw, []
+            dirty, self._dirty = self._dirty, set()
+            closed, self._closed = self._closed, []
+            buckets = {(res, t, b.ts): b for res, t, b in closed}
+            buckets.update({(res, t, self._buckets[(res, t)].ts): ScoreBucket(**vars(self._buckets[(res, t)]))
+                            for res, t in dirty})
+        if not pending or self.redis is None:
+            return 0
+        try:
+            self._merge_existing(buckets)
+            now = self._clock()
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.hset(SCORE_LATEST_KEY, mapping={t: self.codec.encode(p) for t, p in pending.items()})
+            by_ticker: Dict[str, Dict[bytes, float]] = {}
+            for ticker, ts, member in raw:
+                by_ticker.setdefault(ticker, {})[member] = ts
+            for ticker, members in by_ticker.items():
+                key = raw_key(ticker)
+                pipe.zadd(key, members)
+                pipe.zremrangebyscore(key, "-inf", now - self.raw_retention_sec)
+                pipe.expire(key, self.raw_retention_sec * 2)
+            by_key: Dict[Tuple[int, str], Dict[str, bytes]] = {}
+            for (res, ticker, _), b in buckets.items():
+                by_key.setdefault((res, _ymd(b.ts)), {})[f"{ticker}:{b.ts}"] = self.codec.encode(b.to_list())
+            for (res, ymd), mapping in by_key.items():
+                key = rollup_key(res, ymd)
+                pipe.hset(key, mapping=mapping)
+                pipe.expire(key, ROLLUPS[res][1])
+            pipe.execute()
+            return len(pending)
+        except Exception as e:
+            logger.warning(f"점수 시계열 기록 실패 ({len(pending)}종목): {e}")
+            return 0
+
+    def _merge_existing(self, buckets: Dict[Tuple[int, str, int], ScoreBucket]) -> None:
+        """프로세스 시작 전에 열린 버킷은 Redis 기존 집계와 병합 (재시작 직후 버킷당 1회)"""
+        fresh = [(res, t, b) for (res, t, _), b in buckets.items()
+                 if b.ts < self._started and (res, t, b.ts) not in self._loaded]
+        if not fresh:
+            return
+        pipe = self.redis.pipeline(transaction=False)
+        for res, t, b in fresh:
+            pipe.hget(rollup_key(res, _ymd(b.ts)), f"{t}:{b.ts}")
+        for (res, t, b), raw in zip(fresh, pipe.execute()):
+            self._loaded.add((res, t, b.ts))
+            if raw:
+                try:
+                    prev = ScoreBucket.from_list(b.ts, decode_payload(raw))
+                    b.merge(prev)
+                    with self._lock:
+                        live = self._buckets.get((res, t))
+                        if live is not None and live.ts == b.ts:
+                            live.merge(prev)
+                except Exception as e:
+                    logger.debug(f"기존 점수 버킷 병합 실패 {t}: {e}")
+
+    # ------------------------------------------------------------------ 조회
+    def latest(self, tickers: Optional[Iterable[str]] = None) -> Dict[str, Dict]:
+        """종목별 최신 점수 (단일 HGETALL / HMGET)"""
+        if self.redis is None:
+            return {}
+        try:
+            if tickers is None:
+                raw = {k.decode() if isinstance(k, bytes) else k: v
+                       for k, v in (self.redis.hgetall(SCORE_LATEST_KEY) or {}).items()}
+            else:
+                names = [t.upper() for t in tickers]
+                raw = dict(zip(names, self.redis.hmget(SCORE_LATEST_KEY, names)))
+        except Exception as e:
+            logger.warning(f"최신 점수 조회 실패: {e}")
+            return {}
+        out = {}
+        for t, v in raw.items():
+            if v is None:
+                continue
+            try:
+                out[t] = decode_payload(v)
+            except Exception:
+                continue
+        return out
+
+    def resolution_for(self, start: float, end: float) -> int:
+        span = end - start
+        if span <= self.raw_retention_sec:
+            return 0
+        return self.rollups[0] if span <= SCORE_AUTO_1M_MAX_SEC else self.rollups[-1]
+
+    def range(self, ticker: str, start: float, end: Optional[float] = None, resolution="auto") -> List[Dict]:
+        """구간 점수 (resolution: auto | 0(원시) | 60 | 300)"""
+        if self.redis is None:
+            return []
+        ticker = ticker.upper()
+        end = self._clock() if end is None else end
+        res = self.resolution_for(start, end) if resolution == "auto" else int(resolution)
+        try:
+            if res == 0:
+                rows = self.redis.zrangebyscore(raw_key(ticker), start, end)
+                out = []
+                for m in rows:
+                    ts, score, signal_type = decode_payload(m)
+                    out.append({"ts": ts, "resolution": 0, "score": score, "signal_type": signal_type})
+                return out
+            if res not in ROLLUPS:
+                raise ValueError(f"지원하지 않는 해상도: {res}")
+            fields_by_key: Dict[str, List[int]] = {}
+            b = int(start // res * res)
+            while b <= end:
+                fields_by_key.setdefault(rollup_key(res, _ymd(b)), []).append(b)
+                b += res
+            out = []
+            for key, starts in fields_by_key.items():
+                vals = self.redis.hmget(key, [f"{ticker}:{s}" for s in starts])
+                for s, v in zip(starts, vals):
+                    if v:
+                        out.append(ScoreBucket.from_list(s, decode_payload(v)).to_dict(res))
+            return out
+        except ValueError:
+            raise
+        except Exception as e:
+            logger.warning(f"점수 구간 조회 실패 {ticker}: {e}")
+            return []
+
+
+_score_series: Optional[ScoreSeries] = None
+
+
+def get_score_series() -> ScoreSeries:
+    """글로벌 점수 시계열 인스턴스 반환"""
+    global _score_series
+    if _score_series is None:
+        redis_client = None
+        try:
+            redis_url = os.getenv("REDIS_URL")
+            if redis_url:
+                redis_client = redis.from_url(redis_url)
+        except Exception:
+            redis_client = None
+        _score_series = ScoreSeries(redis_client=redis_client)
+    return _score_series
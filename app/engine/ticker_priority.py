@@ -0,0 +1,173 @@
+"""
+적응형 종목 스케줄링 (고정 초 구간 → 사이클별 우선순위 배정)
+- 기존 should_process_ticker_now: Tier A는 30초, Tier B는 60초 고정 구간 → 급변 종목도 자기 구간까지 대기
+- 매 사이클 종목 활동도로 순위화: 최근 변동성 확대, 거래량 급증, 보유 포지션, 직전 점수의 컷오프 근접도, 대기 시간
+- 예산 제약: APIRateLimiter Tier별 잔여 토큰을 분 내 남은 사이클 수로 나눠 페이싱 (Tier 할당량은 그대로 상한)
+  + 사이클당 최대 평가 종목 수(CPU 예산) + 사이클 마감 시간
+- 마감(최대 대기) 초과 종목은 우선 배정 → 조용한 종목도 명목 주기의 N배 안에 한 번은 평가
+"""
+from __future__ import annotations
+
+import logging
+import math
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from app.utils.rate_limiter import TokenTier
+
+logger = logging.getLogger(__name__)
+
+ADAPTIVE_CYCLE_SEC = float(os.getenv("ADAPTIVE_CYCLE_SEC", "30"))          # generate_signals 주기
+ADAPTIVE_MAX_TICKERS = int(os.getenv("ADAPTIVE_MAX_TICKERS", "0"))         # 사이클당 평가 상한 (0=토큰만)
+# 루프 마감: soft_time_limit(20s) 안에 배치 검증/발행 마무리 몫을 남김
+ADAPTIVE_CYCLE_DEADLINE_SEC = float(os.getenv("ADAPTIVE_CYCLE_DEADLINE_SEC", "12"))
+ADAPTIVE_MAX_WAIT_MULT = float(os.getenv("ADAPTIVE_MAX_WAIT_MULT", "3"))   # 명목 주기 × N 초과 → 마감
+ADAPTIVE_PROXIMITY_BAND = float(os.getenv("ADAPTIVE_PROXIMITY_BAND", "0.25"))
+
+# 명목 주기 (기존 고정 구간과 동일한 의미)
+NOMINAL_INTERVAL_SEC = {
+    TokenTier.TIER_A: float(os.getenv("TIER_A_INTERVAL_SEC", "30")),
+    TokenTier.TIER_B: float(os.getenv("TIER_B_INTERVAL_SEC", "60")),
+}
+
+# 우선순위 가중 (합 1.0, 마감 초과는 별도 +1)
+WEIGHTS = {"volatility": 0.25, "volume": 0.2, "position": 0.2, "proximity": 0.2, "wait": 0.15}
+
+
+@dataclass
+class TickerActivity:
+    """종목 1개의 사이클 활동도"""
+    ticker: str
+    tier: TokenTier
+    volatility: float = 0.0       # 최근 5봉 평균 |수익률| / 20봉 기준 (1=평소)
+    volume_surge: float = 0.0     # 마지막 봉 거래량 / 직전 20봉 평균
+    has_position: bool = False
+    proximity: float = 0.0        # 직전 점수의 컷오프 근접도 (0~1)
+    wait_sec: float = 0.0         # 마지막 배정 이후 경과
+    overdue: bool = False
+    priority: float = 0.0
+
+    @property
+    def reason(self) -> str:
+        if self.overdue:
+            return "adaptive_deadline"
+        drivers = {"vol": self.volatility > 1.5, "surge": self.volume_surge > 2.0,
+                   "position": self.has_position, "near_cut": self.proximity > 0.5}
+        hot = [k for k, on in drivers.items() if on]
+        return f"adaptive_{'+'.join(hot)}" if hot else "adaptive"
+
+
+@dataclass
+class TickerSchedulePlan:
+    selected: List[TickerActivity] = field(default_factory=list)
+    deferred: List[TickerActivity] = field(default_factory=list)
+    budgets: Dict[TokenTier, int] = field(default_factory=dict)
+    deadline: float = 0.0         # 이 시각(epoch) 이후 시작하는 평가는 다음 사이클로
+
+    def items(self) -> List[Tuple[str, TokenTier, str]]:
+        """generate_signals 처리 대상 형식 (ticker, tier, reason)"""
+        return [(a.ticker, a.tier, a.reason) for a in self.selected]
+
+
+def activity_features(candles: Sequence) -> Tuple[float, float]:
+    """(변동성 배율, 거래량 급증 배율) — 봉 부족 시 (0, 0)"""
+    if len(candles) < 7:
+        return 0.0, 0.0
+    closes = [c.c for c in candles[-21:]]
+    rets = [abs(b / a - 1.0) for a, b in zip(closes, closes[1:]) if a]
+    if len(rets) < 6:
+        return 0.0, 0.0
+    base = sum(rets) / len(rets)
+    recent = sum(rets[-5:]) / 5
+    volatility = recent / base if base > 0 else 0.0
+    vols = [c.v for c in candles[-21:-1]]
+    avg_v = sum(vols) / len(vols) if vols else 0.0
+    volume_surge = candles[-1].v / avg_v if avg_v > 0 else 0.0
+    return volatility, volume_surge
+
+
+class AdaptiveTickerScheduler:
+    """사이클별 종목 우선순위 → 토큰/CPU 예산 내 배정"""
+
+    def __init__(self, cycle_sec: float = ADAPTIVE_CYCLE_SEC, max_tickers: int = ADAPTIVE_MAX_TICKERS,
+                 deadline_sec: float = ADAPTIVE_CYCLE_DEADLINE_SEC, max_wait_mult: float = ADAPTIVE_MAX_WAIT_MULT,
+                 clock=time.time):
+        self.cycle_sec = max(1.0, cycle_sec)
+        self.max_tickers = max_tickers
+        self.deadline_sec = deadline_sec
+        self.max_wait_mult = max_wait_mult
+        self._clock = clock
+        self._last_selected: Dict[str, float] = {}
+        self.universe_version: Optional[str] = None
+
+    def score(self, ticker: str, tier: TokenTier, candles: Sequence, has_position: bool = False,
+              last_score: Optional[float] = None, cutoff: float = 0.0,
+              now: Optional[float] = None) -> TickerActivity:
+        now = self._clock() if now is None else now
+        volatility, surge = activity_features(candles)
+        proximity = 0.0
+        if last_score is not None:
+            proximity = max(0.0, 1.0 - abs(abs(last_score) - cutoff) / max(ADAPTIVE_PROXIMITY_BAND, 1e-9))
+        interval = NOMINAL_INTERVAL_SEC.get(tier, 60.0)
+        last = self._last_selected.get(ticker)
+        wait = now - last if last is not None else interval * self.max_wait_mult
+        act = TickerActivity(ticker, tier, volatility, surge, has_position, proximity, wait)
+        act.overdue = wait >= interval * self.max_wait_mult
+        act.priority = (
+            WEIGHTS["volatility"] * min(max(volatility - 1.0, 0.0), 3.0) / 3.0
+            + WEIGHTS["volume"] * min(max(surge - 1.0, 0.0), 4.0) / 4.0
+            + WEIGHTS["position"] * (1.0 if has_position else 0.0)
+            + WEIGHTS["proximity"] * proximity
+            + WEIGHTS["wait"] * min(wait / interval, 2.0) / 2.0
+            + (1.0 if act.overdue else 0.0)
+        )
+        return act
+
+    def tier_budgets(self, available: Dict[TokenTier, int], now: Optional[float] = None) -> Dict[TokenTier, int]:
+        """Tier별 잔여 토큰 → 이번 사이클 몫 (분 내 남은 사이클 수로 균등 페이싱, 마지막 사이클은 전부)"""
+        now = self._clock() if now is None else now
+        cycles_left = max(1, math.ceil((60.0 - now % 60.0) / self.cycle_sec))
+        return {tier: math.ceil(max(0, n) / cycles_left) for tier, n in available.items()}
+
+    def plan(self, activities: Iterable[TickerActivity], budgets: Dict[TokenTier, int],
+             now: Optional[float] = None) -> TickerSchedulePlan:
+        """우선순위 순 배정: Tier 토큰 몫 ∧ 사이클 평가 상한 안에서 선택, 나머지 이월"""
+        now = self._clock() if now is None else now
+        ranked = sorted(activities, key=lambda a: (-a.priority, a.ticker))
+        left = dict(budgets)
+        plan = TickerSchedulePlan(budgets=dict(budgets), deadline=now + self.deadline_sec)
+        for act in ranked:
+            cpu_ok = self.max_tickers <= 0 or len(plan.selected) < self.max_tickers
+            if cpu_ok and left.get(act.tier, 0) > 0:
+                left[act.tier] -= 1
+                plan.selected.append(act)
+                self._last_selected[act.ticker] = now
+            else:
+                plan.deferred.append(act)
+        return plan
+
+    def forget(self, keep: Set[str]) -> None:
+        """유니버스에서 빠진 종목 상태 정리"""
+        for t in [t for t in self._last_selected if t not in keep]:
+            self._last_selected.pop(t, None)
+
+    def sync_universe(self, version: str, symbols: Iterable[str]) -> bool:
+        """유니버스 버전이 바뀐 경우에만 빠진 종목 정리 (재편입 종목이 예전 대기 시간을 물려받지 않도록)"""
+        if version == self.universe_version:
+            return False
+        self.forget(set(symbols))
+        self.universe_version = version
+        return True
+
+
+_ticker_scheduler: Optional[AdaptiveTickerScheduler] = None
+
+
+def get_ticker_scheduler() -> AdaptiveTickerScheduler:
+    """글로벌 적응형 종목 스케줄러 인스턴스 반환"""
+    global _ticker_scheduler
+    if _ticker_scheduler is None:
+        _ticker_scheduler = AdaptiveTickerScheduler()
+    return _ticker_scheduler
@@ -0,0 +1,155 @@
+"""
+멀티 타임프레임 봉 집계 (단일 소스)
+- 인제스터가 가장 세밀한 원본 봉(야후/알파카 1분봉)을 한 번만 넣으면
+  15s/30s/1m/5m 롤링 버퍼를 봉 단위로 증분 갱신 (진행 중 봉 갱신은 해당 버킷만 재계산)
+- 원본보다 세밀한 타임프레임(1분 원본의 30s/15s)은 저장하지 않고 조회 시 필요한 개수만 분할 생성
+  (기존 DelayedQuotesIngestor의 복제 봉과 같은 OHLC, 거래량 균등 분배, ts는 타임프레임 간격으로 구분)
+- 소비자는 get_bars(ticker, tf, n)로 자기 타임프레임을 같은 버퍼에서 받는다
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from datetime import timedelta
+from itertools import islice
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+
+from app.io.quotes_delayed import Candle
+
+logger = logging.getLogger(__name__)
+
+TIMEFRAMES = (15, 30, 60, 300)
+BAR_BUFFER_LEN = int(os.getenv("BAR_BUFFER_LEN", "400"))
+
+
+def _bucket_start(ts, tf: int):
+    """tf(3600의 약수) 경계로 내림 (tz-aware/naive 모두 유지)"""
+    within = ts.minute * 60 + ts.second + ts.microsecond / 1e6
+    return ts - timedelta(seconds=within % tf)
+
+
+class BarAggregator:
+    """종목별 원본 봉 1벌 + 상위 타임프레임 롤링 버퍼"""
+
+    def __init__(self, timeframes: Iterable[int] = TIMEFRAMES, maxlen: int = BAR_BUFFER_LEN):
+        self.timeframes = tuple(sorted(int(tf) for tf in timeframes))
+        for tf in self.timeframes:
+            if 3600 % tf:
+                raise ValueError(f"타임프레임은 3600의 약수여야 함: {tf}")
+        self.maxlen = maxlen
+        self._base_sec: Dict[str, int] = {}
+        self._base: Dict[str, Deque[Candle]] = {}
+        self._rolled: Dict[Tuple[str, int], Deque[Candle]] = {}
+        self._last_ingest: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------ 입력
+    def ingest(self, ticker: str, bars: Iterable, base_sec: int = 60) -> int:
+        """원본 봉 반영 (마지막 봉 이후 + 동일 ts 갱신만) → 반영 개수"""
+        ticker = ticker.upper()
+        n = 0
+        with self._lock:
+            if self._base_sec.get(ticker, base_sec) != base_sec:
+                self._drop_locked(ticker)  # 원본 해상도 변경 → 버퍼 재구성
+            self._base_sec[ticker] = base_sec
+            base = self._base.setdefault(ticker, deque(maxlen=self.maxlen))
+            for b in bars:
+                last_ts = base[-1].ts if base else None
+                if last_ts is not None and b.ts < last_ts:
+                    continue
+                bar = b if isinstance(b, Candle) else Candle(ticker, b.ts, b.o, b.h, b.l, b.c, int(b.v or 0))
+                revised = last_ts is not None and b.ts == last_ts
+                if revised:
+                    if (bar.o, bar.h, bar.l, bar.c, bar.v) == (base[-1].o, base[-1].h, base[-1].l, base[-1].c, base[-1].v):
+                        continue
+                    base[-1] = bar
+                else:
+                    base.append(bar)
+                for tf in self.timeframes:
+                    if tf > base_sec:
+                        self._roll(ticker, tf, bar, revised)
+                n += 1
+            self._last_ingest[ticker] = time.time()
+        return n
+
+    def _roll(self, ticker: str, tf: int, bar: Candle, revised: bool) -> None:
+        buf = self._rolled.setdefault((ticker, tf), deque(maxlen=self.maxlen))
+        start = _bucket_start(bar.ts, tf)
+        if buf and buf[-1].ts == start:
+            if revised:
+                # 진행 중 원본 봉 갱신 → 해당 버킷만 원본에서 재계산 (버킷당 최대 tf/base개)
+                members = []
+                for b in reversed(self._base[ticker]):
+                    if b.ts < start:
+                        break
+                    members.append(b)
+                members.reverse()
+                buf[-1] = Candle(ticker, start, members[0].o, max(b.h for b in members),
+                                 min(b.l for b in members), members[-1].c, sum(b.v for b in members))
+            else:
+                cur = buf[-1]
+                buf[-1] = Candle(ticker, start, cur.o, max(cur.h, bar.h), min(cur.l, bar.l), bar.c, cur.v + bar.v)
+        elif not buf or start > buf[-1].ts:
+            buf.append(Candle(ticker, start, bar.o, bar.h, bar.l, bar.c, bar.v))
+
+    # ------------------------------------------------------------------ 조회
+    def get_bars(self, ticker: str, tf: int, n: int = 50) -> List[Candle]:
+        """tf초 봉 최근 n개 (원본보다 세밀하면 분할 뷰, 미지원 tf는 원본 해상도)"""
+        ticker = ticker.upper()
+        with self._lock:
+            base_sec = self._base_sec.get(ticker)
+            base = self._base.get(ticker)
+            if not base:
+                return []
+            if tf > base_sec and (ticker, tf) in self._rolled:
+                return _tail(self._rolled[(ticker, tf)], n)
+            if tf >= base_sec or base_sec % tf:
+                return _tail(base, n)
+            factor = base_sec // tf
+            src = _tail(base, -(-n // factor))
+        out: List[Candle] = []
+        for b in src:
+            vol_per = max(b.v // factor, 0)
+            for k in range(factor):
+                out.append(Candle(b.ticker, b.ts + timedelta(seconds=k * tf), b.o, b.h, b.l, b.c, vol_per, b.spread_est))
+        return out[-n:]
+
+    def resolution(self, ticker: str) -> Optional[int]:
+        return self._base_sec.get(ticker.upper())
+
+    def age_sec(self, ticker: str) -> Optional[float]:
+        """마지막 원본 반영 후 경과 초 (없으면 None)"""
+        ts = self._last_ingest.get(ticker.upper())
+        return None if ts is None else time.time() - ts
+
+    def tickers(self) -> List[str]:
+        return list(self._base)
+
+    def drop(self, ticker: str) -> None:
+        with self._lock:
+            self._drop_locked(ticker.upper())
+
+    def _drop_locked(self, ticker: str) -> None:
+        self._base.pop(ticker, None)
+        self._base_sec.pop(ticker, None)
+        self._last_ingest.pop(ticker, None)
+        for tf in self.timeframes:
+            self._rolled.pop((ticker, tf), None)
+
+
+def _tail(buf: Deque[Candle], n: int) -> List[Candle]:
+    return list(islice(buf, max(0, len(buf) - n), None))
+
+
+_bar_aggregator: Optional[BarAggregator] = None
+
+
+def get_bar_aggregator() -> BarAggregator:
+    """글로벌 봉 집계기 인스턴스 반환 (프로세스 내 인제스터/소비자 공유)"""
+    global _bar_aggregator
+    if _bar_aggregator is None:
+        _bar_aggregator = BarAggregator()
+    return _bar_aggregator
@@ -0,0 +1,183 @@
+"""
+디스크 봉 캐시 (워커 시작/재활용 시 즉시 워밍업)
+- 종목 × 거래일별 numpy 구조화 배열 파일: {root}/{TICKER}/{YYYYMMDD}.npy (ts epoch 초 + OHLCV)
+  · 로드는 mmap (필요한 최근 일자 파일만 뒤에서부터), 저장은 같은 ts 덮어쓰기 병합 후 원자적 교체
+- 종목별 최고 수위선(hwm): 마지막으로 저장된 봉 ts ({TICKER}/hwm) → 워밍업은 디스크 로드 후 hwm 이후 꼬리만 조회
+- 네트워크 없이도 캐시된 봉으로 버퍼를 채움, BAR_CACHE_DAYS 지난 일자 파일은 정리
+"""
+from __future__ import annotations
+
+import logging
+import math
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from app.io.quotes_delayed import Candle
+
+logger = logging.getLogger(__name__)
+
+BAR_CACHE_DIR = os.getenv("BAR_CACHE_DIR", "logs/bar_cache")
+BAR_CACHE_DAYS = int(os.getenv("BAR_CACHE_DAYS", "10"))
+BAR_CACHE_ENABLED = os.getenv("BAR_CACHE_ENABLED", "1") in ("1", "true", "True")
+
+BAR_DTYPE = np.dtype([("ts", "i8"), ("o", "f8"), ("h", "f8"), ("l", "f8"), ("c", "f8"), ("v", "i8")])
+
+
+def _epoch(ts: datetime) -> int:
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)  # tz 없는 봉은 UTC (알파카 인제스터 규약)
+    return int(ts.timestamp())
+
+
+def _day(epoch: int) -> str:
+    return datetime.fromtimestamp(epoch, tz=timezone.utc).strftime("%Y%m%d")
+
+
+class BarDiskCache:
+    """종목·일자별 봉 파일 + hwm"""
+
+    def __init__(self, root: str = BAR_CACHE_DIR, keep_days: int = BAR_CACHE_DAYS):
+        self.root = Path(root)
+        self.keep_days = keep_days
+        self._hwm: Dict[str, Optional[int]] = {}
+        self._lock = threading.Lock()
+
+    def _dir(self, ticker: str) -> Path:
+        return self.root / ticker.upper()
+
+    # ------------------------------------------------------------------ 저장
+    def save(self, ticker: str, bars: Iterable) -> int:
+        """봉 병합 저장 (같은 ts는 새 값으로) → 저장 행 수"""
+        rows = [(_epoch(b.ts), b.o, b.h, b.l, b.c, int(b.v or 0)) for b in bars if getattr(b, "ts", None)]
+        if not rows:
+            return 0
+        ticker = ticker.upper()
+        d = self._dir(ticker)
+        by_day: Dict[str, list] = {}
+        for r in rows:
+            by_day.setdefault(_day(r[0]), []).append(r)
+        with self._lock:
+            d.mkdir(parents=True, exist_ok=True)
+            for day, day_rows in by_day.items():
+                path = d / f"{day}.npy"
+                new = np.array(day_rows, dtype=BAR_DTYPE)
+                if path.exists():
+                    try:
+                        old = np.load(path)
+                        new = np.concatenate([old[~np.isin(old["ts"], new["ts"])], new])
+                    except Exception as e:
+                        logger.warning(f"봉 캐시 손상 → 덮어씀 ({path}): {e}")
+                new = new[np.argsort(new["ts"], kind="stable")]
+                _atomic_save(path, new)
+            top = max(r[0] for r in rows)
+            if top > (self.hwm_epoch(ticker) or 0):
+                _atomic_write_text(d / "hwm", str(top))
+                self._hwm[ticker] = top
+            self._prune(d)
+        return len(rows)
+
+    def _prune(self, d: Path) -> None:
+        days = sorted(p for p in d.glob("*.npy"))
+        for p in days[:-self.keep_days] if self.keep_days > 0 else []:
+            try:
+                p.unlink()
+            except OSError:
+                pass
+
+    # ------------------------------------------------------------------ 조회
+    def hwm_epoch(self, ticker: str) -> Optional[int]:
+        ticker = ticker.upper()
+        if ticker not in self._hwm:
+            val = None
+            try:
+                val = int((self._dir(ticker) / "hwm").read_text().strip())
+            except (OSError, ValueError):
+                days = sorted(self._dir(ticker).glob("*.npy")) if self._dir(ticker).exists() else []
+                if days:
+                    try:
+                        arr = np.load(days[-1], mmap_mode="r")
+                        val = int(arr["ts"][-1]) if len(arr) else None
+                    except Exception:
+                        val = None
+            self._hwm[ticker] = val
+        return self._hwm[ticker]
+
+    def hwm(self, ticker: str, naive: bool = False) -> Optional[datetime]:
+        e = self.hwm_epoch(ticker)
+        if e is None:
+            return None
+        ts = datetime.fromtimestamp(e, tz=timezone.utc)
+        return ts.replace(tzinfo=None) if naive else ts
+
+    def load(self, ticker: str, n: int, naive: bool = False) -> List[Candle]:
+        """최근 n개 봉 (최신 일자 파일부터 mmap으로 필요한 만큼만)"""
+        ticker = ticker.upper()
+        d = self._dir(ticker)
+        if n <= 0 or not d.exists():
+            return []
+        parts, have = [], 0
+        for path in sorted(d.glob("*.npy"), reverse=True):
+            try:
+                arr = np.load(path, mmap_mode="r")
+            except Exception as e:
+                logger.warning(f"봉 캐시 로드 실패 ({path}): {e}")
+                continue
+            parts.append(arr[max(0, len(arr) - (n - have)):])
+            have += len(parts[-1])
+            if have >= n:
+                break
+        if not parts:
+            return []
+        tz = None if naive else timezone.utc
+        out = []
+        for arr in reversed(parts):
+            for ts, o, h, l, c, v in arr.tolist():
+                when = datetime.fromtimestamp(ts, tz=timezone.utc)
+                out.append(Candle(ticker, when.replace(tzinfo=tz), o, h, l, c, v))
+        return out
+
+    def warm(self, aggregator, ticker: str, n: int, naive: bool = False, bar_sec: int = 60,
+             now: Optional[float] = None) -> int:
+        """디스크 봉을 집계기에 먼저 채움 → 네트워크로 받아야 할 꼬리 봉 수 (캐시 없으면 n)
+
+        마지막 저장 봉은 진행 중이었을 수 있어 hwm 봉부터 다시 받는다 (+1).
+        """
+        cached = self.load(ticker, n, naive)
+        top = self.hwm_epoch(ticker)
+        if not cached or top is None:
+            return n
+        aggregator.ingest(ticker, cached, base_sec=bar_sec)
+        now = time.time() if now is None else now
+        return min(n, max(0, math.ceil((now - top) / bar_sec)) + 1)
+
+
+def _atomic_save(path: Path, arr: np.ndarray) -> None:
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        np.save(f, arr)
+    os.replace(tmp, path)
+
+
+def _atomic_write_text(path: Path, text: str) -> None:
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(text)
+    os.replace(tmp, path)
+
+
+_bar_cache: Optional[BarDiskCache] = None
+
+
+def get_bar_cache() -> Optional[BarDiskCache]:
+    """글로벌 디스크 봉 캐시 (BAR_CACHE_ENABLED=0이면 None)"""
+    global _bar_cache
+    if not BAR_CACHE_ENABLED:
+        return None
+    if _bar_cache is None:
+        _bar_cache = BarDiskCache()
+    return _bar_cache
@@ -0,0 +1,291 @@
+"""
+페이로드 코덱 (스트림 메시지 / Redis 캐시 구조체 직렬화 단일 지점)
+- 바이너리: MAGIC(0xC1) + 스키마 버전 1바이트 + msgpack 본문
+  · 0xC1은 msgpack이 절대 쓰지 않는 바이트이고 JSON 텍스트 첫 글자도 될 수 없음 → 첫 바이트로 형식 판별
+- decode()는 형식을 가리지 않음: 바이너리든 기존 JSON 문자열/바이트든 같은 dict로 복원 (하위 호환)
+- 스트림: 바이너리 코덱이면 메시지 전체를 필드 1개(_p)로 XADD → 소비 시 중첩 dict/list 그대로 복원
+  (필드별 JSON 문자열화 → 소비자 재파싱 왕복 제거), json 코덱이면 기존 필드별 문자열 형식 유지
+- PAYLOAD_CODEC=msgpack|json (기본 msgpack, 미설치 시 json) — 혼합 배포 중에는 json으로 되돌림
+- 벤치마크: python -m app.io.codec --bench [--redis] (인코드/디코드 µs, 메시지당 바이트·Redis 메모리)
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import time
+from datetime import date, datetime
+from typing import Any, Dict, Optional
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - 선택 의존성
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+PAYLOAD_CODEC = os.getenv("PAYLOAD_CODEC", "msgpack").lower()
+MAGIC = b"\xc1"
+SCHEMA_VERSION = 1
+PAYLOAD_FIELD = "_p"  # 바이너리 스트림 엔트리의 단일 필드명
+
+
+def _default(o: Any) -> Any:
+    """표준 타입이 아닌 값 변환 (datetime → ISO, numpy 스칼라 → 파이썬 값)"""
+    if isinstance(o, (datetime, date)):
+        return o.isoformat()
+    if isinstance(o, (set, frozenset)):
+        return list(o)
+    if hasattr(o, "item"):
+        try:
+            return o.item()
+        except Exception:
+            pass
+    return str(o)
+
+
+class JsonCodec:
+    """기존 형식 (UTF-8 JSON)"""
+    name = "json"
+    binary = False
+
+    def encode(self, obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=_default).encode()
+
+    def decode(self, raw) -> Any:
+        return decode(raw)
+
+
+class MsgpackCodec:
+    """스키마 버전 헤더 + msgpack"""
+    name = "msgpack"
+    binary = True
+
+    def __init__(self):
+        if msgpack is None:
+            raise RuntimeError("msgpack 미설치")
+
+    def encode(self, obj: Any) -> bytes:
+        return MAGIC + bytes((SCHEMA_VERSION,)) + msgpack.packb(obj, default=_default, use_bin_type=True)
+
+    def decode(self, raw) -> Any:
+        return decode(raw)
+
+
+CODECS = {"json": JsonCodec, "msgpack": MsgpackCodec}
+
+
+def decode(raw) -> Any:
+    """바이너리(버전 헤더) / JSON 텍스트 모두 복원 (None → None)"""
+    if raw is None:
+        return None
+    if isinstance(raw, memoryview):
+        raw = raw.tobytes()
+    if isinstance(raw, (bytes, bytearray)) and raw[:1] == MAGIC:
+        version = raw[1] if len(raw) > 1 else 0
+        if version > SCHEMA_VERSION or version < 1:
+            raise ValueError(f"지원하지 않는 페이로드 스키마 버전: {version}")
+        if msgpack is None:
+            raise RuntimeError("msgpack 미설치 (바이너리 페이로드 디코드 불가)")
+        return msgpack.unpackb(memoryview(raw)[2:], raw=False, strict_map_key=False)
+    return json.loads(raw)
+
+
+def is_binary(raw) -> bool:
+    return isinstance(raw, (bytes, bytearray, memoryview)) and bytes(raw[:1]) == MAGIC
+
+
+# =============================================================================
+# 스트림 필드 변환
+# =============================================================================
+
+def coerce_text_fields(data: Dict) -> Dict:
+    """Redis XADD는 값으로 bytes/str/int/float만 허용한다.
+    dict/list/None 등은 안전하게 문자열로 변환한다. (json 코덱 스트림 형식)
+    """
+    coerced: Dict[str, Any] = {}
+    for key, value in data.items():
+        try:
+            # bool은 int로 변환 (bool은 int 하위 타입이라 먼저 검사)
+            if isinstance(value, bool):
+                coerced[key] = int(value)
+                continue
+            # 기본 허용 타입
+            if isinstance(value, (str, int, float)):
+                coerced[key] = value
+                continue
+            # dict/list → JSON 문자열
+            if isinstance(value, (dict, list)):
+                try:
+                    coerced[key] = json.dumps(value, ensure_ascii=False)
+                except Exception:
+                    coerced[key] = str(value)
+                continue
+            # datetime → isoformat
+            if isinstance(value, datetime):
+                coerced[key] = value.isoformat()
+                continue
+            # numpy 스칼라 처리 (np.int64, np.float64 등)
+            if hasattr(value, "item"):
+                try:
+                    item_val = value.item()
+                    if isinstance(item_val, bool):
+                        coerced[key] = int(item_val)
+                    elif isinstance(item_val, (str, int, float)):
+                        coerced[key] = item_val
+                    else:
+                        coerced[key] = str(item_val)
+                    continue
+                except Exception:
+                    pass
+            # 최후 수단: 문자열화
+            coerced[key] = str(value)
+        except Exception:
+            try:
+                coerced[key] = str(value)
+            except Exception:
+                coerced[key] = ""
+    return coerced
+
+
+def encode_stream_fields(message: Dict, codec=None) -> Dict:
+    """XADD 필드 맵: 바이너리 코덱 → {_p: 페이로드}, json 코덱 → 필드별 문자열"""
+    codec = codec or get_codec()
+    if codec.binary:
+        return {PAYLOAD_FIELD: codec.encode(message)}
+    return coerce_text_fields(message)
+
+
+def decode_stream_fields(fields: Dict) -> Dict[str, Any]:
+    """XREAD 필드 맵 → 메시지 dict (바이너리 단일 필드 / 기존 문자열 필드 모두)"""
+    raw = fields.get(PAYLOAD_FIELD, fields.get(PAYLOAD_FIELD.encode()))
+    if raw is not None and is_binary(raw):
+        try:
+            data = decode(raw)
+            if isinstance(data, dict):
+                return data
+        except Exception as e:
+            logger.warning(f"스트림 페이로드 디코드 실패: {e}")
+    return {_text(k): _text(v) for k, v in fields.items()}
+
+
+def _text(v) -> str:
+    if isinstance(v, (bytes, bytearray)):
+        return bytes(v).decode("utf-8", errors="replace")
+    return v if isinstance(v, str) else str(v)
+
+
+_codec = None
+
+
+def get_codec():
+    """글로벌 페이로드 코덱 (PAYLOAD_CODEC, msgpack 미설치 시 json)"""
+    global _codec
+    if _codec is None:
+        cls = CODECS.get(PAYLOAD_CODEC, JsonCodec)
+        try:
+            _codec = cls()
+        except Exception as e:
+            logger.warning(f"페이로드 코덱 {PAYLOAD_CODEC} 사용 불가 → json: {e}")
+            _codec = JsonCodec()
+    return _codec
+
+
+# =============================================================================
+# 벤치마크
+# =============================================================================
+
+def sample_messages() -> Dict[str, Any]:
+    """대표 페이로드 (signals.raw 발행 / signals:recent 항목 / EDGAR 중첩 필드)"""
+    signal = {
+        "ticker": "NVDA", "signal_type": "long", "score": 0.41237518, "confidence": 0.7312,
+        "regime": "trend", "tech_score": 0.5521, "sentiment_score": 0.1834, "edgar_bonus": 0.0,
+        "trigger": "breakout+vol_spike", "summary": "돌파 + 거래량 급증", "entry_price": 131.42,
+        "stop_loss": 129.87, "take_profit": 134.51, "horizon_minutes": 30,
+        "timestamp": "2026-10-16T14:31:05.120331+00:00", "config_version": "c3f1a9e0b2",
+    }
+    recent = {k: signal[k] for k in ("ticker", "signal_type", "score", "confidence", "regime", "timestamp")}
+    recent.update({"session": "RTH", "spread_bp": 3.8, "dollar_vol_5m": 18234567.5, "config_version": "c3f1a9e0b2"})
+    edgar = {
+        "ticker": "AAPL", "form": "8-K", "url": "https://www.sec.gov/Archives/edgar/data/320193/x.htm",
+        "items": ["2.02", "9.01"], "impact_score": 0.82,
+        "meta": {"filed": "2026-10-16T20:05:00Z", "cik": 320193, "tags": ["earnings", "guidance"]},
+        "snippet_hash": "5d41402abc4b2a76b9719d911017c592",
+    }
+    return {"signal": signal, "recent": recent, "edgar": edgar}
+
+
+def _time_us(fn, arg, n: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(n):
+        fn(arg)
+    return (time.perf_counter() - t0) / n * 1e6
+
+
+def benchmark(n: int = 20000, redis_client=None) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """코덱별 · 메시지별 인코드/디코드 µs, 바이트 수 (redis_client 지정 시 스트림 엔트리 메모리)"""
+    codecs = {"json": JsonCodec()}
+    if msgpack is not None:
+        codecs["msgpack"] = MsgpackCodec()
+    out: Dict[str, Dict[str, Dict[str, float]]] = {}
+    for name, codec in codecs.items():
+        res: Dict[str, Dict[str, float]] = {}
+        for kind, msg in sample_messages().items():
+            blob = codec.encode(msg)
+            row = {"bytes": len(blob), "encode_us": round(_time_us(codec.encode, msg, n), 3),
+                   "decode_us": round(_time_us(decode, blob, n), 3)}
+            if kind != "recent":
+                # 기존 스트림 경로: 필드별 문자열화 + 소비자 필드별 재파싱
+                fields = encode_stream_fields(msg, codec)
+                row["stream_encode_us"] = round(_time_us(lambda m: encode_stream_fields(m, codec), msg, n), 3)
+                row["stream_decode_us"] = round(_time_us(_legacy_consume if not codec.binary else decode_stream_fields,
+                                                         fields, n), 3)
+                if redis_client is not None:
+                    row["redis_bytes_per_msg"] = _redis_stream_bytes(redis_client, fields)
+            res[kind] = row
+        out[name] = res
+    return out
+
+
+def _legacy_consume(fields: Dict) -> Dict[str, Any]:
+    """기존 소비자 동작 재현: 필드마다 JSON 복원 시도"""
+    out = {}
+    for k, v in fields.items():
+        try:
+            out[k] = json.loads(v) if isinstance(v, str) and v[:1] in "[{" else v
+        except ValueError:
+            out[k] = v
+    return out
+
+
+def _redis_stream_bytes(r, fields: Dict, n: int = 1000) -> float:
+    key = f"bench:codec:{os.getpid()}:{time.time_ns()}"
+    try:
+        pipe = r.pipeline(transaction=False)
+        for _ in range(n):
+            pipe.xadd(key, fields)
+        pipe.execute()
+        return round(float(r.memory_usage(key, samples=0) or 0) / n, 1)
+    finally:
+        r.delete(key)
+
+
+def _main(argv: Optional[list] = None) -> None:
+    ap = argparse.ArgumentParser(description="페이로드 코덱 벤치마크")
+    ap.add_argument("--bench", action="store_true")
+    ap.add_argument("-n", type=int, default=20000)
+    ap.add_argument("--redis", action="store_true", help="REDIS_URL 스트림에 실제 적재해 메시지당 메모리 측정")
+    args = ap.parse_args(argv)
+    if not args.bench:
+        ap.print_help()
+        return
+    client = None
+    if args.redis:
+        import redis
+        client = redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+    print(json.dumps(benchmark(args.n, client), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    _main()
@@ -0,0 +1,190 @@
+"""
+로컬 가짜 시세 피드 (오프라인 테스트/리플레이용 TCP 서버)
+- 프로토콜: 줄 단위 JSON, 알파카 데이터 스트림과 같은 메시지 형식
+  · 클라이언트 → {"action": "subscribe"|"unsubscribe", "trades": [...], "bars": [...]}
+  · 서버 → {"T": "t", "S": 종목, "p": 가격, "s": 수량, "t": ISO8601} / {"T": "b", ...OHLCV}
+- publish()는 해당 종목을 구독한 연결에만 전송, drop_clients()로 끊김(재연결/백필) 재현
+- 실행: python -m app.io.fake_feed --port 9100 --bars bars.jsonl.gz --speed 60
+  (시뮬레이터 봉 파일을 봉당 체결 4건(o/h/l/c)으로 풀어 배속 재생)
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import socketserver
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def setup(self):
+        super().setup()
+        self._wlock = threading.Lock()
+
+    def handle(self):
+        feed: LocalFeedServer = self.server.feed  # type: ignore[attr-defined]
+        feed._register(self)
+        try:
+            self._send([{"T": "success", "msg": "connected"}])
+            for line in self.rfile:
+                try:
+                    msg = json.loads(line)
+                except ValueError:
+                    continue
+                action = msg.get("action")
+                tickers = {t.upper() for t in (msg.get("trades") or []) + (msg.get("bars") or [])}
+                if action == "subscribe":
+                    feed._subscribe(self, tickers)
+                elif action == "unsubscribe":
+                    feed._unsubscribe(self, tickers)
+                self._send([{"T": "subscription", "trades": sorted(feed._subs.get(self, ()))}])
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            feed._unregister(self)
+
+    def _send(self, payload) -> None:
+        with self._wlock:  # 발행 스레드와 구독 응답이 같은 소켓에 씀
+            self.wfile.write((json.dumps(payload) + "\n").encode())
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class LocalFeedServer:
+    """구독 기반 로컬 TCP 피드"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self._server = _Server((host, port), _Handler)
+        self._server.feed = self  # type: ignore[attr-defined]
+        self._subs: Dict[_Handler, Set[str]] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.sent = 0
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self._server.server_address[:2]
+
+    @property
+    def url(self) -> str:
+        host, port = self.address
+        return f"tcp://{host}:{port}"
+
+    def start(self) -> "LocalFeedServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-feed", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.drop_clients()
+        self._server.shutdown()
+        self._server.server_close()
+
+    # ------------------------------------------------------------------ 연결/구독
+    def _register(self, h: _Handler) -> None:
+        with self._lock:
+            self._subs[h] = set()
+
+    def _unregister(self, h: _Handler) -> None:
+        with self._lock:
+            self._subs.pop(h, None)
+
+    def _subscribe(self, h: _Handler, tickers: Set[str]) -> None:
+        with self._lock:
+            self._subs.setdefault(h, set()).update(tickers)
+
+    def _unsubscribe(self, h: _Handler, tickers: Set[str]) -> None:
+        with self._lock:
+            self._subs.get(h, set()).difference_update(tickers)
+
+    def subscriptions(self) -> Set[str]:
+        with self._lock:
+            return set().union(*self._subs.values()) if self._subs else set()
+
+    def clients(self) -> int:
+        return len(self._subs)
+
+    def drop_clients(self) -> None:
+        """모든 연결 강제 종료 (재연결/공백 백필 재현)"""
+        with self._lock:
+            handlers = list(self._subs)
+        for h in handlers:
+            try:
+                h.connection.shutdown(2)
+            except OSError:
+                pass
+
+    # ------------------------------------------------------------------ 발행
+    def publish(self, msg: dict) -> int:
+        ticker = (msg.get("S") or "").upper()
+        with self._lock:
+            targets = [h for h, subs in self._subs.items() if ticker in subs]
+        for h in targets:
+            try:
+                h._send([msg])
+                self.sent += 1
+            except OSError:
+                pass
+        return len(targets)
+
+    def trade(self, ticker: str, price: float, size: int = 100, ts: Optional[datetime] = None) -> int:
+        ts = ts or datetime.now(timezone.utc)
+        return self.publish({"T": "t", "S": ticker.upper(), "p": float(price), "s": int(size), "t": ts.isoformat()})
+
+    def bar(self, ticker: str, ts: datetime, o: float, h: float, l: float, c: float, v: int) -> int:
+        return self.publish({"T": "b", "S": ticker.upper(), "o": o, "h": h, "l": l, "c": c, "v": v,
+                             "t": ts.isoformat()})
+
+    def replay_bars(self, bars_by_ticker: Dict[str, List], speed: float = 60.0, bar_sec: int = 60) -> int:
+        """종목별 봉(load_bars_jsonl 결과) → 시각순 체결 4건(o/h/l/c)으로 풀어 배속 재생 (speed=0이면 대기 없음)"""
+        by_ts: Dict[datetime, List[Tuple[str, object]]] = {}
+        for ticker, bars in bars_by_ticker.items():
+            for b in bars:
+                ts = b.ts if b.ts.tzinfo else b.ts.replace(tzinfo=timezone.utc)
+                by_ts.setdefault(ts, []).append((ticker, b))
+        n = 0
+        for ts in sorted(by_ts):
+            for ticker, b in by_ts[ts]:
+                for px in (b.o, b.h, b.l, b.c):
+                    n += self.trade(ticker, px, max(int(b.v) // 4, 1), ts)
+            if speed > 0:
+                time.sleep(bar_sec / speed)
+        return n
+
+
+def _main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="로컬 가짜 시세 피드 (TCP, 알파카 메시지 형식)")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=9100)
+    ap.add_argument("--bars", help="시뮬레이터 봉 파일 (jsonl / jsonl.gz)")
+    ap.add_argument("--speed", type=float, default=60.0, help="배속 (봉 1개 = bar_sec / speed 초)")
+    args = ap.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    feed = LocalFeedServer(args.host, args.port).start()
+    logger.info(f"가짜 피드 시작: {feed.url} (QUOTES_STREAM_URL로 지정)")
+    try:
+        if args.bars:
+            from app.adapters.market_simulator import load_bars_jsonl
+            while not feed.subscriptions():
+                time.sleep(0.5)
+            sent = feed.replay_bars(load_bars_jsonl(args.bars), speed=args.speed)
+            logger.info(f"재생 완료: 체결 {sent}건 전송")
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        feed.stop()
+
+
+if __name__ == "__main__":
+    _main()
@@ -0,0 +1,204 @@
+"""
+최종가 서비스 (종목별 가격 + 시각 + 출처, 신선도 한도 내 조회)
+- 공급: update_quotes 시세 인제스트 경로(종목 일괄) + 미스 시 브로커 다종목 스냅샷 1회
+- 저장: 프로세스 로컬 L1 + Redis 해시 prices:last (워커/API 프로세스 간 공유)
+- 조회: 가격 캡 프리필터, 스톱 거리, 총 리스크, /portfolio/price 가 종목별 REST 대신 여기서 읽음
+  · max_age_sec 초과(또는 없음) 종목만 모아 fetcher(tickers) 1회로 보충
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional
+
+import redis
+
+logger = logging.getLogger(__name__)
+
+LAST_PRICE_KEY = "prices:last"
+LAST_PRICE_MAX_AGE_SEC = float(os.getenv("LAST_PRICE_MAX_AGE_SEC", "60"))  # update_quotes 2주기
+LAST_PRICE_KEY_TTL_SEC = 86400
+
+
+@dataclass
+class LastPrice:
+    price: float
+    ts: float           # epoch 초 (가격 관측 시각)
+    source: str         # quotes | snapshot | manual
+
+    def age(self, now: Optional[float] = None) -> float:
+        return (time.time() if now is None else now) - self.ts
+
+    def to_json(self) -> str:
+        return json.dumps({"p": self.price, "ts": self.ts, "src": self.source})
+
+    @classmethod
+    def from_json(cls, raw) -> Optional["LastPrice"]:
+        try:
+            d = json.loads(raw)
+            return cls(float(d["p"]), float(d["ts"]), str(d.get("src", "")))
+        except Exception:
+            return None
+
+
+def _epoch(ts) -> float:
+    if ts is None:
+        return time.time()
+    if isinstance(ts, datetime):
+        return ts.timestamp()
+    return float(ts)
+
+
+class LastPriceService:
+    """신선도 한도가 있는 종목 최종가 캐시"""
+
+    def __init__(self, redis_client=None, max_age_sec: float = LAST_PRICE_MAX_AGE_SEC,
+                 fetcher: Optional[Callable[[List[str]], Dict[str, float]]] = None, clock=time.time):
+        self.redis = redis_client
+        self.max_age_sec = max_age_sec
+        self.fetcher = fetcher
+        self._clock = clock
+        self._local: Dict[str, LastPrice] = {}
+        self._lock = threading.Lock()
+        self.stats = {"local": 0, "redis": 0, "fetched": 0, "miss": 0}
+
+    # ------------------------------------------------------------------ 공급
+    def update(self, ticker: str, price: float, ts=None, source: str = "quotes") -> None:
+        self.update_many({ticker: price}, ts, source)
+
+    def update_many(self, prices: Dict[str, float], ts=None, source: str = "quotes") -> int:
+        """가격 일괄 반영 (0 이하/None 무시, 더 오래된 관측은 덮어쓰지 않음) → 반영 개수"""
+        when = _epoch(ts) if ts is not None else self._clock()
+        fresh: Dict[str, LastPrice] = {}
+        with self._lock:
+            for ticker, price in prices.items():
+                try:
+                    price = float(price or 0)
+                except (TypeError, ValueError):
+                    continue
+                if price <= 0:
+                    continue
+                t = ticker.upper()
+                cur = self._local.get(t)
+                if cur is not None and cur.ts > when:
+                    continue
+                self._local[t] = fresh[t] = LastPrice(price, when, source)
+        if fresh and self.redis is not None:
+            try:
+                pipe = self.redis.pipeline(transaction=False)
+                pipe.hset(LAST_PRICE_KEY, mapping={t: lp.to_json() for t, lp in fresh.items()})
+                pipe.expire(LAST_PRICE_KEY, LAST_PRICE_KEY_TTL_SEC)
+                pipe.execute()
+            except Exception as e:
+                logger.debug(f"최종가 Redis 기록 실패: {e}")
+        return len(fresh)
+
+    # ------------------------------------------------------------------ 조회
+    def get_entries(self, tickers: Iterable[str], max_age_sec: Optional[float] = None,
+                    fetch: bool = True, fetcher: Optional[Callable] = None) -> Dict[str, LastPrice]:
+        """신선한 항목만: L1 → Redis → (남은 종목 일괄) fetcher (호출자 어댑터 지정 가능)"""
+        fetcher = fetcher or self.fetcher
+        limit = self.max_age_sec if max_age_sec is None else max_age_sec
+        now = self._clock()
+        wanted = list(dict.fromkeys(t.upper() for t in tickers))
+        out: Dict[str, LastPrice] = {}
+        missing: List[str] = []
+        for t in wanted:
+            lp = self._local.get(t)
+            if lp is not None and lp.age(now) <= limit:
+                out[t] = lp
+                self.stats["local"] += 1
+            else:
+                missing.append(t)
+
+        if missing and self.redis is not None:
+            try:
+                raws = self.redis.hmget(LAST_PRICE_KEY, missing)
+                still = []
+                for t, raw in zip(missing, raws):
+                    lp = LastPrice.from_json(raw) if raw else None
+                    if lp is not None:
+                        with self._lock:
+                            cur = self._local.get(t)
+                            if cur is None or lp.ts > cur.ts:
+                                self._local[t] = lp
+                    if lp is not None and lp.age(now) <= limit:
+                        out[t] = lp
+                        self.stats["redis"] += 1
+                    else:
+                        still.append(t)
+                missing = still
+            except Exception as e:
+                logger.debug(f"최종가 Redis 조회 실패: {e}")
+
+        if missing and fetch and fetcher is not None:
+            try:
+                got = fetcher(missing) or {}
+            except Exception as e:
+                logger.warning(f"최종가 스냅샷 조회 실패 ({len(missing)}종목): {e}")
+                got = {}
+            self.update_many(got, source="snapshot")
+            got_keys = {k.upper() for k in got}
+            for t in missing:
+                lp = self._local.get(t)
+                if t in got_keys and lp is not None:
+                    out[t] = lp
+                    self.stats["fetched"] += 1
+        self.stats["miss"] += len(wanted) - len(out)
+        return out
+
+    def get_entry(self, ticker: str, max_age_sec: Optional[float] = None, fetch: bool = True,
+                  fetcher: Optional[Callable] = None) -> Optional[LastPrice]:
+        return self.get_entries([ticker], max_age_sec, fetch, fetcher).get(ticker.upper())
+
+    def get_many(self, tickers: Iterable[str], max_age_sec: Optional[float] = None,
+                 fetch: bool = True, fetcher: Optional[Callable] = None) -> Dict[str, float]:
+        return {t: lp.price for t, lp in self.get_entries(tickers, max_age_sec, fetch, fetcher).items()}
+
+    def get(self, ticker: str, max_age_sec: Optional[float] = None, fetch: bool = True,
+            fetcher: Optional[Callable] = None) -> Optional[float]:
+        lp = self.get_entry(ticker, max_age_sec, fetch, fetcher)
+        return lp.price if lp else None
+
+
+def adapter_price_fetcher(trading_adapter) -> Callable[[List[str]], Dict[str, float]]:
+    """브로커 어댑터 → 다종목 스냅샷 fetcher (일괄 API 없으면 종목별 조회)"""
+    def _fetch(tickers: List[str]) -> Dict[str, float]:
+        batch = getattr(trading_adapter, "get_latest_prices", None)
+        if callable(batch):
+            return batch(tickers)
+        out = {}
+        for t in tickers:
+            p = trading_adapter.get_current_price(t)
+            if p:
+                out[t] = p
+        return out
+    return _fetch
+
+
+_last_price_service: Optional[LastPriceService] = None
+
+
+def get_last_price_service() -> LastPriceService:
+    """글로벌 최종가 서비스 인스턴스 반환 (fetcher는 트레이딩 어댑터 지연 연결)"""
+    global _last_price_service
+    if _last_price_service is None:
+        redis_client = None
+        try:
+            redis_url = os.getenv("REDIS_URL")
+            if redis_url:
+                redis_client = redis.from_url(redis_url)
+        except Exception:
+            redis_client = None
+
+        def _adapter_fetch(tickers: List[str]) -> Dict[str, float]:
+            from app.adapters.trading_adapter import get_trading_adapter
+            return adapter_price_fetcher(get_trading_adapter())(tickers)
+
+        _last_price_service = LastPriceService(redis_client=redis_client, fetcher=_adapter_fetch)
+    return _last_price_service
@@ -5,12 +5,18 @@ Alpaca Data API를 통한 1분봉 데이터 수집
 import os
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, List
+from typing import Dict, List, Optional
 from dataclasses import dataclass
 import importlib
 
+from app.io.bar_aggregator import BAR_BUFFER_LEN, get_bar_aggregator
+from app.io.bar_cache import get_bar_cache
+
 logger = logging.getLogger(__name__)
 
+# 봉 집계기 데이터가 이 시간(초) 안에 갱신됐으면 REST 재조회 없이 반환
+ALPACA_BAR_TTL_SEC = float(os.getenv("ALPACA_BAR_TTL_SEC", "30"))
+
 @dataclass
 class Candle:
     """캔들 데이터 (기존 코드 호환: o/h/l/c/v, ts)"""
@@ -24,6 +30,8 @@ class Candle:
 class AlpacaQuotesIngestor:
     """Alpaca 시세 인제스터"""
     
+    naive_ts = True  # 봉 ts는 tz 제거 UTC (스트림 봉도 같은 형식으로 맞춤)
+    
     def __init__(self):
         """초기화"""
         try:
@@ -41,18 +49,54 @@ class AlpacaQuotesIngestor:
             api_key=os.getenv("ALPACA_API_KEY"),
             secret_key=os.getenv("ALPACA_API_SECRET")
         )
-        self.cache = {}  # 캔들 데이터 캐시
+        self.bars = get_bar_aggregator()  # 1분봉 단일 버퍼 (다른 타임프레임도 여기서 파생)
         self.tickers = []  # 티커 리스트 (호환성)
         logger.info("Alpaca Quotes 인제스터 초기화 완료")
     
     def get_latest_candles(self, ticker: str, n: int = 100) -> List[Candle]:
-        """최근 n개 캔들 조회"""
+        """최근 n개 1분봉 (집계기 데이터가 신선하고 충분하면 재조회 없음)"""
+        age = self.bars.age_sec(ticker)
+        if age is not None and age < ALPACA_BAR_TTL_SEC:
+            cached = self.bars.get_bars(ticker, 60, n)
+            if len(cached) >= min(n, BAR_BUFFER_LEN):
+                return cached
+        self._ingest(ticker, n)
+        return self.bars.get_bars(ticker, 60, n)  # 조회 실패 시 기존 버퍼
+
+    def _ingest(self, ticker: str, n: int, start: Optional[datetime] = None) -> int:
+        candles = self._fetch_bars(ticker, n, start)
+        if not candles:
+            return 0
+        cache = get_bar_cache()
+        if cache is not None:
+            try:
+                cache.save(ticker, candles)
+            except Exception as e:  # noqa: BLE001
+                logger.debug("Alpaca %s 봉 캐시 저장 실패: %s", ticker, e)
+        return self.bars.ingest(ticker, candles, base_sec=60)
+
+    def _warm(self, ticker: str, n: int) -> int:
+        """디스크 캐시로 버퍼를 먼저 채우고 hwm 이후 꼬리만 조회 (조회 실패 시 캐시 봉 유지) → 조회 봉 수"""
+        cache = get_bar_cache()
+        if cache is None:
+            return self._ingest(ticker, n)
+        tail = cache.warm(self.bars, ticker, min(n, BAR_BUFFER_LEN), naive=True)
+        if tail >= min(n, BAR_BUFFER_LEN):
+            return self._ingest(ticker, n)
+        return self._ingest(ticker, tail, start=cache.hwm(ticker, naive=True)) if tail > 0 else 0
+
+    def fetch_recent_bars(self, ticker: str, n: int = 200) -> List[Candle]:
+        """최근 n개 1분봉 REST 조회 (버퍼 미반영, 스트림 공백 백필용)"""
+        return self._fetch_bars(ticker, n)
+
+    def _fetch_bars(self, ticker: str, n: int, start: Optional[datetime] = None) -> List[Candle]:
+        """Alpaca Data API 1분봉 조회 (start 지정 시 그 시각부터 = 디스크 캐시 꼬리)"""
         try:
             # 1분봉 요청
             request = self._StockBarsRequest(
                 symbol_or_symbols=[ticker],
                 timeframe=self._TimeFrame.Minute,
-                start=datetime.now() - timedelta(days=5),  # 5일 전부터
+                start=start or datetime.now() - timedelta(days=5),  # 5일 전부터
                 limit=n
             )
             
@@ -115,14 +159,12 @@ class AlpacaQuotesIngestor:
                     except Exception:  # noqa: BLE001
                         continue
             
-            # 캐시 업데이트
-            self.cache[ticker] = candles
             logger.debug("Alpaca %s: %d개 캔들 조회", ticker, len(candles))
             return candles
             
         except Exception as e:  # noqa: BLE001
             logger.error("Alpaca %s 캔들 조회 실패: %s", ticker, e)
-            return self.cache.get(ticker, [])
+            return []
     
     def update_all_tickers(self, tickers: List[str] = None):
         """모든 티커 업데이트"""
@@ -134,7 +176,8 @@ class AlpacaQuotesIngestor:
         
         for ticker in tickers:
             try:
-                self.get_latest_candles(ticker, 200)
+                # 이미 버퍼가 있으면 최근 봉만 증분 조회
+                self._ingest(ticker, 200 if self.bars.age_sec(ticker) is None else 10)
             except Exception as e:  # noqa: BLE001
                 logger.error("Alpaca %s 업데이트 실패: %s", ticker, e)
     
@@ -155,7 +198,7 @@ class AlpacaQuotesIngestor:
 
     def get_technical_indicators(self, ticker: str) -> Dict:
         """기술지표 반환 (delayed 인제스터와 동일 키)"""
-        candles = self.cache.get(ticker)
+        candles = self.bars.get_bars(ticker, 60, 50)
         if not candles:
             try:
                 candles = self.get_latest_candles(ticker, 50)
@@ -174,28 +217,41 @@ class AlpacaQuotesIngestor:
         self.update_all_tickers()
     
     def update_universe_tickers(self, tickers: List[str]):
-        """유니버스 티커 업데이트"""
-        self.update_all_tickers(tickers)
+        """유니버스 티커 업데이트 (추가 종목만 워밍업, 제거 종목은 캐시 정리)"""
+        new_set = [t.strip().upper() for t in tickers if t and t.strip()]
+        current = set(self.tickers or [])
+        added = [t for t in new_set if t not in current]
+        removed = [t for t in current if t not in set(new_set)]
+        self.tickers = new_set
+        for t in removed:
+            self.bars.drop(t)
+        if added:
+            logger.info("Alpaca 유니버스 변경: +%d -%d", len(added), len(removed))
+            for ticker in added:
+                try:
+                    self._warm(ticker, 200)
+                except Exception as e:  # noqa: BLE001
+                    logger.error("Alpaca %s 워밍업 실패: %s", ticker, e)
     
     def warmup_backfill(self, tickers: List[str], days_back: int = 5):
         """워밍업 백필"""
         logger.info("Alpaca 워밍업 백필: %d개 티커, %d일", len(tickers), days_back)
         for ticker in tickers:
             try:
-                self.get_latest_candles(ticker, days_back * 390)  # 6.5시간 * 60분
+                self._warm(ticker, days_back * 390)  # 6.5시간 * 60분
             except Exception as e:  # noqa: BLE001
                 logger.error("Alpaca %s 워밍업 실패: %s", ticker, e)
     
     def get_cached_candles(self, ticker: str) -> List[Candle]:
         """캐시된 캔들 조회"""
-        return self.cache.get(ticker, [])
+        return self.bars.get_bars(ticker, 60, BAR_BUFFER_LEN)
     
     def get_market_data_summary(self) -> Dict:
         """티커별 시세/지표 맵 (scheduler.update_quotes 호환)"""
         result: Dict[str, Dict] = {}
-        for ticker, candles in self.cache.items():
+        for ticker in self.bars.tickers():
             try:
-                candles = candles or []
+                candles = self.get_cached_candles(ticker)
                 last_close = float(candles[-1].c) if candles else 0.0
                 indicators = self._compute_indicators_from_candles(candles)
                 last_ts = candles[-1].ts if candles else datetime.utcnow()
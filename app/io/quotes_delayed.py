@@ -5,6 +5,9 @@ Produces simple OHLCV bars for a small watchlist, suitable for demo/Day3.
 Env:
 - TICKERS: comma-separated symbols
 - BAR_SEC: 30 or 60 (default 30). Yahoo offers 1m; 30s bars are approximated.
+
+Bars are stored once at 1m resolution in the shared BarAggregator
+(app.io.bar_aggregator); 30s/15s views are split on read.
 """
 from __future__ import annotations
 
@@ -30,17 +33,25 @@ class Candle:
 
 
 class DelayedQuotesIngestor:
+    delayed_feed = True  # Yahoo 지연 시세: 최종가는 봉 시작 ts로 기록 (신선한 값으로 보이지 않도록)
+
     def __init__(self, tickers_csv: Optional[str] = None, bar_sec: int = 30):
         self.tickers: List[str] = [t.strip().upper() for t in (tickers_csv or os.getenv("TICKERS", "AAPL,MSFT")).split(",") if t.strip()]
         self.bar_sec: int = int(os.getenv("BAR_SEC", str(bar_sec)))
         if self.bar_sec not in (15, 30, 60):
             self.bar_sec = 30
         self.market_data: Dict[str, Dict] = {}
+        from app.io.bar_aggregator import get_bar_aggregator
+        self.bars = get_bar_aggregator()
         self.verbose: bool = (os.getenv("QUOTE_LOG_VERBOSE", "false").lower() in ("1", "true", "yes", "on"))
         self._logger = logging.getLogger(__name__)
 
-    def _fetch_yahoo_1m(self, ticker: str) -> Dict:
+    def _fetch_yahoo_1m(self, ticker: str, since: Optional[datetime] = None) -> Dict:
         url = f"https://query1.finance.yahoo.com/v8/finance/chart/{ticker}?range=1d&interval=1m"
+        if since is not None:
+            # tail only (disk cache high-water mark → now)
+            url = (f"https://query1.finance.yahoo.com/v8/finance/chart/{ticker}"
+                   f"?period1={int(since.timestamp())}&period2={int(datetime.now(timezone.utc).timestamp())}&interval=1m")
         headers = {"User-Agent": os.getenv("SEC_USER_AGENT", "curl/7")}
         with httpx.Client(headers=headers, timeout=10.0) as client:
             r = client.get(url)
@@ -113,24 +124,6 @@ class DelayedQuotesIngestor:
                 candles.append(cndl)
             except Exception:
                 continue
-        # If BAR_SEC==30 or 15, approximate by splitting each 1m bar
-        if self.bar_sec in (30, 15) and candles:
-            split: List[Candle] = []
-            factor = 2 if self.bar_sec == 30 else 4
-            if getattr(self, "verbose", False):
-                try:
-                    self._logger.info(f"[YAPI.PARSE] {ticker} split 1m into factor={factor}")
-                except Exception:
-                    pass
-            for c in candles:
-                vol_per = max(c.v // factor, 0)
-                for _ in range(factor):
-                    split.append(Candle(
-                        ticker=c.ticker,
-                        ts=c.ts,  # keep same ts; downstream uses ordering not exact spacing
-                        o=c.o, h=c.h, l=c.l, c=c.c, v=vol_per, spread_est=c.spread_est
-                    ))
-            candles = split
         trimmed = candles[-200:]
         if getattr(self, "verbose", False) and trimmed:
             try:
@@ -139,29 +132,76 @@ class DelayedQuotesIngestor:
                 pass
         return trimmed
 
-    def update_all_tickers(self) -> None:
-        for t in self.tickers:
+    def _refresh(self, t: str, since: Optional[datetime] = None) -> None:
+        raw = self._fetch_yahoo_1m(t) if since is None else self._fetch_yahoo_1m(t, since)
+        candles = self._parse_1m_to_candles(t, raw)
+        self.bars.ingest(t, candles, base_sec=60)
+        self._persist(t, candles)
+        self.refresh_market_data(t)
+
+    def _persist(self, t: str, candles: List[Candle]) -> None:
+        """Write fetched bars to the disk warm cache (best-effort)."""
+        from app.io.bar_cache import get_bar_cache
+        cache = get_bar_cache()
+        if cache is None or not candles:
+            return
+        try:
+            cache.save(t, candles)
+        except Exception as e:
+            self._logger.debug(f"bar cache save failed {t}: {e}")
+
+    def _warm(self, t: str) -> None:
+        """Fill the buffer from the disk cache, then fetch only bars after its high-water mark.
+
+        A fresh cache skips the network; a failed tail fetch keeps the cached bars (offline start).
+        """
+        from app.io.bar_cache import get_bar_cache
+        cache = get_bar_cache()
+        if cache is None:
+            self._refresh(t)
+            return
+        tail = cache.warm(self.bars, t, 200)
+        hwm = cache.hwm(t)
+        if hwm is None:
+            self._refresh(t)
+            return
+        if tail <= 2:  # high-water mark within the last minute: next update_quotes tops it up
+            self.refresh_market_data(t)
+            return
+        try:
+            self._refresh(t, since=hwm if tail < 200 else None)
+        except Exception as e:
+            self._logger.warning(f"bar cache tail fetch failed {t}, using cached bars: {e}")
+            self.refresh_market_data(t)
+
+    def fetch_recent_bars(self, t: str, n: int = 200) -> List[Candle]:
+        """Recent 1m bars from Yahoo without touching the shared buffer (stream gap backfill)."""
+        return self._parse_1m_to_candles(t, self._fetch_yahoo_1m(t))[-n:]
+
+    def refresh_market_data(self, t: str) -> None:
+        """Recompute price/indicators from the shared buffer (no fetch; used when a stream feeds bars)."""
+        candles = self.get_latest_candles(t, 200)
+        last_price = candles[-1].c if candles else 0.0
+        self.market_data[t] = {
+            "current_price": last_price,
+            "indicators": self._compute_indicators_from_candles(candles),
+            "last_update": datetime.now(timezone.utc),
+        }
+        if getattr(self, "verbose", False):
+            try:
+                self._logger.info(f"[YAPI.DONE] {t} last={last_price:.4f} candles={len(candles)}")
+            except Exception:
+                pass
+
+    def update_all_tickers(self, tickers: Optional[List[str]] = None) -> None:
+        for t in (self.tickers if tickers is None else tickers):
             try:
-                raw = self._fetch_yahoo_1m(t)
-                candles = self._parse_1m_to_candles(t, raw)
-                last_price = candles[-1].c if candles else 0.0
-                self.market_data[t] = {
-                    "candles": candles,
-                    "current_price": last_price,
-                    "indicators": self._compute_indicators_from_candles(candles),
-                    "last_update": datetime.now(timezone.utc),
-                }
-                if getattr(self, "verbose", False):
-                    try:
-                        self._logger.info(f"[YAPI.DONE] {t} last={last_price:.4f} candles={len(candles)}")
-                    except Exception:
-                        pass
+                self._refresh(t)
             except Exception:
                 continue
 
     def get_latest_candles(self, ticker: str, n: int = 50) -> List[Candle]:
-        c = self.market_data.get(ticker, {}).get("candles", [])
-        return c[-n:]
+        return self.bars.get_bars(ticker, self.bar_sec, n)
 
     def get_technical_indicators(self, ticker: str) -> Dict:
         # simple placeholder; real indicators computed elsewhere
@@ -200,11 +240,8 @@ class DelayedQuotesIngestor:
         self.tickers = new_set
         # cleanup removed
         for t in removed:
-            if t in self.market_data:
-                try:
-                    del self.market_data[t]
-                except Exception:
-                    pass
+            self.market_data.pop(t, None)
+            self.bars.drop(t)
         # warmup fetch for added symbols
         if added:
             try:
@@ -217,16 +254,6 @@ class DelayedQuotesIngestor:
         target = symbols or list(self.tickers)
         for t in target:
             try:
-                raw = self._fetch_yahoo_1m(t)
-                candles = self._parse_1m_to_candles(t, raw)
-                last_price = candles[-1].c if candles else 0.0
-                self.market_data[t] = {
-                    "candles": candles,
-                    "current_price": last_price,
-                    "indicators": self._compute_indicators_from_candles(candles),
-                    "last_update": datetime.now(timezone.utc),
-                }
+                self._warm(t)
             except Exception:
                 continue
-
-
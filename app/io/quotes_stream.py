@@ -0,0 +1,638 @@
+"""
+스트리밍 시세 인제스트 (데이터 소스당 장기 구독 1개)
+- 폴링(update_quotes 30초 + 종목별 REST) 대신 소스 연결 1개로 체결/분봉을 밀어받음 → 초 미만 지연, 유니버스 크기와 무관한 요청 비용
+- 구독 관리: set_universe()로 원하는 종목 집합만 바꾸면 수신 루프가 subscribe/unsubscribe 차분 전송
+- 재연결: 지수 백오프, 재구독 시 종목별 마지막 봉 이후 공백을 REST 백필(backfill)로 메운 뒤 스트림 반영
+- 봉 생성: 체결 → bar_sec 버킷 OHLCV (진행 중 봉 포함), flush_sec 주기로 공유 BarAggregator + 최종가 서비스에 반영
+- 소스: 알파카 호환 메시지({"T": "t"|"b", "S": 종목, ...})
+  · TcpJsonFeed: 줄 단위 JSON over TCP (app.io.fake_feed 로컬 가짜 피드, 오프라인 테스트)
+  · AlpacaWebsocketFeed: 알파카 데이터 스트림 웹소켓
+- 배치: 수신 루프는 전용 프로세스(python -m app.io.quotes_stream, docker-compose quotes_stream)에서만 실행
+  · 셀러리 자식 프로세스는 max-tasks-per-child로 수 분마다 재시작되므로 연결을 들고 있지 않는다
+  · 서비스 → Redis: 종목별 최근 봉 리스트 + 반영 시각 + 연결 상태 (RedisBarPublisher)
+  · 워커 → Redis: 원하는 구독 종목 기록, 신선한 종목의 봉만 읽어 프로세스 봉 집계기에 반영 (StreamBarReader)
+"""
+from __future__ import annotations
+
+import json
+import logging
+import math
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from app.io.bar_aggregator import BAR_BUFFER_LEN, _bucket_start, get_bar_aggregator
+from app.io.codec import _text
+from app.io.quotes_delayed import Candle
+
+logger = logging.getLogger(__name__)
+
+QUOTES_STREAM_URL = os.getenv("QUOTES_STREAM_URL", "")          # tcp://host:port | wss://... | alpaca
+STREAM_FLUSH_SEC = float(os.getenv("STREAM_FLUSH_SEC", "0.25"))
+STREAM_STALE_SEC = float(os.getenv("STREAM_STALE_SEC", "90"))   # 이 시간 무수신 → 폴링 폴백
+STREAM_RECONNECT_MAX_SEC = float(os.getenv("STREAM_RECONNECT_MAX_SEC", "30"))
+STREAM_WARMUP_BARS = int(os.getenv("STREAM_WARMUP_BARS", "200"))
+STREAM_STATUS_SEC = float(os.getenv("STREAM_STATUS_SEC", "2"))              # 서비스 상태 기록 주기
+STREAM_WANTED_POLL_SEC = float(os.getenv("STREAM_WANTED_POLL_SEC", "5"))    # 서비스가 구독 종목을 다시 읽는 주기
+STREAM_READ_TAIL = int(os.getenv("STREAM_READ_TAIL", "3"))                 # 워커가 이미 가진 종목은 꼬리 N봉만 조회
+
+# 스트림 서비스 ↔ 워커 공유 키
+STREAM_BARS_KEY_PREFIX = "quotes:stream:bars"   # 종목별 최근 원본 봉 리스트 (JSON, 오래된 → 최신)
+STREAM_FED_KEY = "quotes:stream:fed"            # 종목별 마지막 반영 시각 (epoch)
+STREAM_STATUS_KEY = "quotes:stream:status"      # connected / last_msg_at / subscribed(JSON)
+STREAM_WANTED_KEY = "quotes:stream:wanted"      # 워커가 원하는 구독 종목 (JSON 리스트)
+STREAM_KEY_TTL_SEC = 24 * 3600
+
+
+def parse_ts(value) -> datetime:
+    """epoch(초/나노초) 또는 ISO8601(Z) → UTC aware datetime"""
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    if isinstance(value, (int, float)):
+        v = float(value)
+        return datetime.fromtimestamp(v / 1e9 if v > 1e12 else v, tz=timezone.utc)
+    s = str(value).replace("Z", "+00:00")
+    if "." in s:  # 나노초 소수부 → 마이크로초로 절단
+        head, _, tail = s.partition(".")
+        n = len(tail) - len(tail.lstrip("0123456789"))
+        s = f"{head}.{tail[:min(n, 6)]}{tail[n:]}"
+    return parse_ts(datetime.fromisoformat(s))
+
+
+def decode_messages(raw) -> List[dict]:
+    """피드 프레임 → 메시지 리스트 (알파카는 배열, 가짜 피드는 객체/배열)"""
+    if isinstance(raw, (bytes, bytearray)):
+        raw = raw.decode()
+    raw = raw.strip() if isinstance(raw, str) else raw
+    if not raw:
+        return []
+    data = json.loads(raw) if isinstance(raw, str) else raw
+    return [m for m in (data if isinstance(data, list) else [data]) if isinstance(m, dict)]
+
+
+# ---------------------------------------------------------------------------
+# 소스
+# ---------------------------------------------------------------------------
+class FeedSource:
+    """스트리밍 소스 인터페이스 (연결 1개, 차분 구독)"""
+    name = "feed"
+
+    def connect(self) -> None:
+        raise NotImplementedError
+
+    def subscribe(self, tickers: List[str]) -> None:
+        raise NotImplementedError
+
+    def unsubscribe(self, tickers: List[str]) -> None:
+        raise NotImplementedError
+
+    def recv(self, timeout: float) -> List[dict]:
+        """timeout 내 수신 메시지 (없으면 []), 연결 종료 시 ConnectionError"""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+    @staticmethod
+    def _sub_msg(action: str, tickers: List[str]) -> dict:
+        return {"action": action, "trades": list(tickers), "bars": list(tickers)}
+
+
+class TcpJsonFeed(FeedSource):
+    """줄 단위 JSON over TCP (로컬 가짜 피드 / 사내 중계)"""
+    name = "tcp"
+
+    def __init__(self, host: str, port: int, connect_timeout: float = 5.0):
+        self.host, self.port = host, int(port)
+        self.connect_timeout = connect_timeout
+        self._sock: Optional[socket.socket] = None
+        self._buf = b""
+
+    def connect(self) -> None:
+        self._sock = socket.create_connection((self.host, self.port), timeout=self.connect_timeout)
+        self._buf = b""
+
+    def _send(self, msg: dict) -> None:
+        self._sock.sendall((json.dumps(msg) + "\n").encode())
+
+    def subscribe(self, tickers: List[str]) -> None:
+        self._send(self._sub_msg("subscribe", tickers))
+
+    def unsubscribe(self, tickers: List[str]) -> None:
+        self._send(self._sub_msg("unsubscribe", tickers))
+
+    def recv(self, timeout: float) -> List[dict]:
+        self._sock.settimeout(timeout)
+        try:
+            chunk = self._sock.recv(65536)
+        except socket.timeout:
+            return []
+        if not chunk:
+            raise ConnectionError("피드 연결 종료")
+        self._buf += chunk
+        *lines, self._buf = self._buf.split(b"\n")
+        out: List[dict] = []
+        for line in lines:
+            try:
+                out.extend(decode_messages(line))
+            except ValueError:
+                logger.debug(f"피드 프레임 파싱 실패: {line[:80]!r}")
+        return out
+
+    def close(self) -> None:
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            finally:
+                self._sock = None
+
+
+class AlpacaWebsocketFeed(FeedSource):
+    """알파카 데이터 스트림 (wss, 인증 후 trades/bars 구독)"""
+    name = "alpaca"
+
+    def __init__(self, url: Optional[str] = None, key: Optional[str] = None, secret: Optional[str] = None):
+        feed = os.getenv("ALPACA_DATA_FEED", "iex")
+        self.url = url or f"wss://stream.data.alpaca.markets/v2/{feed}"
+        self.key = key or os.getenv("ALPACA_API_KEY")
+        self.secret = secret or os.getenv("ALPACA_API_SECRET")
+        self._ws = None
+
+    def connect(self) -> None:
+        from websockets.sync.client import connect
+        self._ws = connect(self.url, open_timeout=10)
+        self._ws.send(json.dumps({"action": "auth", "key": self.key, "secret": self.secret}))
+        deadline = time.time() + 10
+        while time.time() < deadline:
+            for m in decode_messages(self._ws.recv(timeout=10)):
+                if m.get("T") == "error":
+                    raise ConnectionError(f"알파카 스트림 인증 실패: {m.get('msg')}")
+                if m.get("T") == "success" and m.get("msg") == "authenticated":
+                    return
+        raise ConnectionError("알파카 스트림 인증 응답 없음")
+
+    def subscribe(self, tickers: List[str]) -> None:
+        self._ws.send(json.dumps(self._sub_msg("subscribe", tickers)))
+
+    def unsubscribe(self, tickers: List[str]) -> None:
+        self._ws.send(json.dumps(self._sub_msg("unsubscribe", tickers)))
+
+    def recv(self, timeout: float) -> List[dict]:
+        try:
+            raw = self._ws.recv(timeout=timeout)
+        except TimeoutError:
+            return []
+        except Exception as e:
+            raise ConnectionError(str(e)) from e
+        return decode_messages(raw)
+
+    def close(self) -> None:
+        if self._ws is not None:
+            try:
+                self._ws.close()
+            finally:
+                self._ws = None
+
+
+def build_feed_source(url: str) -> Callable[[], FeedSource]:
+    """QUOTES_STREAM_URL → 소스 팩토리 (재연결마다 새 인스턴스)"""
+    if url.startswith("tcp://"):
+        host, _, port = url[len("tcp://"):].rpartition(":")
+        return lambda: TcpJsonFeed(host or "127.0.0.1", int(port))
+    if url.startswith(("ws://", "wss://")):
+        return lambda: AlpacaWebsocketFeed(url)
+    if url == "alpaca":
+        return lambda: AlpacaWebsocketFeed()
+    raise ValueError(f"지원하지 않는 스트림 URL: {url}")
+
+
+# ---------------------------------------------------------------------------
+# 봉 생성
+# ---------------------------------------------------------------------------
+class StreamBarBuilder:
+    """체결/분봉 메시지 → bar_sec 봉 (완료 봉 + 진행 중 봉을 flush 단위로 배출)"""
+
+    def __init__(self, bar_sec: int = 60, naive_ts: bool = False):
+        self.bar_sec = bar_sec
+        self.naive_ts = naive_ts
+        self._cur: Dict[str, Candle] = {}
+        self._pending: Dict[str, List[Candle]] = {}
+
+    def _ts(self, ts: datetime) -> datetime:
+        ts = parse_ts(ts)
+        return ts.replace(tzinfo=None) if self.naive_ts else ts
+
+    def on_trade(self, ticker: str, ts, price: float, size: float = 0) -> bool:
+        if price is None or price <= 0:
+            return False
+        start = _bucket_start(self._ts(ts), self.bar_sec)
+        cur = self._cur.get(ticker)
+        if cur is not None and start < cur.ts:
+            return False  # 지연 체결 (이미 닫힌 봉) 무시
+        if cur is not None and start == cur.ts:
+            bar = Candle(ticker, start, cur.o, max(cur.h, price), min(cur.l, price), price, cur.v + int(size or 0))
+        else:
+            bar = Candle(ticker, start, price, price, price, price, int(size or 0))
+            if cur is not None:
+                self._pending.setdefault(ticker, []).append(cur)  # 직전 봉 완료
+        self._cur[ticker] = bar
+        self._pending.setdefault(ticker, [])
+        return True
+
+    def on_bar(self, ticker: str, ts, o: float, h: float, l: float, c: float, v: float) -> bool:
+        """소스 확정 분봉 (진행 중 봉보다 과거면 무시)"""
+        start = _bucket_start(self._ts(ts), self.bar_sec)
+        cur = self._cur.get(ticker)
+        if cur is not None and start < cur.ts:
+            return False
+        if cur is not None and start > cur.ts:
+            self._pending.setdefault(ticker, []).append(cur)
+        self._cur[ticker] = Candle(ticker, start, float(o), float(h), float(l), float(c), int(v or 0))
+        self._pending.setdefault(ticker, [])
+        return True
+
+    def drain(self) -> Dict[str, List[Candle]]:
+        """변경된 종목별 [완료 봉..., 진행 중 봉]"""
+        out = {t: done + [self._cur[t]] for t, done in self._pending.items() if t in self._cur}
+        self._pending = {}
+        return out
+
+    def drop(self, ticker: str) -> None:
+        self._cur.pop(ticker, None)
+        self._pending.pop(ticker, None)
+
+
+# ---------------------------------------------------------------------------
+# 인제스터
+# ---------------------------------------------------------------------------
+class StreamingQuotesIngestor:
+    """소스 연결 1개를 유지하는 백그라운드 수신 루프"""
+
+    def __init__(self, source_factory: Callable[[], FeedSource], bars=None,
+                 backfill: Optional[Callable[[str, int], List]] = None, bar_sec: int = 60,
+                 naive_ts: bool = False, flush_sec: float = STREAM_FLUSH_SEC, stale_sec: float = STREAM_STALE_SEC,
+                 reconnect_max_sec: float = STREAM_RECONNECT_MAX_SEC, last_prices=None,
+                 publisher: Optional["RedisBarPublisher"] = None,
+                 on_prices: Optional[Callable[[Dict[str, float]], Any]] = None, clock=time.time, sleep=time.sleep):
+        self.source_factory = source_factory
+        self.bars = bars if bars is not None else get_bar_aggregator()
+        self.backfill = backfill
+        self.bar_sec = bar_sec
+        self.builder = StreamBarBuilder(bar_sec, naive_ts)
+        self.flush_sec = flush_sec
+        self.stale_sec = stale_sec
+        self.reconnect_max_sec = reconnect_max_sec
+        self.last_prices = last_prices
+        self.publisher = publisher
+        self.on_prices = on_prices
+        self._clock = clock
+        self._sleep = sleep
+        self._wanted: Set[str] = set()
+        self.subscribed: Set[str] = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.connected = False
+        self.last_msg_at: Optional[float] = None
+        self.stats = {"messages": 0, "trades": 0, "bars": 0, "connects": 0, "reconnects": 0,
+                      "backfilled_bars": 0, "errors": 0}
+
+    # ------------------------------------------------------------------ 제어
+    def set_universe(self, tickers: Iterable[str]) -> None:
+        """구독 대상 교체 (수신 루프가 다음 틱에 차분 반영)"""
+        with self._lock:
+            self._wanted = {t.strip().upper() for t in tickers if t and t.strip()}
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, name="quotes-stream", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def healthy(self) -> bool:
+        return (self.connected and self.last_msg_at is not None
+                and self._clock() - self.last_msg_at < self.stale_sec)
+
+    def covers(self, ticker: str) -> bool:
+        """스트림이 이 종목을 신선하게 공급 중인지 (아니면 폴링 대상)"""
+        t = ticker.upper()
+        if not self.healthy() or t not in self.subscribed:
+            return False
+        age = self.bars.age_sec(t)
+        return age is not None and age < self.stale_sec
+
+    # ------------------------------------------------------------------ 루프
+    def run(self) -> None:
+        delay = 1.0
+        while not self._stop.is_set():
+            src = None
+            try:
+                src = self.source_factory()
+                src.connect()
+                self.connected = True
+                self.stats["connects"] += 1
+                if self.stats["connects"] > 1:
+                    self.stats["reconnects"] += 1
+                logger.info(f"📡 시세 스트림 연결 ({src.name}, {self.stats['connects']}회차)")
+                self.subscribed = set()
+                delay = 1.0
+                self._pump(src)
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.warning(f"시세 스트림 끊김 → {delay:.0f}s 후 재연결: {e}")
+            finally:
+                self.connected = False
+                self._publish_status()
+                if src is not None:
+                    try:
+                        src.close()
+                    except Exception:
+                        pass
+            if self._stop.is_set():
+                break
+            self._sleep(delay)
+            delay = min(delay * 2, self.reconnect_max_sec)
+
+    def _pump(self, src: FeedSource) -> None:
+        last_flush = last_status = self._clock()
+        self._publish_status()
+        while not self._stop.is_set():
+            self._sync_subscriptions(src)
+            for msg in src.recv(timeout=min(self.flush_sec, 0.5)):
+                self._handle(msg)
+            if self._clock() - last_flush >= self.flush_sec:
+                self.flush()
+                last_flush = self._clock()
+            if self._clock() - last_status >= STREAM_STATUS_SEC:
+                self._publish_status()
+                last_status = self._clock()
+        self.flush()
+
+    def _publish_status(self) -> None:
+        if self.publisher is None:
+            return
+        try:
+            self.publisher.status(self.connected, self.last_msg_at, self.subscribed)
+        except Exception as e:
+            logger.debug(f"스트림 상태 기록 실패: {e}")
+
+    def _sync_subscriptions(self, src: FeedSource) -> None:
+        with self._lock:
+            wanted = set(self._wanted)
+        added = sorted(wanted - self.subscribed)
+        removed = sorted(self.subscribed - wanted)
+        if removed:
+            src.unsubscribe(removed)
+            for t in removed:
+                self.builder.drop(t)
+            self.subscribed -= set(removed)
+        if added:
+            src.subscribe(added)
+            self.subscribed |= set(added)
+            self._backfill(added)  # 구독 후 백필 → 그 사이 체결은 소켓 버퍼에 대기
+            logger.info(f"📡 스트림 구독 +{len(added)} -{len(removed)} (총 {len(self.subscribed)})")
+
+    def _backfill(self, tickers: List[str]) -> None:
+        """마지막 봉 이후 공백 REST 백필 (버퍼 없으면 워밍업 분량)"""
+        if self.backfill is None:
+            return
+        for t in tickers:
+            age = self.bars.age_sec(t)
+            if age is None:
+                n = STREAM_WARMUP_BARS
+            elif age > self.bar_sec:
+                n = min(BAR_BUFFER_LEN, math.ceil(age / self.bar_sec) + 2)
+            else:
+                continue
+            try:
+                got = self.backfill(t, n) or []
+                self.stats["backfilled_bars"] += self.bars.ingest(t, got, base_sec=self.bar_sec)
+                if self.publisher is not None:
+                    self.publisher.replace(t, self.bars.get_bars(t, self.bar_sec, BAR_BUFFER_LEN))
+            except Exception as e:
+                logger.warning(f"스트림 공백 백필 실패 ({t}): {e}")
+
+    def _handle(self, msg: dict) -> None:
+        kind, ticker = msg.get("T"), (msg.get("S") or "").upper()
+        self.last_msg_at = self._clock()
+        self.stats["messages"] += 1
+        if ticker not in self.subscribed:
+            return
+        try:
+            if kind == "t":
+                if self.builder.on_trade(ticker, msg["t"], float(msg["p"]), msg.get("s", 0)):
+                    self.stats["trades"] += 1
+            elif kind in ("b", "u"):  # 분봉 / 정정 분봉
+                if self.builder.on_bar(ticker, msg["t"], msg["o"], msg["h"], msg["l"], msg["c"], msg.get("v", 0)):
+                    self.stats["bars"] += 1
+        except (KeyError, TypeError, ValueError) as e:
+            logger.debug(f"스트림 메시지 스킵 {msg}: {e}")
+
+    def flush(self) -> int:
+        """누적 봉 → 봉 집계기 + 최종가 서비스 + 가격 훅(페이퍼 트리거) 반영 → 갱신 종목 수"""
+        drained = self.builder.drain()
+        prices: Dict[str, float] = {}
+        for t, bars in drained.items():
+            self.bars.ingest(t, bars, base_sec=self.bar_sec)
+            prices[t] = bars[-1].c
+        if prices and self.last_prices is not None:
+            try:
+                self.last_prices.update_many(prices, ts=self._clock(), source="stream")
+            except Exception as e:
+                logger.debug(f"스트림 최종가 반영 실패: {e}")
+        if drained and self.publisher is not None:
+            try:
+                self.publisher.publish(drained)
+            except Exception as e:
+                logger.warning(f"스트림 봉 Redis 반영 실패: {e}")
+        if prices and self.on_prices is not None:
+            try:
+                self.on_prices(prices)
+            except Exception as e:
+                logger.warning(f"스트림 가격 훅 실패: {e}")
+        return len(drained)
+
+
+# ---------------------------------------------------------------------------
+# 서비스 ↔ 워커 (Redis)
+# ---------------------------------------------------------------------------
+def stream_bars_key(ticker: str) -> str:
+    return f"{STREAM_BARS_KEY_PREFIX}:{ticker.upper()}"
+
+
+def _encode_bar(c: Candle) -> str:
+    return json.dumps([c.ts.isoformat(), c.o, c.h, c.l, c.c, c.v])
+
+
+def _decode_bar(ticker: str, raw) -> Candle:
+    ts, *ohlc, v = json.loads(_text(raw))
+    return Candle(ticker, datetime.fromisoformat(ts), *(float(x) for x in ohlc), int(v))
+
+
+class RedisBarPublisher:
+    """스트림 서비스 측: 종목별 최근 봉 리스트(진행 중 봉은 마지막 원소 갱신) + 반영 시각 + 연결 상태 기록"""
+
+    def __init__(self, redis_client, max_len: int = BAR_BUFFER_LEN, clock=time.time):
+        self.redis = redis_client
+        self.max_len = max_len
+        self._clock = clock
+        self._last_ts: Dict[str, datetime] = {}
+
+    def replace(self, ticker: str, bars: List[Candle]) -> None:
+        """백필 후 버퍼 전체 교체"""
+        key = stream_bars_key(ticker)
+        bars = list(bars)[-self.max_len:]
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.delete(key)
+        if bars:
+            pipe.rpush(key, *[_encode_bar(b) for b in bars])
+            pipe.expire(key, STREAM_KEY_TTL_SEC)
+        pipe.hset(STREAM_FED_KEY, mapping={ticker.upper(): self._clock()})
+        pipe.execute()
+        if bars:
+            self._last_ts[ticker.upper()] = bars[-1].ts
+        else:
+            self._last_ts.pop(ticker.upper(), None)
+
+    def publish(self, drained: Dict[str, List[Candle]]) -> None:
+        """flush 결과 반영: 같은 ts는 마지막 원소 갱신, 새 봉은 추가 (파이프라인 1회)"""
+        pipe = self.redis.pipeline(transaction=False)
+        fed: Dict[str, float] = {}
+        for ticker, bars in drained.items():
+            t = ticker.upper()
+            key = stream_bars_key(t)
+            for b in bars:
+                last = self._last_ts.get(t)
+                if last is not None and b.ts == last:
+                    pipe.lset(key, -1, _encode_bar(b))
+                elif last is None or b.ts > last:
+                    pipe.rpush(key, _encode_bar(b))
+                    self._last_ts[t] = b.ts
+            pipe.ltrim(key, -self.max_len, -1)
+            pipe.expire(key, STREAM_KEY_TTL_SEC)
+            fed[t] = self._clock()
+        if fed:
+            pipe.hset(STREAM_FED_KEY, mapping=fed)
+            pipe.expire(STREAM_FED_KEY, STREAM_KEY_TTL_SEC)
+        try:
+            pipe.execute()
+        except Exception:
+            self._last_ts.clear()  # 리스트가 사라진 경우(LSET 실패) 다음 봉부터 추가로 복구
+            raise
+
+    def status(self, connected: bool, last_msg_at: Optional[float], subscribed: Iterable[str]) -> None:
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.hset(STREAM_STATUS_KEY, mapping={
+            "connected": int(bool(connected)),
+            "last_msg_at": last_msg_at or 0,
+            "subscribed": json.dumps(sorted(subscribed)),
+            "updated_at": self._clock(),
+        })
+        pipe.expire(STREAM_STATUS_KEY, STREAM_KEY_TTL_SEC)
+        pipe.execute()
+
+    def wanted(self) -> Optional[List[str]]:
+        """워커가 기록한 구독 종목 (기록 전이면 None)"""
+        raw = self.redis.get(STREAM_WANTED_KEY)
+        return None if raw is None else list(json.loads(_text(raw)))
+
+
+class StreamBarReader:
+    """워커 측: 원하는 구독 종목 기록 + 스트림 서비스가 신선하게 공급 중인 종목의 봉을 프로세스 봉 집계기에 반영"""
+
+    def __init__(self, redis_client, bars=None, bar_sec: int = 60, stale_sec: float = STREAM_STALE_SEC,
+                 tail: int = STREAM_READ_TAIL, clock=time.time):
+        self.redis = redis_client
+        self.bars = bars if bars is not None else get_bar_aggregator()
+        self.bar_sec = bar_sec
+        self.stale_sec = stale_sec
+        self.tail = tail
+        self._clock = clock
+
+    def sync(self, tickers: Iterable[str]) -> List[str]:
+        """스트림 공급 종목 목록 (서비스 다운/무수신/미구독 종목은 제외 → 호출자가 폴링)"""
+        wanted = sorted({t.strip().upper() for t in tickers if t and t.strip()})
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.set(STREAM_WANTED_KEY, json.dumps(wanted), ex=STREAM_KEY_TTL_SEC)
+        pipe.hgetall(STREAM_STATUS_KEY)
+        pipe.hmget(STREAM_FED_KEY, wanted or ["_"])
+        _, status, fed = pipe.execute()
+        status = {_text(k): _text(v) for k, v in (status or {}).items()}
+        now = self._clock()
+        if status.get("connected") != "1" or now - float(status.get("last_msg_at") or 0) >= self.stale_sec:
+            return []
+        subscribed = set(json.loads(status.get("subscribed") or "[]"))
+        covered = [t for t, f in zip(wanted, fed or [])
+                   if t in subscribed and f is not None and now - float(_text(f)) < self.stale_sec]
+        if not covered:
+            return []
+        pipe = self.redis.pipeline(transaction=False)
+        for t in covered:
+            age = self.bars.age_sec(t)
+            n = self.tail if age is not None and age < self.stale_sec else BAR_BUFFER_LEN
+            pipe.lrange(stream_bars_key(t), -n, -1)
+        out = []
+        for t, rows in zip(covered, pipe.execute()):
+            bars = [_decode_bar(t, r) for r in rows or []]
+            if bars:
+                self.bars.ingest(t, bars, base_sec=self.bar_sec)
+                out.append(t)
+        return out
+
+
+_stream_bar_reader: Optional[StreamBarReader] = None
+
+
+def get_stream_bar_reader() -> StreamBarReader:
+    """글로벌 스트림 봉 리더 인스턴스 반환 (워커 프로세스용, 수신 스레드 없음)"""
+    global _stream_bar_reader
+    if _stream_bar_reader is None:
+        import redis
+        _stream_bar_reader = StreamBarReader(redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0")))
+    return _stream_bar_reader
+
+
+def run_service(url: str = QUOTES_STREAM_URL) -> None:
+    """스트림 전용 프로세스: 워커가 기록한 구독 종목을 따라 수신 → Redis 공유 봉/최종가 갱신"""
+    import redis
+    from app.io.last_price import get_last_price_service
+    from app.jobs.paper_trading_manager import fire_paper_triggers
+    if not url:
+        raise SystemExit("QUOTES_STREAM_URL 미설정")
+    if os.getenv("QUOTES_PROVIDER", "delayed").lower() == "alpaca":
+        from app.io.quotes_alpaca import AlpacaQuotesIngestor
+        rest = AlpacaQuotesIngestor()
+    else:
+        from app.io.quotes_delayed import DelayedQuotesIngestor
+        rest = DelayedQuotesIngestor()
+    publisher = RedisBarPublisher(redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0")))
+    stream = StreamingQuotesIngestor(build_feed_source(url), backfill=getattr(rest, "fetch_recent_bars", None),
+                                     naive_ts=getattr(rest, "naive_ts", False),
+                                     last_prices=get_last_price_service(), publisher=publisher,
+                                     on_prices=fire_paper_triggers)
+    stream.start()
+    try:
+        while True:
+            try:
+                wanted = publisher.wanted()
+                if wanted is not None:
+                    stream.set_universe(wanted)
+            except Exception as e:
+                logger.warning(f"구독 종목 조회 실패: {e}")
+            time.sleep(STREAM_WANTED_POLL_SEC)
+    finally:
+        stream.stop()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    run_service()
@@ -0,0 +1,186 @@
+"""
+최근 신호 저장소 (시간 인덱스 + 커서 페이지네이션)
+- 본문: 해시 signals:recent:data (id → 코덱 페이로드), id = 기록 시각(ms)×1000 + 시퀀스 (정수, 유일·시간순)
+- 인덱스: ZSET (score = id) — 전체 / 발행분 / 종목별 / 액션(long|short|...)별, 각각 발행분 전용 인덱스 포함
+  → 어떤 필터 조합도 인덱스 1개 범위 조회 (ZREVRANGEBYSCORE LIMIT) + HMGET 1회 = 페이지당 O(log N + limit)
+- 커서: 마지막 항목 id → 다음 페이지는 (cursor 배타 상한, 중복/누락 없음)
+- 보존: RECENT_SIGNALS_DEPTH 건 / RECENT_SIGNALS_MAX_AGE_SEC, 기록 N건마다 전체 인덱스 컷오프로 일괄 정리
+  (기존 리스트 LTRIM 500건 → 깊이 설정 가능, 요청마다 500건 파싱 제거)
+"""
+from __future__ import annotations
+
+import itertools
+import logging
+import os
+import random
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import redis
+
+from app.io.codec import decode as decode_payload, get_codec
+
+logger = logging.getLogger(__name__)
+
+RECENT_SIGNALS_PREFIX = "signals:recent"
+RECENT_SIGNALS_DEPTH = int(os.getenv("RECENT_SIGNALS_DEPTH", "5000"))
+RECENT_SIGNALS_MAX_AGE_SEC = int(os.getenv("RECENT_SIGNALS_MAX_AGE_SEC", str(3 * 86400)))
+RECENT_SIGNALS_TRIM_EVERY = int(os.getenv("RECENT_SIGNALS_TRIM_EVERY", "50"))
+RECENT_SIGNALS_MAX_PAGE = 500
+
+DATA_KEY = f"{RECENT_SIGNALS_PREFIX}:data"
+INDEX_SET_KEY = f"{RECENT_SIGNALS_PREFIX}:indexes"  # 정리 대상 인덱스 키 목록
+
+
+def index_key(ticker: Optional[str] = None, action: Optional[str] = None, emitted_only: bool = False) -> str:
+    """필터 조합 → 인덱스 키 (종목·액션 동시 지정은 종목 인덱스 + 페이지 내 필터)"""
+    if ticker:
+        base = f"{RECENT_SIGNALS_PREFIX}:idx:t:{ticker.upper()}"
+    elif action:
+        base = f"{RECENT_SIGNALS_PREFIX}:idx:a:{action.lower()}"
+    else:
+        base = f"{RECENT_SIGNALS_PREFIX}:idx:all"
+    return f"{base}:emitted" if emitted_only else base
+
+
+def id_to_epoch(signal_id: int) -> float:
+    return signal_id / 1_000_000.0
+
+
+def epoch_to_id(epoch: float) -> int:
+    return int(epoch * 1000) * 1000
+
+
+class RecentSignalStore:
+    """시간 인덱스 최근 신호 저장소"""
+
+    def __init__(self, redis_client=None, depth: int = RECENT_SIGNALS_DEPTH,
+                 max_age_sec: int = RECENT_SIGNALS_MAX_AGE_SEC, trim_every: int = RECENT_SIGNALS_TRIM_EVERY,
+                 codec=None, clock=time.time):
+        self.redis = redis_client
+        self.depth = depth
+        self.max_age_sec = max_age_sec
+        self.trim_every = max(1, trim_every)
+        self.codec = codec or get_codec()
+        self._clock = clock
+        self._seq = itertools.count(random.randrange(1000))  # 프로세스 간 같은 ms 충돌 완화
+        self._since_trim = 0
+        self._lock = threading.Lock()
+
+    def _next_id(self) -> int:
+        return epoch_to_id(self._clock()) + next(self._seq) % 1000
+
+    # ------------------------------------------------------------------ 기록
+    def record(self, payload: Dict) -> Optional[int]:
+        """신호 1건 기록 (본문 + 인덱스, 파이프라인 1회) → id"""
+        if self.redis is None:
+            return None
+        with self._lock:
+            sid = self._next_id()
+            self._since_trim += 1
+            trim = self._since_trim >= self.trim_every
+            if trim:
+                self._since_trim = 0
+        emitted = not payload.get("suppressed_reason")
+        keys = [index_key(), index_key(ticker=payload.get("ticker")) if payload.get("ticker") else None,
+                index_key(action=payload.get("signal_type")) if payload.get("signal_type") else None]
+        keys = [k for k in keys if k]
+        if emitted:
+            keys += [f"{k}:emitted" for k in keys]
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.hset(DATA_KEY, str(sid), self.codec.encode(dict(payload, id=str(sid))))
+            for k in keys:
+                pipe.zadd(k, {str(sid): sid})
+            pipe.sadd(INDEX_SET_KEY, *keys)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"최근 신호 기록 실패: {e}")
+            return None
+        if trim:
+            self.trim()
+        return sid
+
+    def trim(self) -> int:
+        """보존 깊이/기간 밖 항목 일괄 정리 (전체 인덱스 기준 컷오프) → 삭제 건수"""
+        if self.redis is None:
+            return 0
+        try:
+            cutoff = epoch_to_id(self._clock() - self.max_age_sec)
+            overflow = self.redis.zrevrange(index_key(), self.depth, self.depth)
+            if overflow:
+                cutoff = max(cutoff, int(overflow[0]) + 1)  # 깊이 초과분(이 id 이하) 제거
+            evicted = self.redis.zrangebyscore(index_key(), "-inf", f"({cutoff}")
+            if not evicted:
+                return 0
+            pipe = self.redis.pipeline(transaction=False)
+            for key in self.redis.smembers(INDEX_SET_KEY) or []:
+                pipe.zremrangebyscore(key, "-inf", f"({cutoff}")
+            pipe.hdel(DATA_KEY, *evicted)
+            pipe.execute()
+            return len(evicted)
+        except Exception as e:
+            logger.warning(f"최근 신호 정리 실패: {e}")
+            return 0
+
+    # ------------------------------------------------------------------ 조회
+    def page(self, ticker: Optional[str] = None, action: Optional[str] = None, include_suppressed: bool = False,
+             since: Optional[float] = None, until: Optional[float] = None, cursor: Optional[str] = None,
+             limit: int = 50) -> Tuple[List[Dict], Optional[str]]:
+        """최신순 한 페이지 → (항목, 다음 커서 | None)
+
+        since/until: epoch 초 범위, cursor: 직전 페이지 마지막 id (배타 상한)
+        """
+        if self.redis is None:
+            return [], None
+        limit = max(1, min(int(limit), RECENT_SIGNALS_MAX_PAGE))
+        hi = f"({int(cursor)}" if cursor else (epoch_to_id(until) + 999 if until is not None else "+inf")
+        lo = epoch_to_id(since) if since is not None else "-inf"
+        key = index_key(ticker=ticker, action=action, emitted_only=not include_suppressed)
+        need_filter = bool(ticker and action)
+        items: List[Dict] = []
+        last_id: Optional[str] = None
+        exhausted = False
+        while len(items) < limit and not exhausted:
+            ids = self.redis.zrevrangebyscore(key, hi, lo, start=0, num=limit)
+            ids = [i.decode() if isinstance(i, bytes) else str(i) for i in ids]
+            exhausted = len(ids) < limit
+            if not ids:
+                break
+            for sid, raw in zip(ids, self.redis.hmget(DATA_KEY, ids)):
+                last_id = sid
+                if raw is None:
+                    continue  # 정리 중 경합
+                try:
+                    item = decode_payload(raw)
+                except Exception:
+                    continue
+                if need_filter and str(item.get("signal_type", "")).lower() != action.lower():
+                    continue
+                items.append(item)
+                if len(items) >= limit:
+                    break
+            hi = f"({last_id}"
+            if not need_filter:
+                break  # 필터 없는 인덱스는 한 번에 limit개 확정
+        more = not exhausted or len(items) >= limit
+        return items, (last_id if items and more else None)
+
+
+_recent_signal_store: Optional[RecentSignalStore] = None
+
+
+def get_recent_signal_store() -> RecentSignalStore:
+    """글로벌 최근 신호 저장소 인스턴스 반환"""
+    global _recent_signal_store
+    if _recent_signal_store is None:
+        redis_client = None
+        try:
+            redis_url = os.getenv("REDIS_URL")
+            if redis_url:
+                redis_client = redis.from_url(redis_url)
+        except Exception:
+            redis_client = None
+        _recent_signal_store = RecentSignalStore(redis_client=redis_client)
+    return _recent_signal_store
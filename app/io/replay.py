@@ -0,0 +1,553 @@
+"""
+스트림 캡처 / 가속 리플레이 하네스
+- 캡처: quotes.XNAS.* / signals.raw / news.edgar / orders.* 스트림 + 캔들 스냅샷을 로컬 파일로 기록
+  · streams.jsonl.gz: 줄당 [stream, id, fields] (원본 XADD ID 보존, 증분 XRANGE로 트림 전에 수집)
+  · candles.jsonl.gz: 줄당 {"ticker","ts","o","h","l","c","v"} (SIM_BARS_PATH와 동일 포맷)
+- 리플레이: 로컬 Redis에 원본 ID 순서대로 재주입, 가상 시계(배속) 기준으로
+  generate_signals / pipeline_e2e를 비트 주기마다 동기 실행하고 처리량/지연을 집계
+- 가상 시계는 재주입 시점, 캔들 가시성(ts <= 가상 시각), 시장 시계(get_market_clock: 세션/일일 키)를 결정한다.
+  time.time()을 직접 쓰는 경로와 Redis TTL(쿨다운 등)은 실제 시각 그대로라 실행 간 결과가 완전히 같지는 않다.
+- 리플레이 시작 시 일일 상한/쿨다운/방향락 키를 지우고, 컴포넌트 전체를 주입한 뒤 자동 초기화를 끈다.
+- 브로커는 항상 로컬 시뮬레이터(BROKER=sim): 캡처 캔들을 봉 격자로 재생하고 가상 시계에 맞춰 step()
+  → AUTO_MODE가 켜져 있어도 실제(알파카 페이퍼 포함) 주문이 나가지 않음. Redis/Postgres는 로컬만 허용.
+
+사용:
+  python -m app.io.replay capture --out /tmp/session --duration 3600 --interval 5
+  python -m app.io.replay replay --src /tmp/session --speed 60
+"""
+from __future__ import annotations
+
+import bisect
+import gzip
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from app.adapters.market_simulator import MarketSimulator, SimBar, SimConfig
+from app.io.codec import decode_stream_fields, encode_stream_fields
+from app.io.quotes_delayed import Candle, DelayedQuotesIngestor
+from app.utils.market_clock import ET, MarketClock, TimeLike
+
+logger = logging.getLogger(__name__)
+
+CAPTURE_PATTERNS = ("quotes.XNAS.*", "signals.raw", "news.edgar", "orders.*")
+STREAMS_FILE = "streams.jsonl.gz"
+CANDLES_FILE = "candles.jsonl.gz"
+MANIFEST_FILE = "manifest.json"
+
+# 비트 주기와 동일 (scheduler.celery_app.conf.beat_schedule)
+REPLAY_TASK_INTERVALS = {"generate_signals": 30.0, "pipeline_e2e": 15.0}
+# 이전 실행/운영 상태가 남으면 신호가 억제되므로 리플레이 시작 시 삭제
+REPLAY_RESET_PATTERNS = ("dailycap:*", "cooldown:*", "dirlock:*")
+REPLAY_BROKER = "sim"
+LOCAL_HOSTS = ("localhost", "127.0.0.1", "::1")
+
+
+def _s(v) -> str:
+    return v.decode() if isinstance(v, bytes) else str(v)
+
+
+def _id_ms(message_id: str) -> int:
+    return int(message_id.split("-", 1)[0])
+
+
+def _id_tuple(message_id: str) -> Tuple[int, int]:
+    ms, _, seq = message_id.partition("-")
+    return int(ms), int(seq or 0)
+
+
+# =============================================================================
+# 캡처
+# =============================================================================
+
+class StreamCapture:
+    """Redis 스트림 + 캔들 스냅샷 증분 녹화기"""
+
+    def __init__(self, redis_client, out_dir: str, patterns: Iterable[str] = CAPTURE_PATTERNS,
+                 quotes_ingestor=None, candles_n: int = 200, batch: int = 1000):
+        self.redis = redis_client
+        self.out_dir = out_dir
+        self.patterns = tuple(patterns)
+        self.quotes_ingestor = quotes_ingestor
+        self.candles_n = candles_n
+        self.batch = batch
+        self._last_id: Dict[str, str] = {}
+        self._candle_seen: Dict[str, float] = {}  # ticker → 마지막 기록 봉 ts
+        self.stats = {"entries": 0, "candles": 0, "streams": 0}
+        os.makedirs(out_dir, exist_ok=True)
+        self._streams_f = gzip.open(os.path.join(out_dir, STREAMS_FILE), "at", encoding="utf-8")
+        self._candles_f = gzip.open(os.path.join(out_dir, CANDLES_FILE), "at", encoding="utf-8")
+        self._started = time.time()
+
+    def _stream_keys(self) -> List[str]:
+        keys = set()
+        for pat in self.patterns:
+            if "*" in pat:
+                keys.update(_s(k) for k in self.redis.scan_iter(match=pat, count=500))
+            elif self.redis.exists(pat):
+                keys.add(pat)
+        return sorted(keys)
+
+    def _capture_stream(self, key: str) -> int:
+        n = 0
+        start = self._last_id.get(key)
+        while True:
+            lo = f"({start}" if start else "-"
+            rows = self.redis.xrange(key, min=lo, max="+", count=self.batch)
+            if not rows:
+                break
+            for mid, fields in rows:
+                mid = _s(mid)
+                data = decode_stream_fields(fields)  # 바이너리(_p) 엔트리도 논리 필드로 기록
+                self._streams_f.write(json.dumps([key, mid, data], separators=(",", ":"), ensure_ascii=False,
+                                                 default=str) + "\n")
+                start = mid
+                n += 1
+            if len(rows) < self.batch:
+                break
+        if start:
+            self._last_id[key] = start
+        return n
+
+    def _capture_candles(self, tickers: Iterable[str]) -> int:
+        if self.quotes_ingestor is None:
+            return 0
+        if isinstance(self.quotes_ingestor, DelayedQuotesIngestor):
+            try:
+                self.quotes_ingestor.update_all_tickers()  # 지연 시세는 캐시 갱신 후 조회
+            except Exception as e:
+                logger.debug(f"캔들 갱신 실패: {e}")
+        n = 0
+        for t in tickers:
+            try:
+                candles = self.quotes_ingestor.get_latest_candles(t, self.candles_n) or []
+            except Exception as e:
+                logger.debug(f"캔들 스냅샷 실패 {t}: {e}")
+                continue
+            seen = self._candle_seen.get(t, 0.0)
+            for c in candles:
+                ts = c.ts.timestamp() if isinstance(c.ts, datetime) else float(c.ts)
+                if ts <= seen:
+                    continue
+                self._candles_f.write(json.dumps(
+                    {"ticker": t, "ts": ts, "o": c.o, "h": c.h, "l": c.l, "c": c.c, "v": int(c.v or 0)},
+                    separators=(",", ":")) + "\n")
+                seen = ts
+                n += 1
+            self._candle_seen[t] = seen
+        return n
+
+    def snapshot(self) -> Dict[str, int]:
+        """1회 증분 수집 (직전 스냅샷 이후 신규 엔트리/봉만)"""
+        keys = self._stream_keys()
+        entries = sum(self._capture_stream(k) for k in keys)
+        tickers = sorted({k.rsplit(".", 1)[-1] for k in keys if k.startswith("quotes.")}
+                         | set(getattr(self.quotes_ingestor, "tickers", []) or []))
+        candles = self._capture_candles(tickers)
+        self.stats["entries"] += entries
+        self.stats["candles"] += candles
+        self.stats["streams"] = len(self._last_id)
+        return {"entries": entries, "candles": candles}
+
+    def run(self, duration_sec: float = 0.0, interval_sec: float = 5.0) -> Dict:
+        """duration 동안 interval마다 스냅샷 (0이면 1회)"""
+        deadline = time.time() + max(0.0, duration_sec)
+        try:
+            while True:
+                self.snapshot()
+                if time.time() + interval_sec > deadline:
+                    break
+                time.sleep(interval_sec)
+        finally:
+            self.close()
+        return self.stats
+
+    def close(self) -> None:
+        for f in (self._streams_f, self._candles_f):
+            try:
+                f.close()
+            except Exception:
+                pass
+        manifest = {
+            "captured_at": datetime.now(timezone.utc).isoformat(),
+            "duration_sec": round(time.time() - self._started, 1),
+            "streams": self._last_id,
+            **self.stats,
+        }
+        with open(os.path.join(self.out_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+
+def load_capture(src_dir: str) -> Tuple[List[Tuple[str, str, Dict[str, str]]], Dict[str, List[Candle]]]:
+    """캡처 디렉터리 → (ID 순 엔트리 목록, 종목별 시간순 캔들)"""
+    entries: Dict[Tuple[str, str], Dict[str, str]] = {}
+    path = os.path.join(src_dir, STREAMS_FILE)
+    if os.path.exists(path):
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    key, mid, data = json.loads(line)
+                    entries[(key, mid)] = data  # 중복 캡처 dedupe
+    ordered = sorted(((k, m, d) for (k, m), d in entries.items()), key=lambda e: (_id_tuple(e[1]), e[0]))
+
+    candles: Dict[str, Dict[float, Candle]] = {}
+    path = os.path.join(src_dir, CANDLES_FILE)
+    if os.path.exists(path):
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                d = json.loads(line)
+                t = str(d["ticker"]).upper()
+                ts = float(d["ts"])
+                candles.setdefault(t, {})[ts] = Candle(
+                    ticker=t, ts=datetime.fromtimestamp(ts, tz=timezone.utc),
+                    o=float(d["o"]), h=float(d["h"]), l=float(d["l"]), c=float(d["c"]), v=int(d.get("v", 0)))
+    return ordered, {t: [m[k] for k in sorted(m)] for t, m in candles.items()}
+
+
+# =============================================================================
+# 리플레이
+# =============================================================================
+
+class VirtualClock:
+    """가상 시계: 배속(speed) 기준으로 실시간 대기, speed<=0이면 대기 없이 즉시 진행"""
+
+    def __init__(self, start: float, speed: float = 0.0, sleep: Callable[[float], None] = time.sleep):
+        self.now = start
+        self.speed = speed
+        self._sleep = sleep
+        self._wall0 = time.monotonic()
+        self._virt0 = start
+
+    def advance_to(self, t: float) -> None:
+        if t <= self.now:
+            return
+        if self.speed > 0:
+            target_wall = self._wall0 + (t - self._virt0) / self.speed
+            delay = target_wall - time.monotonic()
+            if delay > 0:
+                self._sleep(delay)
+        self.now = t
+
+
+class ReplayMarketClock(MarketClock):
+    """현재 시각을 가상 시계에서 읽는 시장 시계 (세션 판정/일일 키가 녹화 시점을 따름)"""
+
+    def __init__(self, clock: VirtualClock):
+        super().__init__()
+        self.clock = clock
+
+    def _to_epoch(self, t: TimeLike) -> float:
+        return self.clock.now if t is None else MarketClock._to_epoch(t)
+
+    def now(self) -> datetime:
+        return datetime.fromtimestamp(self.clock.now, tz=ET)
+
+
+class ReplayQuotesIngestor(DelayedQuotesIngestor):
+    """캡처 캔들을 가상 시각까지만 노출하는 시세 어댑터 (외부 호출/공유 봉 집계기 미사용)"""
+
+    def __init__(self, candles: Dict[str, List[Candle]], clock: VirtualClock):
+        super().__init__(tickers_csv=",".join(sorted(candles)) or "AAPL")
+        self._all = candles
+        self._ts = {t: [c.ts.timestamp() for c in bars] for t, bars in candles.items()}
+        self._visible: Dict[str, List[Candle]] = {}
+        self.clock = clock
+
+    def _refresh(self, ticker: str) -> None:
+        bars = self._all.get(ticker, [])
+        visible = bars[:bisect.bisect_right(self._ts.get(ticker, []), self.clock.now)]
+        self._visible[ticker] = visible
+        self.market_data[ticker] = {
+            "current_price": visible[-1].c if visible else 0.0,
+            "indicators": self._compute_indicators_from_candles(visible),
+            "last_update": datetime.fromtimestamp(self.clock.now, tz=timezone.utc),
+        }
+
+    def update_all_tickers(self) -> None:
+        for t in self.tickers:
+            self._refresh(t)
+
+    def get_latest_candles(self, ticker: str, n: int = 50) -> List[Candle]:
+        self._refresh(ticker)
+        return self._visible.get(ticker, [])[-n:]
+
+    def warmup_backfill(self, symbols: Optional[List[str]] = None) -> None:
+        self.update_all_tickers()
+
+
+def _bar_sec(candles: Dict[str, List[Candle]], default: int = 60) -> int:
+    """캡처 캔들 간격 (종목별 최소 양의 간격 중 최솟값)"""
+    gaps = [int(b.ts.timestamp() - a.ts.timestamp())
+            for bars in candles.values() for a, b in zip(bars, bars[1:]) if b.ts > a.ts]
+    return max(1, min(gaps)) if gaps else default
+
+
+def _grid_bars(bars: List[Candle], start: float, bar_sec: int) -> Iterable[SimBar]:
+    """캡처 캔들 → 시뮬레이터 봉 격자 (start + k·bar_sec, 새 캔들 없는 칸은 직전 종가로 평평하게)"""
+    ts = [c.ts.timestamp() for c in bars]
+    k = 0
+    last = None
+    while True:
+        t = start + k * bar_sec
+        i = bisect.bisect_right(ts, t) - 1
+        when = datetime.fromtimestamp(t, tz=timezone.utc)
+        if i >= 0 and bars[i] is not last:
+            c = last = bars[i]
+            yield SimBar(o=c.o, h=c.h, l=c.l, c=c.c, v=int(c.v or 0), ts=when)
+        else:
+            px = last.c if last is not None else bars[0].o
+            yield SimBar(o=px, h=px, l=px, c=px, v=int((last or bars[0]).v or 0), ts=when)
+        if i >= len(bars) - 1 and last is bars[-1]:
+            return
+        k += 1
+
+
+@dataclass
+class ReplayReport:
+    events: int = 0
+    wall_sec: float = 0.0
+    virtual_sec: float = 0.0
+    task_runs: Dict[str, int] = field(default_factory=dict)
+    task_latency_ms: Dict[str, List[float]] = field(default_factory=dict)
+    task_errors: Dict[str, int] = field(default_factory=dict)
+
+    def summary(self) -> Dict:
+        def pct(xs: List[float], q: float) -> float:
+            if not xs:
+                return 0.0
+            s = sorted(xs)
+            return round(s[min(len(s) - 1, int(q * len(s)))], 1)
+
+        return {
+            "events": self.events,
+            "wall_sec": round(self.wall_sec, 3),
+            "virtual_sec": round(self.virtual_sec, 1),
+            "speedup": round(self.virtual_sec / self.wall_sec, 1) if self.wall_sec > 0 else None,
+            "events_per_sec": round(self.events / self.wall_sec, 1) if self.wall_sec > 0 else None,
+            "tasks": {
+                name: {"runs": self.task_runs.get(name, 0), "errors": self.task_errors.get(name, 0),
+                       "p50_ms": pct(lat, 0.5), "p95_ms": pct(lat, 0.95), "max_ms": pct(lat, 1.0)}
+                for name, lat in self.task_latency_ms.items()
+            },
+        }
+
+
+def _default_tasks() -> Dict[str, Tuple[float, Callable[[], object]]]:
+    from app.jobs import scheduler
+    return {name: (interval, getattr(scheduler, name).apply) for name, interval in REPLAY_TASK_INTERVALS.items()}
+
+
+class ReplayDriver:
+    """캡처 세션을 로컬 Redis에 가상 시계 기준으로 재주입 + 파이프라인 작업 구동"""
+
+    def __init__(self, src_dir: str, redis_client, speed: float = 0.0,
+                 tasks: Optional[Dict[str, Tuple[float, Callable[[], object]]]] = None,
+                 regenerate_signals: bool = True, sleep: Callable[[float], None] = time.sleep):
+        self.entries, self.candles = load_capture(src_dir)
+        self.redis = redis_client
+        self.regenerate_signals = regenerate_signals
+        start = _id_ms(self.entries[0][1]) / 1000.0 if self.entries else time.time()
+        if self.candles:
+            start = min([start] + [bars[0].ts.timestamp() for bars in self.candles.values() if bars])
+        self.clock = VirtualClock(start, speed, sleep)
+        self.ingestor = ReplayQuotesIngestor(self.candles, self.clock)
+        self.bar_sec = _bar_sec(self.candles)
+        self.broker: Optional[MarketSimulator] = None
+        self._tasks = tasks
+        self.report = ReplayReport()
+
+    def _build_broker(self) -> MarketSimulator:
+        """캡처 캔들로 구동하는 시뮬레이터 브로커 (수동 진행: 레이트리밋도 가상 시계 기준)"""
+        cfg = SimConfig.from_env()
+        cfg.start = datetime.fromtimestamp(self.clock.now, tz=timezone.utc)
+        cfg.bar_sec = self.bar_sec
+        cfg.speed = 0.0
+        bars = {t: _grid_bars(b, self.clock.now, self.bar_sec) for t, b in self.candles.items() if b}
+        return MarketSimulator(cfg, bars)
+
+    def _step_broker(self) -> None:
+        """가상 시계를 따라 시뮬레이터 봉 진행 (잔량 체결/브래킷 발동)"""
+        if self.broker is None:
+            return
+        behind = int((self.clock.now - self.broker.now.timestamp()) // self.broker.config.bar_sec)
+        if behind > 0:
+            self.broker.step(behind)
+
+    def _reset_streams(self) -> None:
+        """재주입 대상 스트림 초기화 (원본 ID로 XADD하려면 빈 스트림이어야 함)"""
+        keys = sorted({key for key, _, _ in self.entries})
+        if keys:
+            self.redis.delete(*keys)
+
+    def _reset_state(self) -> None:
+        """일일 상한/쿨다운/방향락 키 삭제 (이전 실행 상태로 신호가 억제되지 않도록)"""
+        keys = [k for pattern in REPLAY_RESET_PATTERNS for k in self.redis.scan_iter(match=pattern, count=500)]
+        if keys:
+            self.redis.delete(*keys)
+
+    def _install_components(self) -> Callable[[], None]:
+        """scheduler 컴포넌트 전체 주입 + 시세 어댑터/브로커/시장 시계 교체, 원복 함수 반환
+
+        task_prerun 자동 초기화가 실제 인제스터로 되돌리지 않도록 리플레이 동안 AUTO_INIT_COMPONENTS를 끈다.
+        브로커는 BROKER 설정과 무관하게 시뮬레이터로 고정한다 (주문 경로는 get_trading_adapter() 단일).
+        """
+        from app.jobs import scheduler
+        import app.adapters.trading_adapter as trading_adapter_mod
+        import app.utils.market_clock as market_clock_mod
+
+        saved = dict(scheduler.trading_components)
+        saved_env = {k: os.environ.get(k) for k in ("AUTO_INIT_COMPONENTS", "BROKER")}
+        saved_clock = market_clock_mod._market_clock
+        saved_adapter = trading_adapter_mod._trading_adapter
+        broker = os.getenv("BROKER", "paper")
+        if broker != REPLAY_BROKER:
+            logger.warning(f"리플레이 브로커 강제: {broker} → {REPLAY_BROKER}")
+        os.environ["BROKER"] = REPLAY_BROKER
+        self.broker = self._build_broker()
+        trading_adapter_mod._trading_adapter = self.broker
+        try:
+            scheduler._autoinit_components_if_enabled()
+        except Exception as e:
+            logger.warning(f"리플레이 컴포넌트 초기화 실패: {e}")
+        scheduler.trading_components["quotes_ingestor"] = self.ingestor
+        scheduler.trading_components["slack_bot"] = None  # 리플레이 중 슬랙 발송 차단
+        os.environ["AUTO_INIT_COMPONENTS"] = "false"
+        market_clock_mod._market_clock = ReplayMarketClock(self.clock)
+
+        def restore() -> None:
+            scheduler.trading_components.clear()
+            scheduler.trading_components.update(saved)
+            for k, v in saved_env.items():
+                if v is None:
+                    os.environ.pop(k, None)
+                else:
+                    os.environ[k] = v
+            market_clock_mod._market_clock = saved_clock
+            trading_adapter_mod._trading_adapter = saved_adapter
+
+        return restore
+
+    def _run_task(self, name: str, fn: Callable[[], object]) -> None:
+        t0 = time.perf_counter()
+        try:
+            fn()
+        except Exception as e:
+            self.report.task_errors[name] = self.report.task_errors.get(name, 0) + 1
+            logger.warning(f"리플레이 작업 실패 {name}: {e}")
+        self.report.task_latency_ms.setdefault(name, []).append((time.perf_counter() - t0) * 1000.0)
+        self.report.task_runs[name] = self.report.task_runs.get(name, 0) + 1
+
+    def run(self, until: Optional[float] = None) -> Dict:
+        tasks = self._tasks if self._tasks is not None else _default_tasks()
+        restore = self._install_components() if self._tasks is None else None
+        try:
+            return self._run(tasks, until)
+        finally:
+            if restore:
+                restore()
+
+    def _run(self, tasks: Dict[str, Tuple[float, Callable[[], object]]], until: Optional[float]) -> Dict:
+        # 신호 재생성 모드: 녹화된 signals.raw는 주입하지 않고 generate_signals가 새로 만든다
+        entries = [e for e in self.entries
+                   if not (self.regenerate_signals and "generate_signals" in tasks and e[0] == "signals.raw")]
+        self._reset_streams()
+        self._reset_state()
+
+        start = self.clock.now
+        end = until or max([_id_ms(entries[-1][1]) / 1000.0 if entries else start] +
+                           [bars[-1].ts.timestamp() for bars in self.candles.values() if bars])
+        next_run = {name: start + interval for name, (interval, _) in tasks.items()}
+        wall0 = time.perf_counter()
+        i = 0
+        while True:
+            next_event = _id_ms(entries[i][1]) / 1000.0 if i < len(entries) else None
+            due_task = min(next_run.items(), key=lambda kv: kv[1]) if next_run else None
+            if next_event is not None and (due_task is None or next_event <= due_task[1]):
+                if next_event > end:
+                    break
+                self.clock.advance_to(next_event)
+                self._step_broker()
+                pipe = self.redis.pipeline(transaction=False)
+                # 같은 밀리초 묶음은 한 파이프라인으로
+                while i < len(entries) and _id_ms(entries[i][1]) / 1000.0 <= self.clock.now:
+                    key, mid, data = entries[i]
+                    pipe.xadd(key, encode_stream_fields(data), id=mid)
+                    i += 1
+                    self.report.events += 1
+                pipe.execute()
+            elif due_task is not None and due_task[1] <= end:
+                name, t = due_task
+                self.clock.advance_to(t)
+                self._step_broker()
+                self._run_task(name, tasks[name][1])
+                next_run[name] = t + tasks[name][0]
+            else:
+                break
+        self.report.wall_sec = time.perf_counter() - wall0
+        self.report.virtual_sec = self.clock.now - start
+        summary = self.report.summary()
+        logger.info(f"🎞️ 리플레이 완료: {summary}")
+        return summary
+
+
+def _local_redis(url: str, force: bool = False):
+    """리플레이는 로컬 Redis만 허용 (운영 스트림 덮어쓰기 방지)"""
+    import redis
+    host = urlparse(url).hostname or ""
+    if not force and host not in LOCAL_HOSTS:
+        raise ValueError(f"리플레이 대상 Redis가 로컬이 아님: {host} (--force로 강제)")
+    return redis.from_url(url)
+
+
+def _check_local_database(force: bool = False) -> None:
+    """신호/거래 적재가 운영 Postgres로 가지 않도록 로컬 DSN만 허용"""
+    dsn = os.getenv("POSTGRES_URL") or os.getenv("DATABASE_URL")
+    host = (urlparse(dsn).hostname or "") if dsn else ""
+    if dsn and not force and host not in LOCAL_HOSTS:
+        raise ValueError(f"리플레이 대상 Postgres가 로컬이 아님: {host} (--force로 강제)")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(prog="python -m app.io.replay")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    cap = sub.add_parser("capture")
+    cap.add_argument("--out", required=True)
+    cap.add_argument("--duration", type=float, default=0.0)
+    cap.add_argument("--interval", type=float, default=5.0)
+    cap.add_argument("--no-candles", action="store_true")
+    rep = sub.add_parser("replay")
+    rep.add_argument("--src", required=True)
+    rep.add_argument("--speed", type=float, default=0.0, help="배속 (0=대기 없이 최대 속도)")
+    rep.add_argument("--redis-url", default="redis://localhost:6379/0")
+    rep.add_argument("--keep-signals", action="store_true", help="녹화된 signals.raw 그대로 주입")
+    rep.add_argument("--force", action="store_true")
+    args = parser.parse_args()
+
+    if args.cmd == "capture":
+        import redis as _redis
+        ingestor = None
+        if not args.no_candles:
+            if os.getenv("QUOTES_PROVIDER", "delayed").lower() == "alpaca":
+                from app.io.quotes_alpaca import AlpacaQuotesIngestor
+                ingestor = AlpacaQuotesIngestor()
+            else:
+                ingestor = DelayedQuotesIngestor()
+        cap_ = StreamCapture(_redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0")),
+                             args.out, quotes_ingestor=ingestor)
+        print(json.dumps(cap_.run(args.duration, args.interval)))
+    else:
+        _check_local_database(args.force)
+        os.environ["REDIS_URL"] = args.redis_url  # scheduler 싱글톤들이 로컬 Redis를 보도록
+        driver = ReplayDriver(args.src, _local_redis(args.redis_url, args.force), speed=args.speed,
+                              regenerate_signals=not args.keep_signals)
+        print(json.dumps(driver.run(), ensure_ascii=False, indent=2))
@@ -3,14 +3,69 @@ Redis Streams publish/consume
 메시지 버스로 사용할 Redis Streams 기본 기능
 """
 import redis
-import json
 import logging
 from typing import Dict, List, Optional, Any
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
 from dataclasses import dataclass
 
+from app.io.codec import _text, coerce_text_fields, decode_stream_fields, encode_stream_fields, get_codec
+
 logger = logging.getLogger(__name__)
 
+# =============================================================================
+# 스트림 윈도우 카운터 (EOD 리포트용 O(1) 집계)
+# =============================================================================
+# 키: stats:stream_counts:{YYYYMMDD}  필드: {stream}:{session}
+# - 날짜는 "리포트 날짜"(ET 16:00 이후 이벤트는 다음 날짜로 귀속)
+#   → EOD 윈도우(전일 16:00 ET ~ 당일 16:00 ET)가 해시 하나와 정확히 일치
+# - 세션: post(16:00~20:00) / overnight(20:00~04:00) / pre(04:00~09:30) / rth(09:30~16:00)
+# - 카운터 시작 시각(ms)은 stats:stream_counts:since 에 1회 기록 → 이보다 먼저 열린 윈도우의 해시는
+#   일부만 집계된 것(배포 당일 등)이므로 리포터가 스트림에서 재구성
+# - 재구성된 해시에는 _complete 필드가 붙어 이후에는 그대로 사용
+STREAM_COUNT_KEY_PREFIX = "stats:stream_counts"
+STREAM_COUNT_SINCE_KEY = f"{STREAM_COUNT_KEY_PREFIX}:since"
+STREAM_COUNT_COMPLETE_FIELD = "_complete"
+STREAM_COUNT_TTL_SEC = 14 * 24 * 3600
+COUNTED_STREAMS = (
+    "signals.raw",
+    "signals.tradable",
+    "orders.submitted",
+    "orders.fills",
+    "risk.pnl",
+    "news.edgar",
+    "news.headlines",
+)
+_ET = ZoneInfo("America/New_York")
+
+
+def stream_count_bucket(ts_ms: int) -> tuple:
+    """XADD ID의 밀리초 타임스탬프 → (리포트 날짜 YYYYMMDD, 세션 라벨)"""
+    et = datetime.fromtimestamp(ts_ms / 1000.0, tz=timezone.utc).astimezone(_ET)
+    minutes = et.hour * 60 + et.minute
+    report_date = et.date()
+    if minutes >= 16 * 60:
+        report_date = report_date + timedelta(days=1)
+        session = "post" if minutes < 20 * 60 else "overnight"
+    elif minutes < 4 * 60:
+        session = "overnight"
+    elif minutes < 9 * 60 + 30:
+        session = "pre"
+    else:
+        session = "rth"
+    return report_date.strftime("%Y%m%d"), session
+
+
+def stream_count_key(report_ymd: str) -> str:
+    return f"{STREAM_COUNT_KEY_PREFIX}:{report_ymd}"
+
+
+def _message_id_ms(message_id: Any) -> int:
+    """'1700000000000-0' 형태의 스트림 ID에서 밀리초 추출"""
+    if isinstance(message_id, bytes):
+        message_id = message_id.decode()
+    return int(str(message_id).split("-", 1)[0])
+
 @dataclass
 class StreamMessage:
     """스트림 메시지"""
@@ -30,6 +85,10 @@ class RedisStreams:
             db: Redis 데이터베이스 번호
         """
         self.redis_client = redis.Redis(host=host, port=port, db=db, decode_responses=True)
+        # 소비 전용: 바이너리 페이로드(_p)는 UTF-8 디코드하면 깨지므로 bytes로 받아 코덱이 복원
+        self.binary_client = redis.Redis(host=host, port=port, db=db, decode_responses=False)
+        self.codec = get_codec()
+        self._counter_since_marked = False  # 카운터 시작 시각 기록 여부 (프로세스당 1회 SETNX)
         self.consumer_group = "bot"  # 요구사항에 맞게 변경
         import os
         import uuid
@@ -54,53 +113,50 @@ class RedisStreams:
     
     def _coerce_message_fields(self, data: Dict) -> Dict:
         """Redis XADD는 값으로 bytes/str/int/float만 허용한다.
-        dict/list/None 등은 안전하게 문자열로 변환한다.
+        dict/list/None 등은 안전하게 문자열로 변환한다. (json 코덱 형식, codec.coerce_text_fields)
         """
-        coerced: Dict[str, Any] = {}
-        for key, value in data.items():
-            try:
-                # 기본 허용 타입
-                if isinstance(value, (str, int, float)):
-                    coerced[key] = value
-                    continue
-                # bool은 int로 변환
-                if isinstance(value, bool):
-                    coerced[key] = int(value)
-                    continue
-                # dict/list → JSON 문자열
-                if isinstance(value, (dict, list)):
-                    try:
-                        coerced[key] = json.dumps(value, ensure_ascii=False)
-                    except Exception:
-                        coerced[key] = str(value)
-                    continue
-                # datetime → isoformat
-                from datetime import datetime as _dt
-                if isinstance(value, _dt):
-                    coerced[key] = value.isoformat()
-                    continue
-                # numpy 스칼라 처리 (np.int64, np.float64 등)
-                # hasattr(value, 'item')이면 스칼라로 변환 시도
-                if hasattr(value, "item"):
-                    try:
-                        item_val = value.item()
-                        if isinstance(item_val, (str, int, float)):
-                            coerced[key] = item_val
-                        elif isinstance(item_val, bool):
-                            coerced[key] = int(item_val)
-                        else:
-                            coerced[key] = str(item_val)
-                        continue
-                    except Exception:
-                        pass
-                # 최후 수단: 문자열화
-                coerced[key] = str(value)
-            except Exception:
+        return coerce_text_fields(data)
+
+    def _encode_message(self, data: Dict) -> Dict:
+        """XADD 필드 맵 (바이너리 코덱이면 단일 _p 필드, 아니면 필드별 문자열)"""
+        return encode_stream_fields(data, self.codec)
+
+    def _parse_entries(self, result) -> List[StreamMessage]:
+        """XREADGROUP 결과 → StreamMessage (바이너리/기존 문자열 엔트리 모두 복원)"""
+        messages = []
+        for stream, stream_messages in result or []:
+            for message_id, fields in stream_messages:
+                data = decode_stream_fields(fields)
+                # timestamp 파싱
+                timestamp_str = data.get("timestamp", "")
                 try:
-                    coerced[key] = str(value)
-                except Exception:
-                    coerced[key] = ""
-        return coerced
+                    timestamp = datetime.fromisoformat(timestamp_str) if timestamp_str else datetime.now()
+                except (TypeError, ValueError):
+                    timestamp = datetime.now()
+                messages.append(StreamMessage(
+                    stream=_text(stream),
+                    message_id=_text(message_id),
+                    data=data,
+                    timestamp=timestamp
+                ))
+        return messages
+    
+    def _bump_stream_counter(self, stream_key: str, message_id: Any) -> None:
+        """발행 성공 시 리포트 날짜/세션 버킷 카운터 증가 (실패해도 발행에는 영향 없음)"""
+        if stream_key not in COUNTED_STREAMS or not message_id:
+            return
+        try:
+            ymd, session = stream_count_bucket(_message_id_ms(message_id))
+            key = stream_count_key(ymd)
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.hincrby(key, f"{stream_key}:{session}", 1)
+            pipe.expire(key, STREAM_COUNT_TTL_SEC)
+            if not self._counter_since_marked:
+                pipe.set(STREAM_COUNT_SINCE_KEY, _message_id_ms(message_id), nx=True)
+            pipe.execute()
+            self._counter_since_marked = True
+        except Exception as e:
+            logger.debug(f"스트림 카운터 갱신 실패 ({stream_key}): {e}")
     
     def publish_quote(self, ticker: str, mic: str, data: Dict):
         """시세 데이터 발행"""
@@ -111,7 +167,7 @@ class RedisStreams:
             "timestamp": datetime.now().isoformat(),
             **data
         }
-        message = self._coerce_message_fields(message)
+        message = self._encode_message(message)
         
         try:
             message_id = self.redis_client.xadd(stream_key, message)
@@ -127,10 +183,11 @@ class RedisStreams:
             "timestamp": datetime.now().isoformat(),
             **data
         }
-        message = self._coerce_message_fields(message)
+        message = self._encode_message(message)
         
         try:
             message_id = self.redis_client.xadd("news.headlines", message)
+            self._bump_stream_counter("news.headlines", message_id)
             logger.debug(f"뉴스 발행: {message_id}")
             return message_id
         except Exception as e:
@@ -143,10 +200,11 @@ class RedisStreams:
             "timestamp": datetime.now().isoformat(),
             **data
         }
-        message = self._coerce_message_fields(message)
+        message = self._encode_message(message)
         
         try:
             message_id = self.redis_client.xadd("news.edgar", message)
+            self._bump_stream_counter("news.edgar", message_id)
             logger.debug(f"EDGAR 발행: {message_id}")
             return message_id
         except Exception as e:
@@ -159,10 +217,11 @@ class RedisStreams:
             "timestamp": datetime.now().isoformat(),
             **signal_data
         }
-        message = self._coerce_message_fields(message)
+        message = self._encode_message(message)
         
         try:
             message_id = self.redis_client.xadd("signals.raw", message)
+            self._bump_stream_counter("signals.raw", message_id)
             logger.info(f"시그널 발행: {message_id}")
             return message_id
         except Exception as e:
@@ -175,10 +234,11 @@ class RedisStreams:
             "timestamp": datetime.now().isoformat(),
             **signal_data
         }
-        message = self._coerce_message_fields(message)
+        message = self._encode_message(message)
         
         try:
             message_id = self.redis_client.xadd("signals.tradable", message)
+            self._bump_stream_counter("signals.tradable", message_id)
             logger.info(f"거래 시그널 발행: {message_id}")
             return message_id
         except Exception as e:
@@ -191,10 +251,11 @@ class RedisStreams:
             "timestamp": datetime.now().isoformat(),
             **order_data
         }
-        message = self._coerce_message_fields(message)
+        message = self._encode_message(message)
         
         try:
             message_id = self.redis_client.xadd("orders.submitted", message)
+            self._bump_stream_counter("orders.submitted", message_id)
             logger.info(f"주문 발행: {message_id}")
             return message_id
         except Exception as e:
@@ -207,10 +268,11 @@ class RedisStreams:
             "timestamp": datetime.now().isoformat(),
             **fill_data
         }
-        message = self._coerce_message_fields(message)
+        message = self._encode_message(message)
         
         try:
             message_id = self.redis_client.xadd("orders.fills", message)
+            self._bump_stream_counter("orders.fills", message_id)
             logger.info(f"체결 발행: {message_id}")
             return message_id
         except Exception as e:
@@ -223,10 +285,11 @@ class RedisStreams:
             "timestamp": datetime.now().isoformat(),
             **risk_data
         }
-        message = self._coerce_message_fields(message)
+        message = self._encode_message(message)
         
         try:
             message_id = self.redis_client.xadd("risk.pnl", message)
+            self._bump_stream_counter("risk.pnl", message_id)
             logger.debug(f"리스크 업데이트 발행: {message_id}")
             return message_id
         except Exception as e:
@@ -242,12 +305,12 @@ class RedisStreams:
             if "BUSYGROUP" not in str(e):
                 logger.error(f"컨슈머 그룹 생성 실패: {e}")
     
-    def recover_pending(self, stream_key: str, min_idle_ms: int = 300000, count: int = 100):
-        """PEL에서 idle 메시지들을 자동 클레임하여 복구"""
+    def recover_pending(self, stream_key: str, min_idle_ms: int = 300000, count: int = 100) -> List[StreamMessage]:
+        """PEL에서 idle 메시지들을 자동 클레임하여 복구 (바이너리 페이로드도 코덱으로 복원)"""
         try:
             self.ensure_consumer_group(stream_key)
             # 0-0부터 자동 클레임
-            res = self.redis_client.xautoclaim(
+            res = self.binary_client.xautoclaim(
                 stream_key, 
                 self.consumer_group,
                 self.consumer_name, 
@@ -255,7 +318,7 @@ class RedisStreams:
                 start_id='0-0', 
                 count=count
             )
-            claimed = res[1] if isinstance(res, (list, tuple)) else []
+            claimed = self._parse_entries([(stream_key, res[1])]) if isinstance(res, (list, tuple)) else []
             if claimed:
                 logger.warning(f"펜딩 복구: {stream_key} {len(claimed)}건 재할당")
             return claimed
@@ -271,30 +334,14 @@ class RedisStreams:
             self.ensure_consumer_group(stream_key)
             
             # XREADGROUP으로 메시지 읽기
-            result = self.redis_client.xreadgroup(
+            result = self.binary_client.xreadgroup(
                 self.consumer_group,
                 self.consumer_name,
                 {stream_key: '>'},
                 count=count,
                 block=block_ms
             )
-            
-            messages = []
-            for stream, stream_messages in result:
-                for message_id, data in stream_messages:
-                    # timestamp 파싱
-                    timestamp_str = data.get("timestamp", "")
-                    timestamp = datetime.fromisoformat(timestamp_str) if timestamp_str else datetime.now()
-                    
-                    message = StreamMessage(
-                        stream=stream,
-                        message_id=message_id,
-                        data=data,
-                        timestamp=timestamp
-                    )
-                    messages.append(message)
-            
-            return messages
+            return self._parse_entries(result)
             
         except Exception as e:
             # SoftTimeLimitExceeded 등 간헐적 시간 초과는 경고로 강등하여 소음 축소
@@ -336,6 +383,18 @@ class RedisStreams:
         """EDGAR 스트림 소비"""
         return self.consume_stream("news.edgar", count, block_ms)
     
+    def latest_ids_by_ticker(self, stream_keys, count: int = 200) -> Dict[str, str]:
+        """스트림들의 최근 count건에서 종목별 최신 메시지 ID (컨슈머 그룹과 무관한 XREVRANGE 조회)"""
+        latest: Dict[str, tuple] = {}
+        for stream_key in stream_keys:
+            for message_id, fields in self.binary_client.xrevrange(stream_key, count=count) or []:
+                ticker = str(decode_stream_fields(fields).get("ticker") or "").upper()
+                mid = _text(message_id)
+                order = tuple(int(x) for x in mid.split("-"))
+                if ticker and (ticker not in latest or order > latest[ticker][0]):
+                    latest[ticker] = (order, mid)
+        return {ticker: mid for ticker, (_, mid) in latest.items()}
+
     def consume_signals(self, count: int = 10, block_ms: int = 1000) -> List[StreamMessage]:
         """시그널 스트림 소비"""
         return self.consume_stream("signals.raw", count, block_ms)
@@ -363,9 +422,9 @@ class RedisStreams:
     def get_latest_message_id(self, stream_key: str) -> Optional[str]:
         """최신 메시지 ID 조회"""
         try:
-            result = self.redis_client.xrevrange(stream_key, count=1)
+            result = self.binary_client.xrevrange(stream_key, count=1)
             if result:
-                return result[0][0]  # (message_id, data) 튜플의 첫 번째 요소
+                return _text(result[0][0])  # (message_id, data) 튜플의 첫 번째 요소
             return None
         except Exception as e:
             logger.error(f"최신 메시지 ID 조회 실패 ({stream_key}): {e}")
@@ -399,29 +458,14 @@ class RedisStreams:
                        count: int = 10, block_ms: int = 1000) -> List[StreamMessage]:
         """컨슈머 그룹에서 메시지 읽기"""
         try:
-            result = self.redis_client.xreadgroup(
+            result = self.binary_client.xreadgroup(
                 group_name,
                 consumer_name,
                 {stream_key: ">"},  # ">" = latest (요구사항)
                 count=count,
                 block=block_ms
             )
-            
-            messages = []
-            for stream, stream_messages in result:
-                for message_id, data in stream_messages:
-                    timestamp_str = data.get("timestamp", "")
-                    timestamp = datetime.fromisoformat(timestamp_str) if timestamp_str else datetime.now()
-                    
-                    message = StreamMessage(
-                        stream=stream,
-                        message_id=message_id,
-                        data=data,
-                        timestamp=timestamp
-                    )
-                    messages.append(message)
-            
-            return messages
+            return self._parse_entries(result)
             
         except Exception as e:
             logger.error(f"그룹 읽기 실패 ({stream_key}): {e}")
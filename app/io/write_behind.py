@@ -0,0 +1,444 @@
+"""
+쓰기 지연(write-behind) 영속화
+- 신호/거래/청산 결정 감사 행을 Redis 스트림(persist.rows)에 XADD만 하고 즉시 반환 → 거래 경로에서 DB 왕복 제거
+- 신호 ID는 Postgres 시퀀스에서 블록 단위로 선할당(HiLo) → RETURNING 대기 없이 호출 측이 ID 부여, trades.signal_id 연계 유지
+- 플러셔(Celery beat)가 소비자 그룹으로 배치 읽기 → 테이블별 멀티로우 INSERT(execute_values) ON CONFLICT DO NOTHING → XACK/XDEL
+- 크래시로 미확인(pending) 상태인 항목은 XAUTOCLAIM으로 재처리 (클라이언트 ID 기준 멱등)
+- Redis 미설정/장애 시 로컬 스풀 파일(JSONL, 파일 락)로 폴백 → 워커 재시작 후에도 다음 플러시가 이어서 적재
+- 플러시 지연(가장 오래된 미플러시 행 나이)을 persist:metrics 해시에 기록
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Deque, Dict, List, Optional, Tuple
+
+import psycopg2
+import psycopg2.extras
+import redis
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - 비 POSIX
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+WRITE_BEHIND_STREAM = "persist.rows"
+WRITE_BEHIND_GROUP = "persist-writer"
+DEAD_LETTER_STREAM = "persist.rows.dead"
+METRICS_KEY = "persist:metrics"
+
+WRITE_BEHIND_BATCH = int(os.getenv("WRITE_BEHIND_BATCH", "500"))
+WRITE_BEHIND_MAX_BATCHES = int(os.getenv("WRITE_BEHIND_MAX_BATCHES", "20"))
+WRITE_BEHIND_CLAIM_IDLE_MS = int(os.getenv("WRITE_BEHIND_CLAIM_IDLE_MS", "60000"))
+WRITE_BEHIND_FLUSH_SEC = float(os.getenv("WRITE_BEHIND_FLUSH_SEC", "1.0"))   # 스풀 폴백 플러시 주기
+WRITE_BEHIND_SPOOL_DIR = os.getenv("WRITE_BEHIND_SPOOL_DIR", "logs/write_behind")
+WRITE_BEHIND_ID_BLOCK = int(os.getenv("WRITE_BEHIND_ID_BLOCK", "200"))
+
+
+@dataclass(frozen=True)
+class TableSpec:
+    """배치 INSERT 대상 테이블 (컬럼 순서 고정 + 멱등 키)"""
+    name: str
+    columns: Tuple[str, ...]
+    conflict: str
+
+
+# 삽입 순서 = 딕셔너리 순서 (trades.signal_id → signals.id FK)
+TABLES: Dict[str, TableSpec] = {
+    "signals": TableSpec("signals", (
+        "id", "ts", "ticker", "signal_type", "score", "confidence", "regime", "tech_score",
+        "sentiment_score", "edgar_bonus", "trigger", "summary", "entry_price", "stop_loss",
+        "take_profit", "horizon_minutes", "meta",
+    ), "id"),
+    "trades": TableSpec("trades", (
+        "trade_id", "ticker", "side", "quantity", "price", "signal_id", "created_at", "status",
+    ), "trade_id"),
+    "exit_decisions": TableSpec("exit_decisions", (
+        "decision_id", "ts", "symbol", "side", "qty", "policy", "reason", "tif",
+        "attempt", "market_state", "order_id", "price",
+    ), "decision_id"),
+}
+
+
+def _s(v) -> str:
+    return v.decode() if isinstance(v, bytes) else str(v)
+
+
+class WriteBehindStore:
+    """스트림 버퍼 + 배치 플러시 영속화 서비스"""
+
+    def __init__(self, redis_url: Optional[str] = None, dsn: Optional[str] = None,
+                 batch_size: int = WRITE_BEHIND_BATCH, id_block: int = WRITE_BEHIND_ID_BLOCK,
+                 spool_dir: Optional[str] = None):
+        self.redis_url = redis_url if redis_url is not None else os.getenv("REDIS_URL")
+        self.dsn = dsn if dsn is not None else (os.getenv("POSTGRES_URL") or os.getenv("DATABASE_URL"))
+        self.batch_size = batch_size
+        self.id_block = max(1, id_block)
+        self.consumer = f"{socket.gethostname()}:{os.getpid()}"
+        self._r = None
+        self._conn = None
+        self._group_ready = False
+        self._lock = threading.Lock()
+        self.spool = Path(spool_dir or WRITE_BEHIND_SPOOL_DIR)
+        self._ids: Dict[str, Deque[int]] = {}
+        self._refill_wanted = threading.Event()
+        self._threads: Dict[str, threading.Thread] = {}
+        self.stats = {"enqueued": 0, "flushed": 0, "dead": 0, "id_misses": 0,
+                      "last_flush_rows": 0, "last_flush_ms": 0.0}
+
+    @property
+    def r(self):
+        if self._r is None and self.redis_url:
+            self._r = redis.from_url(self.redis_url)
+        return self._r
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.dsn)
+
+    # ------------------------------------------------------------------
+    # 클라이언트 ID (시퀀스 블록 선할당)
+    # ------------------------------------------------------------------
+    def next_id(self, table: str = "signals") -> Optional[int]:
+        """SERIAL 컬럼용 ID 1개 (로컬 풀에서 꺼냄, 잔량 부족 시 백그라운드 보충)"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            pool = self._ids.setdefault(table, deque())
+            if pool:
+                if len(pool) <= self.id_block // 4:
+                    self._request_refill()
+                return pool.popleft()
+        # 풀 고갈 (콜드 스타트) → 동기 보충 1회
+        self.stats["id_misses"] += 1
+        self.refill_ids(table)
+        with self._lock:
+            pool = self._ids.get(table)
+            return pool.popleft() if pool else None
+
+    def refill_ids(self, table: str = "signals") -> int:
+        try:
+            with psycopg2.connect(self.dsn) as conn:
+                with conn.cursor() as cur:
+                    cur.execute(
+                        "SELECT nextval(pg_get_serial_sequence(%s, 'id')) FROM generate_series(1, %s)",
+                        (table, self.id_block),
+                    )
+                    ids = [int(row[0]) for row in cur.fetchall()]
+        except Exception as e:
+            logger.warning(f"ID 블록 선할당 실패 {table}: {e}")
+            return 0
+        with self._lock:
+            self._ids.setdefault(table, deque()).extend(ids)
+        return len(ids)
+
+    def _request_refill(self) -> None:
+        self._refill_wanted.set()
+        self._ensure_thread("refill", self._refill_loop)
+
+    def _refill_loop(self) -> None:
+        while True:
+            self._refill_wanted.wait()
+            self._refill_wanted.clear()
+            for table in list(self._ids):
+                if len(self._ids[table]) <= self.id_block // 4:
+                    self.refill_ids(table)
+
+    def warm(self, table: str = "signals") -> None:
+        """워커 기동 시 ID 풀 선충전 (백그라운드)"""
+        if self.enabled:
+            self._ids.setdefault(table, deque())
+            self._request_refill()
+
+    # ------------------------------------------------------------------
+    # 적재 (거래 경로)
+    # ------------------------------------------------------------------
+    def enqueue(self, table: str, row: Dict) -> bool:
+        """행 1건 버퍼링 (스트림 XADD 1회, 실패 시 로컬 스풀 파일)"""
+        if table not in TABLES or not self.enabled:
+            return False
+        payload = json.dumps({"t": table, "row": row, "ts": time.time()}, default=str)
+        self.stats["enqueued"] += 1
+        if self.r is not None:
+            try:
+                self.r.xadd(WRITE_BEHIND_STREAM, {"d": payload})
+                return True
+            except Exception as e:
+                logger.warning(f"쓰기 지연 스트림 적재 실패, 스풀 파일 사용: {e}")
+        try:
+            self._spool_append(payload)
+        except Exception as e:
+            logger.error(f"쓰기 지연 스풀 적재 실패 (행 유실): {e}")
+            return False
+        self._ensure_thread("flush", self._spool_flush_loop)
+        return True
+
+    def _ensure_thread(self, name: str, target) -> None:
+        t = self._threads.get(name)
+        if t is None or not t.is_alive():
+            t = threading.Thread(target=target, name=f"write-behind-{name}", daemon=True)
+            self._threads[name] = t
+            t.start()
+
+    def _spool_flush_loop(self) -> None:
+        while True:
+            time.sleep(WRITE_BEHIND_FLUSH_SEC)
+            try:
+                self.flush_spool()
+            except Exception as e:
+                logger.warning(f"스풀 플러시 실패: {e}")
+
+    # ------------------------------------------------------------------
+    # 스풀 파일 (Redis 장애 시 내구 버퍼)
+    # ------------------------------------------------------------------
+    def _spool_locked(self):
+        self.spool.mkdir(parents=True, exist_ok=True)
+        lf = open(self.spool / ".lock", "a")
+        if fcntl:
+            fcntl.flock(lf, fcntl.LOCK_EX)
+        return lf  # close() 시 락 해제
+
+    def _spool_append(self, payload: str) -> None:
+        lf = self._spool_locked()
+        try:
+            with open(self.spool / "spool.jsonl", "a") as f:
+                f.write(payload + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+        finally:
+            lf.close()
+
+    def _spool_files(self) -> List[Path]:
+        """플러시 대상 스풀 (내 것 + 유휴 시간이 지난 다른 프로세스 잔여분, 오래된 순)"""
+        if not self.spool.exists():
+            return []
+        stale = time.time() - WRITE_BEHIND_CLAIM_IDLE_MS / 1000.0
+        mine = f"spool-{os.getpid()}-"
+        files = []
+        for p in self.spool.glob("spool-*.flushing"):
+            try:
+                mtime = p.stat().st_mtime
+            except FileNotFoundError:
+                continue  # 다른 플러셔가 방금 처리
+            if p.name.startswith(mine) or mtime < stale:
+                files.append((mtime, p))
+        return [p for _, p in sorted(files)]
+
+    def _read_spool(self, path: Path) -> List[str]:
+        try:
+            with open(path) as f:
+                return [line.rstrip("\n") for line in f if line.endswith("\n")]
+        except FileNotFoundError:
+            return []  # 다른 플러셔가 먼저 처리
+
+    def spool_backlog(self) -> int:
+        if not self.spool.exists():
+            return 0
+        paths = list(self.spool.glob("spool-*.flushing")) + [self.spool / "spool.jsonl"]
+        return sum(len(self._read_spool(p)) for p in paths)
+
+    # ------------------------------------------------------------------
+    # 플러시 (백그라운드)
+    # ------------------------------------------------------------------
+    def _db(self):
+        if self._conn is None or self._conn.closed:
+            self._conn = psycopg2.connect(self.dsn)
+        return self._conn
+
+    def _ensure_group(self) -> None:
+        if self._group_ready:
+            return
+        try:
+            self.r.xgroup_create(WRITE_BEHIND_STREAM, WRITE_BEHIND_GROUP, id="0", mkstream=True)
+        except redis.ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        self._group_ready = True
+
+    def flush(self, max_batches: int = WRITE_BEHIND_MAX_BATCHES) -> Dict:
+        """스풀 → 스트림 배치 플러시 (크래시 잔여분 재청구 → 신규분), 메트릭 갱신"""
+        t0 = time.time()
+        rows = self.flush_spool()
+        r = self.r
+        if r is not None and self.enabled:
+            self._ensure_group()
+            try:
+                claimed = r.xautoclaim(WRITE_BEHIND_STREAM, WRITE_BEHIND_GROUP, self.consumer,
+                                       WRITE_BEHIND_CLAIM_IDLE_MS, start_id="0-0", count=self.batch_size)
+                entries = claimed[1] if claimed else []
+                if entries:
+                    rows += self._flush_entries(entries)
+            except redis.ResponseError as e:
+                logger.debug(f"XAUTOCLAIM 미지원/실패: {e}")
+            for _ in range(max(1, max_batches)):
+                resp = r.xreadgroup(WRITE_BEHIND_GROUP, self.consumer, {WRITE_BEHIND_STREAM: ">"},
+                                    count=self.batch_size)
+                entries = resp[0][1] if resp else []
+                if not entries:
+                    break
+                rows += self._flush_entries(entries)
+        self.stats["last_flush_rows"] = rows
+        self.stats["last_flush_ms"] = round((time.time() - t0) * 1000, 1)
+        metrics = self.metrics()
+        if r is not None:
+            try:
+                r.hset(METRICS_KEY, mapping={k: json.dumps(v) for k, v in metrics.items()})
+            except Exception as e:
+                logger.debug(f"쓰기 지연 메트릭 기록 실패: {e}")
+        return metrics
+
+    def flush_spool(self) -> int:
+        """스풀 파일을 플러시 중 파일로 넘긴 뒤 DB 적재 → 성공 시 삭제
+
+        DB 장애면 파일을 남겨 다음 주기(또는 재시작 후 유휴 시간이 지나 다른 프로세스)가 재시도 (ID 기준 멱등)
+        """
+        if not self.spool.exists():
+            return 0
+        current = self.spool / "spool.jsonl"
+        if current.exists():
+            lf = self._spool_locked()
+            try:
+                if current.exists() and current.stat().st_size > 0:
+                    os.replace(current, self.spool / f"spool-{os.getpid()}-{time.time_ns()}.flushing")
+            finally:
+                lf.close()
+        written = 0
+        for path in self._spool_files():
+            payloads = self._read_spool(path)
+            for i in range(0, len(payloads), self.batch_size):
+                n, dead = self._write(payloads[i:i + self.batch_size])
+                self._dead_letter(dead)
+                written += n
+            path.unlink(missing_ok=True)
+        return written
+
+    def _flush_entries(self, entries: List) -> int:
+        ids = [msg_id for msg_id, _ in entries]
+        payloads = [_s(data.get(b"d") or data.get("d") or "{}") for _, data in entries]
+        written, dead = self._write(payloads)
+        self._dead_letter(dead)
+        # 성공/데드레터 처리 완료 → 확인 후 삭제 (DB 예외로 _write가 중단되면 pending 유지 → 재청구)
+        pipe = self.r.pipeline(transaction=False)
+        pipe.xack(WRITE_BEHIND_STREAM, WRITE_BEHIND_GROUP, *ids)
+        pipe.xdel(WRITE_BEHIND_STREAM, *ids)
+        pipe.execute()
+        return written
+
+    def _write(self, payloads: List[str]) -> Tuple[int, List[str]]:
+        """테이블별 멀티로우 INSERT, 배치 실패 시 행 단위 재시도 → (성공 행 수, 실패 payload)"""
+        grouped: Dict[str, List[Tuple[str, tuple]]] = {t: [] for t in TABLES}
+        dead: List[str] = []
+        for p in payloads:
+            try:
+                d = json.loads(p)
+                spec = TABLES[d["t"]]
+                row = d["row"]
+                grouped[spec.name].append((p, tuple(row.get(c) for c in spec.columns)))
+            except Exception:
+                dead.append(p)
+        conn = self._db()
+        try:
+            with conn.cursor() as cur:
+                for name, items in grouped.items():
+                    if items:
+                        self._insert(cur, TABLES[name], [v for _, v in items])
+            conn.commit()
+            written = sum(len(v) for v in grouped.values())
+        except psycopg2.OperationalError:
+            self._conn = None
+            raise
+        except Exception as e:
+            conn.rollback()
+            logger.warning(f"배치 INSERT 실패, 행 단위 재시도: {e}")
+            written = 0
+            for name, items in grouped.items():
+                for p, values in items:
+                    try:
+                        with conn.cursor() as cur:
+                            self._insert(cur, TABLES[name], [values])
+                        conn.commit()
+                        written += 1
+                    except psycopg2.OperationalError:
+                        self._conn = None
+                        raise
+                    except Exception as row_e:
+                        conn.rollback()
+                        logger.error(f"영속화 행 실패 {name}: {row_e}")
+                        dead.append(p)
+        self.stats["flushed"] += written
+        return written, dead
+
+    @staticmethod
+    def _insert(cur, spec: TableSpec, values: List[tuple]) -> None:
+        psycopg2.extras.execute_values(
+            cur,
+            f"INSERT INTO {spec.name} ({', '.join(spec.columns)}) VALUES %s "
+            f"ON CONFLICT ({spec.conflict}) DO NOTHING",
+            values,
+            page_size=max(1, len(values)),
+        )
+
+    def _dead_letter(self, payloads: List[str]) -> None:
+        if not payloads:
+            return
+        self.stats["dead"] += len(payloads)
+        if self.r is None:
+            return
+        try:
+            pipe = self.r.pipeline(transaction=False)
+            for p in payloads:
+                pipe.xadd(DEAD_LETTER_STREAM, {"d": p}, maxlen=10000, approximate=True)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"데드레터 기록 실패 ({len(payloads)}건): {e}")
+
+    # ------------------------------------------------------------------
+    # 메트릭
+    # ------------------------------------------------------------------
+    def lag_seconds(self) -> float:
+        """가장 오래된 미플러시 행의 나이 (초)"""
+        oldest = None
+        for path in self._spool_files()[:1] or [self.spool / "spool.jsonl"]:
+            head = self._read_spool(path)[:1] if path.exists() else []
+            try:
+                oldest = float(json.loads(head[0]).get("ts")) if head else None
+            except Exception:
+                oldest = None
+        if self.r is not None:
+            try:
+                head = self.r.xrange(WRITE_BEHIND_STREAM, min="-", max="+", count=1)
+                if head:
+                    ms = int(_s(head[0][0]).split("-")[0])
+                    oldest = min(oldest, ms / 1000.0) if oldest else ms / 1000.0
+            except Exception as e:
+                logger.debug(f"플러시 지연 계산 실패: {e}")
+        return round(max(0.0, time.time() - oldest), 3) if oldest else 0.0
+
+    def metrics(self) -> Dict:
+        backlog = self.spool_backlog()
+        if self.r is not None:
+            try:
+                backlog += int(self.r.xlen(WRITE_BEHIND_STREAM) or 0)
+            except Exception:
+                pass
+        return {**self.stats, "backlog": backlog, "lag_sec": self.lag_seconds(), "ts": int(time.time())}
+
+
+_write_behind: Optional[WriteBehindStore] = None
+
+
+def get_write_behind() -> WriteBehindStore:
+    """글로벌 쓰기 지연 저장소 인스턴스 반환"""
+    global _write_behind
+    if _write_behind is None:
+        _write_behind = WriteBehindStore()
+    return _write_behind
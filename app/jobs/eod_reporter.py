@@ -11,11 +11,30 @@ import json
 import logging
 from datetime import datetime, timedelta, timezone
 from typing import Dict, Any, Optional
+from zoneinfo import ZoneInfo
 
 import redis
 
+from app.io.streams import (
+    COUNTED_STREAMS,
+    STREAM_COUNT_COMPLETE_FIELD,
+    STREAM_COUNT_SINCE_KEY,
+    STREAM_COUNT_TTL_SEC,
+    stream_count_bucket,
+    stream_count_key,
+)
+
 logger = logging.getLogger(__name__)
 
+# 요약 키 ↔ 스트림 매핑
+EOD_COUNT_STREAMS = {
+    "signals_raw": "signals.raw",
+    "signals_tradable": "signals.tradable",
+    "orders_submitted": "orders.submitted",
+    "orders_fills": "orders.fills",
+    "risk_updates": "risk.pnl",
+}
+
 
 def _get_redis() -> Optional[redis.Redis]:
     try:
@@ -26,53 +45,144 @@ def _get_redis() -> Optional[redis.Redis]:
         return None
 
 
-def _xr_count(r: redis.Redis, stream: str, start_ms: int, end_ms: int) -> int:
+def _report_window_et(report_date) -> tuple:
+    """리포트 날짜의 윈도우: 전일 16:00 ET ~ 당일 16:00 ET (DST 반영)"""
+    et = ZoneInfo("America/New_York")
+    et_close = datetime.combine(report_date, datetime.min.time(), tzinfo=et).replace(hour=16)
+    et_open = datetime.combine(report_date - timedelta(days=1), datetime.min.time(), tzinfo=et).replace(hour=16)
+    return et_open, et_close
+
+
+def _read_counter_hash(r: redis.Redis, report_ymd: str) -> tuple:
+    """카운터 해시 1회 조회 → ({stream: {session: n}} | None, 재구성 완료 여부)"""
+    try:
+        raw = r.hgetall(stream_count_key(report_ymd)) or {}
+    except Exception as e:
+        logger.warning(f"스트림 카운터 조회 실패: {e}")
+        return None, False
+    if not raw:
+        return None, False
+    out: Dict[str, Dict[str, int]] = {}
+    complete = False
+    for k, v in raw.items():
+        k = k.decode() if isinstance(k, bytes) else str(k)
+        if k == STREAM_COUNT_COMPLETE_FIELD:
+            complete = True
+            continue
+        stream, _, session = k.rpartition(":")
+        try:
+            out.setdefault(stream, {})[session] = int(v)
+        except Exception:
+            continue
+    return out, complete
+
+
+def read_stream_counts(r: redis.Redis, report_ymd: str) -> Optional[Dict[str, Dict[str, int]]]:
+    """윈도우 카운터 해시 1회 조회 → {stream: {session: n}}. 해시가 없으면 None"""
+    return _read_counter_hash(r, report_ymd)[0]
+
+
+def _counters_since_ms(r: redis.Redis) -> Optional[int]:
     try:
-        # XRANGE stream start end COUNT N — 대략 상한선으로 충분히 큰 값 사용
-        start_id = f"{start_ms}-0"
-        end_id = f"{end_ms}-9999"
-        # 대용량 방지: 페이지 단위로 합산
-        total = 0
-        last_id = start_id
-        page = r.xrange(stream, min=start_id, max=end_id, count=1000)
-        while page:
-            total += len(page)
-            last = page[-1][0]
-            # 다음 페이지 시작 ID (exclusive)
-            page = r.xrange(stream, min=last, max=end_id, count=1000)
-            # 첫 항목이 last와 같을 수 있어 무한루프 방지
-            if page and page[0][0] == last:
-                page = page[1:]
-        return total
+        raw = r.get(STREAM_COUNT_SINCE_KEY)
+        return int(raw) if raw is not None else None
     except Exception:
-        return 0
+        return None
+
+
+def load_stream_counts(r: redis.Redis, report_ymd: str, now_utc: datetime | None = None) -> tuple:
+    """리포트 날짜 카운트 → ({stream: {session: n}}, 출처)
+
+    카운터가 윈도우 전체를 덮을 때만(카운터 시작 시각 ≤ 윈도우 시작, 또는 재구성 완료 표시) 해시를 그대로 쓰고,
+    없거나 일부만 있으면(배포 당일·Redis 유실 후) 스트림에서 다시 센다. 윈도우가 닫혔으면 그 결과로 해시를
+    채워 두어(backfill) 다음 조회부터는 HGETALL 1회로 끝난다. 열린 윈도우는 발행 중인 증가분을 덮어쓰지
+    않도록 저장하지 않는다(xrange).
+    """
+    report_date = datetime.strptime(report_ymd, "%Y%m%d").date()
+    et_open, et_close = _report_window_et(report_date)
+    buckets, complete = _read_counter_hash(r, report_ymd)
+    if buckets is not None:
+        since_ms = _counters_since_ms(r)
+        if complete or (since_ms is not None and since_ms <= int(et_open.timestamp() * 1000)):
+            return buckets, "counters"
+    now_utc = now_utc or datetime.now(timezone.utc)
+    closed = now_utc >= et_close
+    counts = rebuild_stream_counters(r, report_ymd, write=closed)
+    return counts, ("backfill" if closed else "xrange")
+
+
+def rebuild_stream_counters(r: redis.Redis, report_ymd: str, write: bool = True) -> Dict[str, Dict[str, int]]:
+    """기존 스트림을 XRANGE로 한 번 훑어 해당 리포트 날짜의 카운터를 재구성 (백필용).
+
+    카운터 도입 이전 날짜나 카운터 유실 시 사용. 새 해시를 임시 키에 만든 뒤 RENAME으로
+    교체하므로 재구성 도중 들어온 발행분 일부는 누락될 수 있다(장 마감 후 실행 권장).
+    write=False면 세기만 하고 해시는 건드리지 않는다.
+    """
+    report_date = datetime.strptime(report_ymd, "%Y%m%d").date()
+    et_open, et_close = _report_window_et(report_date)
+    start_id = f"{int(et_open.timestamp() * 1000)}-0"
+    end_ms = int(et_close.timestamp() * 1000) - 1
+    end_id = f"{end_ms}-18446744073709551615"
+
+    counts: Dict[str, Dict[str, int]] = {}
+    for stream in COUNTED_STREAMS:
+        last_id = None
+        while True:
+            lo = f"({last_id}" if last_id else start_id
+            try:
+                page = r.xrange(stream, min=lo, max=end_id, count=1000)
+            except Exception as e:
+                logger.warning(f"스트림 백필 조회 실패 ({stream}): {e}")
+                break
+            if not page:
+                break
+            for msg_id, _ in page:
+                mid = msg_id.decode() if isinstance(msg_id, bytes) else str(msg_id)
+                ymd, session = stream_count_bucket(int(mid.split("-", 1)[0]))
+                if ymd == report_ymd:
+                    per = counts.setdefault(stream, {})
+                    per[session] = per.get(session, 0) + 1
+            last_id = page[-1][0].decode() if isinstance(page[-1][0], bytes) else str(page[-1][0])
+
+    if not write:
+        return counts
+    key = stream_count_key(report_ymd)
+    mapping = {f"{stream}:{session}": n for stream, per in counts.items() for session, n in per.items()}
+    mapping[STREAM_COUNT_COMPLETE_FIELD] = 1  # 빈 윈도우도 재구성 완료로 표시 (반복 재구성 방지)
+    try:
+        tmp = f"{key}:rebuild"
+        pipe = r.pipeline()
+        pipe.delete(tmp)
+        pipe.hset(tmp, mapping=mapping)
+        pipe.rename(tmp, key)
+        pipe.expire(key, STREAM_COUNT_TTL_SEC)
+        pipe.execute()
+    except Exception as e:
+        logger.error(f"스트림 카운터 저장 실패 ({report_ymd}): {e}")
+    logger.info(f"스트림 카운터 백필 완료: {report_ymd} {sum(len(v) for v in counts.values())}개 버킷")
+    return counts
 
 
 def _build_eod_summary(now_utc: datetime | None = None) -> Dict[str, Any]:
     now_utc = now_utc or datetime.now(timezone.utc)
-    et = timezone(timedelta(hours=-5))  # EST 기준, 세부 DST는 단순화
     kst = timezone(timedelta(hours=+9))
 
     # 리포팅 윈도우: 전일 16:00 ET ~ 당일 16:00 ET
-    et_today = now_utc.astimezone(et).date()
-    et_close = datetime.combine(et_today, datetime.min.time(), tzinfo=et).replace(hour=16)
-    et_open = et_close - timedelta(hours=24)
-
-    start_ms = int(et_open.timestamp() * 1000)
-    end_ms = int(et_close.timestamp() * 1000)
+    et_today = now_utc.astimezone(ZoneInfo("America/New_York")).date()
+    et_open, et_close = _report_window_et(et_today)
+    report_ymd = et_today.strftime("%Y%m%d")
 
     r = _get_redis()
-    counts = {}
+    counts = {k: 0 for k in EOD_COUNT_STREAMS}
+    sessions: Dict[str, Dict[str, int]] = {}
+    counts_source = "none"
     if r:
-        counts = {
-            "signals_raw": _xr_count(r, "signals.raw", start_ms, end_ms),
-            "signals_tradable": _xr_count(r, "signals.tradable", start_ms, end_ms),
-            "orders_submitted": _xr_count(r, "orders.submitted", start_ms, end_ms),
-            "orders_fills": _xr_count(r, "orders.fills", start_ms, end_ms),
-            "risk_updates": _xr_count(r, "risk.pnl", start_ms, end_ms),
-        }
-    else:
-        counts = {k: 0 for k in ["signals_raw", "signals_tradable", "orders_submitted", "orders_fills", "risk_updates"]}
+        # 발행 시점에 누적된 윈도우 카운터 (HGETALL 1회), 윈도우를 다 덮지 못하면 스트림에서 재구성
+        buckets, counts_source = load_stream_counts(r, report_ymd, now_utc)
+        for name, stream in EOD_COUNT_STREAMS.items():
+            per = buckets.get(stream, {})
+            counts[name] = sum(per.values())
+            sessions[name] = per
 
     # 포트폴리오 요약(가능하면)
     portfolio: Dict[str, Any] = {}
@@ -91,6 +201,8 @@ def _build_eod_summary(now_utc: datetime | None = None) -> Dict[str, Any]:
         },
         "generated_at": now_utc.astimezone(kst).isoformat(),
         "counts": counts,
+        "counts_by_session": sessions,
+        "counts_source": counts_source,
         "portfolio": {
             "equity": portfolio.get("equity"),
             "positions_count": portfolio.get("positions_count", len(portfolio.get("positions", []))),
@@ -161,4 +273,37 @@ if CELERY_AVAILABLE and celery_app:
             logger.error(f"KST 아침 로그 실패: {e}")
             return {"status": "error", "error": str(e)}
 
+    @celery_app.task(name="app.jobs.eod_reporter.backfill_stream_counters")
+    def backfill_stream_counters(days: int = 1, end_ymd: Optional[str] = None):
+        """최근 N개 리포트 날짜의 스트림 카운터를 스트림에서 재구성"""
+        try:
+            r = _get_redis()
+            if not r:
+                return {"status": "error", "error": "redis unavailable"}
+            if end_ymd:
+                end_date = datetime.strptime(end_ymd, "%Y%m%d").date()
+            else:
+                end_date = datetime.now(ZoneInfo("America/New_York")).date()
+            done = []
+            for i in range(max(1, int(days))):
+                ymd = (end_date - timedelta(days=i)).strftime("%Y%m%d")
+                rebuild_stream_counters(r, ymd)
+                done.append(ymd)
+            return {"status": "ok", "dates": done}
+        except Exception as e:
+            logger.error(f"스트림 카운터 백필 실패: {e}")
+            return {"status": "error", "error": str(e)}
+
+
+if __name__ == "__main__":
+    # 수동 백필: python -m app.jobs.eod_reporter 20250102 [20250103 ...]
+    import sys
+
+    logging.basicConfig(level=logging.INFO)
+    _r = _get_redis()
+    if _r is None:
+        sys.exit("Redis 연결 실패 (REDIS_URL 확인)")
+    for _ymd in sys.argv[1:] or [datetime.now(ZoneInfo("America/New_York")).strftime("%Y%m%d")]:
+        print(_ymd, rebuild_stream_counters(_r, _ymd))
+
 
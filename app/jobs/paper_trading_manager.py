@@ -11,12 +11,15 @@
 """
 
 import logging
+import os
 from datetime import datetime
 from typing import Optional, Dict, List, Tuple
 from dataclasses import dataclass
 
 from app.engine.mixer import TradingSignal
 from app.adapters.paper_ledger import PaperLedger, PaperTrade
+from app.adapters.trigger_book import STOP, TARGET, Trigger, TriggerBook
+from app.io.codec import decode_stream_fields
 
 logger = logging.getLogger(__name__)
 
@@ -57,17 +60,17 @@ class PerformanceMetrics:
 class PaperTradingManager:
     """스마트 페이퍼 트레이딩 매니저"""
     
-    def __init__(self, initial_cash: float = 1000000.0):
-        self.ledger = PaperLedger(initial_cash)
+    def __init__(self, initial_cash: float = 1000000.0, trigger_book: Optional[TriggerBook] = None):
+        self.ledger = PaperLedger(initial_cash, name="smart")
         
         # 리스크 관리 설정
         self.max_position_size_pct = 0.10  # 포트폴리오의 10%까지
         self.max_total_exposure_pct = 0.80  # 총 80%까지 투자
         self.min_cash_reserve_pct = 0.20   # 20% 현금 보유
         
-        # 주문 관리
-        self.pending_stop_losses: Dict[str, StopLossOrder] = {}
-        self.pending_take_profits: Dict[str, TakeProfitOrder] = {}
+        # 주문 관리: 종목별 가격 정렬 트리거 북 (재시작 시 Redis에서 복원)
+        self.trigger_book = trigger_book if trigger_book is not None else TriggerBook()
+        self.trigger_book.load()
         
         # 성과 추적
         self.daily_metrics: List[PerformanceMetrics] = []
@@ -78,10 +81,28 @@ class PaperTradingManager:
         
         logger.info(f"📊 스마트 페이퍼 트레이딩 매니저 초기화: {initial_cash:,}원")
     
+    @property
+    def pending_stop_losses(self) -> Dict[str, StopLossOrder]:
+        """대기 스톱로스 (트리거 북 뷰)"""
+        return {
+            t.order_id: StopLossOrder(t.ticker, t.quantity, t.level, t.order_id,
+                                      datetime.fromisoformat(t.created_at), t.signal_id)
+            for t in self.trigger_book.orders(STOP)
+        }
+
+    @property
+    def pending_take_profits(self) -> Dict[str, TakeProfitOrder]:
+        """대기 익절 (트리거 북 뷰)"""
+        return {
+            t.order_id: TakeProfitOrder(t.ticker, t.quantity, t.level, t.order_id,
+                                        datetime.fromisoformat(t.created_at), t.signal_id)
+            for t in self.trigger_book.orders(TARGET)
+        }
+
     def get_trading_components(self):
         """트레이딩 컴포넌트 가져오기"""
         try:
-            from app.hooks.autoinit import trading_components
+            from app.jobs.scheduler import trading_components
             return trading_components
         except ImportError:
             logger.warning("trading_components를 가져올 수 없음")
@@ -212,7 +233,12 @@ class PaperTradingManager:
             signal_id=trade.order_id
         )
         
-        self.pending_stop_losses[stop_order.order_id] = stop_order
+        self.trigger_book.add(Trigger(
+            order_id=stop_order.order_id, ticker=stop_order.ticker, kind=STOP,
+            level=float(stop_order.stop_price), quantity=stop_order.quantity,
+            group=trade.order_id, signal_id=stop_order.signal_id,
+            created_at=stop_order.created_at.isoformat(),
+        ))
         logger.info(f"📉 스톱로스 주문 생성: {signal.ticker} @ ${signal.stop_loss:.2f}")
     
     def _create_take_profit_order(self, signal: TradingSignal, trade: PaperTrade):
@@ -226,81 +252,64 @@ class PaperTradingManager:
             signal_id=trade.order_id
         )
         
-        self.pending_take_profits[tp_order.order_id] = tp_order
+        self.trigger_book.add(Trigger(
+            order_id=tp_order.order_id, ticker=tp_order.ticker, kind=TARGET,
+            level=float(tp_order.target_price), quantity=tp_order.quantity,
+            group=trade.order_id, signal_id=tp_order.signal_id,
+            created_at=tp_order.created_at.isoformat(),
+        ))
         logger.info(f"📈 익절 주문 생성: {signal.ticker} @ ${signal.take_profit:.2f}")
     
     def check_and_execute_stop_orders(self, current_prices: Dict[str, float]):
-        """스톱로스/익절 주문 체크 및 실행"""
+        """스톱로스/익절 주문 체크 및 실행 (대기 트리거가 있는 종목만 평가)"""
+        self.trigger_book.sync()  # 다른 프로세스가 등록/발동한 트리거 반영
         executed_orders = []
-        
-        # 스톱로스 체크
-        for order_id, stop_order in list(self.pending_stop_losses.items()):
-            current_price = current_prices.get(stop_order.ticker)
-            if not current_price:
-                continue
-                
-            # 스톱로스 조건 체크
-            if current_price <= stop_order.stop_price:
-                try:
-                    # 반대 주문 실행
-                    side = "sell"  # 손절은 항상 매도
-                    
-                    trade = self.ledger.simulate_fill(
-                        order_id=order_id,
-                        ticker=stop_order.ticker,
-                        side=side,
-                        quantity=stop_order.quantity,
-                        price=current_price,
-                        meta={"order_type": "stop_loss"}
-                    )
-                    
-                    executed_orders.append(("stop_loss", stop_order, trade))
-                    del self.pending_stop_losses[order_id]
-                    
-                    logger.info(f"🛑 스톱로스 실행: {stop_order.ticker} @ ${current_price:.2f}")
-                    
-                except Exception as e:
-                    logger.error(f"스톱로스 실행 실패: {stop_order.ticker} - {e}")
-        
-        # 익절 체크
-        for order_id, tp_order in list(self.pending_take_profits.items()):
-            current_price = current_prices.get(tp_order.ticker)
-            if not current_price:
-                continue
-                
-            # 익절 조건 체크
-            if current_price >= tp_order.target_price:
-                try:
-                    # 반대 주문 실행
-                    side = "sell"  # 익절도 항상 매도
-                    
-                    trade = self.ledger.simulate_fill(
-                        order_id=order_id,
-                        ticker=tp_order.ticker,
-                        side=side,
-                        quantity=tp_order.quantity,
-                        price=current_price,
-                        meta={"order_type": "take_profit"}
-                    )
-                    
-                    executed_orders.append(("take_profit", tp_order, trade))
-                    del self.pending_take_profits[order_id]
-                    
-                    logger.info(f"🎯 익절 실행: {tp_order.ticker} @ ${current_price:.2f}")
-                    
-                except Exception as e:
-                    logger.error(f"익절 실행 실패: {tp_order.ticker} - {e}")
-        
+        for ticker in self.trigger_book.tickers():
+            price = current_prices.get(ticker)
+            if price:
+                executed_orders.extend(self.on_price_update(ticker, price, notify=False))
+
         # 실행된 주문들에 대한 알림
         for order_type, order, trade in executed_orders:
             self._send_stop_order_notification(order_type, order, trade)
         
         return executed_orders
+
+    def on_price_update(self, ticker: str, current_price: float, notify: bool = True) -> List[Tuple]:
+        """가격 갱신 1건 → 교차된 스톱/익절만 체결 (OCO 반대편은 자동 취소)"""
+        executed_orders = []
+        for trig in self.trigger_book.on_price(ticker, current_price):
+            is_stop = trig.kind == STOP
+            order_cls = StopLossOrder if is_stop else TakeProfitOrder
+            order = order_cls(trig.ticker, trig.quantity, trig.level, trig.order_id,
+                              datetime.fromisoformat(trig.created_at), trig.signal_id)
+            try:
+                # 반대 주문 실행 (손절/익절 모두 매도)
+                trade = self.ledger.simulate_fill(
+                    order_id=trig.order_id,
+                    ticker=trig.ticker,
+                    side="sell",
+                    quantity=trig.quantity,
+                    price=current_price,
+                    meta={"order_type": trig.kind}
+                )
+                executed_orders.append((trig.kind, order, trade))
+                if is_stop:
+                    logger.info(f"🛑 스톱로스 실행: {trig.ticker} @ ${current_price:.2f}")
+                else:
+                    logger.info(f"🎯 익절 실행: {trig.ticker} @ ${current_price:.2f}")
+            except Exception as e:
+                logger.error(f"{'스톱로스' if is_stop else '익절'} 실행 실패: {trig.ticker} - {e}")
+
+        if notify:
+            for order_type, order, trade in executed_orders:
+                self._send_stop_order_notification(order_type, order, trade)
+        return executed_orders
     
     def get_portfolio_value(self) -> float:
         """포트폴리오 총 가치 (KRW)"""
         # 현재가 정보 가져오기
-        current_prices = self._get_current_prices()
+        current_prices = self._valuation_prices()
         
         # USD 포지션을 KRW로 변환
         usd_value_krw = self.ledger.get_portfolio_value(current_prices) * self.usd_krw_rate
@@ -310,7 +319,7 @@ class PaperTradingManager:
     def get_total_exposure(self) -> float:
         """총 익스포저 (KRW)"""
         total_exposure = 0.0
-        current_prices = self._get_current_prices()
+        current_prices = self._valuation_prices()
         
         for ticker, pos in self.ledger.positions.items():
             if ticker in current_prices:
@@ -320,25 +329,55 @@ class PaperTradingManager:
         return total_exposure
     
     def _get_current_prices(self) -> Dict[str, float]:
-        """현재가 정보 가져오기"""
+        """현재가 정보 가져오기 (보유 + 대기 트리거 종목)
+
+        1) quotes.XNAS.{ticker} 스트림 최신 틱 (프로세스 간 공유, 파이프라인 1회)
+        2) 최종가 캐시 prices:last (신선도 한도 내, 미스 시 REST 조회 없음)
+        3) 포지션 최종 체결가 (트리거 평가에는 사용하지 않음)
+        """
+        tickers = sorted(set(self.ledger.positions) | set(self.trigger_book.tickers()))
+        prices: Dict[str, float] = {}
+        if not tickers:
+            return prices
+
         try:
             components = self.get_trading_components()
-            quotes_ingestor = components.get("quotes_ingestor")
-            
-            if quotes_ingestor:
-                # 모든 포지션의 현재가 조회
-                prices = {}
-                for ticker in self.ledger.positions.keys():
-                    price = quotes_ingestor.get_latest_price(ticker)
-                    if price:
-                        prices[ticker] = price
-                return prices
-            
+            redis_streams = components.get("redis_streams")
+            # 바이너리 페이로드(_p)는 decode_responses 클라이언트로 읽으면 깨지므로 bytes 클라이언트 사용
+            r = getattr(redis_streams, "binary_client", None) if redis_streams else None
+            if r is None and os.getenv("REDIS_URL"):
+                import redis
+                r = redis.from_url(os.getenv("REDIS_URL"))
+            if r is not None:
+                pipe = r.pipeline(transaction=False)
+                for t in tickers:
+                    pipe.xrevrange(f"quotes.XNAS.{t}", count=1)
+                for t, res in zip(tickers, pipe.execute()):
+                    if not res:
+                        continue
+                    px = float(decode_stream_fields(res[0][1]).get("price") or 0)
+                    if px > 0:
+                        prices[t] = px
         except Exception as e:
-            logger.warning(f"현재가 조회 실패: {e}")
-        
-        # 폴백: 더미 가격 (실제로는 외부 API 사용)
-        return {ticker: 100.0 for ticker in self.ledger.positions.keys()}
+            logger.warning(f"현재가 스트림 조회 실패: {e}")
+
+        missing = [t for t in tickers if t not in prices]
+        if missing:
+            try:
+                from app.io.last_price import get_last_price_service
+                # 캐시만 조회 (미스 시 REST 스냅샷/캔들 재조회 없음)
+                prices.update(get_last_price_service().get_many(missing, fetch=False))
+            except Exception as e:
+                logger.warning(f"현재가 캐시 조회 실패: {e}")
+
+        return prices
+
+    def _valuation_prices(self) -> Dict[str, float]:
+        """평가용 가격 (시세 없으면 최종 체결가)"""
+        prices = self._get_current_prices()
+        for ticker, pos in self.ledger.positions.items():
+            prices.setdefault(ticker, pos.last_price)
+        return prices
     
     def _send_execution_notification(self, signal: TradingSignal, trade: PaperTrade):
         """실행 알림 전송"""
@@ -426,8 +465,7 @@ SL: ${signal.stop_loss:.2f} | TP: ${signal.take_profit:.2f}"""
     
     def reset_daily_stats(self):
         """일일 통계 리셋"""
-        self.ledger.daily_pnl = 0.0
-        self.ledger.daily_trades = 0
+        self.ledger.reset_daily()
         logger.info("📊 일일 통계 리셋 완료")
 
 
@@ -453,6 +491,16 @@ def get_paper_trading_manager():
         paper_trading_manager = PaperTradingManager()
     return paper_trading_manager
 
+def fire_paper_triggers(prices: Dict[str, float]) -> int:
+    """시세 수집 경로 훅 (최종가 반영/스트림 플러시) → 30초 폴링을 기다리지 않고 스톱/익절 평가 → 실행 건수"""
+    if not prices:
+        return 0
+    try:
+        return len(get_paper_trading_manager().check_and_execute_stop_orders(prices))
+    except Exception as e:
+        logger.warning(f"시세 경로 트리거 평가 실패: {e}")
+        return 0
+
 if CELERY_AVAILABLE and celery_app:
     @celery_app.task(name="app.jobs.paper_trading_manager.check_stop_orders")
     def check_stop_orders():
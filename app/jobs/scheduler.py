@@ -10,6 +10,7 @@ import logging
 import os
 import time
 import math
+import uuid
 # from decimal import Decimal  # 사용되지 않음
 from typing import Any, Dict, List, Optional, Tuple, Union
 import urllib.parse as _urlparse
@@ -25,8 +26,15 @@ from celery.signals import beat_init, task_prerun, worker_process_init, worker_r
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-from app.config import settings, get_signal_cutoffs, sanitize_cutoffs_in_redis  # noqa: E402
+from app.config import settings, get_signal_cutoffs, get_config_snapshot, publish_config_change, sanitize_cutoffs_in_redis  # noqa: E402
 from app.utils.rate_limiter import get_rate_limiter, TokenTier  # noqa: E402
+from app.utils.market_clock import get_market_clock  # noqa: E402
+from app.utils.universe import get_universe_service  # noqa: E402
+from app.engine.micro_patterns import THREE_MIN_THREE_UP, get_micro_pattern_detector  # noqa: E402
+from app.engine.eval_memo import get_eval_memo, memo_key  # noqa: E402
+from app.engine.score_series import get_score_series  # noqa: E402
+from app.io.bar_aggregator import get_bar_aggregator  # noqa: E402
+from app.io.recent_signals import get_recent_signal_store  # noqa: E402
 
 # Redis 클라이언트 싱글톤
 _redis_client = None
@@ -49,7 +57,7 @@ def get_redis_client():
 
 def now_et():
     """현재 ET 시간 반환 (DST 자동 처리)"""
-    return datetime.now(ZoneInfo("America/New_York"))
+    return get_market_clock().now()
 
 def et_midnight_tomorrow(dt=None):
     """ET 기준 다음날 자정 반환"""
@@ -257,6 +265,18 @@ celery_app.conf.beat_schedule = {
         "task": "app.jobs.scheduler.check_risk",
         "schedule": 300.0,  # 5분
     },
+    # 체결 스트림 → 공유 리스크 상태 반영 (5초마다)
+    "update-risk-state": {
+        "task": "app.jobs.scheduler.update_risk_state",
+        "schedule": 5.0,
+        "options": {"queue": "celery", "expires": 4},
+    },
+    # 쓰기 지연 영속화 배치 플러시 (10초마다, 한 번에 배치 여러 개 → 비트 부하 최소화)
+    "flush-write-behind": {
+        "task": "app.jobs.scheduler.flush_write_behind",
+        "schedule": 10.0,
+        "options": {"queue": "celery", "expires": 10},
+    },
     # 매일 자정에 일일 리셋
     "daily-reset": {
         "task": "app.jobs.scheduler.daily_reset",
@@ -319,10 +339,11 @@ celery_app.conf.beat_schedule = {
     # Phase 1.5: 스마트 페이퍼 트레이딩 시스템
     # =============================================================================
     
-    # 스톱로스/익절 주문 체크 (5분마다)
+    # 스톱로스/익절 주문 체크 (30초마다, 트리거 북 교차분만 평가)
     "check-stop-orders": {
         "task": "app.jobs.paper_trading_manager.check_stop_orders",
-        "schedule": crontab(minute="*/5"),  # 5분마다
+        "schedule": 30.0,
+        "options": {"queue": "celery", "expires": 25},
     },
     
     # 일일 성과 리포트 (비활성화 - 부정확한 데이터로 인해)
@@ -330,10 +351,10 @@ celery_app.conf.beat_schedule = {
     #     "task": "app.jobs.paper_trading_manager.send_daily_report", 
     #     "schedule": crontab(hour=10, minute=0),  # 19:00 KST
     # },
-    # 마감 전 사전 예약 청산 (미 동부시간 15:48)
+    # 마감 전 사전 예약 청산 (마감 12분 전 윈도우에서만 내부 조건으로 실행, 조기폐장 반영)
     "queue-preclose-liquidation": {
         "task": "app.jobs.scheduler.queue_preclose_liquidation",
-        "schedule": crontab(hour=15, minute=48),
+        "schedule": 60.0,
         "options": {"queue": "celery", "expires": 50},
     },
     # 개장 전 잔여 포지션 정리(09:25~09:30 ET 윈도우에서만 내부 조건으로 실행)
@@ -528,6 +549,12 @@ def _on_worker_process_init(sender=None, **kwargs):
     else:
         rth, ext = get_signal_cutoffs()
         logger.info(f"컷오프 로드됨: RTH={rth:.3f}, EXT={ext:.3f}")
+    # 신호 ID 풀 선충전 (첫 신호 기록 시 시퀀스 왕복 방지)
+    try:
+        from app.io.write_behind import get_write_behind
+        get_write_behind().warm("signals")
+    except Exception as e:
+        logger.warning(f"신호 ID 풀 선충전 실패: {e}")
 
 # 태스크 직전에도 필수 컴포넌트가 없으면 마지막 시도
 @task_prerun.connect
@@ -673,59 +700,13 @@ def consume_api_token_for_ticker(ticker: str) -> Tuple[bool, str]:
 
 def get_universe_with_tiers() -> Dict[str, List[str]]:
     """
-    Tier별 종목 리스트 반환
+    Tier별 종목 리스트 반환 (유니버스 서비스 스냅샷, 메모리 조회)
     
     Returns:
         Dict[str, List[str]]: Tier별 종목 딕셔너리
     """
     try:
-        # 동적 유니버스 조회 (기존 로직 재사용)
-        dynamic_universe = None
-        try:
-            rurl = os.getenv("REDIS_URL")
-            if rurl:
-                r = redis.from_url(rurl)
-                external = r.smembers("universe:external") or []
-                watch = r.smembers("universe:watchlist") or []
-                core = [t.strip().upper() for t in (os.getenv("TICKERS", "").split(",")) if t.strip()]
-                ext = [x.decode() if isinstance(x, (bytes, bytearray)) else x for x in external]
-                wch = [x.decode() if isinstance(x, (bytes, bytearray)) else x for x in watch]
-                merged = []
-                seen = set()
-                max_n = int(os.getenv("UNIVERSE_MAX", "100"))
-                for arr in [core, ext, wch]:
-                    for s in arr:
-                        if s and s not in seen:
-                            merged.append(s)
-                            seen.add(s)
-                        if len(merged) >= max_n:
-                            break
-                    if len(merged) >= max_n:
-                        break
-                dynamic_universe = merged
-        except Exception:
-            dynamic_universe = None
-        
-        # Fallback: 설정에서 직접 가져오기
-        all_tickers = dynamic_universe or []
-        if not all_tickers:
-            all_tickers = (
-                settings.TIER_A_TICKERS + 
-                settings.TIER_B_TICKERS + 
-                settings.BENCH_TICKERS
-            )
-        
-        # Tier별 분류
-        tier_a = [t for t in all_tickers if get_ticker_tier(t) == TokenTier.TIER_A]
-        tier_b = [t for t in all_tickers if get_ticker_tier(t) == TokenTier.TIER_B] 
-        bench = [t for t in all_tickers if get_ticker_tier(t) is None]
-        
-        return {
-            "tier_a": tier_a,
-            "tier_b": tier_b,
-            "bench": bench
-        }
-        
+        return get_universe_service().snapshot().tiers()
     except Exception as e:
         logger.error(f"유니버스 Tier 분류 실패: {e}")
         return {
@@ -734,6 +715,56 @@ def get_universe_with_tiers() -> Dict[str, List[str]]:
             "bench": settings.BENCH_TICKERS
         }
 
+def _feed_last_prices(quotes_ingestor, market_data: Dict) -> int:
+    """시세 요약 → 최종가 서비스
+
+    관측 시각 = 마지막 봉 종료 시각 min(봉 시작 + bar_sec, 조회 시각) — 진행 중인 현재 봉은 신선하게 취급.
+    지연 피드(delayed_feed)는 봉 시작 ts를 유지해 지연 시세가 신선한 값으로 보이지 않도록 함.
+    """
+    try:
+        from app.io.last_price import get_last_price_service
+        delayed = bool(getattr(quotes_ingestor, "delayed_feed", False))
+        bar_sec = int(getattr(quotes_ingestor, "bar_sec", 60) or 60)
+        poll_time = time.time()
+        by_ts: Dict[Any, Dict[str, float]] = {}
+        for t, d in (market_data or {}).items():
+            last = quotes_ingestor.get_latest_candles(t, 1)
+            if not last:
+                continue
+            bar_ts = last[-1].ts
+            if bar_ts.tzinfo is None:
+                bar_ts = bar_ts.replace(tzinfo=timezone.utc)  # naive_ts 인제스터 = tz 제거 UTC
+            stamp = bar_ts.timestamp() if delayed else min(bar_ts.timestamp() + bar_sec, poll_time)
+            by_ts.setdefault(stamp, {})[t] = d.get("current_price")
+        service = get_last_price_service()
+        fed = sum(service.update_many(prices, ts=ts, source="quotes") for ts, prices in by_ts.items())
+    except Exception as e:
+        logger.debug(f"최종가 서비스 갱신 실패: {e}")
+        return 0
+    try:
+        # 새 시세가 들어온 즉시 페이퍼 스톱/익절 평가 (check_stop_orders 폴링은 안전망)
+        from app.jobs.paper_trading_manager import fire_paper_triggers
+        fire_paper_triggers({t: p for prices in by_ts.values() for t, p in prices.items() if p})
+    except Exception as e:
+        logger.warning(f"페이퍼 트리거 평가 실패: {e}")
+    return fed
+
+def _apply_universe_to_ingestor(quotes_ingestor, snap) -> bool:
+    """유니버스 버전이 바뀐 경우에만 인제스터에 반영 (워밍업은 인제스터가 추가 종목만 수행)"""
+    if quotes_ingestor is None or not hasattr(quotes_ingestor, "update_universe_tickers"):
+        return False
+    applied = getattr(quotes_ingestor, "universe_version", None)
+    if applied == snap.version:
+        return False
+    diff = get_universe_service().diff(applied, snap)
+    quotes_ingestor.update_universe_tickers(list(snap.symbols))
+    try:
+        quotes_ingestor.universe_version = snap.version
+    except Exception:
+        pass
+    logger.info(f"🌐 인제스터 유니버스 반영: {applied} → {snap.version} (+{list(diff.added)} -{list(diff.removed)})")
+    return True
+
 def should_call_llm_for_event(ticker: str, event_type: str, signal_score: float = None, 
                               edgar_filing: Dict = None) -> Tuple[bool, str]:
     """
@@ -895,7 +926,10 @@ MAX_CONCURRENT_RISK = settings.MAX_CONCURRENT_RISK
 STOP_LOSS_PCT = float(os.getenv("STOP_LOSS_PCT", "0.015"))  # 1.5%
 TAKE_PROFIT_RR = float(os.getenv("TAKE_PROFIT_RR", "1.5"))  # 1.5R
 EOD_FLATTEN_MINUTES = int(os.getenv("EOD_FLATTEN_MINUTES", "10"))  # 기본 10분 전으로 확대
+PRECLOSE_MINUTES = int(os.getenv("PRECLOSE_MINUTES", "12"))  # 사전 청산 예약: 마감 12분 전(15:48)
 FRACTIONAL_ENABLED = settings.FRACTIONAL_ENABLED
+# 봉(30초) 수익률 VaR95 기준치: 초과 시 비례 축소, 2배 이상이면 수량 절반까지
+VAR_SIZING_REF = float(os.getenv("VAR_SIZING_REF", "0.003"))
 
 # 가드레일 플래그/파라미터
 ENABLE_TIME_STOP = os.getenv("ENABLE_TIME_STOP", "1") in ("1", "true", "True")
@@ -907,6 +941,42 @@ TRAIL_RET_PCT = float(os.getenv("TRAIL_RET_PCT", "0.005"))
 TRAIL_MIN_HOLD_MIN = int(os.getenv("TRAIL_MIN_HOLD_MIN", "5"))
 
 ENABLE_REGIME_FLATTEN_INVERSE = os.getenv("ENABLE_REGIME_FLATTEN_INVERSE", "1") in ("1", "true", "True")
+
+# 스캘프 마이크로 패턴: update_quotes 봉 도착 시 스트리밍 감지 (0이면 generate_signals 루프에서 평가)
+MICRO_PATTERN_STREAMING = os.getenv("MICRO_PATTERN_STREAMING", "1") in ("1", "true", "True")
+
+# 적응형 종목 스케줄링: 활동도 순위 → Tier 토큰 예산 내 배정 (0이면 고정 초 구간 should_process_ticker_now)
+ADAPTIVE_TICKER_SCHEDULING = os.getenv("ADAPTIVE_TICKER_SCHEDULING", "1") in ("1", "true", "True")
+
+# 평가 메모: 새 EDGAR 공시/LLM 인사이트가 들어온 종목은 봉이 같아도 재평가 (스트림 최근 N건 스캔)
+EVAL_MEMO_NEWS_STREAMS = ("news.edgar", "news.headlines")
+EVAL_MEMO_NEWS_SCAN = int(os.getenv("EVAL_MEMO_NEWS_SCAN", "200"))
+# 입력(봉/설정/세션)만으로 정해지는 억제 → 메모 저장 (쿨다운/일일상한/리스크 차단은 시간 경과로 풀리므로 제외)
+EVAL_MEMO_FINAL_SUPPRESS = {"below_cutoff", "ext_disabled", "low_dvol", "wide_spread"}
+
+# 레짐 감지 타임프레임 (2분 = 30초봉 4개 가정)
+REGIME_BAR_SEC = int(os.getenv("REGIME_BAR_SEC", "30"))
+
+# generate_signals 시간 예산: LLM 사전 패스 + 종목 루프 + 배치 검증이 soft_time_limit 안에 끝나도록 배분
+GENERATE_SIGNALS_SOFT_LIMIT_SEC = 20
+SIGNAL_CYCLE_RESERVE_SEC = float(os.getenv("SIGNAL_CYCLE_RESERVE_SEC", "2"))   # 발행/로그 마무리 여유
+SIGNAL_LOOP_MIN_SEC = float(os.getenv("SIGNAL_LOOP_MIN_SEC", "4"))             # LLM 대기 후에도 루프에 남길 시간
+
+
+def _cycle_remaining(start_time: float) -> float:
+    """generate_signals soft_time_limit까지 남은 시간 (마무리 여유 제외)"""
+    return GENERATE_SIGNALS_SOFT_LIMIT_SEC - SIGNAL_CYCLE_RESERVE_SEC - (time.time() - start_time)
+
+
+def _regime_bar_sec(quotes_ingestor) -> int:
+    """레짐 타임프레임: 인제스터 기본 봉보다 짧을 수 없음 (BAR_SEC=60이면 60초봉)"""
+    return max(REGIME_BAR_SEC, int(getattr(quotes_ingestor, "bar_sec", 0) or 0))
+
+
+def _timeframe_bars(ticker: str, tf: int, n: int, fallback=None):
+    """봉 집계기에서 tf초 봉 조회 (집계기에 없는 종목은 fallback)"""
+    bars = get_bar_aggregator().get_bars(ticker, tf, n)
+    return bars if bars else (fallback or [])
 # 인버스 ETF 단일 소스 통일
 INVERSE_ETFS = set(settings.INVERSE_ETFS)
 INVERSE_TICKERS_SET = INVERSE_ETFS  # 중복 제거
@@ -973,7 +1043,7 @@ def get_basket_for_symbol(symbol: str) -> Optional[str]:
 
 def get_basket_state(basket_name: str, window_seconds: int = None) -> Dict[str, Any]:
     """
-    바스켓 상태 집계 (signals:recent 리스트에서 최근 신호들 분석)
+    바스켓 상태 집계 (최근 신호 저장소에서 최근 신호들 분석)
     
     Returns:
         {"neg_count": int, "total_count": int, "mean_score": float, 
@@ -996,19 +1066,18 @@ def get_basket_state(basket_name: str, window_seconds: int = None) -> Dict[str,
         basket_info = BASKETS.get(basket_name, {})
         tickers = basket_info.get("tickers", set())
         
-        # signals:recent 리스트에서 최근 신호들 수집
+        # 최근 신호 저장소에서 최근 신호들 수집
         now = time.time()
         cutoff_time = now - window_seconds
         
         current_scores = []
         trend_scores = []  # slope 계산용
         
-        # signals:recent 리스트에서 설정된 표본 수만큼 가져오기
-        recent_signals = r.lrange("signals:recent", 0, SAMPLE_N - 1)
+        # 최근 신호 저장소에서 윈도우 내 최신 표본 수만큼 가져오기 (시간 인덱스 범위 조회)
+        recent_signals, _ = get_recent_signal_store().page(include_suppressed=True, since=cutoff_time, limit=SAMPLE_N)
         
-        for signal_data in recent_signals:
+        for signal_info in recent_signals:
             try:
-                signal_info = json.loads(signal_data)
                 ticker = signal_info.get("ticker")
                 score = signal_info.get("score", 0)
                 timestamp_str = signal_info.get("timestamp", "")
@@ -1391,14 +1460,24 @@ def get_open_position(trading_adapter, symbol: str) -> Optional[Dict]:
         logger.error(f"포지션 조회 실패 {symbol}: {e}")
         return None
 
+def _last_prices(trading_adapter, symbols: List[str]) -> Dict[str, float]:
+    """최종가 서비스 조회 (신선도 한도 내), 누락 종목만 어댑터 다종목 스냅샷 1회로 보충"""
+    from app.io.last_price import adapter_price_fetcher, get_last_price_service
+    fetcher = adapter_price_fetcher(trading_adapter) if trading_adapter is not None else None
+    try:
+        return get_last_price_service().get_many(symbols, fetcher=fetcher)
+    except Exception as e:
+        logger.debug(f"최종가 서비스 조회 실패 → 어댑터 직접 조회: {e}")
+        return fetcher(list(symbols)) if fetcher else {}
+
 def get_stop_distance(trading_adapter, symbol: str, fallback_pct: float = None) -> float:
     """스톱 거리 계산 (ATR 기반 또는 퍼센트 폴백)"""
     if fallback_pct is None:
         fallback_pct = STOP_LOSS_PCT
     
     try:
-        # 현재 가격 조회
-        current_price = trading_adapter.get_current_price(symbol)
+        # 현재 가격 조회 (최종가 서비스)
+        current_price = _last_prices(trading_adapter, [symbol]).get(symbol.upper())
         if not current_price or current_price <= 0:
             return 0
         
@@ -1467,6 +1546,35 @@ def get_atr_from_db(symbol: str, periods: int = 14) -> Optional[float]:
         logger.warning(f"ATR 계산 실패 {symbol}: {e}")
         return None
 
+def apply_var_sizing(quantity, symbol: str, regime: Optional[str], redis_client=None,
+                     signal_symbol: Optional[str] = None):
+    """수익률 스케치 VaR95 기반 수량 축소 (상향은 노출 상한 우회 방지를 위해 미적용)
+
+    체결 종목(인버스 ETF 등)에 닫힌 봉 스케치가 없으면 신호 종목의 스케치로 폴백
+    """
+    if not quantity or quantity <= 0 or FRACTIONAL_ENABLED:
+        return quantity
+    try:
+        from app.engine.return_sketch import get_return_var95
+        from app.engine.risk import suggest_position_qty
+        source = symbol
+        var95 = get_return_var95(symbol, regime, r=redis_client)
+        if var95 <= 0 and signal_symbol and signal_symbol != symbol:
+            source = signal_symbol
+            var95 = get_return_var95(signal_symbol, regime, r=redis_client)
+        if var95 <= 0:
+            logger.info(f"VaR 사이징 생략: {symbol} 수익률 스케치 없음"
+                        + (f" (신호 종목 {signal_symbol}도 없음)" if signal_symbol and signal_symbol != symbol else ""))
+            return quantity
+        sized = suggest_position_qty(int(quantity), var95=var95, max_risk_r=VAR_SIZING_REF)
+        if sized < quantity:
+            via = f" (스케치: {source})" if source != symbol else ""
+            logger.info(f"📉 VaR 사이징: {symbol} regime={regime} {quantity}주 → {sized}주{via}")
+            return sized
+    except Exception as e:
+        logger.warning(f"VaR 사이징 실패 {symbol}: {e}")
+    return quantity
+
 def calc_entry_quantity(trading_adapter, symbol: str, equity: float, stop_distance: float) -> int:
     """진입 수량 계산 (GPT 권장 리스크 기반 사이징)"""
     try:
@@ -1614,6 +1722,9 @@ def get_current_total_risk(trading_adapter, equity: float) -> float:
     try:
         total_risk = 0.0
         positions = trading_adapter.get_positions()
+        # 보유 종목 현재가 일괄 조회 (종목별 REST 대신 최종가 서비스 + 누락분 스냅샷 1회)
+        held = [getattr(p, 'ticker', None) for p in positions if float(getattr(p, 'quantity', 0)) != 0]
+        prices = _last_prices(trading_adapter, [s for s in held if s])
         
         for pos in positions:
             if float(getattr(pos, 'quantity', 0)) == 0:
@@ -1623,7 +1734,7 @@ def get_current_total_risk(trading_adapter, equity: float) -> float:
             sym = getattr(pos, 'ticker', None)
             if not sym:
                 continue
-            current_price = trading_adapter.get_current_price(sym)
+            current_price = prices.get(sym.upper())
             stop_distance = get_stop_distance(trading_adapter, sym)
             
             if current_price and stop_distance:
@@ -1638,11 +1749,9 @@ def get_current_total_risk(trading_adapter, equity: float) -> float:
 def is_eod_window(market_calendar = None) -> bool:
     """장 마감 전 윈도우 확인 (America/New_York 기준)"""
     try:
-        now_ny = datetime.now(timezone.utc).astimezone(ZoneInfo("America/New_York"))
+        # 세션 캘린더 기준 실제 마감 시각 사용 (조기폐장/휴장일 반영)
         eod_minutes_before = EOD_FLATTEN_MINUTES
-        close_dt = now_ny.replace(hour=16, minute=0, second=0, microsecond=0)
-        start_dt = close_dt - timedelta(minutes=eod_minutes_before)
-        in_window = start_dt <= now_ny <= close_dt
+        in_window = get_market_clock().in_eod_window(eod_minutes_before)
         if in_window:
             logger.info(f"🌅 EOD 윈도우 활성: 마감 {eod_minutes_before}분 전")
         return in_window
@@ -1745,12 +1854,26 @@ def _log_exit_decision(symbol: str, side: str, qty: int, policy: str, reason: st
     ]
     if order_id:
         parts.append(f"order_id={order_id}")
+    px = None
     if price is not None:
         try:
-            parts.append(f"price={float(price):.2f}")
+            px = float(price)
+            parts.append(f"price={px:.2f}")
         except Exception:
-            pass
+            px = None
     logger.info(" ".join(parts))
+    # 감사 행 (쓰기 지연 큐, DSN 없으면 no-op)
+    try:
+        from app.io.write_behind import get_write_behind
+        now = datetime.now(timezone.utc)
+        get_write_behind().enqueue("exit_decisions", {
+            "decision_id": f"{symbol}:{policy}:{order_id or int(now.timestamp() * 1e6)}:{attempt}",
+            "ts": now.isoformat(), "symbol": symbol, "side": side, "qty": qty, "policy": policy,
+            "reason": reason, "tif": tif, "attempt": attempt, "market_state": market_state,
+            "order_id": order_id, "price": px,
+        })
+    except Exception as e:
+        logger.debug(f"청산 결정 감사 적재 실패 {symbol}: {e}")
 
 def flatten_all_positions(trading_adapter, reason: str = "eod_flatten") -> int:
     """모든 포지션 강제 청산: 포지션 단위 예외/재시도 + 구조 로그"""
@@ -1843,21 +1966,28 @@ def flatten_all_positions(trading_adapter, reason: str = "eod_flatten") -> int:
     return flattened_count
 
 def _minutes_to_close(now_utc: datetime | None = None) -> int:
-    ny = (now_utc or datetime.now(timezone.utc)).astimezone(ZoneInfo("America/New_York"))
-    close_dt = ny.replace(hour=16, minute=0, second=0, microsecond=0)
-    delta = (close_dt - ny).total_seconds() / 60.0
-    return int(delta)
+    return get_market_clock().minutes_to_close(now_utc)
 
 def _is_rth_now(now_utc: datetime | None = None) -> bool:
-    ny = (now_utc or datetime.now(timezone.utc)).astimezone(ZoneInfo("America/New_York"))
-    open_dt = ny.replace(hour=9, minute=30, second=0, microsecond=0)
-    close_dt = ny.replace(hour=16, minute=0, second=0, microsecond=0)
-    return open_dt <= ny <= close_dt
+    return get_market_clock().is_rth(now_utc)
 
 @celery_app.task(bind=True, name="app.jobs.scheduler.queue_preclose_liquidation")
 def queue_preclose_liquidation(self):
-    """마감 전(ET 15:48) 사전 예약 청산: CLS/OPG 예약 제출"""
+    """마감 전(기본 마감 12분 전, 정규장 ET 15:48) 사전 예약 청산: CLS/OPG 예약 제출
+
+    - 1분 주기로 호출되며 세션 캘린더의 preclose 윈도우에서만 실행 (조기폐장 반영)
+    - 거래일당 1회만 제출 (Redis NX 가드)
+    """
     try:
+        clock = get_market_clock()
+        if not clock.in_preclose_window(PRECLOSE_MINUTES):
+            return {"status": "outside_window"}
+        try:
+            guard_key = f"preclose:done:{clock.et_ymd()}"
+            if not get_redis_client().set(guard_key, "1", nx=True, ex=86400):
+                return {"status": "already_queued"}
+        except Exception as e:
+            logger.warning(f"사전 청산 중복 가드 실패(계속 진행): {e}")
         from app.adapters.trading_adapter import get_trading_adapter
         trading_adapter = get_trading_adapter()
         positions = trading_adapter.get_positions() or []
@@ -1895,12 +2025,10 @@ def queue_open_opg_cleanup(self):
     """개장 직전/직후 잔여 포지션 OPG 청산 예약
 
     - 장 마감 전에 이미 EOD 예약을 걸지만, 혹시 잔존 시 개장 시점 OPG로 정리
-    - 실행 윈도우: NY 09:25~09:35
+    - 실행 윈도우: NY 09:25~09:35 (거래일만)
     """
     try:
-        ny = datetime.now(timezone.utc).astimezone(ZoneInfo("America/New_York"))
-        ny_time = ny.time()
-        in_window = (ny_time >= time(9,25)) and (ny_time <= time(9,35))
+        in_window = get_market_clock().in_open_window(5, 5)
         if not in_window:
             return {"status": "outside_window"}
 
@@ -2316,10 +2444,33 @@ def log_signal_decision(signal_data: Dict, symbol: str, decision: str, reason: s
 
 # --- DB 저장 헬퍼 함수 (GPT 제안: 실제 거래 후 로컬 DB 기록) ---
 
+def publish_fill_event(trade_result, exec_symbol: str) -> None:
+    """체결 결과 → orders.fills 스트림"""
+    try:
+        redis_streams = trading_components.get("redis_streams")
+        if not redis_streams:
+            return
+        get = (lambda k, d=None: getattr(trade_result, k, d)) if hasattr(trade_result, "side") else trade_result.get
+        redis_streams.publish_fill({
+            "ticker": exec_symbol,
+            "side": str(get("side", "buy")),
+            "quantity": float(get("quantity", 0) or 0),
+            "price": float(get("price", 0) or 0),
+            "trade_id": str(get("trade_id", "") or ""),
+        })
+    except Exception as e:
+        logger.warning(f"체결 이벤트 발행 실패 {exec_symbol}: {e}")
+
 def save_trade_to_db(trade_result, signal_data: Dict, exec_symbol: str, signal_db_id: str = None) -> Optional[str]:
-    """거래 결과를 로컬 DB에 저장 - signal_id 연계 개선"""
+    """거래 결과를 쓰기 지연 큐에 적재 - signal_id 연계 (DB 왕복 없음)
+
+    반환값은 trades.trade_id 문자열 (이전의 trades.id 대신 - INSERT가 비동기라 SERIAL id를 알 수 없음)
+    """
     if not trade_result:
         return None
+
+    # 체결 이벤트 발행 (공유 리스크 상태 소스, DB 설정과 무관)
+    publish_fill_event(trade_result, exec_symbol)
         
     dsn = os.getenv("POSTGRES_URL") or os.getenv("DATABASE_URL")
     if not dsn:
@@ -2327,105 +2478,92 @@ def save_trade_to_db(trade_result, signal_data: Dict, exec_symbol: str, signal_d
         return None
         
     try:
-        with psycopg2.connect(dsn) as conn:
-            with conn.cursor() as cur:
-                # trade_result가 객체인 경우와 dict인 경우 모두 처리
-                if hasattr(trade_result, 'side'):
-                    # 객체 형태 (알파카 Trade 객체)
-                    side = getattr(trade_result, 'side', 'buy')
-                    quantity = int(getattr(trade_result, 'quantity', 0))
-                    price = float(getattr(trade_result, 'price', 0))
-                    trade_id_raw = getattr(trade_result, 'trade_id', f"trade_{int(time.time())}")
-                    # UUID 객체를 문자열로 변환
-                    trade_id_str = str(trade_id_raw) if trade_id_raw else f"trade_{int(time.time())}"
-                else:
-                    # dict 형태
-                    side = trade_result.get("side", "buy")
-                    quantity = int(trade_result.get("quantity", 0))
-                    price = float(trade_result.get("price", 0))
-                    trade_id_raw = trade_result.get("trade_id", f"trade_{int(time.time())}")
-                    # UUID 객체를 문자열로 변환
-                    trade_id_str = str(trade_id_raw) if trade_id_raw else f"trade_{int(time.time())}"
-                
-                # signal_id 결정: 새로 생성된 signal_db_id 우선, 없으면 기존 signal_data에서
-                # signals.id는 INTEGER이므로 변환 필요
-                final_signal_id = None
-                if signal_db_id:
-                    try:
-                        final_signal_id = int(signal_db_id)
-                    except (ValueError, TypeError):
-                        final_signal_id = None
-                elif signal_data.get("signal_id"):
-                    try:
-                        final_signal_id = int(signal_data.get("signal_id"))
-                    except (ValueError, TypeError):
-                        final_signal_id = None
-                
-                # trades 테이블에 기록 - 실제 스키마 사용
-                cur.execute("""
-                    INSERT INTO trades (
-                        trade_id, ticker, side, quantity, price, signal_id, created_at, status
-                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                    RETURNING id
-                """, (
-                    trade_id_str,
-                    exec_symbol,
-                    side,
-                    quantity,
-                    price,
-                    final_signal_id,  # 유효한 signal_id 사용 또는 NULL
-                    datetime.now(),
-                    'filled'
-                ))
-                db_trade_id = cur.fetchone()[0]
-                logger.info(f"💾 거래 기록 저장: ID={db_trade_id}, {exec_symbol} {side} {quantity}주 @ ${price:.2f}, signal_id={final_signal_id}")
-                return str(db_trade_id)
+        # trade_result가 객체인 경우와 dict인 경우 모두 처리
+        if hasattr(trade_result, 'side'):
+            # 객체 형태 (알파카 Trade 객체)
+            side = getattr(trade_result, 'side', 'buy')
+            quantity = int(getattr(trade_result, 'quantity', 0))
+            price = float(getattr(trade_result, 'price', 0))
+            trade_id_raw = getattr(trade_result, 'trade_id', None)
+        else:
+            # dict 형태
+            side = trade_result.get("side", "buy")
+            quantity = int(trade_result.get("quantity", 0))
+            price = float(trade_result.get("price", 0))
+            trade_id_raw = trade_result.get("trade_id")
+        # UUID 객체를 문자열로 변환 (ID 없으면 고유 ID - 초 단위 ID는 ON CONFLICT DO NOTHING에 묻혀 유실됨)
+        trade_id_str = str(trade_id_raw) if trade_id_raw else f"trade_{uuid.uuid4().hex}"
+        
+        # signal_id 결정: 새로 생성된 signal_db_id 우선, 없으면 기존 signal_data에서
+        # signals.id는 INTEGER이므로 변환 필요
+        final_signal_id = None
+        for candidate in (signal_db_id, signal_data.get("signal_id")):
+            if candidate:
+                try:
+                    final_signal_id = int(candidate)
+                except (ValueError, TypeError):
+                    final_signal_id = None
+                break
+        
+        from app.io.write_behind import get_write_behind
+        get_write_behind().enqueue("trades", {
+            "trade_id": trade_id_str,
+            "ticker": exec_symbol,
+            "side": side,
+            "quantity": quantity,
+            "price": price,
+            "signal_id": final_signal_id,  # 유효한 signal_id 사용 또는 NULL
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "status": "filled",
+        })
+        logger.info(f"💾 거래 기록 적재: {trade_id_str}, {exec_symbol} {side} {quantity}주 @ ${price:.2f}, signal_id={final_signal_id}")
+        return trade_id_str
                 
     except Exception as e:
-        logger.error(f"거래 DB 저장 실패: {e}")
+        logger.error(f"거래 기록 적재 실패: {e}")
         return None
 
 def save_signal_to_db(signal_data: Dict, action: str, decision_reason: str) -> Optional[str]:
-    """신호를 로컬 DB에 저장"""
+    """신호를 쓰기 지연 큐에 적재 (ID는 시퀀스 선할당 풀에서 부여 → RETURNING 대기 없음)"""
     dsn = os.getenv("POSTGRES_URL") or os.getenv("DATABASE_URL")
     if not dsn:
         return None
         
+    # 결정 당시 설정 버전 기록 (재현/감사용)
+    meta = dict(signal_data.get("meta") or {})
+    meta.setdefault("config_version", signal_data.get("config_version") or get_config_snapshot().version)
     try:
-        with psycopg2.connect(dsn) as conn:
-            with conn.cursor() as cur:
-                # signals 테이블에 기록 - 실제 스키마에 맞춤
-                cur.execute("""
-                    INSERT INTO signals (
-                        ticker, signal_type, score, confidence, 
-                        regime, tech_score, sentiment_score, edgar_bonus,
-                        trigger, summary, entry_price, stop_loss, take_profit,
-                        horizon_minutes, meta
-                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    RETURNING id
-                """, (
-                    signal_data.get("symbol", "UNKNOWN"),
-                    "long" if float(signal_data.get("score", 0)) > 0 else "short",
-                    float(signal_data.get("score", 0)),
-                    float(signal_data.get("confidence", 0.7)),
-                    signal_data.get("regime", "trend"),
-                    float(signal_data.get("tech_score", 0)),  # 기본값 0
-                    float(signal_data.get("sentiment_score", 0)),  # 기본값 0
-                    float(signal_data.get("edgar_bonus", 0)),  # 기본값 0
-                    decision_reason,  # trigger 컬럼
-                    f"{action} signal",  # summary 컬럼
-                    float(signal_data.get("entry_price", 0)) if signal_data.get("entry_price") else None,
-                    float(signal_data.get("stop_loss", 0)) if signal_data.get("stop_loss") else None,
-                    float(signal_data.get("take_profit", 0)) if signal_data.get("take_profit") else None,
-                    int(signal_data.get("horizon_minutes", 60)),  # 기본값 60분
-                    json.dumps(signal_data.get("meta", {}))
-                ))
-                signal_id = cur.fetchone()[0]
-                logger.debug(f"💾 신호 기록 저장: ID={signal_id}, {signal_data.get('symbol')} {action}")
-                return str(signal_id)
+        from app.io.write_behind import get_write_behind
+        store = get_write_behind()
+        signal_id = store.next_id("signals")
+        if signal_id is None:
+            logger.error("신호 ID 할당 실패 - 기록 건너뜀")
+            return None
+        # signals 테이블 행 - 실제 스키마에 맞춤
+        store.enqueue("signals", {
+            "id": signal_id,
+            "ts": datetime.now(timezone.utc).isoformat(),
+            "ticker": signal_data.get("symbol", "UNKNOWN"),
+            "signal_type": "long" if float(signal_data.get("score", 0)) > 0 else "short",
+            "score": float(signal_data.get("score", 0)),
+            "confidence": float(signal_data.get("confidence", 0.7)),
+            "regime": signal_data.get("regime", "trend"),
+            "tech_score": float(signal_data.get("tech_score", 0)),  # 기본값 0
+            "sentiment_score": float(signal_data.get("sentiment_score", 0)),  # 기본값 0
+            "edgar_bonus": float(signal_data.get("edgar_bonus", 0)),  # 기본값 0
+            "trigger": decision_reason,  # trigger 컬럼
+            "summary": f"{action} signal",  # summary 컬럼
+            "entry_price": float(signal_data.get("entry_price", 0)) if signal_data.get("entry_price") else None,
+            "stop_loss": float(signal_data.get("stop_loss", 0)) if signal_data.get("stop_loss") else None,
+            "take_profit": float(signal_data.get("take_profit", 0)) if signal_data.get("take_profit") else None,
+            "horizon_minutes": int(signal_data.get("horizon_minutes", 60)),  # 기본값 60분
+            "meta": json.dumps(meta),
+        })
+        logger.debug(f"💾 신호 기록 적재: ID={signal_id}, {signal_data.get('symbol')} {action}")
+        return str(signal_id)
                 
     except Exception as e:
-        logger.error(f"신호 DB 저장 실패: {e}")
+        logger.error(f"신호 기록 적재 실패: {e}")
         return None
 
 @celery_app.task(bind=True, name="app.jobs.scheduler.pipeline_e2e",
@@ -2719,6 +2857,8 @@ def pipeline_e2e(self):
                             continue
                         
                         quantity = calc_entry_quantity(trading_adapter, exec_symbol, equity, stop_distance)
+                        quantity = apply_var_sizing(quantity, exec_symbol, signal_data.get("regime"), redis_client,
+                                                    signal_symbol=symbol)
                         if quantity > 0:
                             trade = place_bracket_order(trading_adapter, exec_symbol, "buy", quantity, stop_distance)
                             # 인버스 전용 가드레일 적용
@@ -3046,8 +3186,313 @@ def format_enhanced_slack_message(signal, llm_insight) -> Dict:
         logger.warning("SLACK_CHANNEL_ID가 비어있음: SlackBot 기본 채널에 의존합니다")
     return msg
 
+def _prefetch_llm_insights(processing_tickers, quotes_ingestor, regime_detector, tech_score_engine,
+                           llm_engine, stats: Dict, deadline_sec: Optional[float] = None) -> Dict[str, Dict]:
+    """사이클 사전 패스: 유니버스 봉/레짐/기술점수 일괄 계산 + EDGAR 조회(본 루프에서 재사용) + LLM 후보 가치 순위 디스패치
+
+    deadline_sec: LLM 동시 호출 대기 상한 (사이클 시간 예산에서 배분, 1초 미만이면 전부 이월)
+    """
+    from app.engine.batch_scoring import get_batch_scorer
+    from app.engine.llm_scheduler import LLMWorkItem, get_llm_scheduler
+    prefetch: Dict[str, Dict] = {}
+    items = []
+    tech_bars: Dict[str, List] = {}
+    regime_bars: Dict[str, List] = {}
+    regime_tf = _regime_bar_sec(quotes_ingestor)
+    for ticker, tier, _ in processing_tickers:
+        try:
+            if tier is not None and not can_consume_api_token_for_ticker(ticker)[0]:
+                continue  # 본 루프에서 토큰 부족으로 스킵될 종목
+            candles = quotes_ingestor.get_latest_candles(ticker, 50)
+            if not candles or len(candles) < 2:
+                continue
+            tech_bars[ticker] = candles
+            regime_bars[ticker] = _timeframe_bars(ticker, regime_tf, 50, candles)
+        except Exception as e:
+            logger.debug(f"LLM 사전 패스 스킵 ({ticker}): {e}")
+
+    # 레짐/기술점수: 종목 × 봉 배열로 한 번에 (종목별 루프 대비 인터프리터 오버헤드 제거)
+    try:
+        scored = get_batch_scorer(tech_score_engine, regime_detector).score_universe(tech_bars, regime_bars)
+    except Exception as e:
+        logger.warning(f"일괄 스코어링 실패 → 종목별 계산: {e}")
+        scored = {t: (regime_detector.detect_regime(regime_bars[t]), tech_score_engine.calculate_tech_score(b))
+                  for t, b in tech_bars.items()}
+
+    for ticker, candles in tech_bars.items():
+        try:
+            regime_result, tech_score = scored[ticker]
+            edgar_filing = get_recent_edgar_filing(ticker)
+            prefetch[ticker] = {"candles": candles, "ts": getattr(candles[-1], "ts", None), "regime_result": regime_result,
+                                "tech_score": tech_score, "edgar_filing": edgar_filing, "llm_insight": None}
+            if not llm_engine:
+                continue
+            regime = regime_result.regime.value
+            if edgar_filing:
+                should_call, call_reason = should_call_llm_for_event(ticker, "edgar", edgar_filing=edgar_filing)
+                if should_call:
+                    items.append(LLMWorkItem(ticker, "edgar", tech_score.score, regime, edgar_filing))
+                else:
+                    logger.info(f"🚫 LLM EDGAR 차단: {ticker} - {call_reason}")
+            if regime == 'vol_spike':
+                should_call, call_reason = should_call_llm_for_event(ticker, "vol_spike", signal_score=tech_score.score)
+                if should_call:
+                    items.append(LLMWorkItem(ticker, "vol_spike", tech_score.score, regime, edgar_filing))
+                else:
+                    logger.info(f"🚫 LLM vol_spike 차단: {ticker} - {call_reason}")
+        except Exception as e:
+            logger.debug(f"LLM 사전 패스 스킵 ({ticker}): {e}")
+    if not items:
+        return prefetch
+
+    # 예산: 속도 토큰 ∧ 월 비용 여유 ∧ 일일 호출 잔여
+    budget = llm_engine.available_calls() if hasattr(llm_engine, "available_calls") else 1
+    if settings.LLM_GATING_ENABLED:
+        budget = min(budget, int(get_llm_usage_stats().get("remaining", 0)))
+    if deadline_sec is not None and deadline_sec < 1.0:
+        budget = 0  # 기다릴 시간이 없으면 호출하지 않고 다음 사이클로 이월
+    cut_rth, cut_ext = get_signal_cutoffs()
+    cutoff = cut_rth if _session_label() == "RTH" else cut_ext
+
+    def _run(item):
+        if not consume_llm_call_quota(item.ticker, item.event_type, item.edgar_filing):
+            logger.warning(f"🤖 LLM 쿼터 소비 실패: {item.ticker} ({item.event_type})")
+            return None
+        if item.event_type == "edgar":
+            return llm_engine.analyze_edgar_filing(item.edgar_filing)
+        text = f"Volatility spike detected for {item.ticker} in {item.regime} regime"
+        return llm_engine.analyze_text(text, f"vol_spike_{item.ticker}", regime='vol_spike')
+
+    results, plan = get_llm_scheduler().run_cycle(items, cutoff, budget, _run, deadline_sec=deadline_sec)
+    stats['llm_calls'] += len(plan.run)
+    for it in plan.deferred:
+        prefetch[it.ticker]["llm_pending"] = True  # 이월 후보는 평가 메모 제외 (다음 사이클 재후보)
+    for ticker, insight in results.items():
+        prefetch[ticker]["llm_insight"] = insight
+        logger.info(f"🤖 LLM 분석 반영: {ticker}")
+    return prefetch
+
+def _latest_news_ids(redis_streams) -> Dict[str, str]:
+    """종목별 최신 EDGAR/뉴스(LLM 인사이트) 스트림 ID (사이클 1회 조회, 실패 시 빈 맵 → 봉 기준만)"""
+    if redis_streams is None:
+        return {}
+    try:
+        return redis_streams.latest_ids_by_ticker(EVAL_MEMO_NEWS_STREAMS, EVAL_MEMO_NEWS_SCAN)
+    except Exception as e:
+        logger.debug(f"최신 뉴스 ID 조회 실패(평가 메모): {e}")
+        return {}
+
+def _skip_unchanged_tickers(processing_tickers, quotes_ingestor, memo_ctx, stats: Dict,
+                            news_ids: Optional[Dict[str, str]] = None) -> List:
+    """직전 평가와 (마지막 봉, 설정 버전, 세션, 최신 뉴스 ID)가 같은 종목 제외 → 재평가 대상만 반환"""
+    memo = get_eval_memo()
+    if not memo.enabled:
+        return processing_tickers
+    fresh = []
+    for item in processing_tickers:
+        ticker = item[0]
+        try:
+            last = quotes_ingestor.get_latest_candles(ticker, 1)
+            if memo.lookup(ticker, memo_key(last[-1] if last else None, *memo_ctx, (news_ids or {}).get(ticker))):
+                stats['memo']['hits'] += 1
+                continue
+        except Exception as e:
+            logger.debug(f"평가 메모 조회 실패 ({ticker}): {e}")
+        stats['memo']['misses'] += 1
+        fresh.append(item)
+    return fresh
+
+def _open_position_tickers() -> set:
+    """보유 포지션 종목 (사이클 1회 조회, 실패 시 빈 집합)"""
+    try:
+        from app.adapters.trading_adapter import get_trading_adapter
+        positions = get_trading_adapter().get_positions() or []
+        return {str(p.ticker).upper() for p in positions if float(getattr(p, 'quantity', 0) or 0) != 0}
+    except Exception as e:
+        logger.debug(f"포지션 조회 실패(적응형 스케줄): {e}")
+        return set()
+
+def _plan_adaptive_tickers(candidates, quotes_ingestor, stats: Dict, now: Optional[float] = None):
+    """후보 (ticker, tier, _) → 활동도 순위 + Tier 토큰 몫/평가 상한으로 이번 사이클 배정"""
+    from app.engine.ticker_priority import get_ticker_scheduler
+    sched = get_ticker_scheduler()
+    memo = get_eval_memo()
+    positions = _open_position_tickers()
+    cut_rth, cut_ext = get_signal_cutoffs()
+    cutoff = cut_rth if _session_label() == "RTH" else cut_ext
+    activities = []
+    for ticker, tier, _ in candidates:
+        try:
+            candles = quotes_ingestor.get_latest_candles(ticker, 21)
+        except Exception as e:
+            logger.debug(f"활동도 봉 조회 실패 ({ticker}): {e}")
+            candles = []
+        entry = memo.get(ticker)
+        last_score = None
+        if entry is not None:
+            last_score = entry.signal.score if entry.signal is not None else getattr(entry.tech_score, "score", None)
+        activities.append(sched.score(ticker, tier, candles, ticker.upper() in positions, last_score, cutoff, now))
+
+    try:
+        status = get_rate_limiter().get_token_status()
+        available = {tier: int(status.get(tier.value, {}).get("current_tokens", 0))
+                     for tier in (TokenTier.TIER_A, TokenTier.TIER_B)}
+    except Exception as e:
+        logger.warning(f"토큰 상태 조회 실패 → Tier 할당량 기준: {e}")
+        available = {TokenTier.TIER_A: settings.API_TIER_A_ALLOCATION, TokenTier.TIER_B: settings.API_TIER_B_ALLOCATION}
+    plan = sched.plan(activities, sched.tier_budgets(available, now), now)
+    stats['schedule'] = {"candidates": len(activities), "selected": len(plan.selected), "deferred": len(plan.deferred),
+                         "budget": {t.value: n for t, n in plan.budgets.items()}}
+    if plan.selected:
+        logger.info(f"🎯 적응형 배정: {[f'{a.ticker}({a.priority:.2f},{a.reason})' for a in plan.selected]} "
+                    f"이월 {len(plan.deferred)} 예산 {stats['schedule']['budget']}")
+    return plan
+
+def _dispatch_strong_signal(signal, slack_message: str, slack_bot, ticker: str,
+                            session_label: str, rurl: Optional[str]) -> None:
+    """강신호 페이퍼 트레이딩 실행 → 성공 시에만 슬랙 전송 (예외 시 일일 카운터 롤백)"""
+    try:
+        # Phase 1.5: 페이퍼 트레이딩 자동 실행 후 성공시에만 슬랙 전송!
+        try:
+            from app.jobs.paper_trading_manager import get_paper_trading_manager
+            paper_manager = get_paper_trading_manager()
+            
+            execution_result = paper_manager.execute_signal(signal)
+            if execution_result:
+                logger.info(f"📊 페이퍼 트레이딩 실행: {ticker}")
+                # 실제 주문 실행 성공 시에만 슬랙 전송
+                result = slack_bot.send_message(slack_message)
+                if result:
+                    logger.info(f"✅ Slack 전송 성공: {ticker} (실제 주문 후)")
+                else:
+                    logger.warning(f"❌ Slack 전송 실패: {ticker}")
+            else:
+                logger.info(f"📊 페이퍼 트레이딩 스킵: {ticker} - 슬랙 전송 안함")
+        except Exception as paper_e:
+            logger.warning(f"페이퍼 트레이딩 실행 실패: {ticker} - {paper_e}")
+    except Exception as e:
+        # 예외 발생 시에도 카운터 롤백
+        try:
+            if rurl:
+                r = redis.from_url(rurl)
+                if session_label == "RTH":
+                    day_key = f"dailycap:{get_market_clock().et_ymd()}:RTH:{ticker}"
+                    r.decr(day_key)
+                elif session_label == "EXT":
+                    day_key = f"dailycap:{get_market_clock().et_ymd()}:EXT:{ticker}"
+                    r.decr(day_key)
+                logger.info(f"Slack 전송 예외로 카운터 롤백: {ticker}")
+        except Exception as rollback_e:
+            logger.warning(f"카운터 롤백 실패: {rollback_e}")
+        logger.error(f"❌ Slack 전송 예외: {ticker} - {e}")
+
+def _publish_micro_pattern_signal(event, signal_mixer, redis_streams, indicators: Dict,
+                                  stats: Optional[Dict] = None) -> bool:
+    """마이크로 패턴 이벤트 → 스캘프 신호 (컷/세션 억제 + 리스크 pre-check + signals.raw 발행). 발행 시 True"""
+    from app.engine.regime import RegimeType, RegimeResult
+    from app.engine.techscore import TechScoreResult
+    ticker = event.ticker
+    rurl = os.getenv("REDIS_URL")
+    if event.pattern == THREE_MIN_THREE_UP:
+        fake_regime = RegimeResult(regime=RegimeType.TREND, confidence=0.8,
+                                   features=dict(event.features), timestamp=datetime.now())
+        fake_tech = TechScoreResult(score=1.0, components={"ema": 0.9, "macd": 0.9, "rsi": 0.8, "vwap": 0.8},
+                                    timestamp=datetime.now())
+        summary = event.reason
+    else:
+        abs_ret = event.features.get("last_abs_ret", 0.0)
+        hi = 0.8 if event.direction > 0 else 0.2
+        fake_regime = RegimeResult(regime=RegimeType.VOL_SPIKE, confidence=min(1.0, abs_ret * 20.0),
+                                   features={"last_abs_ret": abs_ret}, timestamp=datetime.now())
+        fake_tech = TechScoreResult(score=event.direction,  # -1 ~ +1로 직접 스케일
+                                    components={"ema": hi, "macd": hi, "rsi": hi, "vwap": hi},
+                                    timestamp=datetime.now())
+        summary = f"{event.reason}; abs_ret={abs_ret:.3%}; range={event.features.get('last_range', 0.0):.3%}"
+
+    quick_signal = signal_mixer.mix_signals(
+        ticker=ticker, regime_result=fake_regime, tech_score=fake_tech,
+        llm_insight=None, edgar_filing=None, current_price=event.price,
+    )
+    if not quick_signal:
+        return False
+    quick_signal.trigger = event.pattern
+    quick_signal.summary = summary
+
+    # 컷/세션 억제 동일 적용 (로컬 계산)
+    sess_now = _session_label()
+    cutoff_rth, cutoff_ext = get_signal_cutoffs()
+    cut = cutoff_rth if sess_now == "RTH" else cutoff_ext
+    if abs(quick_signal.score) < cut:
+        logger.info(f"🔥 [SCALP] {event.pattern} 신호 억제: {ticker} score={quick_signal.score:.3f} < cut={cut:.3f}")
+        _record_recent_signal(redis_url=rurl, signal=quick_signal, session_label=sess_now, indicators=indicators, suppressed="below_cutoff")
+        return False
+    risk_ok, risk_reason = check_signal_risk_feasibility(quick_signal, sess_now)
+    if not risk_ok:
+        logger.warning(f"🛡️ [RISK] {event.pattern} 신호 리스크 차단: {ticker} - {risk_reason}")
+        _record_recent_signal(redis_url=rurl, signal=quick_signal, session_label=sess_now, indicators=indicators, suppressed=f"risk_check: {risk_reason}")
+        return False
+    try:
+        redis_streams.publish_signal({
+            "ticker": quick_signal.ticker,
+            "signal_type": quick_signal.signal_type.value,
+            "score": quick_signal.score,
+            "confidence": quick_signal.confidence,
+            "regime": quick_signal.regime,
+            "tech_score": quick_signal.tech_score,
+            "sentiment_score": quick_signal.sentiment_score,
+            "edgar_bonus": quick_signal.edgar_bonus,
+            "trigger": quick_signal.trigger,
+            "summary": quick_signal.summary,
+            "entry_price": quick_signal.entry_price,
+            "stop_loss": quick_signal.stop_loss,
+            "take_profit": quick_signal.take_profit,
+            "horizon_minutes": quick_signal.horizon_minutes,
+            "timestamp": quick_signal.timestamp.isoformat(),
+            "config_version": get_config_snapshot().version
+        })
+    except Exception as e:
+        logger.error(f"🔥 [SCALP] {event.pattern} Redis 발행 실패: {ticker} - {e}")
+        return False
+    if stats is not None:
+        stats['signals_generated'] = stats.get('signals_generated', 0) + 1
+    _record_recent_signal(redis_url=rurl, signal=quick_signal, session_label=sess_now, indicators=indicators)
+    logger.info(f"스캘프 신호: {ticker} {quick_signal.signal_type.value} ({event.pattern}, {summary}) | 리스크: {risk_reason}")
+    return True
+
+
+def _run_micro_patterns_on_quotes(quotes_ingestor, tickers) -> int:
+    """update_quotes 직후: 종목별 신규 봉만 감지기에 반영 → 이벤트를 스캘프 게이팅 경로로 발행"""
+    micro = get_micro_pattern_detector()
+    if not micro.enabled:
+        return 0
+    signal_mixer = trading_components.get("signal_mixer")
+    redis_streams = trading_components.get("redis_streams")
+    if not signal_mixer or not redis_streams:
+        return 0
+    published = 0
+    for ticker in tickers:
+        try:
+            # 방금 갱신된 봉 집계기 버퍼 사용 (REST 재조회 없음). 첫 호출은 워밍업용으로 창 크기만큼
+            n = 3 * micro.window + 1 if micro.last_ts(ticker) is None else 4
+            candles = _timeframe_bars(ticker, micro.bar_sec, n) or quotes_ingestor.get_latest_candles(ticker, n)
+            events = micro.on_candles(ticker, candles)
+            if not events:
+                continue
+            indicators = quotes_ingestor.get_technical_indicators(ticker) or {}
+            for ev in events:
+                # 워커 프로세스가 바뀌면 감지기 상태가 새로 워밍업됨 → 같은 봉 중복 발행 방지
+                bar_key = getattr(ev.bar_ts, "isoformat", lambda: str(ev.bar_ts))()
+                if not get_redis_client().set(f"micro:{ev.pattern}:{ticker}:{bar_key}", "1", nx=True, ex=900):
+                    continue
+                if _publish_micro_pattern_signal(ev, signal_mixer, redis_streams, indicators):
+                    published += 1
+        except Exception as e:
+            logger.debug(f"스트리밍 패턴 감지 실패 ({ticker}): {e}")
+    return published
+
+
 @celery_app.task(bind=True, name="app.jobs.scheduler.generate_signals",
-                 soft_time_limit=20, time_limit=30)
+                 soft_time_limit=GENERATE_SIGNALS_SOFT_LIMIT_SEC, time_limit=30)
 def generate_signals(self):
     """시그널 생성 작업"""
     try:
@@ -3062,9 +3507,12 @@ def generate_signals(self):
                 'token_exhausted': 0,
                 'price_cap': 0,
                 'insufficient_data': 0,
+                'cycle_deadline': 0,
                 'other': 0
             },
-            'llm_calls': 0
+            'llm_calls': 0,
+            'memo': {'hits': 0, 'misses': 0},
+            'scores_recorded': 0
         }
         
         # 필수 최소 컴포넌트 확인: 스캘프 경로만이라도 돌릴 수 있게 최소 deps만 강제
@@ -3121,72 +3569,101 @@ def generate_signals(self):
             logger.warning(f"🔍 [DEBUG] slack_bot이 None임! trading_components 키: {list(trading_components.keys())}")
         
         signals_generated = 0
+        strong_candidates = []  # (ticker, signal, LLM 인사이트, 세션) - 사이클 끝 배치 검증
         
         # 각 종목별로 시그널 생성
-        # 유니버스 동적 적용 (Redis union: core + external + watchlist)
+        # 유니버스 동적 적용 (유니버스 서비스 스냅샷: core + external + watchlist)
         dynamic_universe = None
+        universe_tiers = None
         try:
-            rurl = os.getenv("REDIS_URL")
-            if rurl:
-                r = redis.from_url(rurl)
-                external = r.smembers("universe:external") or []
-                watch = r.smembers("universe:watchlist") or []
-                core = [t.strip().upper() for t in (os.getenv("TICKERS", "").split(",")) if t.strip()]
-                ext = [x.decode() if isinstance(x, (bytes, bytearray)) else x for x in external]
-                wch = [x.decode() if isinstance(x, (bytes, bytearray)) else x for x in watch]
-                merged = []
-                seen = set()
-                max_n = int(os.getenv("UNIVERSE_MAX", "100"))
-                for arr in [core, ext, wch]:
-                    for s in arr:
-                        if s and s not in seen:
-                            merged.append(s)
-                            seen.add(s)
-                        if len(merged) >= max_n:
-                            break
-                    if len(merged) >= max_n:
-                        break
-                dynamic_universe = merged
-                # 인제스터에 반영 및 워밍업
-                try:
-                    if hasattr(quotes_ingestor, "update_universe_tickers"):
-                        quotes_ingestor.update_universe_tickers(dynamic_universe)
-                except Exception:
-                    pass
+            universe_snap = get_universe_service().snapshot()
+            dynamic_universe = list(universe_snap.symbols)
+            universe_tiers = universe_snap.tiers()
+            # 인제스터에 반영 및 워밍업 (버전 변경 시에만)
+            try:
+                _apply_universe_to_ingestor(quotes_ingestor, universe_snap)
+            except Exception:
+                pass
+            # 적응형 스케줄러: 유니버스에서 빠진 종목의 대기 상태 정리 (버전 변경 시에만)
+            try:
+                from app.engine.ticker_priority import get_ticker_scheduler
+                get_ticker_scheduler().sync_universe(universe_snap.version, universe_snap.symbols)
+            except Exception as e:
+                logger.debug(f"적응형 스케줄러 유니버스 동기화 실패: {e}")
         except Exception:
             dynamic_universe = None
 
         # Tier 기반 종목 처리 (Universe Expansion)
-        universe_tiers = get_universe_with_tiers()
+        if universe_tiers is None:
+            universe_tiers = get_universe_with_tiers()
         logger.info(f"🎯 Tier 유니버스: A={len(universe_tiers['tier_a'])}, B={len(universe_tiers['tier_b'])}, 벤치={len(universe_tiers['bench'])}")
         
         # Tier별 스케줄링 적용
         current_time = datetime.now()
         processing_tickers = []
+        memo_ctx = (get_config_snapshot().version, _session_label())
+        news_ids = _latest_news_ids(redis_streams)
+        cycle_deadline = None
+        tiered = ([(t, TokenTier.TIER_A, "tier_a") for t in universe_tiers['tier_a']]
+                  + [(t, TokenTier.TIER_B, "tier_b") for t in universe_tiers['tier_b']])
+        
+        if ADAPTIVE_TICKER_SCHEDULING and tiered:
+            # 적응형: 새 봉 없는 종목 제외 → 활동도 순위로 Tier 토큰 몫/평가 상한/마감 내 배정
+            candidates = _skip_unchanged_tickers(tiered, quotes_ingestor, memo_ctx, stats, news_ids)
+            plan = _plan_adaptive_tickers(candidates, quotes_ingestor, stats)
+            processing_tickers = plan.items()
+            cycle_deadline = plan.deadline
+        else:
+            # Tier A 종목 체크 (30초마다)
+            for ticker in universe_tiers['tier_a']:
+                should_process, reason = should_process_ticker_now(ticker, current_time)
+                if should_process:
+                    processing_tickers.append((ticker, TokenTier.TIER_A, reason))
+            
+            # Tier B 종목 체크 (60초마다) 
+            for ticker in universe_tiers['tier_b']:
+                should_process, reason = should_process_ticker_now(ticker, current_time)
+                if should_process:
+                    processing_tickers.append((ticker, TokenTier.TIER_B, reason))
+            
+            # 벤치 종목은 현재 이벤트 기반만 (추후 확장)
+            
+            # Fallback: Tier 시스템 비활성화시 기존 방식 사용
+            if not processing_tickers:
+                logger.info("🎯 Tier 처리 대상 없음, 기존 방식으로 Fallback")
+                tickers_iter = dynamic_universe or list(quotes_ingestor.tickers)
+                processing_tickers = [(ticker, None, "fallback") for ticker in tickers_iter]
+            
+            # 변경 인지: 직전 평가 이후 새 봉·설정 변경이 없는 종목은 토큰/스코어링/믹싱 전부 생략
+            processing_tickers = _skip_unchanged_tickers(processing_tickers, quotes_ingestor, memo_ctx, stats, news_ids)
         
-        # Tier A 종목 체크 (30초마다)
-        for ticker in universe_tiers['tier_a']:
-            should_process, reason = should_process_ticker_now(ticker, current_time)
-            if should_process:
-                processing_tickers.append((ticker, TokenTier.TIER_A, reason))
-        
-        # Tier B 종목 체크 (60초마다) 
-        for ticker in universe_tiers['tier_b']:
-            should_process, reason = should_process_ticker_now(ticker, current_time)
-            if should_process:
-                processing_tickers.append((ticker, TokenTier.TIER_B, reason))
-        
-        # 벤치 종목은 현재 이벤트 기반만 (추후 확장)
-        
-        logger.info(f"🎯 처리 대상: {len(processing_tickers)}개 종목 {[f'{t}({tier.value})' for t, tier, _ in processing_tickers]}")
+        logger.info(f"🎯 처리 대상: {len(processing_tickers)}개 종목 {[f'{t}({tier.value if tier else reason})' for t, tier, reason in processing_tickers]}")
         
-        # Fallback: Tier 시스템 비활성화시 기존 방식 사용
-        if not processing_tickers:
-            logger.info("🎯 Tier 처리 대상 없음, 기존 방식으로 Fallback")
-            tickers_iter = dynamic_universe or list(quotes_ingestor.tickers)
-            processing_tickers = [(ticker, None, "fallback") for ticker in tickers_iter]
+        # 시간 예산: 배치 검증 몫과 루프 최소 시간을 남기고 LLM 대기 상한 배분, 루프도 검증 몫 전에 마감
+        from app.engine.llm_scheduler import LLM_CYCLE_DEADLINE_SEC
+        from app.jobs.signal_validation import VALIDATION_DEADLINE_SEC
+        llm_deadline = min(LLM_CYCLE_DEADLINE_SEC,
+                           _cycle_remaining(start_time) - VALIDATION_DEADLINE_SEC - SIGNAL_LOOP_MIN_SEC)
+        loop_deadline = start_time + GENERATE_SIGNALS_SOFT_LIMIT_SEC - SIGNAL_CYCLE_RESERVE_SEC - VALIDATION_DEADLINE_SEC
+        cycle_deadline = loop_deadline if cycle_deadline is None else min(cycle_deadline, loop_deadline)
+
+        # LLM 게이팅 후보 사전 수집 → 가치 순위 상위 K만 예산 내 동시 실행 (사이클 1회)
+        llm_prefetch = _prefetch_llm_insights(processing_tickers, quotes_ingestor, regime_detector,
+                                              tech_score_engine, llm_engine, stats, deadline_sec=llm_deadline)
         
-        for ticker, tier, schedule_reason in processing_tickers:
+        # 고가 종목 프리필터용 현재가: 사이클 1회 일괄 (최종가 서비스, 누락분만 어댑터 스냅샷 1회)
+        try:
+            cycle_prices = _last_prices(globals().get('trading_adapter'), [t for t, _, _ in processing_tickers])
+        except Exception as e:
+            logger.debug(f"사이클 현재가 조회 실패: {e}")
+            cycle_prices = {}
+        
+        for idx, (ticker, tier, schedule_reason) in enumerate(processing_tickers):
+            # 사이클 마감: 남은 배정은 다음 사이클로 (대기 시간이 누적돼 우선순위 상승)
+            if cycle_deadline is not None and time.time() > cycle_deadline:
+                stats['suppressed']['cycle_deadline'] += len(processing_tickers) - idx
+                logger.warning(f"⏱️ 사이클 마감 초과: {len(processing_tickers) - idx}개 종목 이월")
+                break
             try:
                 # API 토큰 체크 및 소비 (Tier 시스템)
                 if tier is not None:  # Tier 시스템 활성화된 경우
@@ -3206,23 +3683,22 @@ def generate_signals(self):
                 
                 # 고가 종목 프리필터 (신호 생성 단계에서 사전 차단)
                 try:
-                    ta = globals().get('trading_adapter')
-                    if ta:
-                        current_price = ta.get_current_price(ticker)
-                        if current_price:
-                            max_price_per_share = float(os.getenv("MAX_PRICE_PER_SHARE_USD", "120"))
-                            fractional_enabled = os.getenv("FRACTIONAL_ENABLED", "false").lower() in ("true", "1", "yes", "on")
-                            if current_price > max_price_per_share and not fractional_enabled:
-                                stats['suppressed']['price_cap'] += 1
-                                continue
+                    current_price = cycle_prices.get(ticker.upper())
+                    if current_price:
+                        max_price_per_share = float(os.getenv("MAX_PRICE_PER_SHARE_USD", "120"))
+                        fractional_enabled = os.getenv("FRACTIONAL_ENABLED", "false").lower() in ("true", "1", "yes", "on")
+                        if current_price > max_price_per_share and not fractional_enabled:
+                            stats['suppressed']['price_cap'] += 1
+                            continue
                 except Exception as e:
                     logger.debug(f"고가 종목 필터 스킵 ({ticker}): {e}")
                 
                 # 티커 평가 시도 카운트 (루프 진입 즉시)
                 stats['processed'] += 1
                 
-                # 1. 시세 데이터 가져오기
-                candles = quotes_ingestor.get_latest_candles(ticker, 50)
+                # 1. 시세 데이터 (사전 패스에서 읽은 봉 재사용, 없을 때만 조회)
+                pre = llm_prefetch.get(ticker)
+                candles = pre["candles"] if pre else quotes_ingestor.get_latest_candles(ticker, 50)
                 # 공격/지연 소스일 때 초기 워밍업 바 완화 (env로 조정)
                 try:
                     qp = (os.getenv("QUOTES_PROVIDER", "") or "").lower()
@@ -3239,234 +3715,33 @@ def generate_signals(self):
                 if not indicators:
                     continue
                 
-                # 2.5 스캘프 모드: 마지막 한 틱이 크게 튀면 즉시 신호 생성 (테스트/알림용)
+                # 2.5~2.6 스캘프 마이크로 패턴 (틱 스파이크 / 3분봉 3연속 양봉)
+                # 스트리밍 모드면 update_quotes가 봉 도착 즉시 처리 → 루프에서는 생략
                 try:
-                    scalp_enabled = (os.getenv("SCALP_TICK_SPIKE", "false").lower() in ("1", "true", "yes", "on"))
-                    if scalp_enabled and len(candles) >= 2:
-                        # 30s/15s 분할 시 마지막 두 바가 같은 1분에 속함 → 분당 간격으로 비교
-                        try:
-                            bars_per_min = max(1, 60 // max(getattr(quotes_ingestor, "bar_sec", 60), 1))
-                        except Exception:
-                            bars_per_min = 1
-                        last = candles[-1]
-                        prev_idx = -1 - bars_per_min if len(candles) > bars_per_min else -2
-                        prev = candles[prev_idx]
-                        last_abs_ret = abs((last.c - prev.c) / max(prev.c, 1e-9))
-                        spike_thr = float(os.getenv("SCALP_MIN_RET", "0.003"))  # 기본 0.3%
-                        # 야후 1분봉 분할 시 마지막 두 바가 동일 값인 경우가 많아 고저폭 기준도 허용
-                        last_range = (last.h - last.l) / max(last.c, 1e-9)
-                        range_thr = float(os.getenv("SCALP_MIN_RANGE", "0.003"))  # 기본 0.3%
-                        trig_reason = None
-                        if last_abs_ret >= spike_thr:
-                            trig_reason = f"ret>={spike_thr:.3%}"
-                        elif last_range >= range_thr:
-                            trig_reason = f"range>={range_thr:.3%}"
-                        if trig_reason:
-                            from app.engine.regime import RegimeType, RegimeResult
-                            from app.engine.techscore import TechScoreResult
-                            direction = 1.0 if (last.c - prev.c) >= 0 else -1.0
-                            fake_regime = RegimeResult(
-                                regime=RegimeType.VOL_SPIKE,
-                                confidence=min(1.0, last_abs_ret * 20.0),
-                                features={"last_abs_ret": last_abs_ret},
-                                timestamp=datetime.now()
-                            )
-                            fake_tech = TechScoreResult(
-                                score=direction,  # -1 ~ +1로 직접 스케일
-                                components={"ema": 0.8 if direction > 0 else 0.2,
-                                            "macd": 0.8 if direction > 0 else 0.2,
-                                            "rsi": 0.8 if direction > 0 else 0.2,
-                                            "vwap": 0.8 if direction > 0 else 0.2},
-                                timestamp=datetime.now()
-                            )
-                            quick_signal = signal_mixer.mix_signals(
-                                ticker=ticker,
-                                regime_result=fake_regime,
-                                tech_score=fake_tech,
-                                llm_insight=None,
-                                edgar_filing=None,
-                                current_price=last.c
-                            )
-                            if quick_signal:
-                                quick_signal.trigger = "tick_spike"
-                                quick_signal.summary = f"{trig_reason}; abs_ret={last_abs_ret:.3%}; range={last_range:.3%}"
-                                # 컷/세션 억제 동일 적용 (로컬 계산)
-                                sess_now = _session_label()
-                                cutoff_rth, cutoff_ext = get_signal_cutoffs()
-                                cut_r = cutoff_rth
-                                cut_e = cutoff_ext
-                                cut = cut_r if sess_now == "RTH" else cut_e
-                                if abs(quick_signal.score) < cut:
-                                    logger.info(f"🔥 [SCALP DEBUG] 스캘프 신호 억제: {ticker} score={quick_signal.score:.3f} < cut={cut:.3f}")
-                                    _record_recent_signal(redis_url=rurl, signal=quick_signal, session_label=sess_now, indicators=indicators, suppressed="below_cutoff")
-                                else:
-                                    # GPT-5 리스크 pre-check 추가
-                                    risk_ok, risk_reason = check_signal_risk_feasibility(quick_signal, sess_now)
-                                    if not risk_ok:
-                                        logger.warning(f"🛡️ [RISK] 스캘프 신호 리스크 차단: {ticker} - {risk_reason}")
-                                        _record_recent_signal(redis_url=rurl, signal=quick_signal, session_label=sess_now, indicators=indicators, suppressed=f"risk_check: {risk_reason}")
-                                    else:
-                                        logger.info(f"🔥 [SCALP DEBUG] 스캘프 신호 발행: {ticker} {quick_signal.signal_type.value} score={quick_signal.score:.3f} | 리스크: {risk_reason}")
-                                        try:
-                                            stats['signals_generated'] += 1
-                                            redis_streams.publish_signal({
-                                            "ticker": quick_signal.ticker,
-                                            "signal_type": quick_signal.signal_type.value,
-                                            "score": quick_signal.score,
-                                            "confidence": quick_signal.confidence,
-                                            "regime": quick_signal.regime,
-                                            "tech_score": quick_signal.tech_score,
-                                            "sentiment_score": quick_signal.sentiment_score,
-                                            "edgar_bonus": quick_signal.edgar_bonus,
-                                            "trigger": quick_signal.trigger,
-                                            "summary": quick_signal.summary,
-                                            "entry_price": quick_signal.entry_price,
-                                            "stop_loss": quick_signal.stop_loss,
-                                            "take_profit": quick_signal.take_profit,
-                                            "horizon_minutes": quick_signal.horizon_minutes,
-                                            "timestamp": quick_signal.timestamp.isoformat()
-                                        })
-                                            logger.info(f"🔥 [SCALP DEBUG] Redis 스트림 발행 성공: {ticker}")
-                                            signals_generated += 1
-                                            _record_recent_signal(redis_url=rurl, signal=quick_signal, session_label=sess_now, indicators=indicators)
-                                            logger.info(f"스캘프 신호: {ticker} {quick_signal.signal_type.value} ({trig_reason}, abs_ret {last_abs_ret:.2%}, range {last_range:.2%})")
-                                        except Exception as e:
-                                            logger.error(f"🔥 [SCALP DEBUG] 스캘프 Redis 발행 실패: {ticker} - {e}")
-                except Exception:
-                    pass
-
-                # 2.6 스캘프 모드(대안): 3분봉 3개 연속 양봉이면 롱 신호
-                try:
-                    if os.getenv("SCALP_3MIN3UP", "false").lower() in ("1", "true", "yes", "on"):
-                        bar_sec = int(os.getenv("BAR_SEC", "30") or 30)
-                        window = max(1, int(180 / max(bar_sec, 1)))  # 3분 창의 바 개수
-                        need = window * 3
-                        if len(candles) >= need:
-                            w1 = candles[-window:]
-                            w2 = candles[-2*window:-window]
-                            w3 = candles[-3*window:-2*window]
-                            def _is_green(ws):
-                                try:
-                                    return (ws[-1].c if ws else 0.0) > (ws[0].o if ws else 0.0)
-                                except Exception:
-                                    return False
-                            if _is_green(w1) and _is_green(w2) and _is_green(w3):
-                                from app.engine.regime import RegimeType, RegimeResult
-                                from app.engine.techscore import TechScoreResult
-                                fake_regime = RegimeResult(
-                                    regime=RegimeType.TREND,
-                                    confidence=0.8,
-                                    features={"3min3up": True},
-                                    timestamp=datetime.now()
-                                )
-                                fake_tech = TechScoreResult(
-                                    score=1.0,
-                                    components={"ema": 0.9, "macd": 0.9, "rsi": 0.8, "vwap": 0.8},
-                                    timestamp=datetime.now()
-                                )
-                                last_px = candles[-1].c
-                                quick_signal = signal_mixer.mix_signals(
-                                    ticker=ticker,
-                                    regime_result=fake_regime,
-                                    tech_score=fake_tech,
-                                    llm_insight=None,
-                                    edgar_filing=None,
-                                    current_price=last_px
-                                )
-                                if quick_signal:
-                                    quick_signal.trigger = "3min_3up"
-                                    quick_signal.summary = "3min green x3"
-                                    sess_now = _session_label()
-                                    cutoff_rth, cutoff_ext = get_signal_cutoffs()
-                                    cut_r = cutoff_rth
-                                    cut_e = cutoff_ext
-                                    cut = cut_r if sess_now == "RTH" else cut_e
-                                    if abs(quick_signal.score) < cut:
-                                        logger.info(f"🔥 [3MIN DEBUG] 3분3상승 신호 억제: {ticker} score={quick_signal.score:.3f} < cut={cut:.3f}")
-                                        _record_recent_signal(redis_url=rurl, signal=quick_signal, session_label=sess_now, indicators=indicators, suppressed="below_cutoff")
-                                    else:
-                                        # 리스크 사전 체크 (GPT-5 권장사항)
-                                        risk_ok, risk_reason = check_signal_risk_feasibility(quick_signal, sess_now)
-                                        if not risk_ok:
-                                            logger.warning(f"🛡️ {ticker} 3분3상승 신호 리스크 차단: {risk_reason}")
-                                            _record_recent_signal(redis_url=rurl, signal=quick_signal, session_label=sess_now, indicators=indicators, suppressed="risk_limit")
-                                        else:
-                                            logger.info(f"🔥 [3MIN DEBUG] 3분3상승 신호 발행: {ticker} long score={quick_signal.score:.3f}")
-                                            try:
-                                                stats['signals_generated'] += 1
-                                                redis_streams.publish_signal({
-                                                "ticker": quick_signal.ticker,
-                                                "signal_type": quick_signal.signal_type.value,
-                                                "score": quick_signal.score,
-                                                "confidence": quick_signal.confidence,
-                                                "regime": quick_signal.regime,
-                                                "tech_score": quick_signal.tech_score,
-                                                "sentiment_score": quick_signal.sentiment_score,
-                                                "edgar_bonus": quick_signal.edgar_bonus,
-                                                "trigger": quick_signal.trigger,
-                                                "summary": quick_signal.summary,
-                                                "entry_price": quick_signal.entry_price,
-                                                "stop_loss": quick_signal.stop_loss,
-                                                "take_profit": quick_signal.take_profit,
-                                                "horizon_minutes": quick_signal.horizon_minutes,
-                                                "timestamp": quick_signal.timestamp.isoformat()
-                                            })
-                                                logger.info(f"🔥 [3MIN DEBUG] Redis 스트림 발행 성공: {ticker}")
-                                                signals_generated += 1
-                                                _record_recent_signal(redis_url=rurl, signal=quick_signal, session_label=sess_now, indicators=indicators)
-                                                logger.info(f"스캘프 신호: {ticker} long (3min_3up)")
-                                            except Exception as e:
-                                                logger.error(f"🔥 [3MIN DEBUG] 3분3상승 Redis 발행 실패: {ticker} - {e}")
-                                            continue
-                except Exception:
-                    pass
+                    micro = get_micro_pattern_detector()
+                    if micro.enabled and not MICRO_PATTERN_STREAMING:
+                        published_3up = False
+                        micro_bars = _timeframe_bars(ticker, micro.bar_sec, 3 * micro.window + 1, candles)
+                        for ev in micro.on_candles(ticker, micro_bars):
+                            if _publish_micro_pattern_signal(ev, signal_mixer, redis_streams, indicators, stats):
+                                signals_generated += 1
+                                published_3up = published_3up or ev.pattern == THREE_MIN_THREE_UP
+                        if published_3up:
+                            continue
+                except Exception as e:
+                    logger.debug(f"스캘프 패턴 평가 실패 ({ticker}): {e}")
 
-                # 3. 레짐 감지
-                regime_result = regime_detector.detect_regime(candles)
-                
-                # 4. 기술적 점수 계산
-                tech_score = tech_score_engine.calculate_tech_score(candles)
-                
-                # 5. EDGAR 공시 확인
-                edgar_filing = None
-                llm_insight = None
-                
-                # 최근 EDGAR 공시가 있는지 확인
-                recent_edgar = get_recent_edgar_filing(ticker)
-                if recent_edgar:
-                    edgar_filing = recent_edgar
-                    # LLM 게이팅 적용 (EDGAR 이벤트)
-                    should_call, call_reason = should_call_llm_for_event(
-                        ticker, "edgar", edgar_filing=edgar_filing
-                    )
-                    if should_call:
-                        # 쿼터 소비 및 LLM 분석
-                        if consume_llm_call_quota(ticker, "edgar", edgar_filing):
-                            llm_insight = llm_engine.analyze_edgar_filing(edgar_filing)
-                            stats['llm_calls'] += 1
-                            logger.info(f"🤖 LLM EDGAR 분석: {ticker} - {call_reason}")
-                        else:
-                            logger.warning(f"🤖 LLM 쿼터 소비 실패: {ticker} (EDGAR)")
-                    else:
-                        logger.info(f"🚫 LLM EDGAR 차단: {ticker} - {call_reason}")
+                # 3~5. 레짐/기술점수/EDGAR (사전 패스 결과 재사용)
+                if pre:
+                    regime_result, tech_score, edgar_filing = pre["regime_result"], pre["tech_score"], pre["edgar_filing"]
+                else:
+                    regime_result = regime_detector.detect_regime(
+                        _timeframe_bars(ticker, _regime_bar_sec(quotes_ingestor), 50, candles))
+                    tech_score = tech_score_engine.calculate_tech_score(candles)
+                    edgar_filing = get_recent_edgar_filing(ticker)
                 
-                # 6. 레짐이 vol_spike인 경우 추가 LLM 분석 (신호 점수 조건부)
-                if regime_result.regime.value == 'vol_spike' and llm_engine and not llm_insight:
-                    # tech_score를 이용해 신호 점수 체크 (vol_spike 게이팅)
-                    should_call, call_reason = should_call_llm_for_event(
-                        ticker, "vol_spike", signal_score=tech_score.score
-                    )
-                    if should_call:
-                        # 쿼터 소비 및 LLM 분석
-                        if consume_llm_call_quota(ticker, "vol_spike"):
-                            text = f"Volatility spike detected for {ticker} in {regime_result.regime.value} regime"
-                            llm_insight = llm_engine.analyze_text(text, f"vol_spike_{ticker}", regime='vol_spike')
-                            stats['llm_calls'] += 1
-                            logger.info(f"🤖 LLM vol_spike 분석: {ticker} - {call_reason}")
-                        else:
-                            logger.warning(f"🤖 LLM 쿼터 소비 실패: {ticker} (vol_spike)")
-                    else:
-                        logger.info(f"🚫 LLM vol_spike 차단: {ticker} - {call_reason}")
+                # 6. LLM 인사이트: 사이클 스케줄러가 가치 순위로 선별·실행한 결과만 사용 (루프 순서 무관)
+                llm_insight = pre.get("llm_insight") if pre else None
                 
                 # 6. 세션별 pre-filter (RTH: 일일상한, EXT: 유동성/스프레드/쿨다운/일일상한)
                 ext_enabled = (os.getenv("EXTENDED_PRICE_SIGNALS", "false").lower() in ("1","true","yes","on"))
@@ -3488,13 +3763,8 @@ def generate_signals(self):
                         if rurl:
                             r_conn = redis.from_url(rurl)
                             rth_daily_cap = int(os.getenv("RTH_DAILY_CAP", "100"))
-                            # ET 기준 날짜 키 (UTC-5, DST 간이 적용)
-                            et_tz = timezone(timedelta(hours=-5))
-                            now_et = datetime.now(et_tz)
-                            # DST 간이 적용 (3월-11월)
-                            if 3 <= now_et.month <= 11:
-                                et_tz = timezone(timedelta(hours=-4))
-                                now_et = datetime.now(et_tz)
+                            # ET 기준 날짜 키 (세션 캘린더)
+                            now_et = get_market_clock().now()
                             rth_day_key = f"dailycap:{now_et:%Y%m%d}:RTH:{ticker}"
                             # 90초 idempotency 슬롯키 (중복 카운트 방지)
                             slot = int(now_et.timestamp() // 90)
@@ -3531,12 +3801,7 @@ def generate_signals(self):
                                 logger.info(f"EXT 쿨다운: {ticker} ({now_ts - last_ts}s < {cool_min*60}s)")
                             else:
                                 # ET 기준 날짜 키
-                                et_tz = timezone(timedelta(hours=-5))
-                                now_et = datetime.now(et_tz)
-                                if 3 <= now_et.month <= 11:
-                                    et_tz = timezone(timedelta(hours=-4))
-                                    now_et = datetime.now(et_tz)
-                                day_key = f"dailycap:{now_et:%Y%m%d}:EXT:{ticker}"
+                                day_key = f"dailycap:{get_market_clock().et_ymd()}:EXT:{ticker}"
                                 
                                 # 원자적 체크-증가
                                 current_count = r.incr(day_key)
@@ -3552,22 +3817,13 @@ def generate_signals(self):
                         logger.warning(f"EXT 쿨다운/상한 체크 실패: {e}")
                         pass
 
-                # VaR95 경량 가드: 최근 리턴 샘플 기반(옵션)
+                # 실현 봉 수익률 → 종목×레짐 분위수 스케치 (O(1) 갱신, 사이징 VaR 소스)
                 try:
-                    from app.engine.risk import rolling_var95
-                    # 샘플은 별도 곳에서 채워진다고 가정; 없으면 스킵
-                    rurl = os.getenv("REDIS_URL")
-                    if rurl:
-                        r = redis.from_url(rurl)
-                        key = f"risk:rets:{ticker}:{regime_result.regime.value}"
-                        samples = [float(x) for x in (r.lrange(key, 0, 9999) or [])]
-                        if samples:
-                            rolling_var95(samples)
-                            # 간이 기준: 예상 손실R>VaR이면 억제
-                            # 여기서는 신호 생성 후 컷오프 단계에서 suppress
-                            pass
-                except Exception:
-                    pass
+                    from app.engine.return_sketch import get_return_recorder
+                    get_return_recorder().record_bar(ticker, regime_result.regime.value, candles,
+                                                     bar_sec=getattr(quotes_ingestor, "bar_sec", None))
+                except Exception as e:
+                    logger.debug(f"수익률 스케치 기록 스킵 {ticker}: {e}")
 
                 # 7. 시그널 믹싱
                 current_price = candles[-1].c if candles else 0
@@ -3579,6 +3835,14 @@ def generate_signals(self):
                     edgar_filing=edgar_filing,
                     current_price=current_price
                 )
+                # 평가 메모는 결과가 확정된 뒤에 저장 (신호 없음/입력만으로 정해지는 억제/발행 완료).
+                # 쿨다운·일일상한·리스크 차단처럼 시간이 지나면 풀리는 억제는 저장하지 않아 다음 사이클에 재평가
+                memo_k = None if (pre and pre.get("llm_pending")) else memo_key(candles[-1], *memo_ctx, news_ids.get(ticker))
+                if signal:
+                    # 점수 시계열 (사이클 끝에 파이프라인 1회로 기록)
+                    get_score_series().record(ticker, signal.score, signal_type=signal.signal_type.value)
+                else:
+                    get_eval_memo().store(ticker, memo_k, regime_result, tech_score, None)
                 
                 if signal:
                     # 컷오프 적용 (세션별)
@@ -3599,6 +3863,8 @@ def generate_signals(self):
                             pass
                         # 최근 신호 리스트에 suppressed로 기록
                         _record_recent_signal(redis_url=rurl, signal=signal, session_label=session_label, indicators=indicators, suppressed=suppress_reason or "below_cutoff")
+                        if actual_reason in EVAL_MEMO_FINAL_SUPPRESS:
+                            get_eval_memo().store(ticker, memo_k, regime_result, tech_score, signal)
                         continue
 
                     # RTH 일일 상한 체크: 컷오프/리스크 통과 후에 한 번만 적용
@@ -3679,7 +3945,8 @@ def generate_signals(self):
                         "stop_loss": signal.stop_loss,
                         "take_profit": signal.take_profit,
                         "horizon_minutes": signal.horizon_minutes,
-                        "timestamp": signal.timestamp.isoformat()
+                        "timestamp": signal.timestamp.isoformat(),
+                        "config_version": get_config_snapshot().version
                     }
                     
                     logger.info(f"🔥 [DEBUG] 시그널 생성됨! ticker={ticker}, type={signal.signal_type.value}, score={signal.score:.3f}, cut={cut:.3f}")
@@ -3698,29 +3965,7 @@ def generate_signals(self):
                         stats['signals_generated'] += 1
                         logger.info(f"🔥 [DEBUG] Redis 스트림 발행 성공: {ticker}")
                         
-                        # 바스켓 분석을 위한 신호 스코어 저장 및 히스토리 추가
-                        try:
-                            rurl = os.getenv("REDIS_URL")
-                            if rurl:
-                                r = redis.from_url(rurl)
-                                now = time.time()
-                                
-                                # 현재 스코어 저장
-                                score_key = f"signal_score:{ticker}"
-                                score_data = {
-                                    "score": signal.score,
-                                    "timestamp": now,
-                                    "signal_type": signal.signal_type.value
-                                }
-                                r.setex(score_key, 300, json.dumps(score_data))  # 5분 TTL
-                                
-                                # 히스토리 저장 (slope 계산용)
-                                history_key = f"score_history:{ticker}"
-                                r.lpush(history_key, json.dumps(score_data))
-                                r.ltrim(history_key, 0, 19)  # 최근 20개만 유지
-                                r.expire(history_key, 1800)  # 30분 TTL
-                        except Exception as e:
-                            logger.warning(f"신호 스코어 저장 실패: {e}")
+                        # 점수 최신값/히스토리는 score_series가 평가 시점에 기록 (scores:latest, scores:raw:*)
                         
                         # Slack 전송: 강신호만 (원래 기획 - 소수·굵직한 알림)
                         if slack_bot:
@@ -3763,79 +4008,13 @@ def generate_signals(self):
                                     except Exception as llm_e:
                                         logger.warning(f"강신호 LLM 분석 실패: {ticker} - {llm_e}")
                                 
-                                try:
-                                    # 기존 메시지나 LLM 향상된 메시지 사용
-                                    if enhanced_llm_insight:
-                                        # LLM 분석이 있으면 더 친근한 메시지로 포맷
-                                        # Phase 1.5: 신호 검증 시스템 적용!
-                                        validated_signal = signal
-                                        try:
-                                            from app.jobs.signal_validation import SignalValidationEngine
-                                            validation_engine = SignalValidationEngine()
-                                            validation_result = validation_engine.validate_signal(signal)
-                                            
-                                            if validation_result:
-                                                validated_signal = validation_engine.apply_validation_result(signal, validation_result)
-                                                logger.info(f"🔍 신호 검증 완료: {ticker} - {'✅통과' if validation_result.should_proceed else '🛑거부'}")
-                                                
-                                                # 검증 거부된 신호는 전송하지 않음
-                                                if not validation_result.should_proceed:
-                                                    logger.info(f"suppressed=validation_rejected ticker={ticker} reason={validation_result.validation_reason}")
-                                                    continue
-                                        except Exception as val_e:
-                                            logger.warning(f"신호 검증 실패: {ticker} - {val_e}")
-                                        
-                                        slack_message = format_enhanced_slack_message(validated_signal, enhanced_llm_insight)
-                                    else:
-                                        # 기존 메시지 사용
-                                        slack_message = format_slack_message(signal)
-                                    
-                                    # Phase 1.5: 페이퍼 트레이딩 자동 실행 후 성공시에만 슬랙 전송!
-                                    try:
-                                        from app.jobs.paper_trading_manager import get_paper_trading_manager
-                                        paper_manager = get_paper_trading_manager()
-                                        
-                                        execution_result = paper_manager.execute_signal(validated_signal)
-                                        if execution_result:
-                                            logger.info(f"📊 페이퍼 트레이딩 실행: {ticker}")
-                                            # 실제 주문 실행 성공 시에만 슬랙 전송
-                                            result = slack_bot.send_message(slack_message)
-                                            if result:
-                                                logger.info(f"✅ Slack 전송 성공: {ticker} (실제 주문 후)")
-                                            else:
-                                                logger.warning(f"❌ Slack 전송 실패: {ticker}")
-                                        else:
-                                            logger.info(f"📊 페이퍼 트레이딩 스킵: {ticker} - 슬랙 전송 안함")
-                                    except Exception as paper_e:
-                                        logger.warning(f"페이퍼 트레이딩 실행 실패: {ticker} - {paper_e}")
-                                    
-                                    
-                                    # 기존 코드 정리 완료
-                                except Exception as e:
-                                    # 예외 발생 시에도 카운터 롤백
-                                    try:
-                                        if rurl:
-                                            r = redis.from_url(rurl)
-                                            if session_label == "RTH":
-                                                et_tz = timezone(timedelta(hours=-5))
-                                                now_et = datetime.now(et_tz)
-                                                if 3 <= now_et.month <= 11:
-                                                    et_tz = timezone(timedelta(hours=-4))
-                                                    now_et = datetime.now(et_tz)
-                                                day_key = f"dailycap:{now_et:%Y%m%d}:RTH:{ticker}"
-                                                r.decr(day_key)
-                                            elif session_label == "EXT":
-                                                et_tz = timezone(timedelta(hours=-5))
-                                                now_et = datetime.now(et_tz)
-                                                if 3 <= now_et.month <= 11:
-                                                    et_tz = timezone(timedelta(hours=-4))
-                                                    now_et = datetime.now(et_tz)
-                                                day_key = f"dailycap:{now_et:%Y%m%d}:EXT:{ticker}"
-                                                r.decr(day_key)
-                                            logger.info(f"Slack 전송 예외로 카운터 롤백: {ticker}")
-                                    except Exception as rollback_e:
-                                        logger.warning(f"카운터 롤백 실패: {rollback_e}")
-                                    logger.error(f"❌ Slack 전송 예외: {ticker} - {e}")
+                                if enhanced_llm_insight:
+                                    # Phase 1.5: 신호 검증은 사이클 끝에서 배치 1회로 (프롬프트 1회 + 마감 시간)
+                                    strong_candidates.append((ticker, signal, enhanced_llm_insight, session_label))
+                                else:
+                                    # 기존 메시지 사용
+                                    _dispatch_strong_signal(signal, format_slack_message(signal), slack_bot,
+                                                            ticker, session_label, rurl)
                             else:
                                 logger.info(f"🔇 Slack 전송 억제 (약신호): {ticker} score={signal.score:.3f} < {strong_signal_threshold:.3f}")
                         else:
@@ -3847,6 +4026,7 @@ def generate_signals(self):
                         continue
                     # 최근 신호 기록 (+ 세션/스프레드/달러대금)
                     _record_recent_signal(redis_url=rurl, signal=signal, session_label=session_label, indicators=indicators)
+                    get_eval_memo().store(ticker, memo_k, regime_result, tech_score, signal)
                     
                     tier_info = f" [Tier:{tier.value}]" if tier else ""
                     logger.info(f"시그널 생성: {ticker} {signal.signal_type.value} (점수: {signal.score:.2f}){tier_info}")
@@ -3855,6 +4035,30 @@ def generate_signals(self):
                 logger.error(f"시그널 생성 실패 ({ticker}): {e}")
                 continue
         
+        # 강신호 후보 배치 검증 → 통과분만 페이퍼 실행/슬랙
+        if strong_candidates:
+            validated = [c[1] for c in strong_candidates]
+            try:
+                from app.jobs.signal_validation import get_validation_service
+                validation_service = get_validation_service(llm_engine=llm_engine)
+                results = validation_service.validate_batch(
+                    validated, deadline_sec=max(0.0, min(VALIDATION_DEADLINE_SEC, _cycle_remaining(start_time))))
+                for i, (ticker, signal, _, _) in enumerate(strong_candidates):
+                    validation_result = results[i]
+                    if validation_result:
+                        validated[i] = validation_service.apply_validation_result(signal, validation_result)
+                        logger.info(f"🔍 신호 검증 완료: {ticker} - {'✅통과' if validation_result.should_proceed else '🛑거부'}")
+                        # 검증 거부된 신호는 전송하지 않음
+                        if not validation_result.should_proceed:
+                            logger.info(f"suppressed=validation_rejected ticker={ticker} reason={validation_result.validation_reason}")
+                            validated[i] = None
+            except Exception as val_e:
+                logger.warning(f"신호 배치 검증 실패: {val_e}")
+            for (ticker, _, insight, session_label), validated_signal in zip(strong_candidates, validated):
+                if validated_signal is not None:
+                    _dispatch_strong_signal(validated_signal, format_enhanced_slack_message(validated_signal, insight),
+                                            slack_bot, ticker, session_label, os.getenv("REDIS_URL"))
+        
         execution_time = time.time() - start_time
         
         # 토큰 사용량 로그 (Tier 시스템)
@@ -3881,17 +4085,42 @@ def generate_signals(self):
         total_suppressed = sum(stats['suppressed'].values())
         blocked_by = {k: v for k, v in stats['suppressed'].items() if v > 0}
         
+        memo_total = stats['memo']['hits'] + stats['memo']['misses']
+        memo_hit_rate = stats['memo']['hits'] / memo_total if memo_total else 0.0
+        
         logger.info(f"📊 신호 생성 완료: processed={stats['processed']}, "
                    f"generated={stats['signals_generated']}, "
                    f"suppressed={total_suppressed} {blocked_by}, "
                    f"llm_calls={stats['llm_calls']}, "
+                   f"memo_skipped={stats['memo']['hits']}/{memo_total} ({memo_hit_rate:.0%}), "
                    f"time={execution_time:.2f}s")
         
+        # 점수 시계열 일괄 기록 (scores:latest + 원시 + 1m/5m 롤업, 파이프라인 1회)
+        try:
+            stats['scores_recorded'] = get_score_series().flush()
+        except Exception as e:
+            logger.warning(f"점수 시계열 기록 실패: {e}")
+        
+        # 평가 메모 히트/미스 일별 누적 (스킵률 = hits / (hits + misses))
+        try:
+            rurl_metrics = os.getenv("REDIS_URL")
+            if rurl_metrics and memo_total:
+                r = redis.from_url(rurl_metrics)
+                hkey = f"metrics:eval_memo:{datetime.utcnow():%Y%m%d}"
+                r.hincrby(hkey, "hits", stats['memo']['hits'])
+                r.hincrby(hkey, "misses", stats['memo']['misses'])
+                r.expire(hkey, 7 * 86400)
+        except Exception as e:
+            logger.debug(f"평가 메모 메트릭 기록 실패: {e}")
+        
         signals_generated = stats['signals_generated']
         
         return {
             "status": "success",
             "signals_generated": signals_generated,
+            "memo_skipped": stats['memo']['hits'],
+            "memo_hit_rate": round(memo_hit_rate, 4),
+            "scores_recorded": stats['scores_recorded'],
             "execution_time": execution_time,
             "timestamp": datetime.now().isoformat()
         }
@@ -3904,6 +4133,17 @@ def generate_signals(self):
             "timestamp": datetime.now().isoformat()
         }
 
+def _stream_covered_tickers(universe: List[str]) -> List[str]:
+    """QUOTES_STREAM_URL 설정 시 스트림 서비스가 Redis에 남긴 봉 반영 → 스트림 공급 종목 (미설정/실패 시 [] → 전부 폴링)"""
+    from app.io.quotes_stream import QUOTES_STREAM_URL, get_stream_bar_reader
+    if not QUOTES_STREAM_URL:
+        return []
+    try:
+        return get_stream_bar_reader().sync(universe)
+    except Exception as e:
+        logger.warning(f"시세 스트림 봉 조회 실패 → 폴링: {e}")
+        return []
+
 @celery_app.task(bind=True, name="app.jobs.scheduler.update_quotes", 
                  soft_time_limit=120, time_limit=150)
 def update_quotes(self):
@@ -3936,7 +4176,13 @@ def update_quotes(self):
             })
         except Exception:
             universe = []
-        quotes_ingestor.update_all_tickers(universe)
+        # 스트리밍 시세(QUOTES_STREAM_URL, quotes_stream 서비스): 스트림이 신선하게 공급 중인 종목은 REST 폴링 생략
+        streamed = _stream_covered_tickers(universe)
+        polled = [t for t in universe if t not in set(streamed)]
+        quotes_ingestor.update_all_tickers(polled)
+        if streamed and hasattr(quotes_ingestor, "refresh_market_data"):
+            for t in streamed:
+                quotes_ingestor.refresh_market_data(t)
         
         # Redis 스트림에 발행
         market_data = quotes_ingestor.get_market_data_summary()
@@ -3952,6 +4198,8 @@ def update_quotes(self):
                     logger.info(f"[YQ] { _t } px={_px:.4f} dollar_vol_5m={_dv:.0f} spread_bp={_sp:.1f} ts={_ts}")
         except Exception:
             pass
+        # 최종가 서비스 공급 (가격 캡/스톱 거리/총 리스크/API가 종목별 REST 대신 조회)
+        _feed_last_prices(quotes_ingestor, market_data)
         for ticker, data in market_data.items():
             if data.get("current_price"):
                 quote_data = {
@@ -3962,12 +4210,22 @@ def update_quotes(self):
                 }
                 redis_streams.publish_quote(ticker, "XNAS", quote_data)
         
+        # 스캘프 마이크로 패턴: 봉 도착 즉시 감지 (generate_signals 사이클 대기 없음)
+        micro_published = 0
+        if MICRO_PATTERN_STREAMING:
+            try:
+                micro_published = _run_micro_patterns_on_quotes(quotes_ingestor, list(market_data.keys()))
+            except Exception as e:
+                logger.warning(f"스트리밍 패턴 감지 실패: {e}")
+        
         execution_time = time.time() - start_time
         logger.debug(f"시세 업데이트 완료: {len(market_data)}개 종목, {execution_time:.2f}초")
         
         return {
             "status": "success",
             "tickers_updated": len(market_data),
+            "tickers_streamed": len(streamed),
+            "micro_signals": micro_published,
             "execution_time": execution_time,
             "timestamp": datetime.now().isoformat()
         }
@@ -4032,8 +4290,8 @@ def scan_edgar(self):
                     continue
             # 해시를 함께 저장해두기
             filing["snippet_hash"] = snippet_hash
-            # Streams는 문자열 값이 안전하므로 dict/list는 JSON 문자열로 변환
-            payload = {k: json.dumps(v) if isinstance(v, (dict, list)) else (v if v is not None else "") for k, v in filing.items()}
+            # 중첩 dict/list 직렬화는 스트림 코덱이 담당 (json 코덱이면 필드별 JSON 문자열)
+            payload = {k: (v if v is not None else "") for k, v in filing.items()}
             redis_streams.publish_edgar(payload)
             published += 1
             
@@ -4175,6 +4433,64 @@ def scan_news(self):
             "timestamp": datetime.now().isoformat()
         }
 
+def _mark_risk_positions(state) -> int:
+    """보유 종목을 최종가로 마크 → 새 체결 없이도 미실현손익·노출·일일 손실 한도가 가격을 따라감"""
+    held = list(state.snapshot(max_age=0).positions)
+    if not held:
+        return 0
+    from app.io.last_price import get_last_price_service
+    prices = get_last_price_service().get_many(held)
+    if not prices:
+        return 0
+    risk_engine = trading_components.get("risk_engine")
+    if risk_engine is not None and risk_engine.shared is state:
+        risk_engine.update_market_prices(prices)  # 공유 상태 마크 + 일일 손실 셧다운 판단
+        return len(prices)
+    return state.mark_prices(prices)
+
+@celery_app.task(bind=True, name="app.jobs.scheduler.update_risk_state",
+                 soft_time_limit=10, time_limit=20)
+def update_risk_state(self):
+    """orders.fills 신규 체결을 공유 리스크 상태에 반영"""
+    try:
+        from app.engine.risk_state import get_shared_risk_state
+        state = get_shared_risk_state()
+        if state is None:
+            return {"status": "skipped", "reason": "no_redis"}
+        applied = state.consume_fills()
+        reconciled = {}
+        if state.reconcile_due():
+            # 브로커 측 브래킷 청산(SL/TP)은 체결 스트림에 오지 않음 → 브로커 포지션과 대사
+            from app.adapters.trading_adapter import get_trading_adapter
+            positions = get_trading_adapter().get_positions() or []
+            reconciled = state.reconcile({
+                str(p.ticker).upper(): {"quantity": float(p.quantity or 0), "current_price": float(p.current_price or 0)}
+                for p in positions
+            })
+        marked = _mark_risk_positions(state)
+        return {"status": "success", "applied": applied, "reconciled": sorted(reconciled), "marked": marked}
+    except Exception as e:
+        logger.error(f"리스크 상태 갱신 실패: {e}")
+        return {"status": "error", "error": str(e)}
+
+@celery_app.task(bind=True, name="app.jobs.scheduler.flush_write_behind",
+                 soft_time_limit=20, time_limit=30)
+def flush_write_behind(self):
+    """persist.rows 스트림 → DB 배치 INSERT (플러시 지연 메트릭 갱신)"""
+    try:
+        from app.io.write_behind import get_write_behind
+        store = get_write_behind()
+        if not store.enabled:
+            return {"status": "skipped", "reason": "no_dsn"}
+        metrics = store.flush()
+        if metrics.get("last_flush_rows"):
+            logger.info(f"💾 쓰기 지연 플러시: {metrics['last_flush_rows']}행, {metrics['last_flush_ms']}ms, "
+                        f"잔여 {metrics['backlog']}행, 지연 {metrics['lag_sec']}s")
+        return {"status": "success", **metrics}
+    except Exception as e:
+        logger.error(f"쓰기 지연 플러시 실패: {e}")
+        return {"status": "error", "error": str(e)}
+
 @celery_app.task(bind=True, name="app.jobs.scheduler.check_risk",
                  soft_time_limit=15, time_limit=30)
 def check_risk(self):
@@ -4338,36 +4654,17 @@ def get_recent_edgar_filing(ticker: str) -> Optional[Dict]:
     # 여기서는 간단히 None 반환
     return None
 
-def _session_label() -> str:
-    """RTH/EXT 간단 판별: ET 시간으로 09:30-16:00은 RTH, 그 외 04:00-20:00은 EXT, 나머지는 CLOSED"""
-    from datetime import datetime, timedelta, time as dtime, timezone
-    et_tz = timezone(timedelta(hours=-5))
-    now_est = datetime.now(et_tz)
-    # DST 간이 적용
-    dst_start = now_est.replace(month=3, day=8 + (6 - now_est.replace(month=3, day=1).weekday()) % 7, hour=2)
-    dst_end = now_est.replace(month=11, day=1 + (6 - now_est.replace(month=11, day=1).weekday()) % 7, hour=2)
-    if dst_start <= now_est < dst_end:
-        et_tz = timezone(timedelta(hours=-4))
-        
-    now = datetime.now(et_tz).time()
-    session = None
-    if dtime(9,30) <= now <= dtime(16,0):
-        session = "RTH"
-    elif dtime(4,0) <= now <= dtime(20,0):
-        session = "EXT"
-    else:
-        session = "CLOSED"
-    
+def _session_label(now_utc: datetime | None = None) -> str:
+    """RTH/EXT/CLOSED 판별: 세션 캘린더 이진 탐색 (RTH 09:30-16:00, PRE/POST는 EXT, 주말·휴장일은 CLOSED)"""
+    session = get_market_clock().label(now_utc)
     # 세션 판별 로그 (디버그 목적)
-    logger.debug(f"session={session} et_time={now} dst_active={dst_start <= now_est < dst_end}")
+    logger.debug(f"session={session}")
     return session
 
 def _record_recent_signal(redis_url: Optional[str], signal, session_label: str, indicators: Dict, suppressed: Optional[str] = None) -> None:
     try:
         if not redis_url:
             return
-        r = redis.from_url(redis_url)
-        key = "signals:recent"
         payload = {
             "ticker": signal.ticker,
             "signal_type": signal.signal_type.value,
@@ -4378,11 +4675,11 @@ def _record_recent_signal(redis_url: Optional[str], signal, session_label: str,
             "session": session_label,
             "spread_bp": float(indicators.get("spread_bp", 0.0)),
             "dollar_vol_5m": float(indicators.get("dollar_vol_5m", 0.0)),
+            "config_version": get_config_snapshot().version,
         }
         if suppressed:
             payload["suppressed_reason"] = suppressed
-        r.lpush(key, json.dumps(payload))
-        r.ltrim(key, 0, 500)
+        get_recent_signal_store().record(payload)
     except Exception:
         pass
 
@@ -4525,27 +4822,12 @@ def refresh_universe():
         rurl = os.getenv("REDIS_URL")
         if not quotes_ingestor or not rurl:
             return {"status": "skipped"}
-        r = redis.from_url(rurl)
-        external = r.smembers("universe:external") or []
-        watch = r.smembers("universe:watchlist") or []
-        core = [t.strip().upper() for t in (os.getenv("TICKERS", "").split(",")) if t.strip()]
-        ext = [x.decode() if isinstance(x, (bytes, bytearray)) else x for x in external]
-        wch = [x.decode() if isinstance(x, (bytes, bytearray)) else x for x in watch]
-        merged = []
-        seen = set()
-        max_n = int(os.getenv("UNIVERSE_MAX", "60"))
-        for arr in [core, ext, wch]:
-            for s in arr:
-                if s and s not in seen:
-                    merged.append(s)
-                    seen.add(s)
-                if len(merged) >= max_n:
-                    break
-            if len(merged) >= max_n:
-                break
-        if hasattr(quotes_ingestor, "update_universe_tickers"):
-            quotes_ingestor.update_universe_tickers(merged)
-        return {"status": "ok", "universe_size": len(merged)}
+        # 알림 유실 대비: 설정 스냅샷 강제 재로드 후 재물질화
+        service = get_universe_service()
+        snap = service.refresh()
+        service.materialize(redis.from_url(rurl))
+        applied = _apply_universe_to_ingestor(quotes_ingestor, snap)
+        return {"status": "ok", "universe_size": len(snap.symbols), "version": snap.version, "applied": applied}
     except Exception as e:
         logger.error(f"유니버스 갱신 실패: {e}")
         return {"status": "error", "error": str(e)}
@@ -4592,6 +4874,7 @@ def adaptive_cutoff():
         ext_new = min(max(ext + delta, max(0.18, ext_base - 0.10)), ext_base + 0.10)
         r.set("cfg:signal_cutoff:rth", rth_new)
         r.set("cfg:signal_cutoff:ext", ext_new)
+        publish_config_change(r, "adaptive_cutoff")
         return {"status": "ok", "fills": fills, "rth": rth_new, "ext": ext_new}
     except Exception as e:
         logger.error(f"적응형 컷오프 실패: {e}")
@@ -7,11 +7,18 @@
 2. 시장 컨텍스트 기반 신호 필터링
 3. 리스크 요소 사전 감지
 4. 검증 결과 로깅 및 메트릭 수집
+5. 사이클 단위 배치 검증 (후보 전체를 프롬프트 1회로, 사이클 마감 시간 내 미응답 시 기본 검증)
+   - 호출은 LLMInsightEngine.complete 경유 → analyze_text와 같은 속도 제한/월 비용 한도/비용 집계
 """
 
+import hashlib
+import json
 import logging
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from datetime import datetime
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Tuple
 from dataclasses import dataclass
 
 from app.engine.mixer import TradingSignal
@@ -284,6 +291,228 @@ class SignalValidationEngine:
             logger.error(f"검증 메트릭 로깅 실패: {e}")
 
 
+# =============================================================================
+# 배치 검증 서비스
+# =============================================================================
+
+VALIDATION_LLM_MODEL = os.getenv("VALIDATION_LLM_MODEL", "gpt-3.5-turbo")
+VALIDATION_DEADLINE_SEC = float(os.getenv("VALIDATION_DEADLINE_SEC", "6"))
+VALIDATION_CACHE_SEC = int(os.getenv("VALIDATION_CACHE_SEC", "900"))
+VALIDATION_MAX_BATCH = int(os.getenv("VALIDATION_MAX_BATCH", "8"))
+
+
+class BatchValidationService(SignalValidationEngine):
+    """사이클 후보 신호 일괄 검증 (LLM 엔진 경유 프롬프트 1회 + 컨텍스트 캐시)"""
+
+    def __init__(self, llm_engine=None, model: str = VALIDATION_LLM_MODEL,
+                 deadline_sec: float = VALIDATION_DEADLINE_SEC,
+                 cache_sec: int = VALIDATION_CACHE_SEC, redis_client=None):
+        super().__init__()
+        self.llm_engine = llm_engine
+        self.model = model
+        self.deadline_sec = deadline_sec
+        self.cache_sec = cache_sec
+        self._redis = redis_client
+        self._cache: Dict[str, Tuple[float, Dict]] = {}
+        self._pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="signal-validation")
+        self.stats = {"batches": 0, "signals": 0, "cache_hits": 0, "timeouts": 0, "fallbacks": 0}
+
+    # ------------------------------------------------------------------
+    # 컨텍스트 캐시
+    # ------------------------------------------------------------------
+    @staticmethod
+    def context_key(signal: TradingSignal) -> str:
+        """동일 판단 컨텍스트 → 동일 키 (점수/가격은 반올림해 미세 변동 흡수)"""
+        ctx = "|".join(str(x) for x in (
+            signal.ticker, signal.signal_type.value, round(signal.score, 2), round(signal.confidence, 2),
+            signal.regime, signal.trigger, round(signal.entry_price or 0, 2),
+            round(signal.stop_loss or 0, 2), round(signal.take_profit or 0, 2),
+        ))
+        return hashlib.md5(ctx.encode()).hexdigest()[:16]
+
+    def _cache_get(self, key: str) -> Optional[Dict]:
+        hit = self._cache.get(key)
+        if hit and time.time() - hit[0] < self.cache_sec:
+            return hit[1]
+        if self._redis is not None:
+            try:
+                raw = self._redis.get(f"validation:cache:{key}")
+                if raw:
+                    data = json.loads(raw)
+                    self._cache[key] = (time.time(), data)
+                    return data
+            except Exception as e:
+                logger.debug(f"검증 캐시 조회 실패: {e}")
+        return None
+
+    def _cache_put(self, key: str, data: Dict) -> None:
+        self._cache[key] = (time.time(), data)
+        if self._redis is not None:
+            try:
+                self._redis.setex(f"validation:cache:{key}", self.cache_sec, json.dumps(data))
+            except Exception as e:
+                logger.debug(f"검증 캐시 저장 실패: {e}")
+
+    # ------------------------------------------------------------------
+    # 배치 검증
+    # ------------------------------------------------------------------
+    def validate_batch(self, signals: List[TradingSignal],
+                       deadline_sec: Optional[float] = None) -> List[Optional[ValidationResult]]:
+        """후보 목록 → 입력 순서대로 검증 결과 (검증 대상 아님이면 None, deadline_sec로 사이클 잔여 시간 지정)"""
+        deadline = self.deadline_sec if deadline_sec is None else max(0.0, deadline_sec)
+        results: List[Optional[ValidationResult]] = [None] * len(signals)
+        pending: Dict[str, List[int]] = {}
+        for i, sig in enumerate(signals):
+            if not self.should_validate_signal(sig):
+                continue
+            key = self.context_key(sig)
+            cached = self._cache_get(key)
+            if cached is not None:
+                self.stats["cache_hits"] += 1
+                results[i] = self._to_result(cached)
+            else:
+                pending.setdefault(key, []).append(i)
+        if not pending:
+            return results
+
+        keys = list(pending)
+        size = max(1, VALIDATION_MAX_BATCH)
+        calls = [self._submit([(k, signals[pending[k][0]]) for k in keys[start:start + size]])
+                 for start in range(0, len(keys), size)]
+        calls = [c for c in calls if c is not None]
+
+        # 청크 수와 무관하게 사이클 전체 마감 1회 (늦은 청크는 이번 사이클에선 기본 검증)
+        _, late = wait([f for f, _ in calls], timeout=deadline) if calls else (set(), set())
+        answers: Dict[str, Dict] = {}
+        for future, ids in calls:
+            if future in late:
+                self.stats["timeouts"] += 1
+                future.cancel()  # 미시작분 취소, 진행 중이면 완료 시 캐시만 갱신 (비용은 엔진이 집계)
+                future.add_done_callback(lambda f, ids=ids: self._cache_late(f, ids))
+            else:
+                answers.update(self._answers(future, ids))
+        if late:
+            logger.warning(f"배치 검증 마감 초과 ({deadline:.1f}s, 청크 {len(late)}/{len(calls)}) → 기본 검증")
+
+        for key, idxs in pending.items():
+            data = answers.get(key)
+            if data is not None:
+                self._cache_put(key, data)
+            for i in idxs:
+                if data is None:
+                    self.stats["fallbacks"] += 1
+                    results[i] = self._create_fallback_validation(signals[i])
+                else:
+                    results[i] = self._to_result(data)
+        return results
+
+    def _submit(self, items: List[Tuple[str, TradingSignal]]) -> Optional[Tuple[Future, Dict[str, str]]]:
+        """청크 프롬프트 비동기 호출 → (future, {프롬프트 ID: 컨텍스트 키}). LLM 엔진 없으면 None"""
+        engine = self.llm_engine
+        if engine is None:
+            return None
+        self.stats["batches"] += 1
+        self.stats["signals"] += len(items)
+        ids = {f"S{n + 1}": key for n, (key, _) in enumerate(items)}
+        prompt = self._build_batch_prompt([(sid, items[n][1]) for n, sid in enumerate(ids)])
+        return self._pool.submit(self._post, engine, prompt), ids
+
+    def _answers(self, future: Future, ids: Dict[str, str]) -> Dict[str, Dict]:
+        """완료된 호출 → {컨텍스트 키: 파싱 결과}. 오류/한도 초과 시 빈 dict"""
+        try:
+            content = future.result(timeout=0)
+        except Exception as e:
+            logger.warning(f"배치 검증 호출 실패 ({len(ids)}건): {e}")
+            return {}
+        if not content:
+            return {}
+        parsed = self._parse_batch_response(content)
+        return {ids[sid]: data for sid, data in parsed.items() if sid in ids}
+
+    def _cache_late(self, future: Future, ids: Dict[str, str]) -> None:
+        if future.cancelled():
+            return
+        for key, data in self._answers(future, ids).items():
+            self._cache_put(key, data)
+
+    def _post(self, engine, prompt: str) -> Optional[str]:
+        return engine.complete(
+            prompt,
+            system="당신은 트레이딩 신호 검증가입니다. 지정된 JSON 형식으로만 응답하세요.",
+            max_tokens=120 * prompt.count("\nID: ") + 50,
+            temperature=0.2,
+            model=self.model,
+            timeout=2 * self.deadline_sec,  # 사이클 마감 뒤 도착분도 캐시에 반영되도록 여유
+            trigger="validation",
+        )
+
+    def _build_batch_prompt(self, items: List[Tuple[str, TradingSignal]]) -> str:
+        blocks = []
+        for sid, sig in items:
+            direction = "매수" if sig.signal_type.value == "long" else "매도"
+            blocks.append(
+                f"\nID: {sid}\n종목: {sig.ticker} | 신호: {direction} (점수 {sig.score:.3f}, 신뢰도 {sig.confidence:.3f})\n"
+                f"레짐: {sig.regime} | 트리거: {sig.trigger}\n요약: {sig.summary}\n"
+                f"진입 ${sig.entry_price or 0:.2f} / 손절 ${sig.stop_loss or 0:.2f} / 익절 ${sig.take_profit or 0:.2f}"
+            )
+        return (
+            "다음 트레이딩 신호들을 각각 검증해주세요. 관점: 신호 타당성, 시장 상황 부합성, 잠재 리스크, 손익비 적절성.\n"
+            + "\n".join(blocks)
+            + '\n\n다음 JSON으로만 응답하세요 (신호마다 1개 항목):\n'
+            '{"results": [{"id": "S1", "verdict": "VALID|INVALID|CAUTION", "confidence_adjustment": -0.2~0.2, '
+            '"risk_factors": ["..."], "reason": "한 줄 근거", "decision": "PROCEED|HOLD|REJECT"}]}'
+        )
+
+    @staticmethod
+    def _parse_batch_response(content: str) -> Dict[str, Dict]:
+        try:
+            start, end = content.find("{"), content.rfind("}") + 1
+            data = json.loads(content[start:end]) if start != -1 and end > 0 else {}
+        except Exception as e:
+            logger.warning(f"배치 검증 응답 파싱 실패: {e}")
+            return {}
+        out = {}
+        for item in data.get("results") or []:
+            try:
+                verdict = str(item.get("verdict", "")).upper()
+                decision = str(item.get("decision", "")).upper()
+                out[str(item["id"])] = {
+                    "is_valid": verdict in ("VALID", "CAUTION"),
+                    "confidence_adjustment": max(-0.2, min(0.2, float(item.get("confidence_adjustment", 0) or 0))),
+                    "risk_factors": [str(r) for r in (item.get("risk_factors") or [])][:5],
+                    "validation_reason": str(item.get("reason", ""))[:200],
+                    "should_proceed": decision == "PROCEED",
+                }
+            except Exception:
+                continue
+        return out
+
+    @staticmethod
+    def _to_result(data: Dict) -> ValidationResult:
+        return ValidationResult(timestamp=datetime.now(), **data)
+
+
+_validation_service: Optional[BatchValidationService] = None
+
+
+def get_validation_service(llm_engine=None) -> BatchValidationService:
+    """글로벌 배치 검증 서비스 (Redis 있으면 컨텍스트 캐시 공유, LLM 엔진은 호출 측 컴포넌트 연결)"""
+    global _validation_service
+    if _validation_service is not None and llm_engine is not None:
+        _validation_service.llm_engine = llm_engine
+    if _validation_service is None:
+        redis_client = None
+        try:
+            redis_url = os.getenv("REDIS_URL")
+            if redis_url:
+                import redis
+                redis_client = redis.from_url(redis_url)
+        except Exception:
+            redis_client = None
+        _validation_service = BatchValidationService(llm_engine=llm_engine, redis_client=redis_client)
+    return _validation_service
+
+
 # =============================================================================
 # Celery Tasks
 # =============================================================================
@@ -3,9 +3,18 @@ Utils 패키지 - 공통 유틸리티 모듈들
 """
 
 from .rate_limiter import APIRateLimiter, TokenTier, get_rate_limiter
+from .market_clock import MarketClock, SessionDay, get_market_clock
+from .universe import UniverseDiff, UniverseService, UniverseSnapshot, get_universe_service
 
 __all__ = [
     'APIRateLimiter',
     'TokenTier', 
-    'get_rate_limiter'
+    'get_rate_limiter',
+    'MarketClock',
+    'SessionDay',
+    'get_market_clock',
+    'UniverseDiff',
+    'UniverseService',
+    'UniverseSnapshot',
+    'get_universe_service'
 ]
\ No newline at end of file
@@ -0,0 +1,314 @@
+"""
+미국 주식시장 세션 캘린더 / 시계 서비스
+- 거래일별 세션 경계(PRE/RTH/POST)를 연 단위로 미리 계산해 정렬 배열로 보관
+- "시각 t는 어떤 세션인가"를 이진 탐색(bisect)으로 응답 → 티커별 반복 계산 제거
+- America/New_York ZoneInfo 기반으로 DST 전환을 정확히 반영
+- NYSE 휴장일/조기폐장(13:00) 규칙 내장, 환경변수로 추가 휴장일 지정 가능
+
+세션 라벨:
+  PRE     04:00 ~ 09:30
+  RTH     09:30 ~ 16:00 (조기폐장일 13:00)
+  POST    16:00 ~ 20:00 (조기폐장일 13:00 ~ 17:00)
+  CLOSED  그 외 / 주말 / 휴장일
+"""
+from __future__ import annotations
+
+import bisect
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from datetime import date, datetime, time as dtime, timedelta, timezone
+from typing import Dict, List, Optional, Set, Tuple, Union
+from zoneinfo import ZoneInfo
+
+logger = logging.getLogger(__name__)
+
+ET = ZoneInfo("America/New_York")
+
+PRE_OPEN = dtime(4, 0)
+RTH_OPEN = dtime(9, 30)
+RTH_CLOSE = dtime(16, 0)
+POST_CLOSE = dtime(20, 0)
+HALF_DAY_CLOSE = dtime(13, 0)
+HALF_DAY_POST_CLOSE = dtime(17, 0)
+
+TimeLike = Union[datetime, float, int, None]
+
+
+@dataclass(frozen=True)
+class SessionDay:
+    """거래일 하나의 세션 경계 (모두 tz-aware ET)"""
+    day: date
+    pre_open: datetime
+    open: datetime
+    close: datetime
+    post_close: datetime
+    half_day: bool = False
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """해당 월의 n번째 요일 (n<0이면 뒤에서부터)"""
+    if n > 0:
+        d = date(year, month, 1)
+        d += timedelta(days=(weekday - d.weekday()) % 7)
+        return d + timedelta(weeks=n - 1)
+    nxt = date(year + (month == 12), month % 12 + 1, 1)
+    d = nxt - timedelta(days=1)
+    d -= timedelta(days=(d.weekday() - weekday) % 7)
+    return d + timedelta(weeks=n + 1)
+
+
+def _easter(year: int) -> date:
+    """그레고리력 부활절 (Anonymous Gregorian algorithm)"""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def _observed(d: date) -> date:
+    """토요일 → 금요일, 일요일 → 월요일 대체 휴일"""
+    if d.weekday() == 5:
+        return d - timedelta(days=1)
+    if d.weekday() == 6:
+        return d + timedelta(days=1)
+    return d
+
+
+def nyse_holidays(year: int) -> Set[date]:
+    """NYSE 정규 휴장일 (규칙 기반)"""
+    days = {
+        _nth_weekday(year, 1, 0, 3),    # MLK Day
+        _nth_weekday(year, 2, 0, 3),    # Presidents Day
+        _easter(year) - timedelta(days=2),  # Good Friday
+        _nth_weekday(year, 5, 0, -1),   # Memorial Day
+        _observed(date(year, 7, 4)),    # Independence Day
+        _nth_weekday(year, 9, 0, 1),    # Labor Day
+        _nth_weekday(year, 11, 3, 4),   # Thanksgiving
+        _observed(date(year, 12, 25)),  # Christmas
+    }
+    # 신정: 토요일이면 전년 12/31을 쉬지 않음(NYSE 규칙)
+    ny = date(year, 1, 1)
+    if ny.weekday() != 5:
+        days.add(_observed(ny))
+    if year >= 2022:
+        days.add(_observed(date(year, 6, 19)))  # Juneteenth
+    return days
+
+
+def nyse_half_days(year: int) -> Set[date]:
+    """NYSE 조기폐장일(13:00): 7/3, 추수감사절 다음날, 12/24 (평일이고 휴장일이 아닐 때)"""
+    holidays = nyse_holidays(year)
+    candidates = [
+        date(year, 7, 3),
+        _nth_weekday(year, 11, 3, 4) + timedelta(days=1),
+        date(year, 12, 24),
+    ]
+    return {d for d in candidates if d.weekday() < 5 and d not in holidays}
+
+
+def _parse_date_list(env_name: str) -> Set[date]:
+    out: Set[date] = set()
+    for tok in (os.getenv(env_name) or "").split(","):
+        tok = tok.strip()
+        if not tok:
+            continue
+        try:
+            out.add(date.fromisoformat(tok))
+        except ValueError:
+            logger.warning(f"{env_name} 날짜 형식 오류 무시: {tok}")
+    return out
+
+
+class MarketClock:
+    """세션 경계 사전 계산 + 이진 탐색 기반 시계"""
+
+    def __init__(self, extra_holidays: Optional[Set[date]] = None, extra_half_days: Optional[Set[date]] = None):
+        """
+        Args:
+            extra_holidays: 규칙 외 추가 휴장일 (예: 국가 애도일)
+            extra_half_days: 규칙 외 추가 조기폐장일
+        """
+        self.extra_holidays = set(extra_holidays if extra_holidays is not None else _parse_date_list("MARKET_EXTRA_HOLIDAYS"))
+        self.extra_half_days = set(extra_half_days if extra_half_days is not None else _parse_date_list("MARKET_EXTRA_HALF_DAYS"))
+        self._lock = threading.Lock()
+        self._years: Set[int] = set()
+        self._days: Dict[date, SessionDay] = {}
+        # (정렬된 경계 시각 epoch sec, 해당 시각부터 시작되는 세션 라벨) — 통째로 교체
+        self._index: Tuple[List[float], List[str]] = ([], [])
+
+    # ------------------------------------------------------------------
+    # 캘린더 구성
+    # ------------------------------------------------------------------
+    def _build_year(self, year: int) -> None:
+        holidays = nyse_holidays(year) | {d for d in self.extra_holidays if d.year == year}
+        half_days = nyse_half_days(year) | {d for d in self.extra_half_days if d.year == year}
+        d = date(year, 1, 1)
+        while d.year == year:
+            if d.weekday() < 5 and d not in holidays:
+                half = d in half_days
+                self._days[d] = SessionDay(
+                    day=d,
+                    pre_open=datetime.combine(d, PRE_OPEN, tzinfo=ET),
+                    open=datetime.combine(d, RTH_OPEN, tzinfo=ET),
+                    close=datetime.combine(d, HALF_DAY_CLOSE if half else RTH_CLOSE, tzinfo=ET),
+                    post_close=datetime.combine(d, HALF_DAY_POST_CLOSE if half else POST_CLOSE, tzinfo=ET),
+                    half_day=half,
+                )
+            d += timedelta(days=1)
+        self._years.add(year)
+
+    def _rebuild_index(self) -> None:
+        bounds: List[float] = []
+        labels: List[str] = []
+        for d in sorted(self._days):
+            sd = self._days[d]
+            for ts, label in (
+                (sd.pre_open, "PRE"),
+                (sd.open, "RTH"),
+                (sd.close, "POST"),
+                (sd.post_close, "CLOSED"),
+            ):
+                bounds.append(ts.timestamp())
+                labels.append(label)
+        self._index = (bounds, labels)
+
+    def _ensure_year(self, year: int) -> None:
+        if year in self._years:
+            return
+        with self._lock:
+            if year in self._years:
+                return
+            # 인접 연도까지 함께 구성 (연말/연초 경계 조회 대비)
+            for y in (year - 1, year, year + 1):
+                if y not in self._years:
+                    self._build_year(y)
+            self._rebuild_index()
+            logger.debug(f"세션 캘린더 구성: {sorted(self._years)}")
+
+    # ------------------------------------------------------------------
+    # 시간 변환
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _to_epoch(t: TimeLike) -> float:
+        if t is None:
+            return datetime.now(timezone.utc).timestamp()
+        if isinstance(t, datetime):
+            if t.tzinfo is None:
+                t = t.replace(tzinfo=timezone.utc)
+            return t.timestamp()
+        return float(t)
+
+    def now(self) -> datetime:
+        """현재 ET 시각"""
+        return datetime.now(ET)
+
+    def to_et(self, t: TimeLike = None) -> datetime:
+        return datetime.fromtimestamp(self._to_epoch(t), tz=ET)
+
+    def et_date(self, t: TimeLike = None) -> date:
+        return self.to_et(t).date()
+
+    def et_ymd(self, t: TimeLike = None) -> str:
+        """ET 기준 날짜 키 (YYYYMMDD)"""
+        return self.to_et(t).strftime("%Y%m%d")
+
+    # ------------------------------------------------------------------
+    # 세션 조회
+    # ------------------------------------------------------------------
+    def session_at(self, t: TimeLike = None) -> str:
+        """PRE / RTH / POST / CLOSED"""
+        ts = self._to_epoch(t)
+        self._ensure_year(datetime.fromtimestamp(ts, tz=ET).year)
+        bounds, labels = self._index
+        i = bisect.bisect_right(bounds, ts) - 1
+        return labels[i] if i >= 0 else "CLOSED"
+
+    def label(self, t: TimeLike = None) -> str:
+        """기존 스케줄러 라벨: RTH / EXT(PRE·POST) / CLOSED"""
+        s = self.session_at(t)
+        if s in ("PRE", "POST"):
+            return "EXT"
+        return s
+
+    def is_rth(self, t: TimeLike = None) -> bool:
+        return self.session_at(t) == "RTH"
+
+    def session_day(self, d: Union[date, TimeLike] = None) -> Optional[SessionDay]:
+        """해당 날짜(또는 시각의 ET 날짜)의 세션 경계. 휴장일이면 None"""
+        if not isinstance(d, date) or isinstance(d, datetime):
+            d = self.et_date(d)
+        self._ensure_year(d.year)
+        return self._days.get(d)
+
+    def is_trading_day(self, d: Union[date, TimeLike] = None) -> bool:
+        return self.session_day(d) is not None
+
+    def is_half_day(self, d: Union[date, TimeLike] = None) -> bool:
+        sd = self.session_day(d)
+        return bool(sd and sd.half_day)
+
+    def next_session_day(self, d: Union[date, TimeLike] = None) -> SessionDay:
+        """d 이후(당일 제외) 첫 거래일"""
+        if not isinstance(d, date) or isinstance(d, datetime):
+            d = self.et_date(d)
+        cur = d + timedelta(days=1)
+        for _ in range(14):
+            sd = self.session_day(cur)
+            if sd:
+                return sd
+            cur += timedelta(days=1)
+        raise ValueError(f"다음 거래일을 찾을 수 없음: {d}")
+
+    def minutes_to_close(self, t: TimeLike = None) -> int:
+        """당일 정규장 마감까지 남은 분 (휴장일은 명목상 16:00 기준, 마감 후 음수)"""
+        ts = self._to_epoch(t)
+        sd = self.session_day(ts)
+        if sd:
+            close_ts = sd.close.timestamp()
+        else:
+            close_ts = datetime.combine(self.et_date(ts), RTH_CLOSE, tzinfo=ET).timestamp()
+        return int((close_ts - ts) / 60.0)
+
+    # ------------------------------------------------------------------
+    # 운영 윈도우
+    # ------------------------------------------------------------------
+    def _window(self, t: TimeLike, anchor: str, before_min: float, after_min: float) -> Tuple[bool, Optional[SessionDay]]:
+        ts = self._to_epoch(t)
+        sd = self.session_day(ts)
+        if not sd:
+            return False, None
+        base = getattr(sd, anchor).timestamp()
+        return (base - before_min * 60 <= ts <= base + after_min * 60), sd
+
+    def in_eod_window(self, minutes_before: int, t: TimeLike = None) -> bool:
+        """마감 N분 전 ~ 마감 (조기폐장 반영)"""
+        return self._window(t, "close", minutes_before, 0)[0]
+
+    def in_preclose_window(self, minutes_before: int = 12, t: TimeLike = None) -> bool:
+        """사전 청산 예약 윈도우: 마감 N분 전 ~ 마감"""
+        return self._window(t, "close", minutes_before, 0)[0]
+
+    def in_open_window(self, minutes_before: int = 5, minutes_after: int = 5, t: TimeLike = None) -> bool:
+        """개장 전후 윈도우 (기본 09:25 ~ 09:35)"""
+        return self._window(t, "open", minutes_before, minutes_after)[0]
+
+
+# 글로벌 인스턴스
+_market_clock: Optional[MarketClock] = None
+
+
+def get_market_clock() -> MarketClock:
+    """글로벌 시장 시계 인스턴스 반환"""
+    global _market_clock
+    if _market_clock is None:
+        _market_clock = MarketClock()
+    return _market_clock
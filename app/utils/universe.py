@@ -0,0 +1,209 @@
+"""
+유니버스 서비스
+- Static Core(TICKERS) + universe:external + universe:watchlist 병합(UNIVERSE_MAX 상한)을 한 곳에서 계산
+- Tier A/B/벤치 분류까지 포함한 불변 스냅샷으로 물질화(version = 내용 해시)
+- 멤버십 소스는 런타임 설정 스냅샷(app.config) → 변경 알림 시에만 재계산, 평소엔 메모리 조회
+- diff API로 이전 버전 대비 추가/제거 종목만 전달 → 인제스터 워밍업은 추가 종목만
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.config import get_config_snapshot, get_config_store, settings
+
+logger = logging.getLogger(__name__)
+
+UNIVERSE_SNAPSHOT_KEY = "universe:snapshot"
+_HISTORY_SIZE = 16
+
+
+@dataclass(frozen=True)
+class UniverseSnapshot:
+    """병합·분류된 유니버스 스냅샷 (불변)"""
+    version: str
+    config_version: str
+    symbols: Tuple[str, ...]
+    tier_a: Tuple[str, ...]
+    tier_b: Tuple[str, ...]
+    bench: Tuple[str, ...]
+    built_at: float = field(default_factory=time.time)
+
+    def tiers(self) -> Dict[str, List[str]]:
+        """get_universe_with_tiers() 호환 형식"""
+        return {"tier_a": list(self.tier_a), "tier_b": list(self.tier_b), "bench": list(self.bench)}
+
+    def to_dict(self) -> Dict:
+        return {
+            "version": self.version,
+            "config_version": self.config_version,
+            "symbols": list(self.symbols),
+            **self.tiers(),
+            "built_at": self.built_at,
+        }
+
+
+@dataclass(frozen=True)
+class UniverseDiff:
+    """두 스냅샷 간 멤버십 차이"""
+    from_version: Optional[str]
+    to_version: str
+    added: Tuple[str, ...]
+    removed: Tuple[str, ...]
+
+    @property
+    def changed(self) -> bool:
+        return self.from_version != self.to_version
+
+
+def _norm(tickers) -> List[str]:
+    return [t.strip().upper() for t in tickers if t and t.strip()]
+
+
+class UniverseService:
+    """물질화된 유니버스 + Tier 멤버십 캐시"""
+
+    def __init__(self, max_size: Optional[int] = None, core: Optional[List[str]] = None):
+        """
+        Args:
+            max_size: 유니버스 상한 (기본 UNIVERSE_MAX, 100 — 시그널 생성 경로 기존 값)
+            core: Static Core 종목 (기본 TICKERS 환경변수)
+        """
+        self.max_size = max_size if max_size is not None else int(os.getenv("UNIVERSE_MAX", "100"))
+        self.core = _norm(core if core is not None else os.getenv("TICKERS", "").split(","))
+        self._tier_a = set(_norm(settings.TIER_A_TICKERS))
+        self._tier_b = set(_norm(settings.TIER_B_TICKERS))
+        self._bench_default = _norm(settings.BENCH_TICKERS)
+        self._lock = threading.Lock()
+        self._snapshot: Optional[UniverseSnapshot] = None
+        self._history: "OrderedDict[str, UniverseSnapshot]" = OrderedDict()
+        self._listeners: List[Callable[[UniverseSnapshot, UniverseDiff], None]] = []
+
+    # ------------------------------------------------------------------
+    # 구성
+    # ------------------------------------------------------------------
+    def _build(self, cfg) -> UniverseSnapshot:
+        merged: List[str] = []
+        seen = set()
+        for arr in (self.core, _norm(cfg.universe_external), _norm(cfg.universe_watchlist)):
+            for s in arr:
+                if len(merged) >= self.max_size:
+                    break
+                if s not in seen:
+                    merged.append(s)
+                    seen.add(s)
+        if not merged:
+            # Fallback: 설정의 Tier 리스트
+            for s in [*_norm(settings.TIER_A_TICKERS), *_norm(settings.TIER_B_TICKERS), *self._bench_default]:
+                if s not in seen:
+                    merged.append(s)
+                    seen.add(s)
+        tier_a = tuple(t for t in merged if t in self._tier_a)
+        tier_b = tuple(t for t in merged if t not in self._tier_a and t in self._tier_b)
+        bench = tuple(t for t in merged if t not in self._tier_a and t not in self._tier_b)
+        body = json.dumps([merged, tier_a, tier_b], separators=(",", ":"))
+        return UniverseSnapshot(
+            version=hashlib.sha1(body.encode()).hexdigest()[:12],
+            config_version=cfg.version,
+            symbols=tuple(merged),
+            tier_a=tier_a,
+            tier_b=tier_b,
+            bench=bench,
+        )
+
+    def snapshot(self) -> UniverseSnapshot:
+        """현재 스냅샷 (설정 버전이 바뀐 경우에만 재계산)"""
+        cfg = get_config_snapshot()
+        snap = self._snapshot
+        if snap is not None and snap.config_version == cfg.version:
+            return snap
+        with self._lock:
+            snap = self._snapshot
+            if snap is not None and snap.config_version == cfg.version:
+                return snap
+            new_snap = self._build(cfg)
+            if snap is not None and snap.version == new_snap.version:
+                # 멤버십 동일(다른 설정만 변경) → 기존 스냅샷 유지, 설정 버전만 갱신
+                new_snap = UniverseSnapshot(
+                    version=snap.version, config_version=cfg.version, symbols=snap.symbols,
+                    tier_a=snap.tier_a, tier_b=snap.tier_b, bench=snap.bench, built_at=snap.built_at,
+                )
+                self._snapshot = new_snap
+                return new_snap
+            self._snapshot = new_snap
+            self._history[new_snap.version] = new_snap
+            while len(self._history) > _HISTORY_SIZE:
+                self._history.popitem(last=False)
+        d = self.diff(snap.version if snap else None, new_snap)
+        logger.info(f"🌐 유니버스 스냅샷 갱신: version={new_snap.version} size={len(new_snap.symbols)} "
+                    f"A={len(new_snap.tier_a)} B={len(new_snap.tier_b)} 벤치={len(new_snap.bench)} "
+                    f"+{len(d.added)} -{len(d.removed)}")
+        for cb in list(self._listeners):
+            try:
+                cb(new_snap, d)
+            except Exception as e:
+                logger.warning(f"유니버스 변경 리스너 실패: {e}")
+        return new_snap
+
+    def refresh(self) -> UniverseSnapshot:
+        """설정 스냅샷을 강제 재로드한 뒤 유니버스 재계산"""
+        get_config_store().invalidate()
+        return self.snapshot()
+
+    # ------------------------------------------------------------------
+    # 조회 / 변경 추적
+    # ------------------------------------------------------------------
+    def diff(self, since_version: Optional[str], snap: Optional[UniverseSnapshot] = None) -> UniverseDiff:
+        """since_version 이후 추가/제거 종목. 알 수 없는 버전이면 전체를 추가로 간주"""
+        snap = snap or self.snapshot()
+        if since_version == snap.version:
+            return UniverseDiff(since_version, snap.version, (), ())
+        prev = self._history.get(since_version) if since_version else None
+        prev_syms = set(prev.symbols) if prev else set()
+        cur_syms = set(snap.symbols)
+        return UniverseDiff(
+            from_version=since_version,
+            to_version=snap.version,
+            added=tuple(s for s in snap.symbols if s not in prev_syms),
+            removed=tuple(s for s in (prev.symbols if prev else ()) if s not in cur_syms),
+        )
+
+    def subscribe(self, callback: Callable[[UniverseSnapshot, UniverseDiff], None]) -> None:
+        """유니버스 변경 시 (snapshot, diff)로 호출될 콜백 등록"""
+        self._listeners.append(callback)
+
+    def tier_of(self, ticker: str) -> Optional[str]:
+        t = (ticker or "").strip().upper()
+        if t in self._tier_a:
+            return "tier_a"
+        if t in self._tier_b:
+            return "tier_b"
+        return None
+
+    def materialize(self, r) -> Optional[UniverseSnapshot]:
+        """현재 스냅샷을 Redis(universe:snapshot)에 기록 — 외부 조회/타 서비스용"""
+        snap = self.snapshot()
+        try:
+            r.set(UNIVERSE_SNAPSHOT_KEY, json.dumps(snap.to_dict(), ensure_ascii=False))
+        except Exception as e:
+            logger.warning(f"유니버스 스냅샷 저장 실패: {e}")
+            return None
+        return snap
+
+
+_universe_service: Optional[UniverseService] = None
+
+
+def get_universe_service() -> UniverseService:
+    """글로벌 유니버스 서비스 인스턴스 반환"""
+    global _universe_service
+    if _universe_service is None:
+        _universe_service = UniverseService()
+    return _universe_service
@@ -0,0 +1,19 @@
+-- 쓰기 지연 영속화: 청산 결정 감사 테이블 (idempotent)
+
+CREATE TABLE IF NOT EXISTS exit_decisions (
+    id SERIAL PRIMARY KEY,
+    decision_id VARCHAR(120) UNIQUE NOT NULL, -- 클라이언트 생성 멱등 키
+    ts TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    symbol VARCHAR(10) NOT NULL,
+    side VARCHAR(10) NOT NULL,
+    qty INTEGER NOT NULL,
+    policy VARCHAR(20) NOT NULL, -- 'EOD', 'TIME_STOP', 'TRAIL_STOP', 'REGIME_FLAT', 'OPEN_CLEANUP'
+    reason TEXT,
+    tif VARCHAR(10),
+    attempt INTEGER DEFAULT 1,
+    market_state VARCHAR(20),
+    order_id VARCHAR(64),
+    price DECIMAL(10,4)
+);
+
+CREATE INDEX IF NOT EXISTS idx_exit_decisions_ts ON exit_decisions(ts);
@@ -0,0 +1,23 @@
+import pytest
+
+import app.adapters.paper_ledger as paper_ledger_mod
+import app.io.bar_cache as bar_cache_mod
+import app.io.write_behind as write_behind_mod
+
+
+@pytest.fixture(autouse=True)
+def _isolated_bar_cache(tmp_path, monkeypatch):
+    """인제스터 테스트가 작업 디렉터리의 logs/bar_cache 에 봉을 쓰지 않도록 임시 경로로 격리"""
+    monkeypatch.setattr(bar_cache_mod, "_bar_cache", bar_cache_mod.BarDiskCache(str(tmp_path / "bar_cache")))
+
+
+@pytest.fixture(autouse=True)
+def _isolated_paper_ledger(tmp_path, monkeypatch):
+    """레저를 만드는 테스트가 logs/paper_ledger 에 이벤트를 남기지 않도록 임시 경로로 격리"""
+    monkeypatch.setattr(paper_ledger_mod, "PAPER_LEDGER_DIR", str(tmp_path / "paper_ledger"))
+
+
+@pytest.fixture(autouse=True)
+def _isolated_write_behind_spool(tmp_path, monkeypatch):
+    """Redis 없는 테스트의 쓰기 지연 행이 logs/write_behind 스풀에 남지 않도록 임시 경로로 격리"""
+    monkeypatch.setattr(write_behind_mod, "WRITE_BEHIND_SPOOL_DIR", str(tmp_path / "write_behind"))
@@ -0,0 +1,68 @@
+import asyncio
+import threading
+
+import pytest
+
+import app.api.main as api
+from app.api.main import PaperOrderRequest
+
+
+def test_paper_order_db_write_runs_off_the_event_loop(monkeypatch):
+    seen = {}
+
+    def _save(order):
+        seen["thread"] = threading.current_thread().name
+        return "db-1"
+
+    monkeypatch.setattr(api, "_save_paper_order", _save)
+    order = PaperOrderRequest(ticker="AAPL", side="buy", qty=1, entry=100.0, sl=99.0, tp=102.0)
+    res = asyncio.run(api.create_paper_order(order))
+    assert res.order_id == "db-1" and seen["thread"].startswith("api-blocking")
+
+
+def test_running_report_job_survives_eviction_and_is_awaited(monkeypatch):
+    monkeypatch.setattr(api, "REPORT_JOB_MAX", 2)
+    monkeypatch.setattr(api, "_report_jobs", type(api._report_jobs)())
+    monkeypatch.setattr(api, "_report_job_tasks", {})
+    release = threading.Event()
+
+    def _slow(days):
+        release.wait(2.0)
+        return {"days": days}
+
+    async def _scenario():
+        slow = api.submit_report_job("perf", _slow, days=1)
+        for d in (2, 3, 4):                                   # 상한 2 → 완료 잡만 밀려남
+            await api.wait_report_job(api.submit_report_job("perf", lambda days: {"days": days}, days=d))
+        assert slow["job_id"] in api._report_jobs and len(api._report_jobs) == 2
+        release.set()
+        return await api.wait_report_job(slow)
+
+    assert asyncio.run(_scenario()) == {"days": 1}
+
+
+def test_unfinished_job_without_task_is_an_error_not_empty_result():
+    job = {"job_id": "gone", "status": "running"}
+    with pytest.raises(RuntimeError):
+        asyncio.run(api.wait_report_job(job))
+
+
+def test_saturated_report_pool_leaves_blocking_pool_free(monkeypatch):
+    monkeypatch.setattr(api, "_report_jobs", type(api._report_jobs)())
+    monkeypatch.setattr(api, "_report_job_tasks", {})
+    release = threading.Event()
+
+    def _slow(days):
+        release.wait(2.0)
+        return {"thread": threading.current_thread().name}
+
+    async def _scenario():
+        jobs = [api.submit_report_job("perf", _slow, days=d) for d in range(api.API_EXECUTOR_WORKERS + 2)]
+        await asyncio.sleep(0.05)
+        cheap = await asyncio.wait_for(api.run_blocking(lambda: threading.current_thread().name), 1.0)
+        release.set()
+        return cheap, [await api.wait_report_job(j) for j in jobs]
+
+    cheap, results = asyncio.run(_scenario())
+    assert cheap.startswith("api-blocking")                   # 리포트가 몰려도 공용 풀은 즉시 응답
+    assert all(r["thread"].startswith("api-report") for r in results)
@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta, timezone
+
+from app.io.bar_aggregator import BarAggregator
+from app.io.quotes_delayed import Candle, DelayedQuotesIngestor
+
+T0 = datetime(2026, 10, 16, 14, 0, tzinfo=timezone.utc)
+
+
+def _m(i, c, v=100):
+    return Candle("AAPL", T0 + timedelta(minutes=i), c - 0.1, c + 0.2, c - 0.2, c, v)
+
+
+def test_rolls_up_incrementally_and_recomputes_revised_bucket():
+    agg = BarAggregator()
+    agg.ingest("AAPL", [_m(i, 100 + i) for i in range(7)])
+
+    five = agg.get_bars("AAPL", 300, 10)
+    assert [b.ts for b in five] == [T0, T0 + timedelta(minutes=5)]
+    assert (five[0].o, five[0].c, five[0].v) == (99.9, 104, 500)
+    assert five[0].h == 104.2 and five[0].l == 99.8
+
+    # 진행 중 1분봉 갱신 → 같은 5분 버킷만 재계산 (거래량 이중 합산 없음)
+    agg.ingest("AAPL", [_m(6, 110, v=250)])
+    assert agg.get_bars("AAPL", 60, 1)[0].c == 110
+    last5 = agg.get_bars("AAPL", 300, 1)[0]
+    assert (last5.c, last5.v, last5.h) == (110, 350, 110.2)
+
+    # 과거 봉은 무시, 재전송된 동일 봉은 반영 0건
+    assert agg.ingest("AAPL", [_m(3, 50), _m(6, 110, v=250)]) == 0
+
+
+def test_finer_timeframes_are_split_views_not_stored():
+    agg = BarAggregator()
+    agg.ingest("AAPL", [_m(i, 100 + i, v=101) for i in range(100)])
+
+    thirty = agg.get_bars("AAPL", 30, 5)
+    assert len(thirty) == 5
+    assert [b.ts for b in thirty[-2:]] == [T0 + timedelta(minutes=99), T0 + timedelta(minutes=99, seconds=30)]
+    assert thirty[-1].c == thirty[-2].c == 199 and thirty[-1].v == 50
+    assert len(agg.get_bars("AAPL", 15, 8)) == 8
+    assert ("AAPL", 30) not in agg._rolled and ("AAPL", 15) not in agg._rolled
+
+
+def test_delayed_ingestor_serves_bar_sec_from_shared_buffer(monkeypatch):
+    agg = BarAggregator()
+    monkeypatch.setattr("app.io.bar_aggregator._bar_aggregator", agg)
+    monkeypatch.setenv("BAR_SEC", "30")
+    ing = DelayedQuotesIngestor(tickers_csv="AAPL")
+    ts = [int((T0 + timedelta(minutes=i)).timestamp()) for i in range(3)]
+    payload = {"chart": {"result": [{"timestamp": ts, "indicators": {"quote": [
+        {"open": [1, 2, 3], "high": [1.5, 2.5, 3.5], "low": [0.5, 1.5, 2.5], "close": [1.2, 2.2, 3.2], "volume": [10, 20, 30]}]}}]}}
+    monkeypatch.setattr(ing, "_fetch_yahoo_1m", lambda t: payload)
+
+    ing.update_all_tickers()
+    assert len(agg._base["AAPL"]) == 3  # 원본 1분봉만 보관
+    assert [c.c for c in ing.get_latest_candles("AAPL", 50)] == [1.2, 1.2, 2.2, 2.2, 3.2, 3.2]
+    assert ing.get_technical_indicators("AAPL")["current_price"] == 3.2
+
+
+def test_regime_timeframe_is_never_finer_than_ingestor_bars(monkeypatch):
+    from app.jobs import scheduler
+    monkeypatch.setenv("BAR_SEC", "60")
+    assert scheduler._regime_bar_sec(DelayedQuotesIngestor(tickers_csv="AAPL")) == 60
+    monkeypatch.setenv("BAR_SEC", "15")
+    assert scheduler._regime_bar_sec(DelayedQuotesIngestor(tickers_csv="AAPL")) == scheduler.REGIME_BAR_SEC
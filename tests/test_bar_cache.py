@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta, timezone
+
+import app.io.bar_cache as bar_cache_mod
+from app.io.bar_aggregator import BarAggregator
+from app.io.bar_cache import BarDiskCache
+from app.io.quotes_delayed import Candle, DelayedQuotesIngestor
+
+T0 = datetime(2026, 10, 15, 19, 50, tzinfo=timezone.utc)
+
+
+def _bars(start, n, px=100.0):
+    return [Candle("AAPL", start + timedelta(minutes=i), px + i, px + i + 1, px + i - 1, px + i + 0.5, 1000 + i)
+            for i in range(n)]
+
+
+def test_merge_revision_hwm_and_reload_across_days(tmp_path):
+    cache = BarDiskCache(str(tmp_path), keep_days=2)
+    cache.save("aapl", _bars(T0 - timedelta(days=2), 5))          # 가장 오래된 일자 → 정리 대상
+    cache.save("AAPL", _bars(T0, 20))                              # 19:50~20:09, 자정(UTC) 안 넘음
+    revised = Candle("AAPL", T0 + timedelta(minutes=19), 1, 2, 0.5, 1.5, 7)
+    cache.save("AAPL", [revised] + _bars(T0 + timedelta(hours=5), 3))  # 다음 UTC 일자 01:50~
+
+    assert len(list((tmp_path / "AAPL").glob("*.npy"))) == 2
+    again = BarDiskCache(str(tmp_path))                            # 재시작 후 새 인스턴스
+    assert again.hwm("AAPL") == T0 + timedelta(hours=5, minutes=2)
+    bars = again.load("AAPL", 5)
+    assert [b.ts for b in bars] == [T0 + timedelta(minutes=18), T0 + timedelta(minutes=19)] + \
+        [T0 + timedelta(hours=5, minutes=i) for i in range(3)]
+    assert (bars[1].c, bars[1].v) == (1.5, 7)                      # 같은 ts는 최신 값으로 교체
+    assert again.load("AAPL", 5, naive=True)[0].ts.tzinfo is None
+    assert again.load("MSFT", 5) == [] and again.hwm("MSFT") is None
+
+
+def test_warmup_loads_disk_then_fetches_only_tail_and_survives_offline(tmp_path, monkeypatch):
+    start = datetime.now(timezone.utc).replace(second=0, microsecond=0) - timedelta(minutes=70)
+    cache = BarDiskCache(str(tmp_path))
+    cache.save("AAPL", _bars(start, 60))
+    monkeypatch.setattr(bar_cache_mod, "_bar_cache", cache)
+    monkeypatch.setattr(bar_cache_mod, "BAR_CACHE_ENABLED", True)
+
+    ing = DelayedQuotesIngestor("AAPL", bar_sec=60)
+    ing.bars = BarAggregator()
+    hwm = cache.hwm("AAPL")
+    calls = []
+
+    def fake_fetch(t, since=None):
+        calls.append(since)
+        raise ConnectionError("offline")
+
+    monkeypatch.setattr(ing, "_fetch_yahoo_1m", fake_fetch)
+    ing.warmup_backfill(["AAPL"])
+    assert calls == [hwm]                                           # 꼬리만 요청 (hwm 이후)
+    assert len(ing.bars.get_bars("AAPL", 60, 200)) == 60           # 네트워크 없어도 버퍼 채움
+    assert ing.market_data["AAPL"]["current_price"] == 159.5
+
+    # 꼬리 조회 성공 → 디스크 hwm 전진, 같은 ts 봉은 교체
+    tail = [Candle("AAPL", hwm + timedelta(minutes=i), 200, 201, 199, 200.5 + i, 10) for i in range(3)]
+    monkeypatch.setattr(ing, "_parse_1m_to_candles", lambda t, raw: tail)
+    monkeypatch.setattr(ing, "_fetch_yahoo_1m", lambda t, since=None: {})
+    ing.warmup_backfill(["AAPL"])
+    assert cache.hwm("AAPL") == hwm + timedelta(minutes=2)
+    assert [b.c for b in cache.load("AAPL", 3)] == [200.5, 201.5, 202.5]
+    assert ing.market_data["AAPL"]["current_price"] == 202.5
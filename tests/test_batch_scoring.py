@@ -0,0 +1,51 @@
+import random
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.engine.batch_scoring import BatchScorer
+from app.engine.regime import RegimeDetector
+from app.engine.techscore import TechScoreEngine
+from app.io.quotes_delayed import Candle
+
+
+def _bars(rnd, n, vol):
+    p, out = 100.0, []
+    for i in range(n):
+        o = p
+        p *= 1 + rnd.gauss(0.0005, vol)
+        h = max(o, p) * (1 + abs(rnd.gauss(0, vol / 2)))
+        lo = min(o, p) * (1 - abs(rnd.gauss(0, vol / 2)))
+        out.append(Candle("X", datetime(2026, 1, 2) + timedelta(seconds=30 * i), o, h, lo, p, rnd.randint(0, 5000)))
+    return out
+
+
+def test_matches_per_ticker_engines():
+    rnd = random.Random(7)
+    universe = {f"T{i}": _bars(rnd, rnd.choice([50, 50, 60, 30, 19]), rnd.choice([0.001, 0.004, 0.01]))
+                for i in range(200)}
+    tech, det = TechScoreEngine(), RegimeDetector()
+    results = BatchScorer(tech, det).score_universe(universe)
+
+    regimes_seen = set()
+    for t, bars in universe.items():
+        regime, score = results[t]
+        exp_r, exp_t = det.detect_regime(bars), tech.calculate_tech_score(bars)
+        assert score.score == pytest.approx(exp_t.score, abs=1e-9)
+        assert score.components == pytest.approx(exp_t.components, abs=1e-9)
+        assert regime.regime == exp_r.regime
+        assert regime.confidence == pytest.approx(exp_r.confidence, abs=1e-9)
+        assert regime.features == pytest.approx(exp_r.features, abs=1e-6)
+        regimes_seen.add(regime.regime)
+    assert len(regimes_seen) >= 3
+
+
+def test_cost_is_nearly_flat_in_universe_size():
+    rnd = random.Random(3)
+    scorer = BatchScorer()
+    big = {f"T{i}": _bars(rnd, 50, 0.004) for i in range(1000)}
+    scorer.score_universe(big)  # 워밍업
+    t0 = time.perf_counter()
+    scorer.score_universe(big)
+    assert time.perf_counter() - t0 < 0.5  # 종목별 루프는 ~1s
@@ -0,0 +1,48 @@
+import json
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+from app.io.codec import (MAGIC, PAYLOAD_FIELD, JsonCodec, MsgpackCodec, decode, decode_stream_fields,
+                          encode_stream_fields)
+from app.io.streams import RedisStreams
+
+
+def test_binary_roundtrip_and_legacy_json_decode():
+    codec = MsgpackCodec()
+    msg = {"ticker": "AAPL", "score": np.float64(0.41), "qty": np.int64(3), "ok": True,
+           "ts": datetime(2026, 10, 16, 14, 31, tzinfo=timezone.utc), "meta": {"tags": ["a", "b"]}}
+    blob = codec.encode(msg)
+    assert blob[:1] == MAGIC and blob[1] == 1
+    assert len(blob) < len(JsonCodec().encode(msg))
+    assert decode(blob) == {"ticker": "AAPL", "score": 0.41, "qty": 3, "ok": True,
+                            "ts": "2026-10-16T14:31:00+00:00", "meta": {"tags": ["a", "b"]}}
+    # 기존 JSON 항목 (str / bytes) 그대로 복원
+    legacy = json.dumps({"ticker": "MSFT", "score": -0.2})
+    assert decode(legacy) == decode(legacy.encode()) == {"ticker": "MSFT", "score": -0.2}
+    with pytest.raises(ValueError):
+        decode(MAGIC + bytes((9,)) + blob[2:])  # 미래 스키마 버전은 명시적으로 거부
+
+
+def test_stream_entries_decode_for_both_codecs_and_old_entries():
+    rs = RedisStreams()
+    msg = {"ticker": "NVDA", "score": 0.5, "meta": {"k": [1, 2]}, "flag": False, "timestamp": "2026-10-16T14:31:00"}
+
+    rs.codec = MsgpackCodec()
+    fields = rs._encode_message(msg)
+    assert list(fields) == [PAYLOAD_FIELD]
+    rs.codec = JsonCodec()
+    text_fields = rs._encode_message(msg)
+    assert text_fields["meta"] == '{"k": [1, 2]}' and text_fields["flag"] == 0
+
+    # 소비 클라이언트는 bytes로 받음: 신규 바이너리 엔트리 + 기존 문자열 엔트리 혼재
+    wire = [(b"signals.raw", [
+        (b"1-0", {PAYLOAD_FIELD.encode(): fields[PAYLOAD_FIELD]}),
+        (b"2-0", {k.encode(): str(v).encode() for k, v in text_fields.items()}),
+    ])]
+    new, old = rs._parse_entries(wire)
+    assert (new.stream, new.message_id) == ("signals.raw", "1-0")
+    assert new.data == msg and new.timestamp == datetime(2026, 10, 16, 14, 31)
+    assert old.data["meta"] == '{"k": [1, 2]}' and old.data["score"] == "0.5"
+    assert decode_stream_fields(encode_stream_fields(msg, JsonCodec()))["ticker"] == "NVDA"
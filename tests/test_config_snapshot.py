@@ -0,0 +1,80 @@
+import queue
+import threading
+
+import app.config as config_mod
+from app.config import CONFIG_CHANNEL, ConfigSnapshotStore
+
+
+class _FakePubSub:
+    def __init__(self, r):
+        self.r, self.closed = r, False
+
+    def subscribe(self, *channels):
+        pass
+
+    def psubscribe(self, *patterns):
+        pass
+
+    def get_message(self, timeout=0.0):
+        try:
+            return self.r.messages.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.closed = True
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.kv, self.messages, self.pubsubs = {}, queue.Queue(), []
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        ps = _FakePubSub(self)
+        self.pubsubs.append(ps)
+        return ps
+
+    def publish(self, channel, message):
+        self.messages.put({"type": "message", "channel": channel, "data": message})
+
+    def pipeline(self, transaction=True):
+        return _Pipe(self)
+
+    def get(self, key):
+        return self.kv.get(key)
+
+    def smembers(self, key):
+        return set(self.kv.get(key, set()))
+
+
+class _Pipe:
+    def __init__(self, r):
+        self.r, self.ops = r, []
+
+    def __getattr__(self, name):
+        return lambda *a, **k: self.ops.append((name, a, k))
+
+    def execute(self):
+        return [getattr(self.r, n)(*a, **k) for n, a, k in self.ops]
+
+
+def test_config_change_reaches_listener_and_thread_stops_on_close(monkeypatch):
+    fake = _FakeRedis()
+    monkeypatch.setattr(config_mod.redis, "from_url", lambda url: fake)
+    monkeypatch.setattr(config_mod, "CONFIG_LISTENER_POLL_SEC", 0.05)
+    invalidated = threading.Event()
+    store = ConfigSnapshotStore(redis_url="redis://fake", ttl_sec=3600)
+    monkeypatch.setattr(store, "invalidate", lambda: (ConfigSnapshotStore.invalidate(store), invalidated.set()))
+
+    first = store.get()
+    assert store.get() is first and store.reloads == 1       # TTL 안에서는 재로드 없음
+
+    fake.kv["cfg:signal_cutoff:rth"] = b"0.25"
+    fake.publish(CONFIG_CHANNEL, "adaptive_cutoff")
+    assert invalidated.wait(2.0)
+    second = store.get()
+    assert second.version != first.version and second.signal_cutoff_rth == 0.25
+
+    listener = store._listener
+    store.close()
+    assert not listener.is_alive() and fake.pubsubs[-1].closed
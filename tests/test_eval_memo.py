@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta
+
+from app.engine.eval_memo import EvalMemo, memo_key
+from app.io.codec import MsgpackCodec, encode_stream_fields
+from app.io.quotes_delayed import Candle
+from app.io.streams import RedisStreams
+from app.jobs import scheduler
+
+T0 = datetime(2026, 10, 16, 14, 0)
+
+
+def _bar(i, c=100.0, v=100):
+    return Candle("AAPL", T0 + timedelta(minutes=i), c, c, c, c, v)
+
+
+def test_hit_only_when_bar_config_and_session_unchanged():
+    now = [1000.0]
+    memo = EvalMemo(enabled=True, max_age_sec=300, clock=lambda: now[0])
+    memo.store("AAPL", memo_key(_bar(1), "v1", "RTH"), "regime", "tech", "signal")
+
+    assert memo.lookup("AAPL", memo_key(_bar(1), "v1", "RTH")).signal == "signal"
+    assert memo.lookup("AAPL", memo_key(_bar(2), "v1", "RTH")) is None         # 새 봉
+    assert memo.lookup("AAPL", memo_key(_bar(1, v=150), "v1", "RTH")) is None  # 진행 중 봉 갱신
+    assert memo.lookup("AAPL", memo_key(_bar(1), "v2", "RTH")) is None         # 설정 변경
+    assert memo.lookup("AAPL", memo_key(_bar(1), "v1", "EXT")) is None         # 세션 전환
+    now[0] += 301
+    assert memo.lookup("AAPL", memo_key(_bar(1), "v1", "RTH")) is None         # 최대 보관 시간 초과
+    assert (memo.hits, memo.misses) == (1, 5)
+
+
+class _Ingestor:
+    def __init__(self, bars):
+        self.bars = bars
+
+    def get_latest_candles(self, ticker, n):
+        return self.bars.get(ticker, [])[-n:]
+
+
+def test_scheduler_skips_unchanged_tickers_before_token_and_scoring(monkeypatch):
+    memo = EvalMemo(enabled=True, max_age_sec=0)
+    monkeypatch.setattr("app.engine.eval_memo._eval_memo", memo)
+    ing = _Ingestor({"AAPL": [_bar(0), _bar(1)], "MSFT": [_bar(0)], "NVDA": []})
+    ctx = ("v1", "RTH")
+    memo.store("AAPL", memo_key(_bar(1), *ctx))
+    memo.store("MSFT", memo_key(_bar(0), *ctx))
+
+    stats = {"memo": {"hits": 0, "misses": 0}}
+    items = [("AAPL", None, "x"), ("MSFT", None, "x"), ("NVDA", None, "x")]
+    ing.bars["MSFT"].append(_bar(1))
+    fresh = scheduler._skip_unchanged_tickers(items, ing, ctx, stats)
+
+    assert [t for t, _, _ in fresh] == ["MSFT", "NVDA"]
+    assert stats["memo"] == {"hits": 1, "misses": 2}
+
+
+class _NewsRedis:
+    def __init__(self, streams):
+        self.streams = streams
+
+    def xrevrange(self, key, count=None):
+        return list(reversed(self.streams.get(key, [])))[:count]
+
+
+def test_new_edgar_or_insight_event_forces_reevaluation(monkeypatch):
+    memo = EvalMemo(enabled=True, max_age_sec=0)
+    monkeypatch.setattr("app.engine.eval_memo._eval_memo", memo)
+    ing = _Ingestor({"AAPL": [_bar(1)], "MSFT": [_bar(1)]})
+    ctx = ("v1", "RTH")
+    memo.store("AAPL", memo_key(_bar(1), *ctx, None))
+    memo.store("MSFT", memo_key(_bar(1), *ctx, None))
+
+    rs = RedisStreams.__new__(RedisStreams)
+    rs.binary_client = _NewsRedis({
+        "news.edgar": [(b"1700000000000-0", encode_stream_fields({"ticker": "aapl", "form": "8-K"}, MsgpackCodec()))],
+        "news.headlines": [(b"1700000000500-0", {b"ticker": b"AAPL", b"summary": b"beat"})],
+    })
+    news_ids = scheduler._latest_news_ids(rs)
+    assert news_ids == {"AAPL": "1700000000500-0"}                # 바이너리/문자열 엔트리 모두, 가장 최신 ID
+
+    stats = {"memo": {"hits": 0, "misses": 0}}
+    fresh = scheduler._skip_unchanged_tickers([("AAPL", None, "x"), ("MSFT", None, "x")], ing, ctx, stats, news_ids)
+    assert [t for t, _, _ in fresh] == ["AAPL"]                    # 봉은 같아도 새 공시/인사이트 → 재평가
+    assert scheduler._latest_news_ids(None) == {}
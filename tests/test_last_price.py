@@ -0,0 +1,115 @@
+from app.io.last_price import LAST_PRICE_KEY, LastPriceService, adapter_price_fetcher
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.h = {}
+
+    def pipeline(self, transaction=False):
+        return self
+
+    def hset(self, key, mapping):
+        self.h.setdefault(key, {}).update(mapping)
+
+    def expire(self, *a):
+        pass
+
+    def execute(self):
+        pass
+
+    def hmget(self, key, fields):
+        return [self.h.get(key, {}).get(f) for f in fields]
+
+
+class _Broker:
+    def __init__(self, prices):
+        self.prices = prices
+        self.batch_calls = []
+
+    def get_latest_prices(self, tickers):
+        self.batch_calls.append(list(tickers))
+        return {t: self.prices[t] for t in tickers if t in self.prices}
+
+    def get_current_price(self, ticker):
+        raise AssertionError("종목별 REST 호출 금지")
+
+
+def test_ingested_prices_are_shared_and_only_stale_misses_hit_the_broker_once():
+    now = [1000.0]
+    r = _FakeRedis()
+    writer = LastPriceService(redis_client=r, max_age_sec=60, clock=lambda: now[0])
+    reader = LastPriceService(redis_client=r, max_age_sec=60, clock=lambda: now[0])  # 다른 프로세스
+    writer.update_many({"AAPL": 190.0, "MSFT": 410.0, "BAD": 0})
+
+    broker = _Broker({"NVDA": 120.0, "TSLA": 250.0})
+    fetch = adapter_price_fetcher(broker)
+    got = reader.get_many(["AAPL", "MSFT", "NVDA", "TSLA", "ZZZZ"], fetcher=fetch)
+    assert got == {"AAPL": 190.0, "MSFT": 410.0, "NVDA": 120.0, "TSLA": 250.0}
+    assert broker.batch_calls == [["NVDA", "TSLA", "ZZZZ"]]
+    assert "BAD" not in r.h[LAST_PRICE_KEY]
+
+    # 두 번째 조회는 L1에서 (브로커 호출 없음, 미보유 종목만 재시도)
+    assert reader.get("nvda", fetcher=fetch) == 120.0 and len(broker.batch_calls) == 1
+
+    # 신선도 한도 초과 → 조회 안 함 (fetch=False) / 재스냅샷 (fetch=True)
+    now[0] += 61
+    assert reader.get("AAPL", fetch=False) is None
+    broker.prices["AAPL"] = 191.0
+    entry = reader.get_entry("AAPL", fetcher=fetch)
+    assert (entry.price, entry.source, entry.ts) == (191.0, "snapshot", now[0])
+
+
+def test_older_observations_do_not_overwrite_newer_ones():
+    svc = LastPriceService(clock=lambda: 2000.0)
+    svc.update("AAPL", 190.0, ts=1990.0)
+    svc.update("AAPL", 150.0, ts=1500.0)
+    assert svc.get("AAPL") == 190.0
+
+
+def test_delayed_quote_feed_stamps_prices_with_the_bar_start(monkeypatch):
+    from datetime import datetime, timezone
+
+    import app.io.last_price as last_price_mod
+    from app.io.quotes_delayed import Candle
+    from app.jobs import scheduler
+
+    bar_ts = datetime(2026, 10, 16, 14, 0, tzinfo=timezone.utc)
+    service = LastPriceService(max_age_sec=60, clock=lambda: bar_ts.timestamp() + 600)  # 봉은 10분 전
+    monkeypatch.setattr(last_price_mod, "get_last_price_service", lambda: service)
+    fired = []
+    monkeypatch.setattr("app.jobs.paper_trading_manager.fire_paper_triggers", fired.append)
+
+    class _Ingestor:
+        delayed_feed = True
+
+        def get_latest_candles(self, ticker, n):
+            return [Candle(ticker, bar_ts, 1, 1, 1, 190.0, 10)] if ticker == "AAPL" else []
+
+    assert scheduler._feed_last_prices(_Ingestor(), {"AAPL": {"current_price": 190.0}, "NONE": {}}) == 1
+    assert fired == [{"AAPL": 190.0}]                                             # 같은 경로에서 트리거 평가
+    assert service.get_entries(["AAPL"], fetch=False) == {}                       # 지연 시세 → 신선하지 않음
+    assert service.get_entries(["AAPL"], max_age_sec=3600, fetch=False)["AAPL"].ts == bar_ts.timestamp()
+
+
+def test_live_quote_feed_stamps_the_current_bar_as_fresh(monkeypatch):
+    import time
+    from datetime import datetime, timezone
+
+    import app.io.last_price as last_price_mod
+    from app.io.quotes_alpaca import Candle
+    from app.jobs import scheduler
+
+    now = time.time()
+    bar_ts = datetime.fromtimestamp(now - 30, tz=timezone.utc).replace(tzinfo=None)  # 진행 중인 1분봉 (naive UTC)
+    service = LastPriceService(max_age_sec=60, clock=lambda: now + 45)               # 봉 시작 기준이면 75초 → 만료
+    monkeypatch.setattr(last_price_mod, "get_last_price_service", lambda: service)
+    monkeypatch.setattr("app.jobs.paper_trading_manager.fire_paper_triggers", lambda prices: None)
+
+    class _Ingestor:
+        def get_latest_candles(self, ticker, n):
+            return [Candle(1, 1, 1, 190.0, 10, bar_ts)]
+
+    assert scheduler._feed_last_prices(_Ingestor(), {"AAPL": {"current_price": 190.0}}) == 1
+    entry = service.get_entries(["AAPL"], fetch=False)["AAPL"]                     # 현재 봉 → 신선
+    assert entry.price == 190.0
+    assert now - 1 <= entry.ts <= now + 1                                           # min(봉 종료, 조회 시각) = 조회 시각
@@ -0,0 +1,48 @@
+import threading
+
+from app.engine.llm_scheduler import LLMWorkItem, LLMWorkScheduler
+
+
+def _items():
+    return [
+        LLMWorkItem("FAR", "vol_spike", 0.95, "vol_spike"),           # 컷오프에서 멀리 → 결정 영향 작음
+        LLMWorkItem("NEAR", "vol_spike", 0.58, "vol_spike"),          # 컷오프 근접
+        LLMWorkItem("FILING", "edgar", 0.50, "trend", {"form_type": "8-K"}),
+        LLMWorkItem("FILING", "vol_spike", 0.50, "vol_spike"),       # 같은 종목 → 최고 가치 1건만
+        LLMWorkItem("SIDE", "vol_spike", 0.10, "sideways"),           # 최소 가치 미만 → 드롭
+    ]
+
+
+def test_ranks_by_decision_impact_and_respects_budget():
+    sched = LLMWorkScheduler(top_k=3, min_value=0.2)
+    plan = sched.plan(_items(), cutoff=0.6, budget=2)
+
+    assert [(i.ticker, i.event_type) for i in plan.run] == [("FILING", "edgar"), ("NEAR", "vol_spike")]
+    assert [i.ticker for i in plan.deferred] == ["FAR"]
+    assert [i.ticker for i in plan.dropped] == ["SIDE"]
+
+
+def test_dispatches_top_k_concurrently_within_deadline():
+    sched = LLMWorkScheduler(top_k=3, min_value=0.0, deadline_sec=5.0)
+    barrier = threading.Barrier(3, timeout=5.0)                # 직렬 실행이면 통과 불가
+
+    def run(item):
+        barrier.wait()
+        return f"insight:{item.ticker}"
+
+    results, plan = sched.run_cycle(_items(), cutoff=0.6, budget=10, run=run)
+    assert len(plan.run) == 3
+    assert set(results) == {i.ticker for i in plan.run}
+
+
+def test_cycle_deadline_override_returns_without_late_results():
+    sched = LLMWorkScheduler(top_k=3, min_value=0.0, deadline_sec=60.0)
+    release = threading.Event()
+
+    def run(item):
+        release.wait(5.0)
+        return f"insight:{item.ticker}"
+
+    results, plan = sched.run_cycle(_items(), cutoff=0.6, budget=10, run=run, deadline_sec=0.0)
+    release.set()
+    assert len(plan.run) == 3 and results == {}                 # 사이클 잔여 시간이 기본 마감보다 우선
@@ -0,0 +1,57 @@
+from datetime import date, datetime, timezone
+
+from app.utils.market_clock import MarketClock, nyse_half_days, nyse_holidays
+
+
+def _utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def test_rth_open_follows_dst_transitions():
+    clock = MarketClock(extra_holidays=set(), extra_half_days=set())
+
+    # 2025-03-07 (EST, UTC-5): 09:30 ET == 14:30 UTC
+    assert clock.session_at(_utc(2025, 3, 7, 14, 29)) == "PRE"
+    assert clock.session_at(_utc(2025, 3, 7, 14, 30)) == "RTH"
+    # 2025-03-10 (EDT, UTC-4): 09:30 ET == 13:30 UTC
+    assert clock.session_at(_utc(2025, 3, 10, 13, 29)) == "PRE"
+    assert clock.session_at(_utc(2025, 3, 10, 13, 30)) == "RTH"
+    assert clock.session_at(_utc(2025, 3, 10, 20, 0)) == "POST"
+    # 2025-11-03 (EST 복귀): 16:00 ET == 21:00 UTC
+    assert clock.session_at(_utc(2025, 10, 31, 19, 59)) == "RTH"
+    assert clock.session_at(_utc(2025, 10, 31, 20, 0)) == "POST"
+    assert clock.session_at(_utc(2025, 11, 3, 20, 59)) == "RTH"
+    assert clock.session_at(_utc(2025, 11, 3, 21, 0)) == "POST"
+    assert clock.minutes_to_close(_utc(2025, 11, 3, 20, 50)) == 10
+
+
+def test_weekends_holidays_and_half_days():
+    clock = MarketClock(extra_holidays=set(), extra_half_days=set())
+
+    # 주말 / DST 전환 일요일
+    assert clock.label(_utc(2025, 3, 9, 15, 0)) == "CLOSED"
+    # 2025-07-04 독립기념일, 2025-04-18 Good Friday
+    assert date(2025, 7, 4) in nyse_holidays(2025)
+    assert date(2025, 4, 18) in nyse_holidays(2025)
+    assert clock.session_at(_utc(2025, 4, 18, 15, 0)) == "CLOSED"
+    # 2025-11-28 추수감사절 다음날: 13:00 ET 조기폐장
+    assert date(2025, 11, 28) in nyse_half_days(2025)
+    assert clock.session_at(_utc(2025, 11, 28, 17, 59)) == "RTH"
+    assert clock.session_at(_utc(2025, 11, 28, 18, 0)) == "POST"
+    assert clock.in_eod_window(10, _utc(2025, 11, 28, 17, 55))
+    assert not clock.in_eod_window(10, _utc(2025, 11, 28, 20, 55))
+    # 2022-01-01 토요일: 전년 12/31은 정상 거래
+    assert clock.is_trading_day(date(2021, 12, 31))
+
+
+def test_legacy_labels_and_windows():
+    clock = MarketClock(extra_holidays=set(), extra_half_days=set())
+
+    assert clock.label(_utc(2025, 6, 2, 12, 0)) == "EXT"      # 08:00 ET
+    assert clock.label(_utc(2025, 6, 2, 14, 0)) == "RTH"      # 10:00 ET
+    assert clock.label(_utc(2025, 6, 3, 1, 0)) == "CLOSED"    # 21:00 ET
+    assert clock.in_open_window(5, 5, _utc(2025, 6, 2, 13, 27))
+    assert not clock.in_open_window(5, 5, _utc(2025, 6, 1, 13, 27))  # 일요일
+    assert clock.in_preclose_window(12, _utc(2025, 6, 2, 19, 48))
+    assert clock.et_ymd(_utc(2025, 6, 3, 2, 0)) == "20250602"
+    assert clock.next_session_day(date(2025, 7, 3)).day == date(2025, 7, 7)
@@ -0,0 +1,133 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import app.adapters.market_simulator as sim_mod
+from app.adapters.market_simulator import MarketSimulator, OrderRejected, SimBar, SimConfig, SimStateStore
+
+T0 = datetime(2025, 1, 2, 14, 30, tzinfo=timezone.utc)
+
+
+def _bars(rows):
+    return [SimBar(o=o, h=h, l=l, c=c, v=v, ts=T0 + timedelta(minutes=i)) for i, (o, h, l, c, v) in enumerate(rows)]
+
+
+def _cfg(**kw):
+    base = dict(latency_ms=0, latency_jitter_ms=0, half_spread_bps=0, impact_bps=0, rate_limit_per_min=0)
+    base.update(kw)
+    return SimConfig(**base)
+
+
+def test_same_seed_replays_identical_fills():
+    def run():
+        sim = MarketSimulator(SimConfig(seed=7, reject_rate=0.2, rate_limit_per_min=0))
+        out = []
+        for i in range(50):
+            try:
+                out.append((sim.submit_market_order("AAPL", "buy" if i % 2 == 0 else "sell", 5).price))
+            except OrderRejected as e:
+                out.append(e.reason)
+            sim.step()
+        return out, sim.get_portfolio_summary()["equity"]
+
+    assert run() == run()
+
+
+def test_partial_fill_completes_on_following_bars():
+    bars = _bars([(10, 10, 10, 10, 1000)] * 4)
+    sim = MarketSimulator(_cfg(participation=0.1), {"XYZ": bars})
+    first = sim.submit_market_order("XYZ", "buy", 250)
+    assert first.quantity == 100 and first.meta["remaining"] == 150
+    fills = sim.step(2)
+    assert [f.quantity for f in fills] == [100, 50]
+    assert sim.get_positions()[0].quantity == 250
+
+
+def test_bracket_stop_wins_same_bar_and_cancels_target():
+    bars = _bars([(100, 100, 100, 100, 10**6), (100, 106, 94, 101, 10**6), (101, 120, 101, 119, 10**6)])
+    sim = MarketSimulator(_cfg(), {"XYZ": bars})
+    trade, stop_id, profit_id = sim.submit_bracket_order("XYZ", "buy", 10, 95.0, 105.0)
+    fills = sim.step()
+    assert [(f.trade_id, f.price) for f in fills] == [(stop_id, 95.0)]
+    assert sim.step() == [] and sim.get_positions() == []
+    assert sim.get_stats()["pending_triggers"] == 0
+
+
+def test_rejects_rate_limit_and_buying_power():
+    sim = MarketSimulator(_cfg(rate_limit_per_min=60, rate_burst=2, initial_cash=1000),
+                          {"XYZ": _bars([(10, 10, 10, 10, 10**6)] * 3)})
+    with pytest.raises(OrderRejected) as e:
+        sim.submit_market_order("XYZ", "buy", 1000)
+    assert e.value.reason == "insufficient_buying_power"
+    sim.submit_market_order("XYZ", "buy", 1)
+    with pytest.raises(OrderRejected) as e:
+        sim.submit_market_order("XYZ", "buy", 1)
+    assert e.value.reason == "rate_limited"
+    sim.step()  # 60초 경과 → 토큰 보충
+    assert sim.submit_market_order("XYZ", "buy", 1).quantity == 1
+    assert sim.get_stats()["rejects"] == {"insufficient_buying_power": 1, "rate_limited": 1}
+
+
+def test_flat_position_keeps_brackets_of_entries_still_working():
+    bars = _bars([(100, 100, 100, 100, 1000), (100, 100, 90, 92, 0), (100, 100, 100, 100, 10**6)])
+    sim = MarketSimulator(_cfg(participation=0.1), {"XYZ": bars})
+    sim.submit_bracket_order("XYZ", "buy", 100, 95.0, 110.0)              # 봉 용량 전부 사용
+    second, stop_b, profit_b = sim.submit_bracket_order("XYZ", "buy", 50, 80.0, 120.0)
+    assert second.quantity == 0 and second.meta["remaining"] == 50        # 진입 전량 대기
+
+    fills = sim.step()                                                    # A 손절 → 보유 0
+    assert len(fills) == 1 and fills[0].meta["bracket_exit"] and sim.positions == {}
+    assert {t.order_id for t in sim._triggers.orders()} == {stop_b, profit_b}
+
+    assert [f.quantity for f in sim.step()] == [50]                       # B 진입 완료, 브래킷 유지
+    assert sim.get_stats()["pending_triggers"] == 2
+
+
+def test_broker_sim_default_steps_on_wall_clock_and_refills_rate_limit(monkeypatch):
+    monkeypatch.delenv("SIM_SPEED", raising=False)
+    assert SimConfig.from_env().speed == 1.0                              # step() 호출자 없는 운영 경로
+    wall = [1000.0]
+    monkeypatch.setattr(sim_mod.time, "time", lambda: wall[0])
+    bars = _bars([(100, 100, 100, 100, 10**6), (100, 100, 100, 100, 10**6), (100, 101, 90, 92, 10**6)])
+    sim = MarketSimulator(_cfg(speed=1.0, rate_limit_per_min=60, rate_burst=1), {"XYZ": bars})
+    _, stop_id, _ = sim.submit_bracket_order("XYZ", "buy", 10, 95.0, 110.0)
+    with pytest.raises(OrderRejected) as e:
+        sim.submit_market_order("XYZ", "buy", 1)
+    assert e.value.reason == "rate_limited"
+
+    wall[0] += 1.0                                                        # 봉은 그대로, 벽시계 1초 → 토큰 1개
+    assert sim.submit_market_order("XYZ", "buy", 1).quantity == 1 and sim.get_stats()["bars"] == 0
+    wall[0] += 120.0                                                      # 2봉 경과 → 가격 진행 + 브래킷 발동
+    assert sim.get_current_price("XYZ") == 92
+    assert [f.trade_id for f in sim.fills][-1] == stop_id and sim.get_positions()[0].quantity == 1
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.kv = {}
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.kv:
+            return None
+        self.kv[key] = str(value).encode()
+        return True
+
+    def get(self, key):
+        return self.kv.get(key)
+
+    def delete(self, key):
+        self.kv.pop(key, None)
+
+
+def test_processes_share_one_book_through_the_state_store():
+    shared = _FakeRedis()
+    bars = _bars([(100, 100, 100, 100, 10**6), (100, 100, 90, 92, 10**6), (92, 93, 91, 92, 10**6)])
+    worker, api = (MarketSimulator(_cfg(), {"XYZ": list(bars)}, store=SimStateStore(shared)) for _ in range(2))
+    _, stop_id, _ = worker.submit_bracket_order("XYZ", "buy", 10, 95.0, 110.0)
+    assert [(p.ticker, p.quantity) for p in api.get_positions()] == [("XYZ", 10)]   # 다른 프로세스에서도 보임
+
+    fills = api.step()                                                    # API 쪽이 봉을 진행해도 같은 책
+    assert [f.trade_id for f in fills] == [stop_id]
+    assert worker.get_positions() == [] and worker.get_current_price("XYZ") == 92
+    assert worker.step() == [] and worker.get_portfolio_summary()["realized_pnl"] == api.realized_pnl == -50.0
+    assert shared.get("sim:lock") is None
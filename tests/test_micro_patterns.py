@@ -0,0 +1,46 @@
+from datetime import datetime, timedelta
+
+from app.engine.micro_patterns import THREE_MIN_THREE_UP, TICK_SPIKE, MicroPatternDetector
+from app.io.quotes_delayed import Candle
+
+T0 = datetime(2026, 10, 16, 14, 0)
+
+
+def _bar(i, o, c, h=None, l=None):
+    return Candle("AAPL", T0 + timedelta(seconds=60 * i), o, h if h is not None else max(o, c),
+                  l if l is not None else min(o, c), c, 1000)
+
+
+def test_tick_spike_fires_once_per_bar_including_in_progress_updates():
+    det = MicroPatternDetector(bar_sec=60, spike_ret=0.003, spike_range=0.01, tick_spike=True, three_up=False)
+    assert det.on_candles("AAPL", [_bar(0, 100, 100), _bar(1, 100, 100.1)]) == []
+
+    # 진행 중 봉 갱신(같은 ts)으로 스파이크 → 1회만 발행
+    ev = det.on_bar("AAPL", T0 + timedelta(seconds=60), 100, 100.5, 100, 100.5)
+    assert [(e.pattern, e.direction) for e in ev] == [(TICK_SPIKE, 1.0)]
+    assert det.on_bar("AAPL", T0 + timedelta(seconds=60), 100, 100.6, 100, 100.6) == []
+
+    ev = det.on_bar("AAPL", T0 + timedelta(seconds=120), 100.6, 100.6, 99.9, 99.9)
+    assert [(e.pattern, e.direction) for e in ev] == [(TICK_SPIKE, -1.0)]
+
+
+def test_three_up_detected_on_the_completing_bar_with_bounded_state():
+    det = MicroPatternDetector(bar_sec=60, tick_spike=False, three_up=True)
+    bars = [_bar(i, 100 + i * 0.01, 100 + i * 0.01 + 0.005) for i in range(200)]
+    events = []
+    for b in bars[:8]:
+        events += det.on_bar("AAPL", b.ts, b.o, b.h, b.l, b.c)
+    assert events == []
+    ev = det.on_bar("AAPL", bars[8].ts, bars[8].o, bars[8].h, bars[8].l, bars[8].c)
+    assert [e.pattern for e in ev] == [THREE_MIN_THREE_UP] and ev[0].bar_ts == bars[8].ts
+
+    for b in bars[9:]:
+        det.on_bar("AAPL", b.ts, b.o, b.h, b.l, b.c)
+    assert len(det._state["AAPL"].bars) == 9  # 3분 창 x3 이상 보관하지 않음
+
+
+def test_first_call_primes_state_without_replaying_history():
+    det = MicroPatternDetector(bar_sec=60, spike_ret=0.003, spike_range=1.0, tick_spike=True, three_up=False)
+    history = [_bar(0, 100, 100), _bar(1, 100, 101), _bar(2, 101, 101), _bar(3, 101, 101.01)]
+    assert det.on_candles("AAPL", history) == []  # 과거 스파이크(1번 봉)는 재발행하지 않음
+    assert det.on_candles("AAPL", history + [_bar(4, 101, 102)])[0].bar_ts == history[-1].ts + timedelta(seconds=60)
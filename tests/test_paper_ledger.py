@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta
+
+import app.adapters.paper_ledger as paper_ledger_mod
+from app.adapters.paper_ledger import PaperLedger
+
+
+def test_recovers_from_snapshot_plus_tail(tmp_path, monkeypatch):
+    monkeypatch.setattr("app.adapters.paper_ledger.PAPER_LEDGER_SNAPSHOT_EVERY", 3)
+    led = PaperLedger(1_000_000, name="t", store_dir=str(tmp_path))
+    led.simulate_fill("o1", "AAPL", "buy", 10, 100.0)
+    led.simulate_fill("o2", "AAPL", "buy", 10, 110.0)
+    led.simulate_fill("o3", "MSFT", "buy", 5, 300.0)   # 스냅샷 (seq=3)
+    led.simulate_fill("o4", "AAPL", "sell", 5, 120.0)
+
+    again = PaperLedger(1_000_000, name="t", store_dir=str(tmp_path))
+    assert again.seq == 4
+    assert again.positions["AAPL"].quantity == 15
+    assert again.cash_usd == led.cash_usd
+    assert again.daily_pnl == led.daily_pnl
+    assert len(again.export_trades()) == 4
+
+
+def test_reset_is_logged_and_two_handles_converge(tmp_path):
+    a = PaperLedger(name="shared", store_dir=str(tmp_path))
+    b = PaperLedger(name="shared", store_dir=str(tmp_path))
+    a.simulate_fill("o1", "NVDA", "buy", 2, 50.0)
+    b.simulate_fill("o2", "NVDA", "sell", 1, 55.0)   # a의 체결 따라잡은 뒤 기록
+    assert b.positions["NVDA"].quantity == 1
+    b.reset_daily()
+    a.refresh()
+    assert a.daily_trades == 0 and a.positions["NVDA"].quantity == 1
+
+
+def test_compaction_rotates_segments_and_prunes_old_ones(tmp_path, monkeypatch):
+    monkeypatch.setattr(paper_ledger_mod, "PAPER_LEDGER_COMPACT_BYTES", 600)
+    monkeypatch.setattr(paper_ledger_mod, "PAPER_LEDGER_KEEP_SEGMENTS", 2)
+    a = PaperLedger(name="c", store_dir=str(tmp_path))
+    b = PaperLedger(name="c", store_dir=str(tmp_path))     # 압축을 모르는 다른 핸들
+    for i in range(12):
+        a.simulate_fill(f"o{i}", "AAPL", "buy", 1, 100.0 + i)
+    b.simulate_fill("o12", "AAPL", "sell", 2, 120.0)        # 새 세그먼트/스냅샷으로 따라잡음
+
+    gens = [g for g, _ in a._log.segments()]
+    assert a._gen >= 3 and gens == [b._gen - 1, b._gen]      # 보존 개수만 남음
+    assert b.seq == 13 and b.positions["AAPL"].quantity == 10
+
+    again = PaperLedger(name="c", store_dir=str(tmp_path))
+    assert again.seq == 13 and again.cash_usd == b.cash_usd
+    assert len(again.export_trades()) < 13                  # 정리된 세그먼트는 내보내지 않음
+    assert again.export_trades(since=datetime.now() + timedelta(hours=1)) == []
+
+
+def test_persistence_is_off_without_a_configured_dir(monkeypatch):
+    monkeypatch.setattr(paper_ledger_mod, "PAPER_LEDGER_DIR", "")
+    assert PaperLedger()._log is None
+    assert PaperLedger(persist=True)._log is None
@@ -0,0 +1,162 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+from app.io.bar_aggregator import BarAggregator
+from app.io.fake_feed import LocalFeedServer
+from app.io.last_price import LastPriceService
+from app.io.quotes_delayed import Candle
+from app.io.quotes_stream import (RedisBarPublisher, StreamBarBuilder, StreamBarReader, StreamingQuotesIngestor,
+                                  build_feed_source)
+
+T0 = datetime(2026, 10, 16, 14, 0, tzinfo=timezone.utc)
+
+
+def _wait(cond, timeout=5.0):
+    end = time.time() + timeout
+    while time.time() < end:
+        if cond():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_builder_rolls_trades_into_bars_and_ignores_late_prints():
+    b = StreamBarBuilder(bar_sec=60)
+    b.on_trade("AAPL", T0 + timedelta(seconds=1), 100.0, 10)
+    b.on_trade("AAPL", T0 + timedelta(seconds=20), 101.0, 5)
+    b.on_trade("AAPL", T0 + timedelta(seconds=40), 99.5, 5)
+    assert [(c.o, c.h, c.l, c.c, c.v) for c in b.drain()["AAPL"]] == [(100.0, 101.0, 99.5, 99.5, 20)]
+    b.on_trade("AAPL", T0 + timedelta(seconds=61), 99.8, 1)
+    assert not b.on_trade("AAPL", T0 + timedelta(seconds=59), 150.0, 1)  # 닫힌 봉 지연 체결
+    bars = b.drain()["AAPL"]
+    assert [c.ts for c in bars] == [T0, T0 + timedelta(minutes=1)]  # 완료 봉 확정본 + 진행 중 봉
+    assert bars[0].c == 99.5 and bars[-1].h == 99.8
+    assert b.drain() == {}
+
+
+def test_stream_subscribes_with_universe_and_backfills_gap_after_reconnect():
+    feed = LocalFeedServer().start()
+    agg, prices = BarAggregator(), LastPriceService()
+    backfills = []
+
+    def backfill(ticker, n):
+        backfills.append((ticker, n))
+        return [Candle(ticker, T0 - timedelta(minutes=k), 100, 100, 100, 100, 1) for k in range(3, 0, -1)]
+
+    hooked = []
+    ing = StreamingQuotesIngestor(build_feed_source(feed.url), bars=agg, backfill=backfill,
+                                  flush_sec=0.02, last_prices=prices, on_prices=hooked.append,
+                                  sleep=lambda s: time.sleep(0.05))
+    ing.set_universe(["AAPL", "MSFT"])
+    ing.start()
+    try:
+        assert _wait(lambda: feed.subscriptions() == {"AAPL", "MSFT"})
+        assert sorted(backfills) == [("AAPL", 200), ("MSFT", 200)]  # 버퍼 없음 → 워밍업 분량
+
+        sent_at = time.time()
+        feed.trade("AAPL", 101.5, ts=T0 + timedelta(seconds=5))
+        feed.trade("NVDA", 999.0, ts=T0 + timedelta(seconds=5))  # 미구독
+        assert _wait(lambda: prices.get("AAPL", fetch=False) == 101.5)
+        assert time.time() - sent_at < 1.0
+        assert _wait(lambda: {"AAPL": 101.5} in hooked)      # 페이퍼 트리거 훅도 플러시마다 호출
+        assert agg.get_bars("AAPL", 60, 1)[0].c == 101.5 and agg.get_bars("AAPL", 60, 5)[0].ts == T0 - timedelta(minutes=3)
+        assert ing.covers("AAPL") and not ing.covers("NVDA")
+
+        # 유니버스 축소 → 차분 구독 해지
+        ing.set_universe(["AAPL"])
+        assert _wait(lambda: feed.subscriptions() == {"AAPL"})
+
+        # 끊김 → 재연결 + 재구독, 마지막 반영 이후 공백만 백필
+        backfills.clear()
+        agg._last_ingest["AAPL"] -= 600
+        feed.drop_clients()
+        assert _wait(lambda: ing.stats["reconnects"] == 1 and feed.subscriptions() == {"AAPL"})
+        assert backfills == [("AAPL", 13)]  # ceil(600s+α / 60) + 2
+        feed.trade("AAPL", 102.0, ts=T0 + timedelta(seconds=70))
+        assert _wait(lambda: prices.get("AAPL", fetch=False) == 102.0)
+    finally:
+        ing.stop()
+        feed.stop()
+    assert not ing.connected
+
+
+class _FakeRedis:
+    """리스트/해시/문자열 명령만 지원하는 최소 인메모리 Redis (bytes 응답)"""
+
+    def __init__(self):
+        self.kv, self.h, self.lists = {}, {}, {}
+
+    def pipeline(self, transaction=True):
+        return _Pipe(self)
+
+    def set(self, key, value, ex=None):
+        self.kv[key] = str(value).encode()
+
+    def get(self, key):
+        return self.kv.get(key)
+
+    def delete(self, key):
+        self.lists.pop(key, None)
+
+    def expire(self, *a):
+        pass
+
+    def rpush(self, key, *values):
+        self.lists.setdefault(key, []).extend(v.encode() for v in values)
+
+    def lset(self, key, index, value):
+        self.lists[key][index] = value.encode()
+
+    def ltrim(self, key, start, end):
+        rows = self.lists.get(key, [])
+        self.lists[key] = rows[start:] if end == -1 else rows[start:end + 1]
+
+    def lrange(self, key, start, end):
+        rows = self.lists.get(key, [])
+        return rows[start:] if end == -1 else rows[start:end + 1]
+
+    def hset(self, key, mapping):
+        self.h.setdefault(key, {}).update({k: str(v).encode() for k, v in mapping.items()})
+
+    def hgetall(self, key):
+        return {k.encode(): v for k, v in self.h.get(key, {}).items()}
+
+    def hmget(self, key, fields):
+        return [self.h.get(key, {}).get(f) for f in fields]
+
+
+class _Pipe:
+    def __init__(self, r):
+        self.r, self.ops = r, []
+
+    def __getattr__(self, name):
+        return lambda *a, **k: self.ops.append((name, a, k))
+
+    def execute(self):
+        return [getattr(self.r, n)(*a, **k) for n, a, k in self.ops]
+
+
+def test_worker_reads_stream_service_bars_through_redis():
+    now = [1000.0]
+    r = _FakeRedis()
+    reader_agg = BarAggregator()
+    reader = StreamBarReader(r, bars=reader_agg, stale_sec=90, clock=lambda: now[0])
+    assert reader.sync(["aapl", "MSFT"]) == []                     # 서비스 미기동 → 전부 폴링
+    pub = RedisBarPublisher(r, clock=lambda: now[0])
+    assert pub.wanted() == ["AAPL", "MSFT"]                        # 워커가 기록한 구독 종목을 서비스가 따름
+
+    warm = [Candle("AAPL", T0 - timedelta(minutes=k), 100, 100, 100, 100, 1) for k in range(3, 0, -1)]
+    pub.replace("AAPL", warm)
+    b = StreamBarBuilder(bar_sec=60)
+    b.on_trade("AAPL", T0 + timedelta(seconds=5), 101.0, 10)
+    pub.publish(b.drain())
+    b.on_trade("AAPL", T0 + timedelta(seconds=30), 101.5, 5)      # 진행 중 봉 갱신 → 마지막 원소 교체
+    pub.publish(b.drain())
+    pub.status(True, now[0], ["AAPL", "MSFT"])
+
+    assert reader.sync(["AAPL", "MSFT"]) == ["AAPL"]               # MSFT는 반영 기록 없음 → 폴링
+    bars = reader_agg.get_bars("AAPL", 60, 10)
+    assert [c.ts for c in bars] == [c.ts for c in warm] + [T0] and bars[-1].c == 101.5 and bars[-1].v == 15
+
+    now[0] += 120                                                  # 서비스 무수신 → 폴링 폴백
+    assert reader.sync(["AAPL"]) == []
@@ -0,0 +1,142 @@
+from app.io.recent_signals import DATA_KEY, RecentSignalStore, index_key
+
+
+def _score(bound):
+    if bound in ("-inf", "+inf"):
+        return float(bound)
+    return float(bound.lstrip("(")) if isinstance(bound, str) else float(bound)
+
+
+def _in(s, lo, hi):
+    lo_ok = s > _score(lo) if str(lo).startswith("(") else s >= _score(lo)
+    hi_ok = s < _score(hi) if str(hi).startswith("(") else s <= _score(hi)
+    return lo_ok and hi_ok
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.h, self.z, self.s, self.reads = {}, {}, {}, 0
+
+    def pipeline(self, transaction=False):
+        return _Pipe(self)
+
+    def hset(self, key, field, value):
+        self.h.setdefault(key, {})[field.encode()] = value
+
+    def hmget(self, key, fields):
+        self.reads += 1
+        return [self.h.get(key, {}).get(f.encode()) for f in fields]
+
+    def hdel(self, key, *fields):
+        for f in fields:
+            self.h.get(key, {}).pop(f if isinstance(f, bytes) else f.encode(), None)
+
+    def sadd(self, key, *members):
+        self.s.setdefault(key, set()).update(m.encode() for m in members)
+
+    def smembers(self, key):
+        return set(self.s.get(key, set()))
+
+    def zadd(self, key, mapping):
+        self.z.setdefault(key, {}).update({m.encode(): s for m, s in mapping.items()})
+
+    def _sorted(self, key, reverse=False):
+        return sorted(self.z.get(_text(key), {}).items(), key=lambda kv: kv[1], reverse=reverse)
+
+    def zrevrange(self, key, start, stop):
+        return [m for m, _ in self._sorted(key, reverse=True)[start:stop + 1]]
+
+    def zrangebyscore(self, key, lo, hi):
+        return [m for m, s in self._sorted(key) if _in(s, lo, hi)]
+
+    def zrevrangebyscore(self, key, hi, lo, start=0, num=None):
+        rows = [m for m, s in self._sorted(key, reverse=True) if _in(s, lo, hi)]
+        return rows[start:start + num] if num is not None else rows[start:]
+
+    def zremrangebyscore(self, key, lo, hi):
+        key = _text(key)
+        self.z[key] = {m: s for m, s in self.z.get(key, {}).items() if not _in(s, lo, hi)}
+
+
+def _text(v):
+    return v.decode() if isinstance(v, bytes) else v
+
+
+class _Pipe:
+    def __init__(self, r):
+        self.r, self.ops = r, []
+
+    def __getattr__(self, name):
+        return lambda *a, **k: self.ops.append((name, a, k))
+
+    def execute(self):
+        return [getattr(self.r, n)(*a, **k) for n, a, k in self.ops]
+
+
+T0 = 1_760_000_000.0
+
+
+def _store(now, **kw):
+    return RecentSignalStore(redis_client=_FakeRedis(), clock=lambda: now[0], **kw)
+
+
+def _signal(ticker, signal_type, suppressed=None):
+    return {"ticker": ticker, "signal_type": signal_type, "score": 0.3, "suppressed_reason": suppressed}
+
+
+def test_cursor_pages_cover_filters_without_duplicates_or_gaps():
+    now = [T0]
+    store = _store(now, trim_every=1000)
+    rows = []
+    for i in range(23):
+        now[0] = T0 + i
+        sig = _signal(["AAPL", "MSFT"][i % 2], ["long", "short", "long"][i % 3], "cooldown" if i % 5 == 0 else None)
+        store.record(sig)
+        rows.append(sig)
+
+    seen, cursor = [], None
+    while True:
+        items, cursor = store.page(include_suppressed=True, cursor=cursor, limit=5)
+        seen += items
+        if cursor is None:
+            break
+    assert len(seen) == 23 and len({s["id"] for s in seen}) == 23
+    assert [int(s["id"]) for s in seen] == sorted((int(s["id"]) for s in seen), reverse=True)
+
+    emitted, _ = store.page(limit=100)
+    assert len(emitted) == 23 - 5 and all(not s["suppressed_reason"] for s in emitted)
+
+    # 종목 + 액션 동시 지정: 종목 인덱스에서 페이지 내 필터, 페이지 경계에서도 누락 없음
+    expected = [s for s in reversed(rows) if s["ticker"] == "AAPL" and s["signal_type"] == "long"]
+    got, cursor = [], None
+    while True:
+        items, cursor = store.page(ticker="aapl", action="LONG", include_suppressed=True, cursor=cursor, limit=2)
+        got += items
+        if cursor is None:
+            break
+    assert [s["id"] for s in got] == [s["id"] for s in store.page(ticker="AAPL", include_suppressed=True,
+                                                                       limit=100)[0] if s["signal_type"] == "long"]
+    assert len(got) == len(expected)
+
+    # 시간 범위 (since/until, epoch 초)
+    window, _ = store.page(include_suppressed=True, since=T0 + 10, until=T0 + 12, limit=100)
+    assert len(window) == 3
+
+
+def test_trim_bounds_depth_and_age_across_all_indexes():
+    now = [T0]
+    store = _store(now, depth=10, max_age_sec=3600, trim_every=4)
+    for i in range(20):
+        now[0] = T0 + i
+        store.record(_signal("NVDA", "long"))
+    r = store.redis
+    assert 10 <= len(r.z[index_key()]) < 14                     # 4건마다 정리 → 최대 depth + trim_every - 1
+    store.trim()
+    assert len(r.z[index_key()]) == 10 and len(r.h[DATA_KEY]) == 10
+    assert len(r.z[index_key(ticker="NVDA", emitted_only=True)]) == 10
+
+    now[0] = T0 + 3600 + 15                                     # 15초 이전 항목은 보존 기간 밖
+    assert store.trim() == 5
+    items, cursor = store.page(limit=100)
+    assert len(items) == 5 and cursor is None
+    assert all(len(z) == 5 for z in r.z.values())
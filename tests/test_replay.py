@@ -0,0 +1,167 @@
+import fnmatch
+import os
+from datetime import datetime, timezone
+
+import app.adapters.trading_adapter as trading_adapter_mod
+import app.io.replay as replay_mod
+from app.io.quotes_delayed import Candle
+from app.io.replay import ReplayDriver, StreamCapture, load_capture
+from app.jobs import scheduler
+from app.utils.market_clock import get_market_clock
+
+
+def _key(mid):
+    ms, _, seq = mid.partition("-")
+    return int(ms), int(seq or 0)
+
+
+class _FakeRedis:
+    """스트림 명령만 지원하는 최소 인메모리 Redis"""
+
+    def __init__(self):
+        self.streams, self.kv = {}, {}
+
+    def scan_iter(self, match="*", count=None):
+        return [k for k in list(self.streams) + list(self.kv) if fnmatch.fnmatch(k, match)]
+
+    def exists(self, key):
+        return int(key in self.streams)
+
+    def delete(self, *keys):
+        for k in keys:
+            self.streams.pop(k, None)
+            self.kv.pop(k, None)
+
+    def xadd(self, key, fields, id="*"):
+        rows = self.streams.setdefault(key, [])
+        assert not rows or _key(id) > _key(rows[-1][0]), "ID 역순 XADD"
+        rows.append((id, dict(fields)))
+        return id
+
+    def xrange(self, key, min="-", max="+", count=None):
+        rows = self.streams.get(key, [])
+        if min.startswith("("):
+            rows = [r for r in rows if _key(r[0]) > _key(min[1:])]
+        return [(m.encode(), {k.encode(): str(v).encode() for k, v in f.items()}) for m, f in rows[:count]]
+
+    def pipeline(self, transaction=False):
+        redis = self
+
+        class _Pipe:
+            def __init__(self):
+                self.ops = []
+
+            def xadd(self, *a, **k):
+                self.ops.append((a, k))
+
+            def execute(self):
+                return [redis.xadd(*a, **k) for a, k in self.ops]
+
+        return _Pipe()
+
+
+class _Ingestor:
+    tickers = ["AAPL"]
+
+    def get_latest_candles(self, ticker, n=50):
+        return [Candle(ticker, datetime.fromtimestamp(1_700_000_000 + 60 * i, tz=timezone.utc),
+                       100 + i, 101 + i, 99 + i, 100.5 + i, 1000) for i in range(3)]
+
+
+def _seed(r):
+    base = 1_700_000_000_000
+    for i in range(4):
+        r.xadd("quotes.XNAS.AAPL", {"price": 100 + i}, id=f"{base + 30_000 * i}-0")
+    r.xadd("signals.raw", {"ticker": "AAPL", "score": "0.7"}, id=f"{base + 45_000}-0")
+    r.xadd("orders.submitted", {"ticker": "AAPL"}, id=f"{base + 60_000}-0")
+    r.xadd("risk.pnl", {"x": 1}, id=f"{base}-0")  # 캡처 대상 아님
+
+
+def test_capture_is_incremental_and_compact(tmp_path):
+    r = _FakeRedis()
+    _seed(r)
+    cap = StreamCapture(r, str(tmp_path), quotes_ingestor=_Ingestor())
+    assert cap.snapshot() == {"entries": 6, "candles": 3}
+    r.xadd("news.edgar", {"form": "8-K"}, id="1700000090000-0")
+    assert cap.snapshot() == {"entries": 1, "candles": 0}  # 이미 기록한 엔트리/봉은 건너뜀
+    cap.close()
+
+    entries, candles = load_capture(str(tmp_path))
+    assert [e[0] for e in entries][:2] == ["quotes.XNAS.AAPL", "quotes.XNAS.AAPL"]
+    assert all(e[0] != "risk.pnl" for e in entries) and len(entries) == 7
+    assert [c.c for c in candles["AAPL"]] == [100.5, 101.5, 102.5]
+
+
+def test_replay_reinjects_on_virtual_clock_and_runs_tasks(tmp_path):
+    src = _FakeRedis()
+    _seed(src)
+    cap = StreamCapture(src, str(tmp_path), quotes_ingestor=_Ingestor())
+    cap.snapshot()
+    cap.close()
+
+    dst = _FakeRedis()
+    dst.streams["signals.raw"] = [("1-0", {"stale": "1"})]
+    seen = []
+    driver = ReplayDriver(str(tmp_path), dst, speed=0.0, tasks={
+        "generate_signals": (30.0, lambda: seen.append(("gen", driver.clock.now,
+                                                        len(driver.ingestor.get_latest_candles("AAPL"))))),
+        "pipeline_e2e": (15.0, lambda: seen.append(("e2e", driver.clock.now, None))),
+    })
+    summary = driver.run()
+
+    # 녹화 signals.raw는 재생성 모드에서 제외, 나머지는 원본 ID 그대로 재주입
+    assert "signals.raw" not in dst.streams
+    assert [m for m, _ in dst.streams["quotes.XNAS.AAPL"]] == [m for m, _ in src.streams["quotes.XNAS.AAPL"]]
+    # 가상 시각까지의 캔들만 보임
+    gens = [s for s in seen if s[0] == "gen"]
+    assert gens[0][1] == 1_700_000_030 and gens[0][2] == 1
+    assert summary["events"] == 5
+    assert summary["tasks"]["pipeline_e2e"]["runs"] == 8 and summary["tasks"]["generate_signals"]["runs"] == 4
+
+
+def test_default_tasks_run_with_full_components_virtual_clock_and_clean_state(tmp_path, monkeypatch):
+    src = _FakeRedis()
+    _seed(src)
+    cap = StreamCapture(src, str(tmp_path), quotes_ingestor=_Ingestor())
+    cap.snapshot()
+    cap.close()
+
+    dst = _FakeRedis()
+    dst.kv.update({"dailycap:20231114:RTH:AAPL": 1, "cooldown:AAPL": 1, "dirlock:AAPL": "long", "keep": 1})
+    monkeypatch.setenv("AUTO_INIT_COMPONENTS", "true")
+    monkeypatch.setenv("BROKER", "alpaca_paper")                # 운영 기본값이어도 실제 주문 금지
+    monkeypatch.setattr(trading_adapter_mod, "_trading_adapter", "real-broker")
+    seen, orders = [], []
+
+    def _autoinit():
+        if os.environ["AUTO_INIT_COMPONENTS"] == "true":
+            scheduler.trading_components.update(quotes_ingestor="real", regime_detector="rd", slack_bot="slack")
+
+    monkeypatch.setattr(scheduler, "_autoinit_components_if_enabled", _autoinit)
+
+    def _task():
+        seen.append((dict(scheduler.trading_components), os.environ["AUTO_INIT_COMPONENTS"],
+                     get_market_clock().now().timestamp(), driver.clock.now))
+        scheduler._ensure_components_before_task()              # prerun 훅이 어댑터를 되돌리지 않음
+        adapter = trading_adapter_mod.get_trading_adapter()
+        orders.append((adapter is driver.broker, os.environ["BROKER"], adapter.submit_market_order("AAPL", "buy", 1),
+                       adapter.now.timestamp(), adapter.get_current_price("AAPL")))
+
+    monkeypatch.setattr(replay_mod, "_default_tasks", lambda: {"generate_signals": (30.0, _task)})
+    before = dict(scheduler.trading_components)
+    driver = ReplayDriver(str(tmp_path), dst, speed=0.0)
+    driver.run()
+
+    assert len(seen) == 4 and all(c["quotes_ingestor"] is driver.ingestor for c, *_ in seen)
+    components, auto, market_now, virtual_now = seen[0]
+    assert components["quotes_ingestor"] is driver.ingestor and components["regime_detector"] == "rd"
+    assert components["slack_bot"] is None and auto == "false" and market_now == virtual_now
+    assert set(dst.kv) == {"keep"}
+    # 종료 후 원복
+    assert scheduler.trading_components == before and os.environ["AUTO_INIT_COMPONENTS"] == "true"
+    assert not isinstance(get_market_clock(), replay_mod.ReplayMarketClock)
+    # 브로커: 시뮬레이터 고정, 가상 시계를 따라 캡처 캔들 봉 진행
+    assert all(is_sim and broker == "sim" and trade.meta["simulated"] for is_sim, broker, trade, *_ in orders)
+    assert [(t, px) for *_, t, px in orders][:3] == [(1_700_000_000, 100.5), (1_700_000_060, 101.5),
+                                                    (1_700_000_060, 101.5)]
+    assert trading_adapter_mod._trading_adapter == "real-broker" and os.environ["BROKER"] == "alpaca_paper"
@@ -0,0 +1,109 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from app.engine.return_sketch import ReturnRecorder, ReturnSketch, sketch_key, var_key
+from app.io.quotes_delayed import Candle
+from app.engine.risk import rolling_var95
+
+
+def test_sketch_var_matches_exact_percentile_within_alpha():
+    rnd = random.Random(7)
+    rets = [rnd.gauss(0.0002, 0.004) for _ in range(5000)]
+    sk = ReturnSketch(alpha=0.02)
+    for x in rets:
+        sk.add(x)
+
+    exact = rolling_var95(rets)
+    var95, cvar95 = sk.var_cvar(0.95)
+    assert abs(var95 - exact) <= 0.03 * exact
+    tail = sorted(rets)[: int(np.ceil(0.05 * len(rets)))]
+    assert abs(cvar95 - abs(np.mean(tail))) <= 0.03 * abs(np.mean(tail))
+
+
+def test_sketch_merge_and_hash_roundtrip():
+    a, b = ReturnSketch(), ReturnSketch()
+    for x in (-0.01, -0.002, 0.0, 0.003):
+        a.add(x)
+    for x in (-0.02, 0.004):
+        b.add(x)
+    merged = ReturnSketch().merge(a).merge(b)
+    assert merged.count == 6
+
+    h = {b"count": b"6"}
+    for x in (-0.01, -0.002, 0.0, 0.003, -0.02, 0.004):
+        f = merged.bucket_field(x).encode()
+        h[f] = str(int(h.get(f, b"0")) + 1).encode()
+    restored = ReturnSketch.from_hash(h)
+    assert restored.count == 6
+    assert restored.quantile(0.0) == merged.quantile(0.0) < -0.019
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.kv, self.h = {}, {}
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.kv:
+            return None
+        self.kv[key] = value
+        return True
+
+    def pipeline(self, transaction=False):
+        return _Pipe(self)
+
+    def hincrby(self, key, field, n):
+        h = self.h.setdefault(key, {})
+        h[field] = h.get(field, 0) + n
+        return h[field]
+
+    hincrbyfloat = hincrby
+
+    def expire(self, *a):
+        pass
+
+    def mget(self, keys):
+        return [self.kv.get(k) for k in keys]
+
+
+class _Pipe:
+    def __init__(self, r):
+        self.r, self.ops = r, []
+
+    def __getattr__(self, name):
+        return lambda *a, **k: self.ops.append((name, a, k))
+
+    def execute(self):
+        return [getattr(self.r, n)(*a, **k) for n, a, k in self.ops]
+
+
+def test_record_bar_uses_closed_bar_once_across_processes():
+    t0 = datetime(2026, 10, 16, 14, 30, tzinfo=timezone.utc)
+    bars = [Candle("AAPL", t0 + timedelta(seconds=30 * i), 1, 1, 1, c, 100) for i, c in enumerate((100.0, 101.0, 99.0))]
+    shared = _FakeRedis()
+    first, restarted = ReturnRecorder(), ReturnRecorder()      # 워커 재활용 전후 / 다른 프로세스
+    first._r = restarted._r = shared
+    partial_now = bars[-1].ts.timestamp() + 10                  # 마지막 봉 진행 중
+
+    assert first.record_bar("AAPL", "trend", bars, bar_sec=30, now=partial_now)
+    assert not restarted.record_bar("AAPL", "trend", bars, bar_sec=30, now=partial_now)
+    assert not first.record_bar("AAPL", "trend", bars)          # bar_sec 모름 → 직전 봉(이미 기록)
+    key = sketch_key("AAPL", "trend")
+    assert shared.h[key]["count"] == 1 and abs(shared.h[key]["sum"] - 0.01) < 1e-12   # 101/100, 부분 봉 99 제외
+
+    assert restarted.record_bar("AAPL", "trend", bars, bar_sec=30, now=partial_now + 30)  # 봉 마감 후
+    assert shared.h[key]["count"] == 2
+
+
+def test_var_sizing_falls_back_to_signal_symbol_sketch(monkeypatch):
+    from app.jobs import scheduler
+    monkeypatch.setattr(scheduler, "FRACTIONAL_ENABLED", False)
+    monkeypatch.setattr(scheduler, "VAR_SIZING_REF", 0.003)
+    r = _FakeRedis()
+    r.kv[var_key("QQQ", "trend")] = '{"var95": 0.006}'           # 신호 종목만 닫힌 봉 스케치 보유
+
+    assert scheduler.apply_var_sizing(10, "SQQQ", "trend", r) == 10                     # 폴백 없음 → 생략
+    assert scheduler.apply_var_sizing(10, "SQQQ", "trend", r, signal_symbol="QQQ") == 5
+    r.kv[var_key("SQQQ", "trend")] = '{"var95": 0.004}'          # 체결 종목 스케치가 생기면 그쪽 우선
+    assert scheduler.apply_var_sizing(10, "SQQQ", "trend", r, signal_symbol="QQQ") == 8
@@ -0,0 +1,52 @@
+import random
+
+from app.engine.return_sketch import ReturnSketch
+from app.engine.risk import RiskEngine, rolling_var95
+
+
+def _engine_with_history(n, seed=3):
+    eng = RiskEngine(initial_capital=1_000_000)
+    rnd = random.Random(seed)
+    for _ in range(n):
+        eng._update_returns_history(rnd.gauss(0.0, 0.002) * eng.initial_capital)
+    return eng
+
+
+def _query_work(eng, monkeypatch, reps=5):
+    """조회 경로가 훑는 스케치 버킷 수 (시간 대신 작업량으로 측정)"""
+    visited = [0]
+    orig = ReturnSketch._ascending
+
+    def _counting(self):
+        for item in orig(self):
+            visited[0] += 1
+            yield item
+
+    monkeypatch.setattr(ReturnSketch, "_ascending", _counting)
+    for _ in range(reps):
+        eng.can_trade("AAPL", "buy", 1, 100.0)
+        eng.get_risk_report()
+    monkeypatch.setattr(ReturnSketch, "_ascending", orig)
+    return visited[0] / reps
+
+
+def test_local_var_tracks_exact_percentile(monkeypatch):
+    monkeypatch.delenv("REDIS_URL", raising=False)
+    eng = RiskEngine(initial_capital=1_000_000)
+    rnd = random.Random(11)
+    rets = [rnd.gauss(0.0, 0.002) for _ in range(3000)]
+    for r in rets:
+        eng._update_returns_history(r * eng.initial_capital)
+    assert eng.shared is None
+    assert abs(eng.calculate_var() - rolling_var95(rets)) <= 0.03 * rolling_var95(rets)
+    assert eng.get_risk_report()["cvar_95"] >= eng.get_risk_report()["var_95"]
+
+
+def test_query_work_is_flat_in_history_length(monkeypatch):
+    monkeypatch.delenv("REDIS_URL", raising=False)
+    short = _engine_with_history(1_000)
+    long = _engine_with_history(200_000)
+    n_buckets = len(long.returns_sketch.pos) + len(long.returns_sketch.neg) + 1
+    # 이력 200배에도 조회 작업량은 버킷 수(로그 스케일) 이내
+    assert _query_work(long, monkeypatch) <= 4 * n_buckets
+    assert _query_work(long, monkeypatch) < 2 * _query_work(short, monkeypatch)
@@ -0,0 +1,185 @@
+import time
+
+import pytest
+
+from app.engine.return_sketch import ReturnRecorder
+from app.engine.risk import RiskEngine, RiskStatus
+from app.io.codec import MsgpackCodec, encode_stream_fields
+from app.engine.risk_state import (DAY_KEY_PREFIX, FILLS_CURSOR_KEY, FILLS_STREAM, POSITIONS_KEY,
+                                   RISK_RECONCILE_GRACE_SEC, SharedRiskState)
+
+
+class _Crash(BaseException):
+    """프로세스 강제 종료 흉내 (except Exception에 잡히지 않음)"""
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.kv, self.h, self.streams, self.crash_on = {}, {}, {}, None
+        self.transactions = []
+
+    def pipeline(self, transaction=True):
+        return _Pipe(self, transaction)
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.kv:
+            return None
+        self.kv[key] = str(value).encode()
+        return True
+
+    def get(self, key):
+        return self.kv.get(key)
+
+    def delete(self, key):
+        self.kv.pop(key, None)
+
+    def mget(self, keys):
+        return [self.kv.get(k) for k in keys]
+
+    def hget(self, key, field):
+        return self.h.get(key, {}).get(field)
+
+    def hset(self, key, field=None, value=None, mapping=None):
+        self.h.setdefault(key, {}).update(mapping or {field: value})
+
+    def hdel(self, key, *fields):
+        for f in fields:
+            self.h.get(key, {}).pop(f, None)
+
+    def hgetall(self, key):
+        return dict(self.h.get(key, {}))
+
+    def hkeys(self, key):
+        return list(self.h.get(key, {}))
+
+    def hincrby(self, key, field, n):
+        h = self.h.setdefault(key, {})
+        h[field] = h.get(field, 0) + n
+        return h[field]
+
+    def hincrbyfloat(self, key, field, n):
+        h = self.h.setdefault(key, {})
+        h[field] = float(h.get(field, 0)) + n
+        return h[field]
+
+    def expire(self, *a):
+        pass
+
+    def xadd(self, stream, fields):
+        entries = self.streams.setdefault(stream, [])
+        mid = f"{1000 + len(entries)}-0"
+        entries.append((mid.encode(), {k.encode(): str(v).encode() for k, v in fields.items()}))
+        return mid
+
+    def xadd_raw(self, stream, fields):
+        """바이너리 코덱으로 인코딩된 필드를 그대로 적재 (bytes 클라이언트가 받는 형태)"""
+        entries = self.streams.setdefault(stream, [])
+        mid = f"{1000 + len(entries)}-0"
+        entries.append((mid.encode(), {k.encode(): v for k, v in fields.items()}))
+        return mid
+
+    def xrange(self, stream, min, max, count=None):
+        lo = int(min.lstrip("(").split("-")[0])
+        return [(i, f) for i, f in self.streams.get(stream, []) if int(i.split(b"-")[0]) > lo][:count]
+
+
+class _Pipe:
+    def __init__(self, r, transaction):
+        self.r, self.transaction, self.ops = r, transaction, []
+
+    def __getattr__(self, name):
+        return lambda *a, **k: self.ops.append((name, a, k))
+
+    def execute(self):
+        if self.transaction:
+            if self.r.crash_on is not None and any(a[-1:] == (self.r.crash_on,) for _, a, _ in self.ops):
+                raise _Crash()
+            self.r.transactions.append([n for n, _, _ in self.ops])
+        return [getattr(self.r, n)(*a, **k) for n, a, k in self.ops]
+
+
+def _state():
+    r = _FakeRedis()
+    recorder = ReturnRecorder()
+    recorder._r = r
+    state = SharedRiskState(initial_capital=100_000, recorder=recorder)
+    state._r = r
+    return state, r
+
+
+def _day(r):
+    return next(v for k, v in r.h.items() if k.startswith(DAY_KEY_PREFIX))
+
+
+def test_fill_and_cursor_commit_together_across_a_crash():
+    state, r = _state()
+    r.xadd(FILLS_STREAM, {"ticker": "AAPL", "side": "buy", "quantity": 10, "price": 100})
+    second = r.xadd(FILLS_STREAM, {"ticker": "AAPL", "side": "sell", "quantity": 4, "price": 110})
+
+    r.crash_on = second                                       # 두 번째 체결 MULTI 직전 종료
+    with pytest.raises(_Crash):
+        state.consume_fills()
+    assert r.get(FILLS_CURSOR_KEY) == b"1000-0" and _day(r)["trades"] == 1
+
+    r.crash_on = None
+    r.delete("risk:state:fills_lock")                         # 죽은 프로세스의 락은 TTL로 풀림
+    assert state.consume_fills() == 1 and state.consume_fills() == 0
+    assert _day(r)["trades"] == 2 and _day(r)["realized_pnl"] == 40.0
+    assert "set" in r.transactions[-1]                        # 상태 갱신과 커서가 같은 MULTI
+
+
+def test_reconcile_drops_broker_closed_positions_after_confirmation():
+    state, r = _state()
+    r.xadd(FILLS_STREAM, {"ticker": "AAPL", "side": "buy", "quantity": 10, "price": 100})
+    r.xadd(FILLS_STREAM, {"ticker": "MSFT", "side": "buy", "quantity": 5, "price": 200})
+    r.xadd(FILLS_STREAM, {"ticker": "NVDA", "side": "buy", "quantity": 2, "price": 50})
+    state.consume_fills()
+    state.mark_prices({"AAPL": 95.0})
+    later = time.time() + RISK_RECONCILE_GRACE_SEC + 1
+
+    broker = {"MSFT": {"quantity": 3, "current_price": 210.0}, "NVDA": {"quantity": 2, "current_price": 51.0}}
+    assert state.reconcile(broker, now=later) == {"MSFT": 20.0}      # 부분 청산은 즉시, AAPL은 재확인 대기
+    assert state.reconcile(broker, now=later) == {"AAPL": -50.0}     # SL 청산 추정 (마지막 마크 가격)
+    assert set(r.h[POSITIONS_KEY]) == {"MSFT", "NVDA"}
+    assert state.snapshot(max_age=0).positions["MSFT"]["quantity"] == 3
+    assert _day(r)["realized_pnl"] == -30.0 and _day(r)["reconciled_exits"] == 2
+    assert state.reconcile(broker, now=later) == {}
+
+
+def test_binary_encoded_fills_round_trip_through_consume_fills():
+    state, r = _state()
+    codec = MsgpackCodec()
+    r.xadd_raw(FILLS_STREAM, encode_stream_fields({"ticker": "AAPL", "side": "buy", "quantity": 10, "price": 100.0}, codec))
+    r.xadd(FILLS_STREAM, {"ticker": "AAPL", "side": "sell", "quantity": 4, "price": 110})   # 기존 문자열 엔트리 혼재
+    assert state.consume_fills() == 2
+    assert r.get(FILLS_CURSOR_KEY) == b"1001-0"
+    assert _day(r)["trades"] == 2 and _day(r)["realized_pnl"] == 40.0
+    assert state.snapshot(max_age=0).positions["AAPL"]["quantity"] == 6
+
+
+def test_price_drop_without_fill_raises_shared_daily_loss(monkeypatch):
+    from app.jobs import scheduler
+
+    class _Prices:
+        def __init__(self, px):
+            self.px = px
+
+        def get_many(self, tickers, **kw):
+            return {t: self.px[t] for t in tickers if t in self.px}
+
+    state, r = _state()
+    r.xadd(FILLS_STREAM, {"ticker": "AAPL", "side": "buy", "quantity": 100, "price": 100})
+    state.consume_fills()
+    engine, other = (RiskEngine(initial_capital=100_000, shared=state) for _ in range(2))   # 워커 / 다른 프로세스
+    monkeypatch.setitem(scheduler.trading_components, "risk_engine", engine)
+    monkeypatch.setattr("app.io.last_price.get_last_price_service", lambda: _Prices({"AAPL": 98.0}))
+
+    assert scheduler._mark_risk_positions(state) == 1
+    assert state.snapshot(max_age=0).unrealized_pnl == -200.0 and engine.status == RiskStatus.NORMAL
+
+    monkeypatch.setattr("app.io.last_price.get_last_price_service", lambda: _Prices({"AAPL": 60.0}))
+    scheduler._mark_risk_positions(state)                     # 새 체결 없이 -4% → 일일 한도 3% 초과
+    snap = state.snapshot(max_age=0)
+    assert snap.unrealized_pnl == -4000.0 and snap.total_exposure == 6000.0 and snap.trades == 1
+    assert engine.status == RiskStatus.SHUTDOWN
+    assert other.can_trade("MSFT", "buy", 1, 10.0)[0] is False   # 공유 스냅샷으로 다른 프로세스도 차단
@@ -0,0 +1,95 @@
+from app.engine.score_series import SCORE_LATEST_KEY, ScoreSeries, rollup_key
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.h, self.z, self.calls = {}, {}, []
+
+    def pipeline(self, transaction=False):
+        return _Pipe(self)
+
+    def hset(self, key, mapping):
+        self.h.setdefault(key, {}).update({(k.encode() if isinstance(k, str) else k): v for k, v in mapping.items()})
+
+    def hget(self, key, field):
+        return self.h.get(key, {}).get(field.encode())
+
+    def hgetall(self, key):
+        return dict(self.h.get(key, {}))
+
+    def hmget(self, key, fields):
+        return [self.h.get(key, {}).get(f.encode()) for f in fields]
+
+    def expire(self, *a):
+        pass
+
+    def zadd(self, key, mapping):
+        self.z.setdefault(key, {}).update(mapping)
+
+    def zremrangebyscore(self, key, lo, hi):
+        self.z[key] = {m: s for m, s in self.z.get(key, {}).items() if s > hi}
+
+    def zrangebyscore(self, key, lo, hi):
+        return [m for m, s in sorted(self.z.get(key, {}).items(), key=lambda kv: kv[1]) if lo <= s <= hi]
+
+
+class _Pipe:
+    def __init__(self, r):
+        self.r, self.ops = r, []
+
+    def __getattr__(self, name):
+        return lambda *a, **k: self.ops.append((name, a, k))
+
+    def execute(self):
+        self.r.calls.append(len(self.ops))
+        return [getattr(self.r, n)(*a, **k) for n, a, k in self.ops]
+
+
+T0 = 1_760_000_400.0  # 5분 경계
+
+
+def test_cycle_flush_is_one_pipeline_with_latest_raw_and_rollups():
+    now = [T0]
+    r = _FakeRedis()
+    series = ScoreSeries(redis_client=r, raw_retention_sec=300, clock=lambda: now[0])
+    for i, s in enumerate([0.1, 0.5, -0.2, 0.3]):            # 0,30,60,90초 → 1m 버킷 2개, 5m 버킷 1개
+        series.record("aapl", s, ts=T0 + 30 * i, signal_type="long")
+    series.record("MSFT", -0.4, ts=T0 + 30, signal_type="short")
+    now[0] = T0 + 100
+    assert series.flush() == 2 and len(r.calls) == 1          # 병합 조회 없이 파이프라인 1회
+
+    latest = series.latest()
+    assert set(latest) == {"AAPL", "MSFT"} and latest["AAPL"]["score"] == 0.3
+    assert series.latest(["msft", "NVDA"]) == {"MSFT": {"score": -0.4, "ts": T0 + 30, "signal_type": "short"}}
+
+    m5 = series.range("AAPL", T0, T0 + 299, resolution=300)
+    assert m5 == [{"ts": int(T0), "resolution": 300, "count": 4, "mean": 0.175, "min": -0.2, "max": 0.5, "last": 0.3}]
+    m1 = series.range("AAPL", T0, T0 + 119, resolution=60)
+    assert [(b["count"], b["last"]) for b in m1] == [(2, 0.5), (2, 0.3)]
+    assert len(r.h[rollup_key(60, "20251009")]) == 3           # AAPL 2 + MSFT 1
+    assert [p["score"] for p in series.range("AAPL", T0 + 50, T0 + 100)] == [-0.2, 0.3]  # auto: 짧은 구간은 원시
+
+    # 원시는 보존 기간 밖이면 잘려나감, 긴 구간 auto는 1m 롤업
+    now[0] = T0 + 500
+    series.record("AAPL", 0.9)
+    series.flush()
+    assert [p["score"] for p in series.range("AAPL", T0, T0 + 500, resolution=0)] == [0.9]
+    assert series.range("AAPL", T0 - 3600, T0 + 500)[-1] == \
+        {"ts": int(T0) + 480, "resolution": 60, "count": 1, "mean": 0.9, "min": 0.9, "max": 0.9, "last": 0.9}
+
+
+def test_restarted_writer_merges_bucket_opened_by_previous_process():
+    r = _FakeRedis()
+    first = ScoreSeries(redis_client=r, clock=lambda: T0 + 10)
+    first.record("AAPL", 0.2, ts=T0)
+    first.record("AAPL", 0.6, ts=T0 + 10)
+    first.flush()
+
+    second = ScoreSeries(redis_client=r, clock=lambda: T0 + 40)  # 워커 재활용 후 같은 1m 버킷
+    second.record("AAPL", -0.1, ts=T0 + 40)
+    second.flush()
+    second.record("AAPL", 0.4, ts=T0 + 50)
+    second.flush()
+    (b,) = second.range("AAPL", T0, T0 + 59, resolution=60)
+    assert (b["count"], b["min"], b["max"], b["last"]) == (4, -0.1, 0.6, 0.4)
+    assert SCORE_LATEST_KEY in r.h
@@ -0,0 +1,107 @@
+import json
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from openai import OpenAI
+
+import app.jobs.signal_validation as validation_mod
+from app.engine.llm_insight import LLMInsightEngine
+from app.engine.mixer import SignalType, TradingSignal
+from app.jobs.signal_validation import BatchValidationService
+
+
+def _signal(ticker, score=0.8, trigger="breakout"):
+    return TradingSignal(
+        ticker=ticker, signal_type=SignalType.LONG if score > 0 else SignalType.SHORT, score=score,
+        confidence=0.7, regime="trend", tech_score=0.8, sentiment_score=0.1, edgar_bonus=0.0,
+        trigger=trigger, summary="test", entry_price=100.0, stop_loss=98.0, take_profit=104.0,
+        horizon_minutes=60, timestamp=datetime.now(), meta={},
+    )
+
+
+def _engine(url, monkeypatch, cap_krw=80000.0):
+    monkeypatch.delenv("REDIS_URL", raising=False)
+    monkeypatch.setenv("LLM_MONTHLY_CAP_KRW", str(cap_krw))
+    engine = LLMInsightEngine(api_key="x")
+    engine.client = OpenAI(api_key="x", base_url=url, max_retries=0)
+    return engine
+
+
+@pytest.fixture
+def stub_server():
+    """로컬 OpenAI 호환 스텁: 프롬프트의 ID마다 결과 1개 (AAPL만 REJECT)"""
+    state = {"calls": 0, "hold": threading.Event()}
+    state["hold"].set()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            state["calls"] += 1
+            state["hold"].wait(5.0)
+            prompt = body["messages"][-1]["content"]
+            results = []
+            for block in prompt.split("\nID: ")[1:]:
+                sid = block.split("\n", 1)[0]
+                rejected = "종목: AAPL" in block
+                results.append({"id": sid, "verdict": "INVALID" if rejected else "VALID",
+                                "confidence_adjustment": 0.05, "risk_factors": ["고변동성"],
+                                "reason": "stub", "decision": "REJECT" if rejected else "PROCEED"})
+            payload = json.dumps({"choices": [{"message": {"content": json.dumps({"results": results})}}]})
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(payload.encode())
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/v1", state
+    server.shutdown()
+
+
+def test_one_call_per_cycle_and_per_signal_results(stub_server, monkeypatch):
+    url, state = stub_server
+    engine = _engine(url, monkeypatch)
+    svc = BatchValidationService(llm_engine=engine, deadline_sec=2.0)
+    results = svc.validate_batch([_signal("NVDA"), _signal("AAPL"), _signal("TSLA", score=0.1)])
+
+    assert state["calls"] == 1 and engine.monthly_cost_krw > 0    # 엔진 비용 집계 경유
+    assert results[0].should_proceed and not results[1].should_proceed
+    assert results[2] is None  # 약신호는 검증 대상 아님
+
+    # 동일 컨텍스트 재사용 → 추가 호출 없음
+    again = svc.validate_batch([_signal("NVDA"), _signal("AAPL")])
+    assert state["calls"] == 1 and svc.stats["cache_hits"] == 2
+    assert [r.should_proceed for r in again] == [True, False]
+
+
+def test_one_cycle_deadline_across_chunks_falls_back_per_signal(stub_server, monkeypatch):
+    url, state = stub_server
+    state["hold"].clear()                                                 # 응답 보류 → 마감 초과
+    monkeypatch.setattr(validation_mod, "VALIDATION_MAX_BATCH", 1)        # 청크 2개
+    waits = []
+    real_wait = validation_mod.wait
+    monkeypatch.setattr(validation_mod, "wait", lambda fs, timeout: waits.append((len(fs), timeout)) or
+                        real_wait(fs, timeout=timeout))
+    svc = BatchValidationService(llm_engine=_engine(url, monkeypatch), deadline_sec=0.2)
+    results = svc.validate_batch([_signal("NVDA", score=0.9), _signal("MSFT", score=0.65)])
+
+    assert waits == [(2, 0.2)]                                            # 두 청크가 마감 하나를 공유
+    assert svc.stats["timeouts"] == 2
+    state["hold"].set()
+    assert [r.validation_reason for r in results] == ["기본 검증 (LLM 없음)"] * 2
+    assert [r.should_proceed for r in results] == [True, False]
+
+
+def test_monthly_cap_blocks_validation_calls(stub_server, monkeypatch):
+    url, state = stub_server
+    engine = _engine(url, monkeypatch, cap_krw=0.0)
+    svc = BatchValidationService(llm_engine=engine, deadline_sec=1.0)
+    results = svc.validate_batch([_signal("NVDA")])
+
+    assert state["calls"] == 0 and not engine.llm_enabled
+    assert results[0].validation_reason == "기본 검증 (LLM 없음)"
@@ -0,0 +1,121 @@
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+
+from app.io.streams import STREAM_COUNT_SINCE_KEY, RedisStreams, stream_count_key
+from app.jobs.eod_reporter import load_stream_counts
+
+ET = ZoneInfo("America/New_York")
+YMD = "20261016"
+
+
+def _ms(hour, minute=0, day=16):
+    return int(datetime(2026, 10, day, hour, minute, tzinfo=ET).timestamp() * 1000)
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.kv, self.h, self.streams, self.xrange_calls = {}, {}, {}, 0
+        self.now_ms = 0
+
+    def pipeline(self, transaction=True):
+        return _Pipe(self)
+
+    def xadd(self, stream, fields):
+        entries = self.streams.setdefault(stream, [])
+        mid = f"{self.now_ms}-{len(entries)}"
+        entries.append((mid, fields))
+        return mid
+
+    def xrange(self, stream, min, max, count=None):
+        self.xrange_calls += 1
+        key = lambda i: tuple(int(x) for x in i.lstrip("(").split("-"))  # noqa: E731
+        lo, hi = key(min), key(max)
+        rows = [(i, f) for i, f in self.streams.get(stream, [])
+                if (key(i) > lo if min.startswith("(") else key(i) >= lo) and key(i) <= hi]
+        return rows[:count]
+
+    def hincrby(self, key, field, n):
+        h = self.h.setdefault(key, {})
+        h[field] = int(h.get(field, 0)) + n
+
+    def hset(self, key, mapping):
+        self.h.setdefault(key, {}).update(mapping)
+
+    def hgetall(self, key):
+        return {k.encode(): str(v).encode() for k, v in self.h.get(key, {}).items()}
+
+    def set(self, key, value, nx=False):
+        if nx and key in self.kv:
+            return None
+        self.kv[key] = str(value).encode()
+
+    def get(self, key):
+        return self.kv.get(key)
+
+    def rename(self, src, dst):
+        self.h[dst] = self.h.pop(src)
+
+    def delete(self, key):
+        self.h.pop(key, None)
+
+    def expire(self, *a):
+        pass
+
+
+class _Pipe:
+    def __init__(self, r):
+        self.r, self.ops = r, []
+
+    def __getattr__(self, name):
+        return lambda *a, **k: self.ops.append((name, a, k))
+
+    def execute(self):
+        return [getattr(self.r, n)(*a, **k) for n, a, k in self.ops]
+
+
+def _publisher(r):
+    rs = RedisStreams()
+    rs.redis_client = r
+    return rs
+
+
+def test_counters_cover_window_once_started_before_it():
+    r = _FakeRedis()
+    rs = _publisher(r)
+    r.now_ms = _ms(15, day=15)                       # 카운터 시작: 전일 윈도우
+    rs.publish_signal({"ticker": "AAPL"})
+    r.now_ms = _ms(17, day=15)                       # 전일 장 마감 후 → 이 리포트 날짜로 귀속
+    rs.publish_signal({"ticker": "AAPL"})
+    r.now_ms = _ms(10)
+    rs.publish_signal({"ticker": "MSFT"})
+    rs.publish_fill({"ticker": "MSFT"})
+    assert int(r.get(STREAM_COUNT_SINCE_KEY)) == _ms(15, day=15)
+
+    counts, source = load_stream_counts(r, YMD, datetime(2026, 10, 16, 21, tzinfo=timezone.utc))
+    assert source == "counters" and r.xrange_calls == 0
+    assert counts["signals.raw"] == {"post": 1, "rth": 1} and counts["orders.fills"] == {"rth": 1}
+
+
+def test_partial_hash_on_deploy_day_is_backfilled_from_streams():
+    r = _FakeRedis()
+    for hour in (5, 9, 11):                           # 카운터 도입 전 발행분
+        r.now_ms = _ms(hour)
+        r.xadd("signals.raw", {"ticker": "AAPL"})
+    rs = _publisher(r)
+    r.now_ms = _ms(13)
+    rs.publish_signal({"ticker": "NVDA"})             # 배포 이후 → 해시는 1건만
+    rs.publish_order({"ticker": "NVDA"})
+
+    # 윈도우가 열려 있으면 스트림에서 세되 발행 중인 해시는 덮지 않음
+    counts, source = load_stream_counts(r, YMD, datetime(2026, 10, 16, 18, tzinfo=timezone.utc))
+    assert source == "xrange" and sum(counts["signals.raw"].values()) == 4
+    assert r.h[stream_count_key(YMD)]["signals.raw:rth"] == 1
+
+    closed = datetime(2026, 10, 16, 21, tzinfo=timezone.utc)
+    counts, source = load_stream_counts(r, YMD, closed)
+    assert source == "backfill"
+    assert counts["signals.raw"] == {"pre": 2, "rth": 2} and counts["orders.submitted"] == {"rth": 1}
+
+    calls = r.xrange_calls
+    again, source = load_stream_counts(r, YMD, closed)  # 재구성 완료 표시 → 이후엔 해시 1회 조회
+    assert source == "counters" and r.xrange_calls == calls and again == counts
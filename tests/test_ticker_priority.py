@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.engine.ticker_priority import ADAPTIVE_CYCLE_DEADLINE_SEC, AdaptiveTickerScheduler, activity_features
+from app.io.quotes_delayed import Candle
+from app.utils.rate_limiter import TokenTier
+
+A, B = TokenTier.TIER_A, TokenTier.TIER_B
+T0 = datetime(2026, 10, 16, 14, 0)
+
+
+def _candles(hot=False, n=21):
+    out, p = [], 100.0
+    for i in range(n):
+        step = 0.01 if (hot and i >= n - 5) else 0.001
+        o, p = p, p * (1 + (step if i % 2 else -step))
+        v = 5000 if (hot and i == n - 1) else 1000
+        out.append(Candle("X", T0 + timedelta(minutes=i), o, max(o, p), min(o, p), p, v))
+    return out
+
+
+def test_activity_features_flag_volatility_and_volume_surge():
+    vol, surge = activity_features(_candles(hot=True))
+    assert vol > 2.0 and surge == 5.0
+    assert activity_features(_candles()) == pytest.approx((1.0, 1.0), rel=1e-3)
+    assert activity_features(_candles(n=3)) == (0.0, 0.0)
+
+
+def test_hot_tickers_take_the_tier_budget_and_quiet_ones_hit_their_deadline():
+    sched = AdaptiveTickerScheduler(cycle_sec=30, max_tickers=0, deadline_sec=20, max_wait_mult=3)
+    now = 1_000_000.0
+    # 직전 사이클(30초 전)에 모두 배정된 상태
+    for t in ("QUIET1", "QUIET2", "HOT", "POS"):
+        sched._last_selected[t] = now - 30
+    acts = [sched.score("QUIET1", A, _candles(), now=now),
+            sched.score("QUIET2", A, _candles(), now=now),
+            sched.score("HOT", A, _candles(hot=True), now=now),
+            sched.score("POS", B, _candles(), has_position=True, last_score=0.7, cutoff=0.7, now=now)]
+    plan = sched.plan(acts, {A: 1, B: 1}, now=now)
+    assert {(a.ticker, a.reason) for a in plan.selected} == {("HOT", "adaptive_vol+surge"),
+                                                              ("POS", "adaptive_position+near_cut")}
+    assert {a.ticker for a in plan.deferred} == {"QUIET1", "QUIET2"}
+    assert plan.deadline == now + 20
+
+    # 조용한 종목은 명목 주기 x3(90s) 대기 후 마감 우선 배정
+    later = now + 61
+    acts = [sched.score("QUIET1", A, _candles(), now=later), sched.score("HOT", A, _candles(hot=True), now=later)]
+    plan = sched.plan(acts, {A: 1}, now=later)
+    assert plan.items() == [("QUIET1", A, "adaptive_deadline")]
+
+
+def test_budgets_pace_remaining_tokens_over_the_minute_and_cap_cpu():
+    sched = AdaptiveTickerScheduler(cycle_sec=30, max_tickers=2)
+    assert sched.tier_budgets({A: 6, B: 3}, now=60 * 100 + 5) == {A: 3, B: 2}
+    assert sched.tier_budgets({A: 4, B: 0}, now=60 * 100 + 40) == {A: 4, B: 0}
+    acts = [sched.score(t, A, _candles(), now=0.0) for t in ("X1", "X2", "X3")]
+    plan = sched.plan(acts, {A: 10}, now=0.0)
+    assert len(plan.selected) == 2 and len(plan.deferred) == 1
+
+
+def test_universe_change_drops_removed_tickers_and_default_deadline_leaves_room():
+    sched = AdaptiveTickerScheduler()
+    sched._last_selected.update({"AAPL": 1.0, "AMD": 1.0})
+    assert sched.sync_universe("v1", ["AAPL"]) and set(sched._last_selected) == {"AAPL"}
+    sched._last_selected["AMD"] = 2.0
+    assert not sched.sync_universe("v1", ["AAPL"]) and "AMD" in sched._last_selected  # 같은 버전 → 유지
+    assert ADAPTIVE_CYCLE_DEADLINE_SEC < 20                                           # soft_time_limit 이전 마감
@@ -0,0 +1,87 @@
+import random
+
+from app.adapters.trigger_book import STOP, TARGET, TRIGGER_BOOK_KEY, Trigger, TriggerBook
+
+
+def _book():
+    return TriggerBook(redis_url="", persist=False)
+
+
+def test_fires_only_crossed_levels_and_cancels_oco_sibling():
+    book = _book()
+    book.add(Trigger("SL_1", "AAPL", STOP, 95.0, 10, group="E1"))
+    book.add(Trigger("TP_1", "AAPL", TARGET, 110.0, 10, group="E1"))
+    book.add(Trigger("SL_2", "AAPL", STOP, 90.0, 5, group="E2"))
+    book.add(Trigger("TP_2", "AAPL", TARGET, 120.0, 5, group="E2"))
+
+    assert book.on_price("AAPL", 100.0) == []
+    fired = book.on_price("AAPL", 94.5)
+    assert [t.order_id for t in fired] == ["SL_1"]
+    assert book.get("TP_1") is None  # OCO 반대편 취소
+    assert [t.order_id for t in book.on_price("AAPL", 125.0)] == ["TP_2"]
+    assert len(book) == 0 and book.tickers() == []
+
+
+def test_thousands_of_resting_orders_touch_only_crossed_levels():
+    book = _book()
+    rnd = random.Random(5)
+    for i in range(5000):
+        px = 100 + rnd.uniform(-1, 1)
+        book.add(Trigger(f"SL_{i}", "SPY", STOP, px * 0.9, 1, group=f"E{i}"))
+        book.add(Trigger(f"TP_{i}", "SPY", TARGET, px * 1.1, 1, group=f"E{i}"))
+
+    for _ in range(2000):
+        assert book.on_price("SPY", 100.0 + rnd.uniform(-2, 2)) == []
+    assert len(book) == 10000
+
+    fired = book.on_price("SPY", 89.5)                       # 가장 높은 스톱 몇 개만 교차
+    assert fired and len(fired) < 5000
+    assert all(t.kind == STOP and t.level >= 89.5 for t in fired)
+    assert len(book) == 10000 - 2 * len(fired)               # 발동분 + OCO 반대편만 제거
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.h = {}
+
+    def hset(self, key, field, value):
+        self.h.setdefault(key, {})[field.encode()] = value.encode()
+
+    def hdel(self, key, *fields):
+        h = self.h.get(key, {})
+        return sum(h.pop(f.encode(), None) is not None for f in fields)
+
+    def hgetall(self, key):
+        return dict(self.h.get(key, {}))
+
+    def pipeline(self, transaction=True):
+        return _Pipe(self)
+
+
+class _Pipe:
+    def __init__(self, r):
+        self.r, self.ops = r, []
+
+    def __getattr__(self, name):
+        return lambda *a, **k: self.ops.append((name, a, k))
+
+    def execute(self):
+        return [getattr(self.r, n)(*a, **k) for n, a, k in self.ops]
+
+
+def test_processes_sharing_a_book_fire_each_trigger_once():
+    shared = _FakeRedis()
+    worker, stream = TriggerBook(redis_url="redis://fake"), TriggerBook(redis_url="redis://fake")
+    worker._r = stream._r = shared
+    worker.add(Trigger("SL_1", "AAPL", STOP, 95.0, 10, group="E1"))
+    worker.add(Trigger("TP_1", "AAPL", TARGET, 110.0, 10, group="E1"))
+
+    assert stream.sync(max_age=0) == 2                        # 다른 프로세스의 신규 트리거 반영
+    assert [t.order_id for t in stream.on_price("AAPL", 94.0)] == ["SL_1"]
+    assert worker.on_price("AAPL", 94.0) == []                # 이미 선점됨 → 중복 체결 없음
+    assert shared.hgetall(TRIGGER_BOOK_KEY) == {} and len(worker) == 0
+
+    worker.add(Trigger("SL_2", "MSFT", STOP, 300.0, 1))
+    stream.sync(max_age=0)
+    worker.cancel("SL_2")
+    assert stream.sync(max_age=0) == 1 and stream.tickers() == []   # 취소도 따라잡음
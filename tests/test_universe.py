@@ -0,0 +1,38 @@
+import app.utils.universe as universe_mod
+from app.config import RuntimeConfig
+from app.utils.universe import UniverseService
+
+
+def _cfg(version, external=(), watch=()):
+    return RuntimeConfig(version=version, loaded_at=0.0, signal_cutoff_rth=0.18, signal_cutoff_ext=0.28,
+                         universe_external=tuple(external), universe_watchlist=tuple(watch))
+
+
+def test_merge_cap_tiers_and_diff_follow_config_version(monkeypatch):
+    cfg = [_cfg("v1", external=["nvda", "AMD"], watch=["PLTR"])]
+    monkeypatch.setattr(universe_mod, "get_config_snapshot", lambda: cfg[0])
+    service = UniverseService(max_size=4, core=["AAPL", "NVDA"])
+    seen = []
+    service.subscribe(lambda snap, d: seen.append((snap.version, d.added, d.removed)))
+
+    first = service.snapshot()
+    assert first.symbols == ("AAPL", "NVDA", "AMD", "PLTR")         # 중복 제거, 코어 → external → watch 순
+    assert first.tier_a == ("AAPL", "NVDA") and "AMD" in first.bench
+    assert service.snapshot() is first                               # 설정 버전 동일 → 재계산 없음
+
+    cfg[0] = _cfg("v2", external=["nvda", "AMD"], watch=["PLTR"])   # 다른 설정만 변경
+    same = service.snapshot()
+    assert same.version == first.version and same.config_version == "v2" and len(seen) == 1
+
+    cfg[0] = _cfg("v3", external=["TSLA", "COIN", "SHOP"])           # 상한 4개에서 잘림
+    second = service.snapshot()
+    assert second.symbols == ("AAPL", "NVDA", "TSLA", "COIN")
+    d = service.diff(first.version, second)
+    assert d.added == ("TSLA", "COIN") and d.removed == ("AMD", "PLTR")
+    assert seen[-1] == (second.version, ("TSLA", "COIN"), ("AMD", "PLTR"))
+    assert service.diff("unknown", second).added == second.symbols   # 모르는 버전 → 전체 추가
+
+
+def test_default_cap_matches_signal_path(monkeypatch):
+    monkeypatch.delenv("UNIVERSE_MAX", raising=False)
+    assert UniverseService(core=[]).max_size == 100
@@ -0,0 +1,94 @@
+from collections import deque
+
+import psycopg2
+import pytest
+
+from app.io.write_behind import WriteBehindStore
+
+
+class _FakeConn:
+    closed = False
+
+    def __init__(self):
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+def _store(monkeypatch, insert, spool_dir=None):
+    store = WriteBehindStore(redis_url="", dsn="postgresql://test", spool_dir=spool_dir)
+    store._conn = _FakeConn()
+    monkeypatch.setattr(store, "_ensure_thread", lambda *a, **k: None)
+    monkeypatch.setattr(WriteBehindStore, "_insert", staticmethod(insert))
+    return store
+
+
+def test_batches_rows_per_table_in_fk_order(monkeypatch):
+    calls = []
+    store = _store(monkeypatch, lambda cur, spec, values: calls.append((spec.name, len(values))))
+    store.enqueue("trades", {"trade_id": "T1", "signal_id": 7})
+    store.enqueue("signals", {"id": 7, "ticker": "AAPL"})
+    store.enqueue("exit_decisions", {"decision_id": "D1"})
+    store.enqueue("signals", {"id": 8, "ticker": "MSFT"})
+
+    assert store.flush_spool() == 4
+    assert calls == [("signals", 2), ("trades", 1), ("exit_decisions", 1)]
+    assert store._conn.commits == 1 and store.spool_backlog() == 0
+
+
+def test_bad_row_is_dead_lettered_without_blocking_batch(monkeypatch):
+    def insert(cur, spec, values):
+        if any(v[0] == "BAD" for v in values):
+            raise ValueError("constraint")
+
+    store = _store(monkeypatch, insert)
+    store.enqueue("trades", {"trade_id": "OK"})
+    store.enqueue("trades", {"trade_id": "BAD"})
+
+    assert store.flush_spool() == 1
+    assert store.stats["dead"] == 1
+
+
+def test_db_outage_keeps_rows_spooled_across_restart(monkeypatch, tmp_path):
+    def insert(cur, spec, values):
+        raise psycopg2.OperationalError("down")
+
+    store = _store(monkeypatch, insert, spool_dir=str(tmp_path))
+    store.enqueue("signals", {"id": 1})
+    with pytest.raises(psycopg2.OperationalError):
+        store.flush_spool()
+    assert store.spool_backlog() == 1
+    assert store.lag_seconds() >= 0.0
+
+    # 워커 재시작 (다른 프로세스) → 유휴 시간이 지난 스풀을 이어서 적재
+    monkeypatch.setattr("app.io.write_behind.WRITE_BEHIND_CLAIM_IDLE_MS", 0)
+    calls = []
+    restarted = _store(monkeypatch, lambda cur, spec, values: calls.append(values), spool_dir=str(tmp_path))
+    monkeypatch.setattr("app.io.write_behind.os.getpid", lambda: -1)
+    assert restarted.flush_spool() == 1 and restarted.spool_backlog() == 0
+
+
+def test_ids_come_from_prefetched_pool(monkeypatch):
+    store = WriteBehindStore(redis_url="", dsn="postgresql://test", id_block=8)
+    refills = []
+    monkeypatch.setattr(store, "_request_refill", lambda: refills.append(1))
+    store._ids["signals"] = deque(range(100, 108))
+
+    assert [store.next_id() for _ in range(3)] == [100, 101, 102]
+    assert store.stats["id_misses"] == 0
+    store._ids["signals"] = deque([200, 201])
+    assert store.next_id() == 200 and refills  # 하한선 이하 → 백그라운드 보충 요청